@@ -1,6 +1,6 @@
 """Database package initialization."""
 
-from .schemas import Base, UploadedFile, ExtractionResult, ExtractionLog, JobStatus
+from .schemas import Base, UploadedFile, ExtractionResult, ExtractionLog, JobStatus, ExtractionLock, ExtractionBatch
 from .connection import engine, SessionLocal, get_db, init_db
 
 __all__ = [
@@ -9,6 +9,8 @@ __all__ = [
     "ExtractionResult",
     "ExtractionLog",
     "JobStatus",
+    "ExtractionLock",
+    "ExtractionBatch",
     "engine",
     "SessionLocal",
     "get_db",
@@ -3,14 +3,14 @@ Database connection and session management.
 Handles database engine creation, session management, and initialization.
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
 from typing import Generator
 
 from app.settings import settings
 from app.utils.logger import get_logger
 from .schemas import Base
+from .migrations import upgrade_database
 
 logger = get_logger(__name__)
 
@@ -38,10 +38,11 @@ else:
     logger.warning("DATABASE_URL not configured - Using SQLite for development")
     logger.warning("SQLite is not recommended for production use")
     
+    # One connection per session (not StaticPool): API threads and extraction workers
+    # must not share a connection, or their transactions interleave
     engine = create_engine(
         "sqlite:///./pdf_extraction.db",
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
+        connect_args={"check_same_thread": False, "timeout": 30},
         echo=settings.DEBUG,
     )
     logger.info("SQLite database engine created")
@@ -70,21 +71,23 @@ def get_db() -> Generator[Session, None, None]:
 
 def init_db() -> None:
     """
-    Initialize database - create all tables.
+    Initialize database - create or migrate all tables.
     
     This should be called on application startup.
-    Creates all tables defined in Base metadata if they don't exist.
+    Creates the schema on a new database and applies pending Alembic revisions
+    (backend/migrations) to an existing one, including databases created before
+    migrations were introduced.
     """
     try:
         logger.info("="*80)
         logger.info("DATABASE INITIALIZATION - Starting")
         logger.info("="*80)
         
-        Base.metadata.create_all(bind=engine)
+        action = upgrade_database(engine)
         
         # Get table count
         table_count = len(Base.metadata.tables)
-        logger.info(f"Database schema verified | Tables: {table_count}")
+        logger.info(f"Database schema verified | Tables: {table_count} | Migrations: {action}")
         logger.info(f"Tables: {', '.join(Base.metadata.tables.keys())}")
         logger.info("Database initialization completed successfully")
         logger.info("="*80)
@@ -107,6 +110,8 @@ def drop_all_tables() -> None:
     logger.warning("="*80)
     
     Base.metadata.drop_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
     
     logger.info("All tables dropped successfully")
 
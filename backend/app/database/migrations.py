@@ -0,0 +1,137 @@
+"""
+Schema migrations with Alembic (revisions in backend/migrations/versions).
+upgrade_database() brings a database to the latest revision:
+- a new database gets the current schema from the models and is stamped at head
+- a database created before migrations existed (by create_all, so it has no
+  alembic_version table) is stamped at the baseline revision and upgraded
+- any other database is upgraded from its recorded revision
+Revisions only add tables, columns and indexes that are missing, so databases
+created by create_all at any later model version upgrade cleanly as well.
+"""
+
+from pathlib import Path
+from typing import Any, Optional
+
+from alembic import command, op
+from alembic.config import Config
+from sqlalchemy import Column, inspect
+from sqlalchemy.engine import Connection, Engine
+
+from app.utils.logger import get_logger
+from .schemas import Base
+
+logger = get_logger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+ALEMBIC_INI = BACKEND_DIR / "alembic.ini"
+MIGRATIONS_DIR = BACKEND_DIR / "migrations"
+
+# Revision matching the schema before migrations were introduced
+BASELINE_REVISION = "3f6c2a1b9d10"
+
+
+def alembic_config(connection: Optional[Connection] = None) -> Config:
+    """
+    Alembic configuration for the migrations directory.
+    
+    Args:
+        connection: Connection the revisions run on (the application engine if omitted)
+    
+    Returns:
+        Alembic config
+    """
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def upgrade_database(bind: Engine) -> str:
+    """
+    Create or upgrade the schema to the latest revision.
+    
+    Args:
+        bind: Database engine
+    
+    Returns:
+        What was done: "created", "upgraded" or "upgraded_unversioned"
+    """
+    with bind.begin() as connection:
+        tables = set(inspect(connection).get_table_names())
+        config = alembic_config(connection)
+        
+        if "alembic_version" in tables:
+            command.upgrade(config, "head")
+            return "upgraded"
+        
+        if tables & set(Base.metadata.tables):
+            logger.info(f"Unversioned database - stamping baseline revision {BASELINE_REVISION} before upgrading")
+            command.stamp(config, BASELINE_REVISION)
+            command.upgrade(config, "head")
+            return "upgraded_unversioned"
+        
+        Base.metadata.create_all(bind=connection)
+        command.stamp(config, "head")
+        return "created"
+
+
+def has_table(table_name: str) -> bool:
+    """Whether a table exists (inside a revision)."""
+    return inspect(op.get_bind()).has_table(table_name)
+
+
+def has_column(table_name: str, column_name: str) -> bool:
+    """Whether a table has a column (inside a revision)."""
+    return column_name in {column["name"] for column in inspect(op.get_bind()).get_columns(table_name)}
+
+
+def has_index(table_name: str, index_name: str) -> bool:
+    """Whether a table has an index (inside a revision)."""
+    return index_name in {index["name"] for index in inspect(op.get_bind()).get_indexes(table_name)}
+
+
+def add_column_if_missing(table_name: str, column: Column, index: bool = False, **index_kw: Any) -> bool:
+    """
+    Add a column (and its ix_<table>_<column> index) unless it exists (inside a revision).
+    
+    Args:
+        table_name: Table name
+        column: Column to add
+        index: Also create the column's index
+        **index_kw: Extra create_index arguments (e.g. unique=True)
+    
+    Returns:
+        True if the column was added
+    """
+    added = not has_column(table_name, column.name)
+    if added:
+        op.add_column(table_name, column)
+    index_name = f"ix_{table_name}_{column.name}"
+    if index and not has_index(table_name, index_name):
+        op.create_index(index_name, table_name, [column.name], **index_kw)
+    return added
+
+
+def add_backfilled_column_if_missing(table_name: str, column: Column, backfill: str, index: bool = False) -> bool:
+    """
+    Add a NOT NULL column whose value for existing rows is computed from other
+    columns (inside a revision). SQLite only adds columns with constant defaults,
+    so the column is added nullable, backfilled, then made NOT NULL.
+    
+    Args:
+        table_name: Table name
+        column: Column to add (nullable=False)
+        backfill: SQL expression for the value of existing rows
+        index: Also create the column's index
+    
+    Returns:
+        True if the column was added
+    """
+    nullable_column = Column(column.name, column.type, nullable=True)
+    added = add_column_if_missing(table_name, nullable_column, index=index)
+    if added:
+        op.execute(f"UPDATE {table_name} SET {column.name} = {backfill} WHERE {column.name} IS NULL")
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.alter_column(column.name, existing_type=column.type, nullable=False)
+    return added
@@ -2,9 +2,11 @@
 CRUD operations for database models.
 """
 
+from sqlalchemy import String, cast, func, or_
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from typing import Iterator, List, Optional, Dict, Any
+from datetime import datetime, timedelta
 import uuid
 
 from .schemas import (
@@ -12,8 +14,13 @@ from .schemas import (
     ExtractionResult,
     ExtractionLog,
     JobStatus,
+    ExtractionLock,
+    ExtractionBatch,
     JobStatusEnum,
-    LogLevelEnum
+    JobTypeEnum,
+    LogLevelEnum,
+    JOB_PRIORITIES,
+    DEFAULT_TENANT_ID
 )
 
 
@@ -27,7 +34,8 @@ class UploadedFileService:
         original_filename: str,
         file_path: str,
         file_size: int,
-        mime_type: str = "application/pdf"
+        mime_type: str = "application/pdf",
+        content_hash: Optional[str] = None
     ) -> UploadedFile:
         """Create a new uploaded file record."""
         db_file = UploadedFile(
@@ -35,7 +43,8 @@ class UploadedFileService:
             original_filename=original_filename,
             file_path=file_path,
             file_size=file_size,
-            mime_type=mime_type
+            mime_type=mime_type,
+            content_hash=content_hash
         )
         db.add(db_file)
         db.commit()
@@ -91,7 +100,10 @@ class ExtractionResultService:
         processing_time: Optional[float] = None,
         total_characters_extracted: Optional[int] = None,
         total_sheets_generated: Optional[int] = None,
-        gemini_model_used: Optional[str] = None
+        gemini_model_used: Optional[str] = None,
+        template_id: Optional[str] = None,
+        model_config: Optional[str] = None,
+        prompt_version: Optional[str] = None
     ) -> ExtractionResult:
         """Create a new extraction result record."""
         db_result = ExtractionResult(
@@ -102,7 +114,10 @@ class ExtractionResultService:
             processing_time=processing_time,
             total_characters_extracted=total_characters_extracted,
             total_sheets_generated=total_sheets_generated,
-            gemini_model_used=gemini_model_used
+            gemini_model_used=gemini_model_used,
+            template_id=template_id,
+            model_config=model_config,
+            prompt_version=prompt_version
         )
         db.add(db_result)
         db.commit()
@@ -119,6 +134,39 @@ class ExtractionResultService:
         """Get extraction result by ID."""
         return db.query(ExtractionResult).filter(ExtractionResult.id == result_id).first()
     
+    @staticmethod
+    def get_by_excel_filename(db: Session, excel_filename: str) -> Optional[ExtractionResult]:
+        """Get the latest extraction result that produced an Excel filename."""
+        return db.query(ExtractionResult).filter(
+            ExtractionResult.excel_filename == excel_filename
+        ).order_by(ExtractionResult.id.desc()).first()
+    
+    @staticmethod
+    def find_reusable(
+        db: Session,
+        content_hash: str,
+        template_id: str,
+        model_config: str,
+        prompt_version: str
+    ) -> Optional[ExtractionResult]:
+        """Find the latest result for identical file content extracted with the same configuration."""
+        return db.query(ExtractionResult).join(UploadedFile).filter(
+            UploadedFile.content_hash == content_hash,
+            ExtractionResult.template_id == template_id,
+            ExtractionResult.model_config == model_config,
+            ExtractionResult.prompt_version == prompt_version
+        ).order_by(ExtractionResult.extraction_timestamp.desc()).first()
+    
+    @staticmethod
+    def delete(db: Session, result_id: int) -> bool:
+        """Delete extraction result record."""
+        db_result = db.query(ExtractionResult).filter(ExtractionResult.id == result_id).first()
+        if db_result:
+            db.delete(db_result)
+            db.commit()
+            return True
+        return False
+    
     @staticmethod
     def get_all(
         db: Session,
@@ -143,6 +191,93 @@ class ExtractionResultService:
             db.commit()
             db.refresh(db_result)
         return db_result
+    
+    @staticmethod
+    def update_excel_file(
+        db: Session,
+        result_id: int,
+        excel_filename: str,
+        excel_path: str
+    ) -> Optional[ExtractionResult]:
+        """Point a result at a new (regenerated) Excel file."""
+        db_result = db.query(ExtractionResult).filter(ExtractionResult.id == result_id).first()
+        if db_result:
+            db_result.excel_filename = excel_filename
+            db_result.excel_path = excel_path
+            db.commit()
+            db.refresh(db_result)
+        return db_result
+    
+    @staticmethod
+    def get_excel_filenames(db: Session, excel_filenames: List[str]) -> List[str]:
+        """Return which of the given Excel filenames belong to extraction results."""
+        if not excel_filenames:
+            return []
+        rows = db.query(ExtractionResult.excel_filename).filter(
+            ExtractionResult.excel_filename.in_(excel_filenames)
+        ).all()
+        return [row[0] for row in rows]
+    
+    @staticmethod
+    def _batch_file_ids(db: Session, batch_id: str) -> List[int]:
+        """
+        Uploaded file IDs whose results belong to a batch. Membership comes from
+        ExtractionBatch.items: deduplicated uploads point at jobs (and results) created
+        outside the batch. Jobs created in the batch also count while items is unset.
+        """
+        db_batch = db.query(ExtractionBatch).filter(ExtractionBatch.batch_id == batch_id).first()
+        if not db_batch:
+            return []
+        job_ids = [item["job_id"] for item in db_batch.items or [] if item.get("job_id")]
+        rows = db.query(JobStatus.file_id).filter(
+            or_(JobStatus.batch_id == batch_id, JobStatus.job_id.in_(job_ids))
+        ).all()
+        return [row[0] for row in rows]
+    
+    @staticmethod
+    def iter_with_data(
+        db: Session,
+        batch_size: int,
+        result_ids: Optional[List[int]] = None,
+        template_id: Optional[str] = None,
+        batch_id: Optional[str] = None,
+        extracted_from: Optional[datetime] = None,
+        extracted_to: Optional[datetime] = None
+    ) -> Iterator[Any]:
+        """
+        Iterate over results with extracted data in ID order, one query per batch_size rows.
+        Keyset pagination on the ID keeps each query cheap, and rows are plain tuples
+        (id, excel_filename, original_filename, extracted_data), so nothing accumulates
+        in the session however many results match.
+        """
+        query = db.query(
+            ExtractionResult.id,
+            ExtractionResult.excel_filename,
+            UploadedFile.original_filename,
+            ExtractionResult.extracted_data
+        ).join(UploadedFile, UploadedFile.id == ExtractionResult.file_id).filter(
+            ExtractionResult.extracted_data.isnot(None),
+            # A None value is stored as JSON null rather than SQL NULL
+            cast(ExtractionResult.extracted_data, String) != "null"
+        )
+        if result_ids:
+            query = query.filter(ExtractionResult.id.in_(result_ids))
+        if template_id:
+            query = query.filter(ExtractionResult.template_id == template_id)
+        if batch_id:
+            query = query.filter(ExtractionResult.file_id.in_(ExtractionResultService._batch_file_ids(db, batch_id)))
+        if extracted_from:
+            query = query.filter(ExtractionResult.extraction_timestamp >= extracted_from)
+        if extracted_to:
+            query = query.filter(ExtractionResult.extraction_timestamp < extracted_to)
+        
+        last_id = 0
+        while True:
+            rows = query.filter(ExtractionResult.id > last_id).order_by(ExtractionResult.id).limit(batch_size).all()
+            if not rows:
+                return
+            yield from rows
+            last_id = rows[-1].id
 
 
 class JobStatusService:
@@ -152,7 +287,13 @@ class JobStatusService:
     def create(
         db: Session,
         file_id: int,
-        job_id: Optional[str] = None
+        job_id: Optional[str] = None,
+        job_type: JobTypeEnum = JobTypeEnum.INTERACTIVE,
+        template_id: str = "fund_report_v1",
+        batch_id: Optional[str] = None,
+        tenant_id: Optional[str] = None,
+        priority: Optional[int] = None,
+        idempotency_key: Optional[str] = None
     ) -> JobStatus:
         """Create a new job status record."""
         if not job_id:
@@ -161,6 +302,13 @@ class JobStatusService:
         db_job = JobStatus(
             file_id=file_id,
             job_id=job_id,
+            job_type=job_type,
+            template_id=template_id,
+            batch_id=batch_id,
+            tenant_id=tenant_id or DEFAULT_TENANT_ID,
+            priority=priority if priority is not None else JOB_PRIORITIES[job_type],
+            queued_at=datetime.utcnow(),
+            idempotency_key=idempotency_key,
             status=JobStatusEnum.PENDING,
             progress_percentage=0
         )
@@ -179,6 +327,26 @@ class JobStatusService:
         """Get job status by file ID."""
         return db.query(JobStatus).filter(JobStatus.file_id == file_id).first()
     
+    @staticmethod
+    def get_by_job_ids(db: Session, job_ids: List[str]) -> List[JobStatus]:
+        """Get jobs for a list of job IDs."""
+        if not job_ids:
+            return []
+        return db.query(JobStatus).filter(JobStatus.job_id.in_(job_ids)).all()
+    
+    @staticmethod
+    def find_active_by_content(
+        db: Session,
+        content_hash: str,
+        template_id: str
+    ) -> Optional[JobStatus]:
+        """Find a pending or processing job for identical file content and template."""
+        return db.query(JobStatus).join(UploadedFile).filter(
+            UploadedFile.content_hash == content_hash,
+            JobStatus.template_id == template_id,
+            JobStatus.status.in_([JobStatusEnum.PENDING, JobStatusEnum.PROCESSING])
+        ).order_by(JobStatus.created_at.asc()).first()
+    
     @staticmethod
     def update_status(
         db: Session,
@@ -209,6 +377,234 @@ class JobStatusService:
             db.refresh(db_job)
         return db_job
     
+    @staticmethod
+    def claim_next_pending(db: Session) -> Optional[JobStatus]:
+        """
+        Atomically claim the next pending job for a worker.
+        
+        Scheduling order: highest priority class first; within a class, the tenant
+        with the fewest running jobs (fair share, ties go to the least recently
+        served tenant, then the longest waiting);
+        within a tenant, FIFO by queued_at. Uses a conditional update so concurrent
+        workers (in any process) never claim the same job.
+        """
+        running = dict(db.query(JobStatus.tenant_id, func.count(JobStatus.id)).filter(
+            JobStatus.status == JobStatusEnum.PROCESSING
+        ).group_by(JobStatus.tenant_id).all())
+        
+        groups = db.query(
+            JobStatus.priority,
+            JobStatus.tenant_id,
+            func.min(JobStatus.queued_at)
+        ).filter(
+            JobStatus.status == JobStatusEnum.PENDING
+        ).group_by(JobStatus.priority, JobStatus.tenant_id).all()
+        
+        # Round-robin between tenants: least recently served first
+        last_started = dict(db.query(JobStatus.tenant_id, func.max(JobStatus.started_at)).filter(
+            JobStatus.tenant_id.in_({g[1] for g in groups}),
+            JobStatus.started_at.isnot(None)
+        ).group_by(JobStatus.tenant_id).all())
+        groups.sort(key=lambda g: (
+            -g[0],
+            running.get(g[1], 0),
+            last_started.get(g[1]) or datetime.min,
+            g[2]
+        ))
+        
+        for priority, tenant_id, _ in groups:
+            candidates = db.query(JobStatus).filter(
+                JobStatus.status == JobStatusEnum.PENDING,
+                JobStatus.priority == priority,
+                JobStatus.tenant_id == tenant_id
+            ).order_by(JobStatus.queued_at.asc(), JobStatus.id.asc()).limit(5).all()
+            
+            for candidate in candidates:
+                claimed = db.query(JobStatus).filter(
+                    JobStatus.id == candidate.id,
+                    JobStatus.status == JobStatusEnum.PENDING
+                ).update({
+                    JobStatus.status: JobStatusEnum.PROCESSING,
+                    JobStatus.current_step: "starting",
+                    JobStatus.started_at: datetime.utcnow(),
+                    JobStatus.updated_at: datetime.utcnow()
+                }, synchronize_session=False)
+                db.commit()
+                
+                if claimed:
+                    db.refresh(candidate)
+                    return candidate
+        return None
+    
+    @staticmethod
+    def get_queue_position(db: Session, db_job: JobStatus) -> int:
+        """
+        Estimate how many pending jobs will be claimed before a pending job.
+        Counts all higher-priority jobs, earlier jobs of the same tenant, and - since
+        tenants are served round-robin - up to as many jobs of each other tenant.
+        """
+        pending = db.query(JobStatus).filter(JobStatus.status == JobStatusEnum.PENDING)
+        
+        higher = pending.filter(JobStatus.priority > db_job.priority).count()
+        own_ahead = pending.filter(
+            JobStatus.priority == db_job.priority,
+            JobStatus.tenant_id == db_job.tenant_id,
+            JobStatus.queued_at < db_job.queued_at
+        ).count()
+        other_tenants = db.query(JobStatus.tenant_id, func.count(JobStatus.id)).filter(
+            JobStatus.status == JobStatusEnum.PENDING,
+            JobStatus.priority == db_job.priority,
+            JobStatus.tenant_id != db_job.tenant_id
+        ).group_by(JobStatus.tenant_id).all()
+        
+        return higher + own_ahead + sum(min(count, own_ahead + 1) for _, count in other_tenants)
+    
+    @staticmethod
+    def average_duration_seconds(db: Session, sample_size: int = 20) -> Optional[float]:
+        """Average run time of the most recently completed jobs, or None without history."""
+        recent = db.query(JobStatus.started_at, JobStatus.completed_at).filter(
+            JobStatus.status == JobStatusEnum.COMPLETED,
+            JobStatus.started_at.isnot(None),
+            JobStatus.completed_at.isnot(None)
+        ).order_by(JobStatus.completed_at.desc()).limit(sample_size).all()
+        if not recent:
+            return None
+        return sum((done - started).total_seconds() for started, done in recent) / len(recent)
+    
+    @staticmethod
+    def request_cancel(db: Session, job_id: str) -> bool:
+        """
+        Mark a pending or processing job as cancelled.
+        Conditional update, so a job that finished concurrently is left untouched.
+        
+        Returns:
+            True if the job was cancelled
+        """
+        count = db.query(JobStatus).filter(
+            JobStatus.job_id == job_id,
+            JobStatus.status.in_([JobStatusEnum.PENDING, JobStatusEnum.PROCESSING])
+        ).update({
+            JobStatus.status: JobStatusEnum.CANCELLED,
+            JobStatus.current_step: "cancelled",
+            JobStatus.completed_at: datetime.utcnow()
+        }, synchronize_session=False)
+        db.commit()
+        return count > 0
+    
+    @staticmethod
+    def finish_if_processing(
+        db: Session,
+        job_id: str,
+        status: JobStatusEnum,
+        current_step: Optional[str] = None,
+        progress_percentage: Optional[int] = None,
+        error_message: Optional[str] = None
+    ) -> bool:
+        """
+        Move a processing job to a final status (completed or failed).
+        Conditional update, so a job cancelled concurrently stays cancelled.
+        
+        Returns:
+            True if the job was still processing and has been updated
+        """
+        values = {
+            JobStatus.status: status,
+            JobStatus.completed_at: datetime.utcnow(),
+            JobStatus.updated_at: datetime.utcnow()
+        }
+        if current_step is not None:
+            values[JobStatus.current_step] = current_step
+        if progress_percentage is not None:
+            values[JobStatus.progress_percentage] = progress_percentage
+        if error_message is not None:
+            values[JobStatus.error_message] = error_message
+        
+        count = db.query(JobStatus).filter(
+            JobStatus.job_id == job_id,
+            JobStatus.status == JobStatusEnum.PROCESSING
+        ).update(values, synchronize_session=False)
+        db.commit()
+        return count > 0
+    
+    @staticmethod
+    def heartbeat(db: Session, job_ids: List[str]) -> int:
+        """
+        Refresh updated_at of running jobs so requeue_stale leaves them alone.
+        
+        Returns:
+            Number of jobs still processing
+        """
+        if not job_ids:
+            return 0
+        count = db.query(JobStatus).filter(
+            JobStatus.job_id.in_(job_ids),
+            JobStatus.status == JobStatusEnum.PROCESSING
+        ).update({JobStatus.updated_at: datetime.utcnow()}, synchronize_session=False)
+        db.commit()
+        return count
+    
+    @staticmethod
+    def requeue_stale(db: Session, stale_after_seconds: int) -> int:
+        """
+        Return jobs stuck in processing (no heartbeat, e.g. after a worker crash) to
+        the pending state. Jobs whose result was already stored only missed their
+        final status update and are marked completed instead of running twice.
+        
+        Returns:
+            Number of requeued jobs
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=stale_after_seconds)
+        stale_jobs = db.query(JobStatus).filter(
+            JobStatus.status == JobStatusEnum.PROCESSING,
+            JobStatus.updated_at < cutoff
+        ).all()
+        finished_file_ids = {file_id for (file_id,) in db.query(ExtractionResult.file_id).filter(
+            ExtractionResult.file_id.in_([db_job.file_id for db_job in stale_jobs])
+        )}
+        
+        requeued = 0
+        for db_job in stale_jobs:
+            if db_job.file_id in finished_file_ids:
+                db_job.status = JobStatusEnum.COMPLETED
+                db_job.current_step = "completed"
+                db_job.progress_percentage = 100
+                db_job.completed_at = datetime.utcnow()
+                continue
+            db_job.status = JobStatusEnum.PENDING
+            db_job.current_step = "queued"
+            db_job.retry_count += 1
+            requeued += 1
+        db.commit()
+        return requeued
+    
+    @staticmethod
+    def count_by_status(db: Session, status: JobStatusEnum) -> int:
+        """Count jobs in a given status."""
+        return db.query(JobStatus).filter(JobStatus.status == status).count()
+    
+    @staticmethod
+    def find_by_idempotency_key(
+        db: Session,
+        idempotency_key: str,
+        tenant_id: str,
+        max_age_seconds: int
+    ) -> Optional[JobStatus]:
+        """Find the newest job submitted with an idempotency key by a tenant within the window."""
+        cutoff = datetime.utcnow() - timedelta(seconds=max_age_seconds)
+        return db.query(JobStatus).filter(
+            JobStatus.idempotency_key == idempotency_key,
+            JobStatus.tenant_id == tenant_id,
+            JobStatus.created_at >= cutoff
+        ).order_by(JobStatus.created_at.desc()).first()
+    
+    @staticmethod
+    def count_pending(db: Session, min_priority: Optional[int] = None) -> int:
+        """Count pending jobs, optionally only those at or above a priority."""
+        query = db.query(JobStatus).filter(JobStatus.status == JobStatusEnum.PENDING)
+        if min_priority is not None:
+            query = query.filter(JobStatus.priority >= min_priority)
+        return query.count()
+    
     @staticmethod
     def increment_retry(db: Session, job_id: str) -> Optional[JobStatus]:
         """Increment retry count for a job."""
@@ -293,3 +689,89 @@ class ExtractionLogService:
         count = db.query(ExtractionLog).filter(ExtractionLog.file_id == file_id).delete()
         db.commit()
         return count
+
+
+class ExtractionLockService:
+    """Service for ExtractionLock model operations."""
+    
+    @staticmethod
+    def acquire(db: Session, lock_key: str, job_id: str) -> Optional[ExtractionLock]:
+        """
+        Try to take the lock for a key.
+        
+        Returns:
+            None if the lock was acquired for job_id, otherwise the existing lock
+        """
+        db.add(ExtractionLock(lock_key=lock_key, job_id=job_id))
+        try:
+            db.commit()
+            return None
+        except IntegrityError:
+            db.rollback()
+        
+        existing = db.query(ExtractionLock).filter(ExtractionLock.lock_key == lock_key).first()
+        if existing is None:
+            # Released between our insert and lookup - try once more
+            db.add(ExtractionLock(lock_key=lock_key, job_id=job_id))
+            try:
+                db.commit()
+                return None
+            except IntegrityError:
+                db.rollback()
+                existing = db.query(ExtractionLock).filter(ExtractionLock.lock_key == lock_key).first()
+        return existing
+    
+    @staticmethod
+    def release(db: Session, lock_key: str, job_id: str) -> bool:
+        """Release a lock if it is still held by job_id."""
+        count = db.query(ExtractionLock).filter(
+            ExtractionLock.lock_key == lock_key,
+            ExtractionLock.job_id == job_id
+        ).delete()
+        db.commit()
+        return count > 0
+    
+    @staticmethod
+    def release_by_job_id(db: Session, job_id: str) -> int:
+        """Release all locks held by a job."""
+        count = db.query(ExtractionLock).filter(ExtractionLock.job_id == job_id).delete()
+        db.commit()
+        return count
+
+
+class ExtractionBatchService:
+    """Service for ExtractionBatch model operations."""
+    
+    @staticmethod
+    def create(
+        db: Session,
+        template_id: str = "fund_report_v1",
+        batch_id: Optional[str] = None
+    ) -> ExtractionBatch:
+        """Create a new, empty batch record."""
+        db_batch = ExtractionBatch(
+            batch_id=batch_id or str(uuid.uuid4()),
+            template_id=template_id,
+            total_files=0,
+            items=[]
+        )
+        db.add(db_batch)
+        db.commit()
+        db.refresh(db_batch)
+        return db_batch
+    
+    @staticmethod
+    def get_by_batch_id(db: Session, batch_id: str) -> Optional[ExtractionBatch]:
+        """Get batch by batch ID."""
+        return db.query(ExtractionBatch).filter(ExtractionBatch.batch_id == batch_id).first()
+    
+    @staticmethod
+    def set_items(db: Session, batch_id: str, items: List[Dict[str, Any]]) -> Optional[ExtractionBatch]:
+        """Store the per-file outcomes of a batch."""
+        db_batch = db.query(ExtractionBatch).filter(ExtractionBatch.batch_id == batch_id).first()
+        if db_batch:
+            db_batch.items = items
+            db_batch.total_files = len(items)
+            db.commit()
+            db.refresh(db_batch)
+        return db_batch
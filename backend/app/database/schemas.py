@@ -20,6 +20,22 @@ class JobStatusEnum(str, enum.Enum):
     CANCELLED = "cancelled"
 
 
+class JobTypeEnum(str, enum.Enum):
+    """Job type enumeration."""
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+
+
+# Scheduling priority per job type - higher runs first, so batch backfills never
+# delay interactive uploads
+JOB_PRIORITIES = {
+    JobTypeEnum.INTERACTIVE: 100,
+    JobTypeEnum.BATCH: 10
+}
+
+DEFAULT_TENANT_ID = "default"
+
+
 class LogLevelEnum(str, enum.Enum):
     """Log level enumeration."""
     DEBUG = "debug"
@@ -39,6 +55,7 @@ class UploadedFile(Base):
     original_filename = Column(String(255), nullable=False)
     file_path = Column(String(512), nullable=False)
     file_size = Column(Integer, nullable=False)  # Size in bytes
+    content_hash = Column(String(64), nullable=True, index=True)  # SHA-256 of file content
     mime_type = Column(String(100), default="application/pdf")
     upload_timestamp = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     
@@ -60,10 +77,15 @@ class ExtractionResult(Base):
     file_id = Column(Integer, ForeignKey("uploaded_files.id", ondelete="CASCADE"), nullable=False, unique=True, index=True)
     
     # Result data
-    excel_filename = Column(String(255), nullable=False)
+    excel_filename = Column(String(255), nullable=False, index=True)
     excel_path = Column(String(512), nullable=False)
     extracted_data = Column(JSON, nullable=True)  # Store structured JSON data
     
+    # Extraction configuration (used to decide whether a result can be reused)
+    template_id = Column(String(100), nullable=True)
+    model_config = Column(String(255), nullable=True)
+    prompt_version = Column(String(50), nullable=True)
+    
     # Metadata
     extraction_timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
     processing_time = Column(Float, nullable=True)  # Time in seconds
@@ -88,6 +110,17 @@ class JobStatus(Base):
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     file_id = Column(Integer, ForeignKey("uploaded_files.id", ondelete="CASCADE"), nullable=False, unique=True, index=True)
     job_id = Column(String(100), unique=True, nullable=False, index=True)  # UUID for job tracking
+    job_type = Column(Enum(JobTypeEnum), default=JobTypeEnum.INTERACTIVE, nullable=False, index=True)
+    template_id = Column(String(100), default="fund_report_v1", nullable=False)
+    batch_id = Column(String(100), ForeignKey("extraction_batches.batch_id", ondelete="SET NULL"), nullable=True, index=True)
+    
+    # Scheduling - priority class, fair share between tenants, FIFO within a tenant
+    priority = Column(Integer, default=JOB_PRIORITIES[JobTypeEnum.INTERACTIVE], nullable=False, index=True)
+    tenant_id = Column(String(100), default=DEFAULT_TENANT_ID, nullable=False, index=True)
+    queued_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    
+    # Client-supplied Idempotency-Key - retries within the window return this job
+    idempotency_key = Column(String(255), nullable=True, index=True)
     
     # Status tracking
     status = Column(Enum(JobStatusEnum), default=JobStatusEnum.PENDING, nullable=False, index=True)
@@ -98,6 +131,7 @@ class JobStatus(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)  # Worker heartbeat
     
     # Error handling
     error_message = Column(Text, nullable=True)
@@ -105,11 +139,35 @@ class JobStatus(Base):
     
     # Relationships
     uploaded_file = relationship("UploadedFile", back_populates="job_status")
+    batch = relationship("ExtractionBatch", back_populates="jobs")
     
     def __repr__(self):
         return f"<JobStatus(id={self.id}, job_id='{self.job_id}', status='{self.status}')>"
 
 
+class ExtractionBatch(Base):
+    """Model for a multi-file upload whose jobs are tracked together."""
+    
+    __tablename__ = "extraction_batches"
+    
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    batch_id = Column(String(100), unique=True, nullable=False, index=True)  # UUID for batch tracking
+    template_id = Column(String(100), default="fund_report_v1", nullable=False)
+    total_files = Column(Integer, default=0, nullable=False)
+    
+    # Per-file outcome: [{"filename", "job_id", "deduplicated", "error"}] - deduplicated
+    # files point at jobs outside the batch, so membership is kept here
+    items = Column(JSON, nullable=True)
+    
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    
+    # Relationships
+    jobs = relationship("JobStatus", back_populates="batch")
+    
+    def __repr__(self):
+        return f"<ExtractionBatch(id={self.id}, batch_id='{self.batch_id}', total_files={self.total_files})>"
+
+
 class ExtractionLog(Base):
     """Model for storing extraction process logs."""
     
@@ -135,3 +193,17 @@ class ExtractionLog(Base):
     
     def __repr__(self):
         return f"<ExtractionLog(id={self.id}, file_id={self.file_id}, level='{self.log_level}', message='{self.message[:50]}...')>"
+
+
+class ExtractionLock(Base):
+    """Single-flight lock: at most one in-flight extraction per content hash and template."""
+    
+    __tablename__ = "extraction_locks"
+    
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    lock_key = Column(String(200), unique=True, nullable=False, index=True)  # "<sha256>:<template_id>"
+    job_id = Column(String(100), nullable=False, index=True)  # Job performing the extraction
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<ExtractionLock(lock_key='{self.lock_key}', job_id='{self.job_id}')>"
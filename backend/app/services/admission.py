@@ -0,0 +1,131 @@
+"""
+Admission control for extraction submissions.
+New jobs are only accepted while the pending queue, the estimated prompt tokens of
+running Gemini calls and the resident memory of the server and its CPU pool are
+below their limits; otherwise the API answers 429 with a Retry-After hint instead
+of piling up work until workers run out of memory.
+"""
+
+import math
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.settings import settings
+from app.database.operations import JobStatusService
+from app.database.schemas import JobTypeEnum, JOB_PRIORITIES
+from app.services.ai_processor import llm_inflight_tokens
+from app.services.executors import process_memory_bytes
+from app.services.job_queue import DEFAULT_JOB_DURATION_SECONDS
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Bounds for the Retry-After hint derived from queue drain time
+MIN_RETRY_AFTER_SECONDS = 5
+MAX_RETRY_AFTER_SECONDS = 600
+
+
+class AdmissionDecision:
+    """Outcome of an admission check."""
+    
+    def __init__(self, admitted: bool, reasons: List[str], retry_after: Optional[int] = None):
+        self.admitted = admitted
+        self.reasons = reasons
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Decide whether new extraction jobs may be queued."""
+    
+    @staticmethod
+    def memory_exceeded() -> bool:
+        """Whether server + CPU pool memory is above ADMISSION_MAX_MEMORY_MB."""
+        if settings.ADMISSION_MAX_MEMORY_MB <= 0:
+            return False
+        return process_memory_bytes() > settings.ADMISSION_MAX_MEMORY_MB * 1024 * 1024
+    
+    def check(
+        self,
+        db: Session,
+        job_type: JobTypeEnum = JobTypeEnum.INTERACTIVE,
+        job_count: int = 1
+    ) -> AdmissionDecision:
+        """
+        Check whether new jobs can be admitted.
+        
+        Interactive submissions are limited by the pending interactive jobs, batch
+        submissions by all pending jobs including the ones being added.
+        
+        Args:
+            db: Database session
+            job_type: Scheduling class of the new jobs
+            job_count: Number of jobs the request would add
+        
+        Returns:
+            Admission decision with the reasons and Retry-After seconds when rejected
+        """
+        reasons = []
+        retry_after = 0
+        
+        if job_type == JobTypeEnum.BATCH:
+            depth = JobStatusService.count_pending(db)
+            limit = settings.ADMISSION_MAX_BATCH_QUEUE_DEPTH
+        else:
+            depth = JobStatusService.count_pending(db, JOB_PRIORITIES[JobTypeEnum.INTERACTIVE])
+            limit = settings.ADMISSION_MAX_QUEUE_DEPTH
+        
+        if depth + job_count > limit:
+            reasons.append(f"queue_depth {depth} + {job_count} exceeds {limit}")
+            retry_after = max(retry_after, self._queue_drain_seconds(db, depth + job_count - limit))
+        
+        tokens = llm_inflight_tokens.tokens
+        if tokens > settings.ADMISSION_MAX_INFLIGHT_TOKENS:
+            reasons.append(f"inflight_tokens {tokens} exceeds {settings.ADMISSION_MAX_INFLIGHT_TOKENS}")
+            retry_after = max(retry_after, settings.ADMISSION_RETRY_AFTER_SECONDS)
+        
+        if self.memory_exceeded():
+            reasons.append(f"memory exceeds {settings.ADMISSION_MAX_MEMORY_MB}MB")
+            retry_after = max(retry_after, settings.ADMISSION_RETRY_AFTER_SECONDS)
+        
+        if reasons:
+            return AdmissionDecision(False, reasons, retry_after)
+        return AdmissionDecision(True, [])
+    
+    def state(self, db: Session) -> Dict[str, Any]:
+        """
+        Current admission state for /health.
+        
+        Args:
+            db: Database session
+        
+        Returns:
+            Whether interactive and batch submissions are accepted, with current load and limits
+        """
+        interactive = self.check(db, JobTypeEnum.INTERACTIVE)
+        batch = self.check(db, JobTypeEnum.BATCH)
+        return {
+            "accepting_interactive": interactive.admitted,
+            "accepting_batch": batch.admitted,
+            "reasons": sorted(set(interactive.reasons + batch.reasons)),
+            "queue_depth": JobStatusService.count_pending(db),
+            "inflight_tokens": llm_inflight_tokens.tokens,
+            "memory_mb": round(process_memory_bytes() / (1024 * 1024), 1),
+            "limits": {
+                "max_queue_depth": settings.ADMISSION_MAX_QUEUE_DEPTH,
+                "max_batch_queue_depth": settings.ADMISSION_MAX_BATCH_QUEUE_DEPTH,
+                "max_inflight_tokens": settings.ADMISSION_MAX_INFLIGHT_TOKENS,
+                "max_memory_mb": settings.ADMISSION_MAX_MEMORY_MB
+            }
+        }
+    
+    @staticmethod
+    def _queue_drain_seconds(db: Session, excess_jobs: int) -> int:
+        """Seconds until the workers have worked off the excess jobs."""
+        duration = JobStatusService.average_duration_seconds(db) or DEFAULT_JOB_DURATION_SECONDS
+        seconds = math.ceil(excess_jobs / max(settings.EXTRACTION_WORKERS, 1) * duration)
+        return min(max(seconds, MIN_RETRY_AFTER_SECONDS), MAX_RETRY_AFTER_SECONDS)
+
+
+# Process-wide admission controller used by the API server
+admission_controller = AdmissionController()
@@ -6,36 +6,155 @@ Uses progressive chunking to extract complete data from large PDFs.
 
 import google.generativeai as genai
 import json
-from typing import Dict, Any, Optional, List
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Optional, List, Tuple
 
 from app.settings import settings
 from app.utils.logger import get_logger
-from app.templates.extraction_prompt import EXTRACTION_PROMPT_TEMPLATE, VALIDATION_PROMPT
+from app.services.document_parser import PDFExtractor
+from app.templates.extraction_prompt import (
+    EXTRACTION_PROMPT_TEMPLATE,
+    VALIDATION_PROMPT,
+    SECTION_FOCUS_INSTRUCTION,
+    BATCH_DOCUMENT_DELIMITER,
+    BATCH_OUTPUT_INSTRUCTION
+)
 
 logger = get_logger(__name__)
 
+# All 9 top-level sections of the fund report template
+SECTION_KEYS = [
+    "portfolio_summary",
+    "schedule_of_investments",
+    "statement_of_operations",
+    "statement_of_cashflows",
+    "pcap_statement",
+    "portfolio_company_profile",
+    "portfolio_company_financials",
+    "footnotes",
+    "reference_values"
+]
+
+# Sections returned as arrays of records (all others are objects)
+LIST_SECTIONS = {
+    "schedule_of_investments",
+    "statement_of_operations",
+    "portfolio_company_profile",
+    "portfolio_company_financials",
+    "footnotes"
+}
+
+# Period-table sections and their expected number of period values (line items x 3 periods)
+STATEMENT_SECTIONS = {
+    "statement_of_cashflows": 78,
+    "pcap_statement": 84
+}
+
+# Lower-case phrases that locate each section's pages for scoped re-extraction
+SECTION_PAGE_KEYWORDS = {
+    "portfolio_summary": ["portfolio summary", "fund summary", "total commitments", "net asset value"],
+    "schedule_of_investments": ["schedule of investments", "investment schedule"],
+    "statement_of_operations": ["statement of operations", "statements of operations"],
+    "statement_of_cashflows": ["statement of cash flows", "statements of cash flows", "cash flows from operating activities"],
+    "pcap_statement": ["partners' capital", "partners’ capital", "partners capital", "capital account", "pcap"],
+    "portfolio_company_profile": ["company overview", "company profile", "company description", "investment thesis"],
+    "portfolio_company_financials": ["ebitda", "ltm revenue", "enterprise value"],
+    "footnotes": ["notes to", "footnote"],
+    "reference_values": []
+}
+
+
+def current_model_config() -> str:
+    """
+    Describe the configured model setup, used to decide whether stored results can be reused.
+    
+    Returns:
+        Model name in single mode, or "cascade:<fast>><strong>" in cascade mode
+    """
+    if settings.EXTRACTION_MODE == "cascade":
+        return f"cascade:{settings.GEMINI_FAST_MODEL}>{settings.GEMINI_STRONG_MODEL}"
+    return settings.GEMINI_MODEL
+
+
+# Rough prompt size estimate for admission control (~4 characters per token)
+CHARS_PER_TOKEN = 4
+
+
+class InflightTokenCounter:
+    """Estimated prompt tokens of the Gemini calls currently running in this process."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens = 0
+    
+    @property
+    def tokens(self) -> int:
+        """Current in-flight token estimate."""
+        return self._tokens
+    
+    @contextmanager
+    def track(self, prompt: str):
+        """
+        Count a prompt as in flight for the duration of the block.
+        
+        Args:
+            prompt: Prompt text sent to the model
+        """
+        tokens = len(prompt) // CHARS_PER_TOKEN
+        with self._lock:
+            self._tokens += tokens
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._tokens -= tokens
+
+
+# Process-wide counter read by admission control
+llm_inflight_tokens = InflightTokenCounter()
+
 
 class GeminiExtractor:
     """Extract structured data using Google Gemini API."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, model_name: Optional[str] = None):
         """
         Initialize Gemini API client.
         
         Args:
             api_key: Gemini API key (uses settings if not provided)
+            model_name: Gemini model name (uses settings.GEMINI_MODEL if not provided)
         """
         self.api_key = api_key or settings.GEMINI_API_KEY
         if not self.api_key:
             logger.critical("Gemini API key is required but not provided")
             raise ValueError("Gemini API key is required")
         
+        self.model_name = model_name or settings.GEMINI_MODEL
+        self.models_used = [self.model_name]
+        self.escalated_sections: List[str] = []
+        # Optional callback(chunk_num, total_chunks) invoked after each chunk is processed
+        self.progress_callback: Optional[Callable[[int, int], None]] = None
+        # Optional cancellation checkpoint, called before every Gemini request
+        self.cancel_check: Optional[Callable[[], None]] = None
+        
         genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel(settings.GEMINI_MODEL)
+        self.model = genai.GenerativeModel(self.model_name)
         
-        logger.info(f"Gemini API initialized successfully | Model: {settings.GEMINI_MODEL}")
+        logger.info(f"Gemini API initialized successfully | Model: {self.model_name}")
+    
+    @property
+    def models_used_label(self) -> str:
+        """Models that contributed to the last extraction, e.g. 'fast-model+strong-model'."""
+        return "+".join(self.models_used)
     
-    def extract_data(self, pdf_text: str, max_retries: int = 2) -> Dict[str, Any]:
+    def extract_data(
+        self,
+        pdf_text: str,
+        max_retries: int = 2,
+        sections: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
         """
         Extract structured data from PDF text using progressive chunking.
         Splits large PDFs into 4 chunks (1/4 each) and extracts all 9 sections from each chunk,
@@ -44,10 +163,11 @@ class GeminiExtractor:
         Args:
             pdf_text: Extracted text from PDF
             max_retries: Maximum number of retry attempts
-            
+            sections: Restrict extraction to these sections (all 9 if not provided)
+        
         Returns:
             Structured data as a dictionary
-            
+        
         Raises:
             Exception: If extraction fails
         """
@@ -57,13 +177,241 @@ class GeminiExtractor:
             chunk_size = len(pdf_text) // 4  # 1/4 of total
             logger.info(f"Large PDF detected | Size: {len(pdf_text):,} characters")
             logger.info(f"Strategy: Progressive chunking | Chunk size: ~{chunk_size:,} characters")
-            return self._extract_with_progressive_chunking(pdf_text)
+            return self._extract_data_progressive_chunks(pdf_text, chunk_size, max_retries, sections)
         else:
             # Single extraction for smaller PDFs
             logger.info(f"Small PDF detected | Size: {len(pdf_text):,} characters | Strategy: Single extraction")
-            return self._extract_single(pdf_text)
+            return self._extract_data_single(pdf_text, max_retries, sections)
+    
+    def extract_with_cascade(self, pdf_text: str, max_retries: int = 2) -> Dict[str, Any]:
+        """
+        Extract data with this (fast) model first, then escalate weak sections.
+        Sections whose fill rate is below settings.CASCADE_MIN_FILL_RATE are
+        re-extracted by settings.GEMINI_STRONG_MODEL in a single focused request,
+        and the stronger result is kept only where it actually fills more fields.
+        
+        Args:
+            pdf_text: Extracted text from PDF
+            max_retries: Maximum number of retry attempts per model
+        
+        Returns:
+            Structured data as a dictionary
+        """
+        logger.info(f"Cascade extraction | Fast model: {self.model_name} | Strong model: {settings.GEMINI_STRONG_MODEL}")
+        data = self.extract_with_retry(pdf_text, max_retries=max_retries)
+        
+        scores = self.score_sections(data)
+        weak_sections = [
+            section for section, score in scores.items()
+            if score < settings.CASCADE_MIN_FILL_RATE
+        ]
+        
+        if not weak_sections:
+            logger.info("Cascade: all sections passed fill-rate check, no escalation needed")
+            return data
+        
+        if settings.GEMINI_STRONG_MODEL == self.model_name:
+            logger.info("Cascade: strong model is the same as fast model, skipping escalation")
+            return data
+        
+        logger.info(f"Cascade: escalating {len(weak_sections)} weak sections: {', '.join(weak_sections)}")
+        
+        try:
+            strong_extractor = self.strong_extractor()
+            strong_data = strong_extractor.extract_data(pdf_text, max_retries=max_retries, sections=weak_sections)
+        except Exception as e:
+            logger.warning(f"Cascade: escalation failed, keeping fast model results: {str(e)}")
+            return data
+        
+        self.models_used.append(strong_extractor.model_name)
+        strong_scores = self.score_sections(strong_data)
+        
+        for section in weak_sections:
+            if strong_scores.get(section, 0.0) > scores[section]:
+                data[section] = strong_data[section]
+                self.escalated_sections.append(section)
+                logger.info(f"   ✓ {section}: fill rate {scores[section]:.0%} -> {strong_scores[section]:.0%}")
+            else:
+                logger.info(f"   - {section}: strong model did not improve fill rate ({scores[section]:.0%})")
+        
+        return data
+    
+    def strong_extractor(self) -> "GeminiExtractor":
+        """
+        Extractor for settings.GEMINI_STRONG_MODEL, used for cascade escalation and for
+        re-extracting sections the cascade left empty. Shares this extractor's API key
+        and cancellation checkpoint; returns self if this already is the strong model.
+        """
+        if self.model_name == settings.GEMINI_STRONG_MODEL:
+            return self
+        strong_extractor = GeminiExtractor(api_key=self.api_key, model_name=settings.GEMINI_STRONG_MODEL)
+        strong_extractor.cancel_check = self.cancel_check
+        return strong_extractor
+    
+    def find_failed_sections(self, data: Dict[str, Any]) -> List[str]:
+        """
+        Find sections that came back empty or with the wrong structure.
+        
+        Args:
+            data: Validated extracted data
+        
+        Returns:
+            List of failed section keys
+        """
+        failed = []
+        for section in SECTION_KEYS:
+            value = data.get(section)
+            expected_type = list if section in LIST_SECTIONS else dict
+            if not isinstance(value, expected_type) or self._count_fields(value)[0] == 0:
+                failed.append(section)
+        return failed
+    
+    def reextract_sections(
+        self,
+        pdf_text: str,
+        data: Dict[str, Any],
+        sections: List[str],
+        require_pages: bool = False,
+        max_retries: int = 2
+    ) -> List[str]:
+        """
+        Re-extract selected sections, scoped to the pages where they appear, and merge
+        them into the existing data in place. A section is replaced only if the new
+        result fills more fields than the current one.
+        
+        Args:
+            pdf_text: Extracted text from PDF (with page markers)
+            data: Existing extracted data (updated in place)
+            sections: Section keys to re-extract
+            require_pages: Skip sections whose pages cannot be located instead of
+                falling back to the whole document
+            max_retries: Maximum number of retry attempts
+        
+        Returns:
+            List of sections that were improved
+        """
+        self._validate_data(data)
+        pages = PDFExtractor.split_pages(pdf_text)
+        page_numbers = set()
+        scoped_sections = []
+        
+        for section in sections:
+            section_pages = self._find_section_pages(pages, section)
+            if section_pages:
+                page_numbers.update(section_pages)
+                scoped_sections.append(section)
+                logger.info(f"Re-extraction: {section} located on pages {sorted(section_pages)}")
+            elif require_pages:
+                logger.info(f"Re-extraction: {section} not found in document, skipping")
+            else:
+                logger.info(f"Re-extraction: {section} pages not located, using whole document")
+                page_numbers.update(page_num for page_num, _ in pages)
+                scoped_sections.append(section)
+        
+        if not scoped_sections:
+            return []
+        
+        scoped_text = "\n".join(text for page_num, text in pages if page_num in page_numbers)
+        logger.info(f"Re-extracting {len(scoped_sections)} sections from {len(page_numbers)}/{len(pages)} pages "
+                    f"({len(scoped_text):,} characters)")
+        
+        new_data = self.extract_data(scoped_text, max_retries=max_retries, sections=scoped_sections)
+        
+        old_scores = self.score_sections(data)
+        new_scores = self.score_sections(new_data)
+        improved = []
+        for section in scoped_sections:
+            if new_scores[section] > old_scores[section]:
+                data[section] = new_data[section]
+                improved.append(section)
+                logger.info(f"   ✓ {section}: fill rate {old_scores[section]:.0%} -> {new_scores[section]:.0%}")
+            else:
+                logger.info(f"   - {section}: re-extraction did not improve fill rate ({old_scores[section]:.0%})")
+        
+        return improved
+    
+    def _find_section_pages(self, pages: List[Tuple[int, str]], section: str) -> List[int]:
+        """
+        Locate the pages mentioning a section, plus the following page for tables that span pages.
+        
+        Args:
+            pages: List of (page_number, page_text) tuples
+            section: Section key
+        
+        Returns:
+            Sorted list of page numbers
+        """
+        keywords = SECTION_PAGE_KEYWORDS.get(section, [])
+        all_page_numbers = {page_num for page_num, _ in pages}
+        found = set()
+        
+        for page_num, text in pages:
+            lowered = text.lower()
+            if any(keyword in lowered for keyword in keywords):
+                found.add(page_num)
+                if page_num + 1 in all_page_numbers:
+                    found.add(page_num + 1)
+        
+        return sorted(found)
     
-    def _extract_data_progressive_chunks(self, pdf_text: str, chunk_size: int, max_retries: int) -> Dict[str, Any]:
+    def score_sections(self, data: Dict[str, Any]) -> Dict[str, float]:
+        """
+        Score each section by the fraction of its fields that are populated.
+        
+        Args:
+            data: Extracted data dictionary
+        
+        Returns:
+            Mapping of section key to fill rate (0.0 - 1.0)
+        """
+        scores = {}
+        for section in SECTION_KEYS:
+            filled, total = self._count_fields(data.get(section))
+            scores[section] = filled / total if total else 0.0
+        return scores
+    
+    def _count_fields(self, value: Any) -> Tuple[int, int]:
+        """
+        Recursively count populated and total leaf fields.
+        Null, zero and empty-string leaves count as unpopulated; header placeholders are ignored.
+        
+        Args:
+            value: Section value (dict, list or leaf)
+        
+        Returns:
+            Tuple of (filled, total)
+        """
+        if isinstance(value, dict):
+            filled, total = 0, 0
+            for key, sub_value in value.items():
+                if key.endswith("_header"):
+                    continue
+                sub_filled, sub_total = self._count_fields(sub_value)
+                filled += sub_filled
+                total += sub_total
+            return filled, total
+        
+        if isinstance(value, list):
+            if not value:
+                return 0, 1
+            filled, total = 0, 0
+            for item in value:
+                sub_filled, sub_total = self._count_fields(item)
+                filled += sub_filled
+                total += sub_total
+            return filled, total
+        
+        if value is None or value == "" or value == 0:
+            return 0, 1
+        return 1, 1
+    
+    def _extract_data_progressive_chunks(
+        self,
+        pdf_text: str,
+        chunk_size: int,
+        max_retries: int,
+        sections: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
         """
         Extract data progressively by splitting PDF into chunks.
         For EACH chunk, extract all 9 sections, then merge results.
@@ -72,7 +420,8 @@ class GeminiExtractor:
             pdf_text: Full PDF text
             chunk_size: Size of each chunk in characters (1/4 of total)
             max_retries: Maximum retry attempts
-            
+            sections: Restrict extraction to these sections (all 9 if not provided)
+        
         Returns:
             Merged structured data from all chunks
         """
@@ -103,6 +452,9 @@ class GeminiExtractor:
         
         # Process each chunk and extract all 9 sections
         for chunk_idx, chunk_text in enumerate(chunks, 1):
+            if self.cancel_check:
+                self.cancel_check()
+            
             logger.info("-"*80)
             logger.info(f"📊 CHUNK {chunk_idx}/{total_chunks}")
             logger.info(f"   Chunk size: {len(chunk_text)} characters")
@@ -113,7 +465,7 @@ class GeminiExtractor:
             try:
                 # Extract all 9 sections from this chunk
                 logger.info(f"   🔄 Extracting all 9 sections from chunk {chunk_idx}...")
-                chunk_data = self._extract_data_single(chunk_text, max_retries)
+                chunk_data = self._extract_data_single(chunk_text, max_retries, sections)
                 
                 if chunk_data:
                     logger.info(f"   ✅ Successfully extracted data from chunk {chunk_idx}")
@@ -128,11 +480,17 @@ class GeminiExtractor:
                     self._log_merge_status(merged_result, chunk_idx, total_chunks)
                 else:
                     logger.warning(f"   ⚠️  No data extracted from chunk {chunk_idx}")
-                    
+            
             except Exception as e:
                 logger.error(f"   ❌ Failed to process chunk {chunk_idx}: {str(e)}")
                 logger.info(f"   ➡️  Continuing with next chunk...")
             
+            if self.progress_callback:
+                try:
+                    self.progress_callback(chunk_idx, total_chunks)
+                except Exception as e:
+                    logger.warning(f"Progress callback failed: {str(e)}")
+            
             logger.info("")
         
         logger.info("="*80)
@@ -156,7 +514,7 @@ class GeminiExtractor:
         Args:
             text: Full text to split
             chunk_size: Maximum size of each chunk
-            
+        
         Returns:
             List of text chunks
         """
@@ -197,14 +555,14 @@ class GeminiExtractor:
             accumulated: Accumulated data from previous chunks
             new_data: New data from current chunk
             chunk_num: Current chunk number
-            
+        
         Returns:
             Updated accumulated data
         """
         for key, value in new_data.items():
             if key not in accumulated:
                 accumulated[key] = value
-                
+            
             elif isinstance(value, dict) and isinstance(accumulated[key], dict):
                 # For dictionaries (portfolio_summary, cashflows, pcap, reference_values)
                 # Merge new keys, but keep existing values for duplicate keys
@@ -212,7 +570,7 @@ class GeminiExtractor:
                     if sub_key not in accumulated[key] or accumulated[key][sub_key] is None or accumulated[key][sub_key] == 0:
                         # Only update if not already set or is null/zero
                         accumulated[key][sub_key] = sub_value
-                
+            
             elif isinstance(value, list) and isinstance(accumulated[key], list):
                 # For lists (investments, operations, companies, footnotes)
                 # Append new items, avoiding duplicates
@@ -240,7 +598,7 @@ class GeminiExtractor:
         Args:
             item1: First item
             item2: Second item
-            
+        
         Returns:
             True if items are duplicates
         """
@@ -276,7 +634,12 @@ class GeminiExtractor:
                     non_null_count = len([v for v in value.values() if v is not None and v != 0 and v != ""])
                     logger.info(f"      - {key}: {non_null_count} fields populated")
     
-    def _extract_data_single(self, pdf_text: str, max_retries: int = 2) -> Dict[str, Any]:
+    def _extract_data_single(
+        self,
+        pdf_text: str,
+        max_retries: int = 2,
+        sections: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
         """
         Extract data from PDF text using a single API call.
         Extracts all 9 sections from the provided text.
@@ -284,7 +647,8 @@ class GeminiExtractor:
         Args:
             pdf_text: Extracted text from PDF (or chunk)
             max_retries: Maximum number of retry attempts
-            
+            sections: Restrict extraction to these sections (all 9 if not provided)
+        
         Returns:
             Structured data as a dictionary with all 9 sections
         """
@@ -297,38 +661,16 @@ class GeminiExtractor:
         
         # Create prompt with extracted text
         prompt = EXTRACTION_PROMPT_TEMPLATE.format(extracted_text=pdf_text)
+        if sections:
+            prompt += SECTION_FOCUS_INSTRUCTION.format(sections=", ".join(sections))
         
         # Try extraction with retries
         for attempt in range(1, max_retries + 1):
             try:
                 logger.info(f"Extraction attempt {attempt}/{max_retries}")
-                logger.info("Sending extraction request to Gemini API...")
-                
-                # Generate content with specific configuration
-                generation_config = {
-                    "temperature": settings.GEMINI_TEMPERATURE,
-                    "top_p": 0.95,
-                    "top_k": 40,
-                    "max_output_tokens": settings.GEMINI_MAX_TOKENS,
-                }
-                
-                response = self.model.generate_content(
-                    prompt,
-                    generation_config=generation_config,
-                    safety_settings={
-                        "HARM_CATEGORY_HARASSMENT": "BLOCK_NONE",
-                        "HARM_CATEGORY_HATE_SPEECH": "BLOCK_NONE",
-                        "HARM_CATEGORY_SEXUALLY_EXPLICIT": "BLOCK_NONE",
-                        "HARM_CATEGORY_DANGEROUS_CONTENT": "BLOCK_NONE",
-                    }
-                )
+                logger.info(f"Sending extraction request to Gemini API ({self.model_name})...")
                 
-                # Extract text from response
-                response_text = response.text
-                logger.info(f"Received response from Gemini ({len(response_text)} chars)")
-                
-                # Log first part of response for debugging
-                logger.debug(f"Response preview: {response_text[:500]}...")
+                response_text = self._generate_content(prompt)
                 
                 # Parse JSON response
                 extracted_data = self._parse_json_response(response_text)
@@ -338,7 +680,7 @@ class GeminiExtractor:
                 
                 logger.info("Successfully extracted and validated data")
                 return validated_data
-                
+            
             except Exception as e:
                 logger.error(f"Extraction attempt {attempt} failed: {str(e)}")
                 if attempt == max_retries:
@@ -346,13 +688,92 @@ class GeminiExtractor:
                     raise Exception(f"Failed to extract data after {max_retries} attempts: {str(e)}")
                 logger.info(f"Retrying... ({attempt + 1}/{max_retries})")
     
+    def extract_packed(self, documents: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Extract several small documents with a single API call.
+        Documents are wrapped in delimiters so the instruction overhead of the
+        prompt is paid once per pack instead of once per document.
+        
+        Args:
+            documents: Mapping of document id to extracted text
+        
+        Returns:
+            Mapping of document id to validated data; ids missing from the
+            response are omitted so the caller can fall back to single extraction
+        
+        Raises:
+            Exception: If the request fails or the response is not valid JSON
+        """
+        packed_text = "\n\n".join(
+            BATCH_DOCUMENT_DELIMITER.format(doc_id=doc_id, extracted_text=text)
+            for doc_id, text in documents.items()
+        )
+        prompt = EXTRACTION_PROMPT_TEMPLATE.format(extracted_text=packed_text)
+        prompt += BATCH_OUTPUT_INSTRUCTION.format(doc_count=len(documents), doc_ids=", ".join(documents))
+        
+        logger.info(f"Packed extraction | Documents: {len(documents)} | Characters: {len(packed_text):,}")
+        response_text = self._generate_content(prompt)
+        parsed = self._parse_json_response(response_text)
+        
+        results = {}
+        for doc_id in documents:
+            doc_data = parsed.get(doc_id)
+            if isinstance(doc_data, dict):
+                results[doc_id] = self._validate_data(doc_data)
+            else:
+                logger.warning(f"Packed response missing document {doc_id}")
+        
+        logger.info(f"Packed extraction completed | Split {len(results)}/{len(documents)} documents")
+        return results
+    
+    def _generate_content(self, prompt: str) -> str:
+        """
+        Send a prompt to Gemini with the standard generation configuration.
+        
+        Args:
+            prompt: Full prompt text
+        
+        Returns:
+            Raw response text
+        """
+        if self.cancel_check:
+            self.cancel_check()
+        
+        generation_config = {
+            "temperature": settings.GEMINI_TEMPERATURE,
+            "top_p": 0.95,
+            "top_k": 40,
+            "max_output_tokens": settings.GEMINI_MAX_TOKENS,
+        }
+        
+        with llm_inflight_tokens.track(prompt):
+            response = self.model.generate_content(
+                prompt,
+                generation_config=generation_config,
+                safety_settings={
+                    "HARM_CATEGORY_HARASSMENT": "BLOCK_NONE",
+                    "HARM_CATEGORY_HATE_SPEECH": "BLOCK_NONE",
+                    "HARM_CATEGORY_SEXUALLY_EXPLICIT": "BLOCK_NONE",
+                    "HARM_CATEGORY_DANGEROUS_CONTENT": "BLOCK_NONE",
+                }
+            )
+        
+        # Extract text from response
+        response_text = response.text
+        logger.info(f"Received response from Gemini ({len(response_text)} chars)")
+        
+        # Log first part of response for debugging
+        logger.debug(f"Response preview: {response_text[:500]}...")
+        
+        return response_text
+    
     def _parse_json_response(self, response_text: str) -> Dict[str, Any]:
         """
         Parse JSON from Gemini response, handling markdown code blocks.
         
         Args:
             response_text: Raw response text from Gemini
-            
+        
         Returns:
             Parsed JSON data
         """
@@ -383,7 +804,7 @@ class GeminiExtractor:
             # Parse JSON
             data = json.loads(cleaned_text)
             return data
-            
+        
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse JSON response: {str(e)}")
             logger.debug(f"Response text (first 1000 chars): {response_text[:1000]}...")
@@ -418,7 +839,7 @@ Return ONLY the corrected JSON starting with {{ and ending with }}"""
                 data = json.loads(fixed_text)
                 logger.info("Successfully repaired JSON response")
                 return data
-                
+            
             except Exception as repair_error:
                 logger.error(f"Failed to repair JSON: {str(repair_error)}")
                 raise Exception(f"Invalid JSON response from Gemini: {str(e)}")
@@ -429,51 +850,24 @@ Return ONLY the corrected JSON starting with {{ and ending with }}"""
         
         Args:
             data: Extracted data dictionary
-            
+        
         Returns:
             Validated data
         """
         # Basic validation - ensure required top-level keys exist
-        required_keys = [
-            "portfolio_summary",
-            "schedule_of_investments",
-            "statement_of_operations",
-            "statement_of_cashflows",
-            "pcap_statement",
-            "portfolio_company_profile",
-            "portfolio_company_financials",
-            "footnotes",
-            "reference_values"
-        ]
-        
-        for key in required_keys:
+        for key in SECTION_KEYS:
             if key not in data:
                 logger.warning(f"Missing required key: {key}, adding empty structure")
-                if key in ["schedule_of_investments", "statement_of_operations", 
-                          "portfolio_company_profile", "portfolio_company_financials", 
-                          "footnotes"]:
-                    data[key] = []
-                elif key in ["statement_of_cashflows", "pcap_statement"]:
-                    data[key] = {}  # These are now dicts, not arrays
-                elif key == "reference_values":
-                    data[key] = {}
-                else:
-                    data[key] = {}
+                data[key] = [] if key in LIST_SECTIONS else {}
         
         # Check if critical financial statements have data
-        if isinstance(data.get("statement_of_cashflows"), dict):
-            cashflow_keys = len([k for k in data["statement_of_cashflows"].keys() if k.startswith("row_")])
-            if cashflow_keys == 0:
-                logger.warning("Statement of Cashflows is empty - no row data extracted")
-            else:
-                logger.info(f"Statement of Cashflows: {cashflow_keys} keys extracted (expected 78)")
-        
-        if isinstance(data.get("pcap_statement"), dict):
-            pcap_keys = len([k for k in data["pcap_statement"].keys() if k.startswith("row_")])
-            if pcap_keys == 0:
-                logger.warning("PCAP Statement is empty - no row data extracted")
-            else:
-                logger.info(f"PCAP Statement: {pcap_keys} keys extracted (expected 84)")
+        for key, expected in STATEMENT_SECTIONS.items():
+            if isinstance(data.get(key), dict):
+                filled, _ = self._count_fields(data[key])
+                if filled == 0:
+                    logger.warning(f"{key} is empty - no period values extracted")
+                else:
+                    logger.info(f"{key}: {filled} period values extracted (expected {expected})")
         
         return data
     
@@ -484,7 +878,7 @@ Return ONLY the corrected JSON starting with {{ and ending with }}"""
         Args:
             pdf_text: Extracted text from PDF
             max_retries: Maximum number of retry attempts
-            
+        
         Returns:
             Structured data
         """
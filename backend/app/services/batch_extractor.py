@@ -0,0 +1,344 @@
+"""
+Offline batch extraction service.
+Packs several small documents into a single Gemini request for throughput-oriented
+backfills, falling back to single-document extraction when a pack cannot be split.
+Packs are bounded by input size and by the output they are expected to need, since
+all documents of a pack share one response. A document that fails - unreadable
+file, database error, extraction error - is marked FAILED and the run continues.
+"""
+
+import os
+import shutil
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.settings import settings
+from app.services.document_parser import PDFExtractor
+from app.services.ai_processor import GeminiExtractor, CHARS_PER_TOKEN
+from app.services.spreadsheet_creator import create_workbook_writer
+from app.services.upload_ingestion import hash_file
+from app.database.operations import (
+    UploadedFileService,
+    ExtractionResultService,
+    ExtractionLogService,
+    JobStatusService
+)
+from app.database.schemas import JobStatusEnum, JobTypeEnum, LogLevelEnum
+from app.templates.extraction_prompt import PROMPT_VERSION
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class BatchDocument:
+    """A document registered for batch extraction together with its database records."""
+    
+    def __init__(self, doc_id: str, original_filename: str, pdf_path: str, file_id: int, job_id: str):
+        self.doc_id = doc_id
+        self.original_filename = original_filename
+        self.pdf_path = pdf_path
+        self.file_id = file_id
+        self.job_id = job_id
+        self.text = ""
+        self.start_time = time.time()
+        # Set once the job reached COMPLETED or FAILED
+        self.finished = False
+
+
+class BatchExtractionRunner:
+    """Run throughput-optimized extraction over many small documents."""
+    
+    def __init__(self, db: Session, template_id: str = "fund_report_v1"):
+        """
+        Initialize batch runner.
+        
+        Args:
+            db: Database session
+            template_id: Template ID for extraction format
+        """
+        self.db = db
+        self.template_id = template_id
+        self.extractor = GeminiExtractor()
+        self.stats = {
+            "documents": 0,
+            "completed": 0,
+            "failed": 0,
+            "packed_requests": 0,
+            "single_requests": 0
+        }
+    
+    def run(self, pdf_paths: List[str]) -> Dict[str, int]:
+        """
+        Extract all given PDFs, packing small documents together.
+        
+        Args:
+            pdf_paths: Paths of the PDF files to process
+        
+        Returns:
+            Summary counters for the batch
+        """
+        logger.info("=" * 80)
+        logger.info(f"BATCH EXTRACTION - Starting | Documents: {len(pdf_paths)} | Template: {self.template_id}")
+        logger.info("=" * 80)
+        
+        documents = []
+        for index, path in enumerate(pdf_paths, 1):
+            document = self._register(f"doc_{index}", path)
+            if document:
+                documents.append(document)
+        
+        packs = self.pack_documents(documents)
+        logger.info(f"Packed {len(documents)} documents into {len(packs)} requests")
+        
+        for pack_idx, pack in enumerate(packs, 1):
+            logger.info(f"Processing pack {pack_idx}/{len(packs)} | Documents: {len(pack)}")
+            try:
+                self._process_pack(pack)
+            except Exception as e:
+                logger.error(f"Pack {pack_idx} failed: {str(e)}", exc_info=True)
+                self.db.rollback()
+                for document in pack:
+                    if not document.finished:
+                        self._fail(document, e)
+        
+        logger.info("=" * 80)
+        logger.info(f"BATCH EXTRACTION - Completed | {self.stats}")
+        logger.info("=" * 80)
+        return self.stats
+    
+    @staticmethod
+    def expected_output_tokens(document: BatchDocument) -> int:
+        """
+        Estimate the response tokens a document needs: the JSON skeleton of all
+        sections plus output proportional to its text.
+        
+        Args:
+            document: Registered document with extracted text
+        
+        Returns:
+            Estimated output tokens
+        """
+        data_chars = len(document.text) * settings.BATCH_OUTPUT_CHARS_RATIO
+        return settings.BATCH_OUTPUT_TOKENS_PER_DOC + int(data_chars) // CHARS_PER_TOKEN
+    
+    @classmethod
+    def pack_documents(cls, documents: List[BatchDocument]) -> List[List[BatchDocument]]:
+        """
+        Greedily group small documents into packs bounded by input characters, expected
+        output tokens (BATCH_PACK_OUTPUT_SHARE of GEMINI_MAX_TOKENS, since the pack's
+        documents share one response) and document count.
+        Documents larger than settings.BATCH_SMALL_DOC_MAX_CHARS get a pack of their own.
+        
+        Args:
+            documents: Registered documents with extracted text
+        
+        Returns:
+            List of packs
+        """
+        output_budget = int(settings.GEMINI_MAX_TOKENS * settings.BATCH_PACK_OUTPUT_SHARE)
+        packs = []
+        current_pack = []
+        current_chars = 0
+        current_output = 0
+        
+        for document in sorted(documents, key=lambda d: len(d.text)):
+            if len(document.text) > settings.BATCH_SMALL_DOC_MAX_CHARS:
+                packs.append([document])
+                continue
+            
+            output_tokens = cls.expected_output_tokens(document)
+            if current_pack and (
+                current_chars + len(document.text) > settings.BATCH_PACK_MAX_CHARS
+                or current_output + output_tokens > output_budget
+                or len(current_pack) >= settings.BATCH_PACK_MAX_DOCS
+            ):
+                packs.append(current_pack)
+                current_pack = []
+                current_chars = 0
+                current_output = 0
+            
+            current_pack.append(document)
+            current_chars += len(document.text)
+            current_output += output_tokens
+        
+        if current_pack:
+            packs.append(current_pack)
+        
+        return packs
+    
+    def _register(self, doc_id: str, source_path: str) -> Optional[BatchDocument]:
+        """
+        Copy a PDF into the upload directory, create its records and extract its text.
+        
+        Args:
+            doc_id: Document id used inside packed prompts
+            source_path: Path of the source PDF
+        
+        Returns:
+            Registered document, or None if registration failed (its job, if one
+            was created, is marked FAILED)
+        """
+        original_filename = os.path.basename(source_path)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        safe_filename = original_filename.replace(" ", "_").replace(".pdf", "")
+        pdf_filename = f"{safe_filename}_{timestamp}_{doc_id}.pdf"
+        pdf_path = os.path.join(settings.UPLOAD_DIR, pdf_filename)
+        self.stats["documents"] += 1
+        
+        db_file = None
+        try:
+            shutil.copyfile(source_path, pdf_path)
+            db_file = UploadedFileService.create(
+                db=self.db,
+                filename=pdf_filename,
+                original_filename=original_filename,
+                file_path=pdf_path,
+                file_size=os.path.getsize(pdf_path),
+                content_hash=hash_file(pdf_path)
+            )
+            db_job = JobStatusService.create(
+                db=self.db, file_id=db_file.id,
+                job_type=JobTypeEnum.BATCH, template_id=self.template_id
+            )
+        except Exception as e:
+            logger.error(f"   ❌ {original_filename} could not be registered: {str(e)}")
+            self.db.rollback()
+            self.stats["failed"] += 1
+            try:
+                # No job to mark as failed - drop the partial upload instead
+                if db_file:
+                    UploadedFileService.delete(self.db, db_file.id)
+                if os.path.exists(pdf_path):
+                    os.remove(pdf_path)
+            except Exception as cleanup_error:
+                self.db.rollback()
+                logger.warning(f"Cleanup after failed registration of {original_filename} failed: {str(cleanup_error)}")
+            return None
+        
+        document = BatchDocument(doc_id, original_filename, pdf_path, db_file.id, db_job.job_id)
+        try:
+            JobStatusService.update_status(
+                self.db, document.job_id, JobStatusEnum.PROCESSING,
+                "extracting_text", 20
+            )
+            document.text = PDFExtractor().extract_text_from_pdf(pdf_path)
+            ExtractionLogService.create(
+                self.db, document.file_id,
+                f"Batch job: extracted {len(document.text)} characters from PDF",
+                LogLevelEnum.INFO, "text_extraction"
+            )
+        except Exception as e:
+            self.db.rollback()
+            self._fail(document, e)
+            return None
+        
+        return document
+    
+    def _process_pack(self, pack: List[BatchDocument]):
+        """
+        Extract one pack, falling back to single-document calls for anything not split cleanly.
+        
+        Args:
+            pack: Documents in the pack
+        """
+        for document in pack:
+            JobStatusService.update_status(
+                self.db, document.job_id, JobStatusEnum.PROCESSING,
+                "processing_with_ai", 40
+            )
+        
+        results = {}
+        if len(pack) > 1:
+            self.stats["packed_requests"] += 1
+            try:
+                results = self.extractor.extract_packed({d.doc_id: d.text for d in pack})
+            except Exception as e:
+                logger.warning(f"Packed request failed, falling back to single extraction: {str(e)}")
+        
+        for document in pack:
+            packed = document.doc_id in results
+            try:
+                if packed:
+                    data = results[document.doc_id]
+                else:
+                    self.stats["single_requests"] += 1
+                    data = self.extractor.extract_with_retry(document.text, max_retries=2)
+                self._finalize(document, data, packed)
+            except Exception as e:
+                self.db.rollback()
+                self._fail(document, e)
+    
+    def _finalize(self, document: BatchDocument, data: Dict[str, Any], packed: bool):
+        """
+        Generate the Excel file and store the extraction result for one document.
+        
+        Args:
+            document: Batch document
+            data: Extracted data
+            packed: Whether the data came from a packed request
+        """
+        JobStatusService.update_status(
+            self.db, document.job_id, JobStatusEnum.PROCESSING,
+            "generating_excel", 70
+        )
+        
+        excel_filename = os.path.basename(document.pdf_path).replace(".pdf", "_extracted.xlsx")
+        excel_path = os.path.join(settings.OUTPUT_DIR, excel_filename)
+        create_workbook_writer().generate_excel(data, excel_path)
+        
+        processing_time = time.time() - document.start_time
+        ExtractionResultService.create(
+            db=self.db,
+            file_id=document.file_id,
+            excel_filename=excel_filename,
+            excel_path=excel_path,
+            extracted_data=data,
+            processing_time=processing_time,
+            total_characters_extracted=len(document.text),
+            total_sheets_generated=9,
+            gemini_model_used=self.extractor.model_name,
+            template_id=self.template_id,
+            model_config=self.extractor.model_name,
+            prompt_version=PROMPT_VERSION
+        )
+        JobStatusService.update_status(
+            self.db, document.job_id, JobStatusEnum.COMPLETED,
+            "completed", 100
+        )
+        ExtractionLogService.create(
+            self.db, document.file_id,
+            f"Batch extraction completed ({'packed' if packed else 'single'} request) in {processing_time:.2f}s",
+            LogLevelEnum.INFO, "completion",
+            extra_data={"packed": packed}
+        )
+        document.finished = True
+        self.stats["completed"] += 1
+        logger.info(f"   ✓ {document.original_filename} -> {excel_filename}")
+    
+    def _fail(self, document: BatchDocument, error: Exception):
+        """
+        Mark a document's job as failed.
+        
+        Args:
+            document: Batch document
+            error: Raised exception
+        """
+        logger.error(f"   ❌ {document.original_filename} failed: {str(error)}")
+        document.finished = True
+        self.stats["failed"] += 1
+        try:
+            JobStatusService.update_status(
+                self.db, document.job_id, JobStatusEnum.FAILED,
+                error_message=str(error)
+            )
+            ExtractionLogService.create(
+                self.db, document.file_id,
+                f"Batch extraction failed: {str(error)}",
+                LogLevelEnum.ERROR, "error"
+            )
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Could not record failure of {document.original_filename}: {str(e)}")
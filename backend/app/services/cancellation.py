@@ -0,0 +1,131 @@
+"""
+Cooperative cancellation of extraction jobs.
+POST /api/jobs/{job_id}/cancel marks the job CANCELLED in the database and signals
+the local cancel token; the pipeline checks its token at checkpoints (between page
+batches, before every LLM call, between chunks and before Excel generation).
+"""
+
+import threading
+import time
+from typing import Dict
+
+from app.database.connection import SessionLocal
+from app.database.operations import JobStatusService
+from app.database.schemas import JobStatusEnum
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Minimum seconds between database checks for cancellations made by another process
+DB_CHECK_INTERVAL_SECONDS = 2.0
+
+
+class JobCancelled(BaseException):
+    """
+    Raised at a checkpoint when a job was cancelled.
+    Like asyncio.CancelledError it derives from BaseException, so the broad
+    `except Exception` retry handlers in the extraction code do not swallow it.
+    """
+
+
+class CancelToken:
+    """Cancellation flag for one running job."""
+    
+    def __init__(self, job_id: str):
+        """
+        Initialize token.
+        
+        Args:
+            job_id: Job UUID
+        """
+        self.job_id = job_id
+        self._event = threading.Event()
+        self._last_db_check = time.monotonic()
+    
+    def cancel(self) -> None:
+        """Signal cancellation to the running pipeline."""
+        self._event.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancellation was signalled (locally or via the database)."""
+        if self._event.is_set():
+            return True
+        
+        # Cancellations from another API process only reach us through the database
+        now = time.monotonic()
+        if now - self._last_db_check >= DB_CHECK_INTERVAL_SECONDS:
+            self._last_db_check = now
+            if self._is_cancelled_in_db():
+                self._event.set()
+        return self._event.is_set()
+    
+    def check(self) -> None:
+        """
+        Cancellation checkpoint.
+        
+        Raises:
+            JobCancelled: If the job was cancelled
+        """
+        if self.cancelled:
+            raise JobCancelled(self.job_id)
+    
+    def _is_cancelled_in_db(self) -> bool:
+        """Read the job status with a short-lived session."""
+        db = SessionLocal()
+        try:
+            db_job = JobStatusService.get_by_job_id(db, self.job_id)
+            return db_job is not None and db_job.status == JobStatusEnum.CANCELLED
+        except Exception as e:
+            logger.warning(f"[{self.job_id}] Cancellation check failed: {str(e)}")
+            return False
+        finally:
+            db.close()
+
+
+class CancellationRegistry:
+    """Cancel tokens for the jobs running in this process."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens: Dict[str, CancelToken] = {}
+    
+    def register(self, job_id: str) -> CancelToken:
+        """
+        Create the cancel token for a job that is about to run.
+        
+        Args:
+            job_id: Job UUID
+        
+        Returns:
+            Cancel token
+        """
+        token = CancelToken(job_id)
+        with self._lock:
+            self._tokens[job_id] = token
+        return token
+    
+    def unregister(self, job_id: str) -> None:
+        """Drop the token of a job that finished running."""
+        with self._lock:
+            self._tokens.pop(job_id, None)
+    
+    def cancel(self, job_id: str) -> bool:
+        """
+        Signal a job running in this process.
+        
+        Args:
+            job_id: Job UUID
+        
+        Returns:
+            True if the job runs in this process
+        """
+        with self._lock:
+            token = self._tokens.get(job_id)
+        if token:
+            token.cancel()
+        return token is not None
+
+
+# Process-wide registry shared by the job queue workers and the API server
+cancellation_registry = CancellationRegistry()
@@ -4,12 +4,17 @@ Extracts text content from PDF documents for further processing.
 """
 
 import pypdf
-from typing import Optional
+import re
+from typing import Optional, List, Tuple
 
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Page marker inserted before each page's text (also used by chunking in ai_processor)
+PAGE_MARKER = "--- Page {page_num} ---"
+PAGE_MARKER_PATTERN = re.compile(r"--- Page (\d+) ---")
+
 
 class PDFExtractor:
     """Extract text content from PDF files using pypdf."""
@@ -18,12 +23,13 @@ class PDFExtractor:
         """Initialize PDF extractor."""
         self.extracted_text = ""
     
-    def extract_text_from_pdf(self, pdf_path: str) -> str:
+    def extract_text_from_pdf(self, pdf_path: str, page_range: Optional[Tuple[int, int]] = None) -> str:
         """
         Extract all text content from a PDF file.
         
         Args:
             pdf_path: Path to PDF file
+            page_range: Optional (start, end) zero-based page slice to extract
             
         Returns:
             Extracted text as a single string
@@ -34,15 +40,17 @@ class PDFExtractor:
             with open(pdf_path, 'rb') as file:
                 pdf = pypdf.PdfReader(file)
                 pages_count = len(pdf.pages)
+                start, end = page_range if page_range else (0, pages_count)
                 
                 logger.info(f"PDF loaded successfully | Pages: {pages_count}")
                 
-                for page_num, page in enumerate(pdf.pages, 1):
+                for page_num in range(start + 1, min(end, pages_count) + 1):
+                    page = pdf.pages[page_num - 1]
                     logger.debug(f"Extracting text from page {page_num}/{pages_count}")
                     text = page.extract_text()
                     
                     if text:
-                        self.extracted_text += text + "\n\n"
+                        self.extracted_text += PAGE_MARKER.format(page_num=page_num) + "\n" + text + "\n\n"
                         logger.debug(f"Page {page_num} extracted | Characters: {len(text):,}")
                     else:
                         logger.warning(f"Page {page_num} contained no extractable text")
@@ -77,6 +85,27 @@ class PDFExtractor:
         
         return text.strip()
     
+    @staticmethod
+    def split_pages(text: str) -> List[Tuple[int, str]]:
+        """
+        Split extracted text back into pages using the page markers.
+        
+        Args:
+            text: Text produced by extract_text_from_pdf
+            
+        Returns:
+            List of (page_number, page_text) tuples; a single page 1 if no markers are found
+        """
+        matches = list(PAGE_MARKER_PATTERN.finditer(text))
+        if not matches:
+            return [(1, text)]
+        
+        pages = []
+        for idx, match in enumerate(matches):
+            end = matches[idx + 1].start() if idx + 1 < len(matches) else len(text)
+            pages.append((int(match.group(1)), text[match.start():end].strip()))
+        return pages
+    
     def get_text_preview(self, max_chars: int = 500) -> str:
         """
         Get a preview of the extracted text.
@@ -96,3 +125,32 @@ class PDFExtractor:
             preview += "..."
         
         return preview
+
+
+def extract_text_from_pdf(pdf_path: str, page_range: Optional[Tuple[int, int]] = None) -> str:
+    """
+    Extract text from a PDF with a fresh extractor.
+    Module-level so it can be dispatched to the CPU process pool.
+    
+    Args:
+        pdf_path: Path to PDF file
+        page_range: Optional (start, end) zero-based page slice to extract
+        
+    Returns:
+        Extracted text as a single string
+    """
+    return PDFExtractor().extract_text_from_pdf(pdf_path, page_range)
+
+
+def count_pdf_pages(pdf_path: str) -> int:
+    """
+    Count the pages of a PDF.
+    
+    Args:
+        pdf_path: Path to PDF file
+        
+    Returns:
+        Number of pages
+    """
+    with open(pdf_path, 'rb') as file:
+        return len(pypdf.PdfReader(file).pages)
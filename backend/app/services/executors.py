@@ -0,0 +1,91 @@
+"""
+Executor pools for blocking work.
+CPU-bound pipeline stages (PDF parsing, Excel generation) run in a process pool so
+they neither hold the GIL against the API event loop nor block other workers.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+from typing import Any, Callable, Optional
+
+from app.settings import settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Get the shared CPU process pool, creating it on first use.
+    
+    Returns:
+        Process pool executor
+    """
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            # Spawn (not fork) - the parent process runs worker and server threads
+            _process_pool = ProcessPoolExecutor(
+                max_workers=settings.CPU_POOL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"CPU process pool started | Workers: {settings.CPU_POOL_WORKERS}")
+        return _process_pool
+
+
+def run_cpu_bound(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a CPU-bound function in the process pool and wait for its result.
+    Must be called from a worker/threadpool thread, never directly on the event loop.
+    
+    Args:
+        func: Module-level (picklable) function
+        *args: Picklable arguments
+    
+    Returns:
+        Function result
+    """
+    if settings.CPU_POOL_WORKERS <= 0:
+        return func(*args)
+    return get_process_pool().submit(func, *args).result()
+
+
+def process_memory_bytes() -> int:
+    """
+    Resident memory of this process plus its CPU pool workers, read from /proc.
+    
+    Returns:
+        RSS in bytes, or 0 where /proc is unavailable
+    """
+    pids = [os.getpid()]
+    with _process_pool_lock:
+        if _process_pool is not None:
+            pids.extend(getattr(_process_pool, "_processes", None) or {})
+    return sum(_read_rss_bytes(pid) for pid in pids)
+
+
+def _read_rss_bytes(pid: int) -> int:
+    """Read VmRSS for a process, 0 if it is gone or /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def shutdown_executors() -> None:
+    """Shut down the process pool if it was started."""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
+            logger.info("CPU process pool stopped")
@@ -0,0 +1,366 @@
+"""
+Extraction pipeline for queued jobs.
+Runs text extraction, AI processing and Excel generation for a single job,
+driving its JobStatus record through the processing states.
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from sqlalchemy.orm import Session
+
+from app.settings import settings
+from app.services.document_parser import extract_text_from_pdf, count_pdf_pages
+from app.services.ai_processor import GeminiExtractor, current_model_config
+from app.services.spreadsheet_creator import generate_excel_file
+from app.services.executors import run_cpu_bound
+from app.services.single_flight import extraction_single_flight
+from app.services.job_events import job_event_broker, TERMINAL_EVENTS
+from app.services.cancellation import CancelToken, JobCancelled, cancellation_registry
+from app.database.connection import SessionLocal
+from app.database.operations import (
+    ExtractionResultService,
+    ExtractionLogService,
+    JobStatusService
+)
+from app.database.schemas import JobStatusEnum, LogLevelEnum
+from app.templates.extraction_prompt import PROMPT_VERSION
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def run_extraction_job(job_id: str) -> None:
+    """
+    Run the extraction pipeline for a claimed job with its own database session.
+    
+    Args:
+        job_id: Job UUID
+    """
+    db = SessionLocal()
+    cancel_token = cancellation_registry.register(job_id)
+    try:
+        ExtractionPipeline(db, job_id, cancel_token).run()
+    finally:
+        cancellation_registry.unregister(job_id)
+        db.close()
+
+
+class ExtractionPipeline:
+    """Run the full extraction pipeline for one job."""
+    
+    def __init__(self, db: Session, job_id: str, cancel_token: Optional[CancelToken] = None):
+        """
+        Initialize pipeline for a job.
+        
+        Args:
+            db: Database session
+            job_id: Job UUID
+            cancel_token: Token checked at cancellation checkpoints
+        """
+        self.db = db
+        self.job_id = job_id
+        self.cancel_token = cancel_token or CancelToken(job_id)
+    
+    def run(self) -> None:
+        """
+        Execute all pipeline phases. Failures are recorded on the job, never raised.
+        """
+        db = self.db
+        job_id = self.job_id
+        start_time = time.time()
+        
+        db_job = JobStatusService.get_by_job_id(db, job_id)
+        if not db_job:
+            logger.error(f"[{job_id}] Job not found - skipping")
+            return
+        
+        db_file = db_job.uploaded_file
+        pdf_path = db_file.file_path
+        excel_filename = f"{Path(db_file.filename).stem}_extracted.xlsx"
+        excel_path = os.path.join(settings.OUTPUT_DIR, excel_filename)
+        
+        logger.info("="*100)
+        logger.info(f"EXTRACTION JOB STARTED | Job ID: {job_id}")
+        logger.info(f"File: {db_file.original_filename} | Template: {db_job.template_id}")
+        logger.info("="*100)
+        
+        db_result = None
+        try:
+            # Update job status: Processing
+            self._set_status(JobStatusEnum.PROCESSING, "extracting_text", 20)
+            
+            # Step 1: Extract text from PDF
+            logger.info(f"[{job_id}] PHASE 2: Text Extraction - Processing PDF")
+            step_start = time.time()
+            
+            extracted_text = self._extract_text(pdf_path)
+            
+            step_duration = int((time.time() - step_start) * 1000)
+            logger.info(f"[{job_id}] Text extraction completed | Characters: {len(extracted_text):,} | Duration: {step_duration}ms")
+            ExtractionLogService.create(
+                db, db_file.id,
+                f"Extracted {len(extracted_text)} characters from PDF",
+                LogLevelEnum.INFO, "text_extraction", step_duration
+            )
+            
+            # Update job status
+            self._set_status(JobStatusEnum.PROCESSING, "processing_with_ai", 40)
+            
+            # Step 2: Send to Gemini for data extraction
+            logger.info(f"[{job_id}] PHASE 3: AI Processing - Extracting structured data with Gemini")
+            step_start = time.time()
+            
+            if settings.EXTRACTION_MODE == "cascade":
+                logger.debug(f"[{job_id}] Mode: cascade | Fast model: {settings.GEMINI_FAST_MODEL}")
+                gemini_extractor = GeminiExtractor(model_name=settings.GEMINI_FAST_MODEL)
+                gemini_extractor.progress_callback = self._report_chunk_progress
+                gemini_extractor.cancel_check = self.cancel_token.check
+                structured_data = gemini_extractor.extract_with_cascade(extracted_text, max_retries=2)
+            else:
+                logger.debug(f"[{job_id}] Model: {settings.GEMINI_MODEL}")
+                gemini_extractor = GeminiExtractor()
+                gemini_extractor.progress_callback = self._report_chunk_progress
+                gemini_extractor.cancel_check = self.cancel_token.check
+                structured_data = gemini_extractor.extract_with_retry(extracted_text, max_retries=2)
+            model_used = gemini_extractor.models_used_label
+            
+            step_duration = int((time.time() - step_start) * 1000)
+            logger.info(f"[{job_id}] AI processing completed | Model: {model_used} | Duration: {step_duration}ms")
+            ExtractionLogService.create(
+                db, db_file.id,
+                f"AI extraction completed using {model_used}",
+                LogLevelEnum.INFO, "ai_processing", step_duration,
+                extra_data={"escalated_sections": gemini_extractor.escalated_sections} if gemini_extractor.escalated_sections else None
+            )
+            
+            # Step 2b: Re-extract empty/invalid sections from the pages where they appear
+            failed_sections = gemini_extractor.find_failed_sections(structured_data)
+            if settings.AUTO_REEXTRACT_SECTIONS and failed_sections:
+                logger.info(f"[{job_id}] Re-extracting failed sections: {', '.join(failed_sections)}")
+                self._set_status(JobStatusEnum.PROCESSING, "reextracting_sections", 60)
+                step_start = time.time()
+                
+                # In cascade mode the fast model already failed these sections - retry on the strong one
+                reextractor = gemini_extractor
+                if settings.EXTRACTION_MODE == "cascade":
+                    reextractor = gemini_extractor.strong_extractor()
+                try:
+                    improved_sections = reextractor.reextract_sections(
+                        extracted_text, structured_data, failed_sections, require_pages=True
+                    )
+                except Exception as e:
+                    logger.warning(f"[{job_id}] Section re-extraction failed, keeping original results: {str(e)}")
+                    improved_sections = []
+                if improved_sections and reextractor.model_name not in gemini_extractor.models_used:
+                    gemini_extractor.models_used.append(reextractor.model_name)
+                    model_used = gemini_extractor.models_used_label
+                
+                step_duration = int((time.time() - step_start) * 1000)
+                ExtractionLogService.create(
+                    db, db_file.id,
+                    f"Re-extracted {len(improved_sections)}/{len(failed_sections)} failed sections",
+                    LogLevelEnum.INFO, "section_reextraction", step_duration,
+                    extra_data={"failed_sections": failed_sections, "improved_sections": improved_sections}
+                )
+            
+            if settings.EXCEL_OUTPUT_MODE != "disk":
+                # Workbook is rendered from extracted_data on download (lazy/memory output mode)
+                logger.info(
+                    f"[{job_id}] PHASE 4: Excel Generation - deferred to first download "
+                    f"({settings.EXCEL_OUTPUT_MODE} output mode) | File: {excel_filename}"
+                )
+            else:
+                # Update job status
+                self._set_status(JobStatusEnum.PROCESSING, "generating_excel", 70)
+                
+                # Step 3: Generate Excel file
+                logger.info(f"[{job_id}] PHASE 4: Excel Generation - Creating spreadsheet")
+                step_start = time.time()
+                
+                run_cpu_bound(generate_excel_file, structured_data, excel_path)
+                self.cancel_token.check()
+                
+                step_duration = int((time.time() - step_start) * 1000)
+                logger.info(f"[{job_id}] Excel generation completed | File: {excel_filename} | Duration: {step_duration}ms")
+                ExtractionLogService.create(
+                    db, db_file.id,
+                    f"Excel file generated: {excel_filename}",
+                    LogLevelEnum.INFO, "excel_generation", step_duration
+                )
+            
+            # Calculate processing time
+            total_processing_time = time.time() - start_time
+            
+            # Count sheets if structured_data is available
+            total_sheets = 0
+            if isinstance(structured_data, dict):
+                total_sheets = len(structured_data.get("sheets", []))
+            
+            # Create extraction result record
+            db_result = ExtractionResultService.create(
+                db=db,
+                file_id=db_file.id,
+                excel_filename=excel_filename,
+                excel_path=excel_path,
+                extracted_data=structured_data if isinstance(structured_data, dict) else None,
+                processing_time=total_processing_time,
+                total_characters_extracted=len(extracted_text),
+                total_sheets_generated=total_sheets,
+                gemini_model_used=model_used,
+                template_id=db_job.template_id,
+                model_config=current_model_config(),
+                prompt_version=PROMPT_VERSION
+            )
+            
+            # Update job status: Completed - unless it was cancelled after the last checkpoint
+            if not self._set_status(
+                JobStatusEnum.COMPLETED, "completed", 100,
+                result_id=db_result.id,
+                output_file=excel_filename,
+                download_url=f"/api/download/{excel_filename}"
+            ):
+                raise JobCancelled(job_id)
+            extraction_single_flight.release(db, job_id)
+            
+            ExtractionLogService.create(
+                db, db_file.id,
+                f"Extraction completed successfully in {total_processing_time:.2f}s",
+                LogLevelEnum.INFO, "completion"
+            )
+            
+            logger.info("="*100)
+            logger.info(f"EXTRACTION COMPLETED SUCCESSFULLY | Job ID: {job_id}")
+            logger.info(f"Total Time: {total_processing_time:.2f}s | Sheets: {total_sheets} | Characters: {len(extracted_text):,}")
+            logger.info("="*100)
+        
+        except JobCancelled:
+            logger.info(f"[{job_id}] EXTRACTION CANCELLED - stopping at checkpoint")
+            
+            db.rollback()
+            JobStatusService.request_cancel(db, job_id)
+            if db_result:
+                # Cancelled while completing - the result must not be served or reused
+                ExtractionResultService.delete(db, db_result.id)
+            job_event_broker.publish(
+                job_id, "cancelled",
+                status=JobStatusEnum.CANCELLED.value,
+                current_step="cancelled",
+                error_message="Cancelled by user"
+            )
+            ExtractionLogService.create(
+                db, db_file.id,
+                "Extraction cancelled by user",
+                LogLevelEnum.WARNING, "cancellation"
+            )
+            extraction_single_flight.release(db, job_id)
+            
+            # Clean up partial output
+            if os.path.exists(excel_path):
+                os.remove(excel_path)
+        
+        except Exception as e:
+            logger.error("="*100)
+            logger.error(f"EXTRACTION FAILED | Job ID: {job_id}")
+            logger.error(f"Error: {str(e)}")
+            logger.error("="*100, exc_info=True)
+            
+            db.rollback()
+            ExtractionLogService.create(
+                db, db_file.id,
+                f"Extraction failed: {str(e)}",
+                LogLevelEnum.ERROR, "error"
+            )
+            if not self._set_status(JobStatusEnum.FAILED, error_message=str(e)):
+                logger.info(f"[{job_id}] Job was cancelled - not marking it as failed")
+            extraction_single_flight.release(db, job_id)
+            
+            # Clean up partial output on error
+            if os.path.exists(excel_path):
+                os.remove(excel_path)
+    
+    def _extract_text(self, pdf_path: str) -> str:
+        """
+        Extract PDF text in page batches on the CPU pool, checking for cancellation between batches.
+        
+        Args:
+            pdf_path: Path to PDF file
+        
+        Returns:
+            Extracted text, identical to a single-pass extraction
+        """
+        page_count = run_cpu_bound(count_pdf_pages, pdf_path)
+        batch_size = max(settings.TEXT_EXTRACTION_PAGE_BATCH, 1)
+        
+        parts = []
+        for start in range(0, page_count, batch_size):
+            self.cancel_token.check()
+            text = run_cpu_bound(extract_text_from_pdf, pdf_path, (start, start + batch_size))
+            if text:
+                parts.append(text)
+        
+        # Each batch is whitespace-normalized, so joining with a space matches the full-document cleanup
+        return " ".join(parts)
+    
+    def _set_status(
+        self,
+        status: JobStatusEnum,
+        current_step: Optional[str] = None,
+        progress_percentage: Optional[int] = None,
+        error_message: Optional[str] = None,
+        **event_data: Any
+    ) -> bool:
+        """
+        Persist a job status change and publish it to event stream subscribers.
+        Final statuses are only written while the job is still processing.
+        
+        Args:
+            status: New job status
+            current_step: Pipeline step name
+            progress_percentage: Progress 0-100
+            error_message: Error message for failed jobs
+            **event_data: Extra fields for the published event
+        
+        Returns:
+            False if the job was cancelled before a final status could be written
+        """
+        if status == JobStatusEnum.PROCESSING:
+            # Cancellation checkpoint - also keeps a cancelled job from being set back to processing
+            self.cancel_token.check()
+            JobStatusService.update_status(
+                self.db, self.job_id, status,
+                current_step, progress_percentage, error_message
+            )
+        elif not JobStatusService.finish_if_processing(
+            self.db, self.job_id, status,
+            current_step, progress_percentage, error_message
+        ):
+            # Cancelled concurrently - the cancellation stands and nothing is published
+            return False
+        
+        event = status.value if status.value in TERMINAL_EVENTS else "progress"
+        job_event_broker.publish(
+            self.job_id, event,
+            status=status.value,
+            current_step=current_step,
+            progress_percentage=progress_percentage,
+            error_message=error_message,
+            **event_data
+        )
+        return True
+    
+    def _report_chunk_progress(self, chunk_num: int, total_chunks: int) -> None:
+        """
+        Map per-chunk AI progress into the 40-60% band of the job.
+        
+        Args:
+            chunk_num: Chunks processed so far
+            total_chunks: Total number of chunks
+        """
+        progress = 40 + int(20 * chunk_num / max(total_chunks, 1))
+        self._set_status(
+            JobStatusEnum.PROCESSING, "processing_with_ai", progress,
+            chunk=chunk_num, total_chunks=total_chunks
+        )
@@ -0,0 +1,311 @@
+"""
+HTTP caching and range support for generated output files.
+Outputs never change once written, so they are served with a strong ETag (SHA-256
+of the content), answered with 304 on a matching If-None-Match, marked immutable
+for caches, and support single byte-range requests (206).
+Workbooks rendered in memory (EXCEL_OUTPUT_MODE=memory) are streamed from the
+buffer with a weak ETag of the data they were rendered from; JSON views of the
+same data use that ETag too and are gzip-compressed (GzipPathsMiddleware).
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Iterator, Optional, Sequence, Tuple
+
+from fastapi import Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+
+from app.settings import settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# In-memory renders are revalidated on every use (the data behind them can be edited)
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# Chunk size for streaming in-memory content
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Single byte-range-spec: "first-last", "first-" or suffix "-length"
+BYTE_RANGE_PATTERN = re.compile(r"(\d*)-(\d*)")
+
+# Number of file hashes kept in memory
+ETAG_CACHE_SIZE = 1024
+
+_etag_cache: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+_etag_cache_lock = threading.Lock()
+
+
+def file_etag(path: str) -> str:
+    """
+    Strong ETag for a file, hashed once per (path, mtime, size).
+    
+    Args:
+        path: File path
+    
+    Returns:
+        Quoted ETag value
+    """
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    with _etag_cache_lock:
+        etag = _etag_cache.get(key)
+        if etag:
+            _etag_cache.move_to_end(key)
+            return etag
+    
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(settings.UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    etag = f'"{digest.hexdigest()}"'
+    
+    with _etag_cache_lock:
+        _etag_cache[key] = etag
+        while len(_etag_cache) > ETAG_CACHE_SIZE:
+            _etag_cache.popitem(last=False)
+    return etag
+
+
+def build_file_response(
+    request: Request,
+    path: str,
+    media_type: str,
+    filename: Optional[str] = None
+) -> Response:
+    """
+    Serve an immutable output file with conditional and range request handling.
+    
+    Args:
+        request: Incoming request (If-None-Match, Range and If-Range headers)
+        path: File path
+        media_type: Response content type
+        filename: Download filename for Content-Disposition (inline if omitted)
+    
+    Returns:
+        304, 206, 416 or full 200 file response
+    """
+    etag = file_etag(path)
+    size = os.path.getsize(path)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        "Accept-Ranges": "bytes"
+    }
+    
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    range_header = request.headers.get("range")
+    if not range_header:
+        return FileResponse(path=path, filename=filename, media_type=media_type, headers=headers)
+    
+    if_range = request.headers.get("if-range")
+    byte_range = _parse_range(range_header, size) if if_range is None or if_range == etag else None
+    if byte_range == "unsatisfiable":
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+    
+    # Ranges declined above are answered with the whole file here rather than by
+    # FileResponse, which interprets Range itself in newer Starlette versions
+    status_code = 200
+    start, end = 0, size - 1
+    if byte_range:
+        status_code = 206
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    if filename:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return StreamingResponse(
+        _iter_file_range(path, start, end),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers
+    )
+
+
+def data_etag(*parts: Any) -> str:
+    """
+    Weak ETag for content rendered from data rather than read from a file.
+    Two renders of the same data are equivalent but not byte-identical (the XLSX
+    container stores timestamps), so the tag is weak and Range is not offered.
+    
+    Args:
+        *parts: JSON-serializable inputs of the render (e.g. extracted data, template ID)
+    
+    Returns:
+        Weak ETag value
+    """
+    canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return f'W/"{hashlib.sha256(canonical.encode("utf-8")).hexdigest()}"'
+
+
+def build_bytes_response(
+    request: Request,
+    content: bytes,
+    media_type: str,
+    etag: str,
+    filename: Optional[str] = None
+) -> Response:
+    """
+    Stream in-memory content with conditional request handling.
+    
+    Args:
+        request: Incoming request (If-None-Match header)
+        content: Response body
+        media_type: Response content type
+        etag: ETag of the content, usually from data_etag()
+        filename: Download filename for Content-Disposition (inline if omitted)
+    
+    Returns:
+        304 or streamed 200 response
+    """
+    not_modified = not_modified_response(request, etag)
+    if not_modified:
+        return not_modified
+    
+    headers = _rendered_headers(etag)
+    headers["Content-Length"] = str(len(content))
+    if filename:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return StreamingResponse(_iter_bytes(content), media_type=media_type, headers=headers)
+
+
+def build_json_response(request: Request, payload: Any, etag: str) -> Response:
+    """
+    JSON response for data derived from a stored result, with conditional request handling.
+    
+    Args:
+        request: Incoming request (If-None-Match header)
+        payload: JSON-serializable response body
+        etag: ETag of the data the payload was built from, from data_etag()
+    
+    Returns:
+        304 or 200 JSON response
+    """
+    not_modified = not_modified_response(request, etag)
+    if not_modified:
+        return not_modified
+    return JSONResponse(payload, headers=_rendered_headers(etag))
+
+
+def not_modified_response(request: Request, etag: str) -> Optional[Response]:
+    """
+    304 for a rendered resource the client already has, checked before rendering it.
+    
+    Args:
+        request: Incoming request (If-None-Match header)
+        etag: ETag from data_etag()
+    
+    Returns:
+        304 response, or None if the content must be sent
+    """
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=_rendered_headers(etag))
+    return None
+
+
+def _rendered_headers(etag: str) -> dict:
+    """Caching headers for content rendered in memory."""
+    return {
+        "ETag": etag,
+        "Cache-Control": REVALIDATE_CACHE_CONTROL,
+        "Accept-Ranges": "none"
+    }
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches the ETag (weak comparison, per RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in candidates)
+
+
+def _parse_range(range_header: str, size: int):
+    """
+    Parse a single-range "bytes=" header.
+    
+    Returns:
+        (start, end) inclusive, "unsatisfiable", or None to serve the full file
+        (malformed, invalid - last byte before first - or multi-range requests)
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    
+    match = BYTE_RANGE_PATTERN.fullmatch(spec.strip())
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    
+    if not first:
+        # Suffix range: last N bytes (a zero-length suffix selects nothing)
+        if int(last) == 0:
+            return "unsatisfiable"
+        return max(size - int(last), 0), size - 1
+    
+    start = int(first)
+    end = int(last) if last else size - 1
+    if last and end < start:
+        # Invalid byte-range-spec - ignored like a malformed header (RFC 9110 14.1.1)
+        return None
+    if start >= size:
+        return "unsatisfiable"
+    return start, min(end, size - 1)
+
+
+def _iter_file_range(path: str, start: int, end: int) -> Iterator[bytes]:
+    """Yield a byte range of a file in chunks."""
+    remaining = end - start + 1
+    with open(path, "rb") as f:
+        f.seek(start)
+        while remaining > 0:
+            chunk = f.read(min(settings.UPLOAD_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _iter_bytes(content: bytes) -> Iterator[bytes]:
+    """Yield in-memory content in chunks."""
+    view = memoryview(content)
+    for offset in range(0, len(view), STREAM_CHUNK_SIZE):
+        yield bytes(view[offset:offset + STREAM_CHUNK_SIZE])
+
+
+class GzipPathsMiddleware:
+    """
+    ASGI middleware that gzip-compresses responses under selected path prefixes.
+    Applied per path rather than app-wide: workbooks are already zip-compressed,
+    byte ranges must address the stored file, and event streams must not be buffered.
+    """
+    
+    def __init__(self, app, path_prefixes: Sequence[str], minimum_size: int):
+        """
+        Initialize middleware.
+        
+        Args:
+            app: ASGI application
+            path_prefixes: Request paths starting with one of these are compressed
+            minimum_size: Smallest response body in bytes that is compressed
+        """
+        self.app = app
+        self.path_prefixes = tuple(path_prefixes)
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size)
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope.get("path", "").startswith(self.path_prefixes):
+            await self.gzip(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
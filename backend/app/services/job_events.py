@@ -0,0 +1,105 @@
+"""
+In-process pub/sub for job progress events.
+Pipeline threads publish step transitions, per-chunk progress and completion;
+the SSE endpoint (GET /api/jobs/{job_id}/events) subscribes on the event loop.
+"""
+
+import asyncio
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+TERMINAL_EVENTS = {"completed", "failed", "cancelled"}
+
+
+class JobEventBroker:
+    """Fan out job events from worker threads to asyncio subscribers."""
+    
+    def __init__(self, max_queue_size: int = 100):
+        """
+        Initialize broker.
+        
+        Args:
+            max_queue_size: Events buffered per subscriber before the oldest are dropped
+        """
+        self.max_queue_size = max_queue_size
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+    
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        """
+        Subscribe to a job's events. Must be called from a running event loop.
+        
+        Args:
+            job_id: Job UUID
+        
+        Returns:
+            Queue receiving event dicts
+        """
+        queue = asyncio.Queue(maxsize=self.max_queue_size)
+        entry = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers.setdefault(job_id, []).append(entry)
+        return queue
+    
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue) -> None:
+        """
+        Remove a subscriber queue.
+        
+        Args:
+            job_id: Job UUID
+            queue: Queue returned by subscribe()
+        """
+        with self._lock:
+            entries = [e for e in self._subscribers.get(job_id, []) if e[1] is not queue]
+            if entries:
+                self._subscribers[job_id] = entries
+            else:
+                self._subscribers.pop(job_id, None)
+    
+    def publish(self, job_id: str, event: str, **data: Any) -> None:
+        """
+        Publish an event for a job. Safe to call from any thread.
+        
+        Args:
+            job_id: Job UUID
+            event: Event name ("progress", "completed", "failed", "cancelled")
+            **data: Event payload fields
+        """
+        with self._lock:
+            entries = list(self._subscribers.get(job_id, []))
+        if not entries:
+            return
+        
+        payload = {"event": event, "job_id": job_id, "timestamp": datetime.utcnow().isoformat(), **data}
+        for loop, queue in entries:
+            try:
+                loop.call_soon_threadsafe(self._deliver, queue, payload)
+            except RuntimeError:
+                # Subscriber's loop is closed - it will be unsubscribed by its own cleanup
+                pass
+    
+    def subscriber_count(self, job_id: Optional[str] = None) -> int:
+        """Number of subscribers for a job, or across all jobs."""
+        with self._lock:
+            if job_id is not None:
+                return len(self._subscribers.get(job_id, []))
+            return sum(len(entries) for entries in self._subscribers.values())
+    
+    @staticmethod
+    def _deliver(queue: asyncio.Queue, payload: Dict[str, Any]) -> None:
+        """Put an event on a subscriber queue, dropping the oldest event if it is full."""
+        if queue.full():
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+        queue.put_nowait(payload)
+
+
+# Process-wide broker shared by the job queue workers and the API server
+job_event_broker = JobEventBroker()
@@ -0,0 +1,211 @@
+"""
+Background job queue for extraction jobs.
+Jobs are persisted as PENDING JobStatus rows; worker threads claim them from the
+database, so additional worker processes (run_worker.py) can share the same queue.
+A heartbeat thread refreshes updated_at of the jobs running here; processing jobs
+without a recent heartbeat belong to a dead worker and are requeued on startup.
+Claim order (priority class, per-tenant fair share, FIFO) lives in
+JobStatusService.claim_next_pending so it survives restarts.
+"""
+
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from app.settings import settings
+from app.database.connection import SessionLocal
+from app.database.operations import JobStatusService
+from app.database.schemas import JobStatus, JobStatusEnum
+from app.services.executors import process_memory_bytes
+from app.services.extraction_pipeline import run_extraction_job
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Assumed job duration for wait estimates until jobs have completed
+DEFAULT_JOB_DURATION_SECONDS = 60
+
+
+class JobQueue:
+    """Pool of worker threads that claim and run pending extraction jobs."""
+    
+    def __init__(self, worker_count: int = settings.EXTRACTION_WORKERS):
+        """
+        Initialize job queue.
+        
+        Args:
+            worker_count: Number of worker threads to start
+        """
+        self.worker_count = worker_count
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._workers: List[threading.Thread] = []
+        self._heartbeat: Optional[threading.Thread] = None
+        self._active_lock = threading.Lock()
+        self._active_jobs: Set[str] = set()
+    
+    def start(self) -> None:
+        """Recover stale jobs and start worker threads."""
+        if self._workers:
+            return
+        
+        db = SessionLocal()
+        try:
+            requeued = JobStatusService.requeue_stale(db, settings.JOB_STALE_AFTER_SECONDS)
+            pending = JobStatusService.count_by_status(db, JobStatusEnum.PENDING)
+        finally:
+            db.close()
+        
+        logger.info(f"Starting job queue | Workers: {self.worker_count} | Pending jobs: {pending} | Requeued stale: {requeued}")
+        
+        self._stopping.clear()
+        for index in range(self.worker_count):
+            worker = threading.Thread(
+                target=self._worker_loop,
+                name=f"extraction-worker-{index + 1}",
+                daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+        
+        self._heartbeat = threading.Thread(target=self._heartbeat_loop, name="extraction-heartbeat", daemon=True)
+        self._heartbeat.start()
+    
+    def stop(self, timeout: float = 5.0) -> None:
+        """Signal workers to stop after their current job."""
+        logger.info("Stopping job queue workers")
+        self._stopping.set()
+        self._wakeup.set()
+        for worker in self._workers:
+            worker.join(timeout=timeout)
+        self._workers = []
+        if self._heartbeat:
+            self._heartbeat.join(timeout=timeout)
+            self._heartbeat = None
+    
+    def notify(self) -> None:
+        """Wake idle workers after a new job was persisted."""
+        self._wakeup.set()
+    
+    def run_forever(self) -> None:
+        """Start workers and block until interrupted (used by run_worker.py)."""
+        self.start()
+        try:
+            while any(worker.is_alive() for worker in self._workers):
+                for worker in self._workers:
+                    worker.join(timeout=1.0)
+        except KeyboardInterrupt:
+            self.stop()
+    
+    def estimate_start(self, db: Session, db_job: JobStatus) -> Optional[Dict[str, Any]]:
+        """
+        Estimate when a pending job will start.
+        
+        Args:
+            db: Database session
+            db_job: Job status record
+        
+        Returns:
+            Queue position (0 = next to be claimed), estimated wait and start time,
+            or None if the job is no longer pending
+        """
+        if db_job.status != JobStatusEnum.PENDING:
+            return None
+        
+        position = JobStatusService.get_queue_position(db, db_job)
+        running = JobStatusService.count_by_status(db, JobStatusEnum.PROCESSING)
+        duration = JobStatusService.average_duration_seconds(db) or DEFAULT_JOB_DURATION_SECONDS
+        workers = max(self.worker_count, 1)
+        
+        # Every worker frees up once per average job duration
+        busy_slots = running + position
+        wait_seconds = 0.0
+        if busy_slots >= workers:
+            wait_seconds = (busy_slots - workers + 1) / workers * duration
+        
+        return {
+            "queue_position": position,
+            "estimated_wait_seconds": round(wait_seconds, 1),
+            "estimated_start_at": (datetime.utcnow() + timedelta(seconds=wait_seconds)).isoformat()
+        }
+    
+    def _worker_loop(self) -> None:
+        """Claim and run pending jobs until stopped."""
+        thread_name = threading.current_thread().name
+        logger.debug(f"{thread_name} started")
+        
+        while not self._stopping.is_set():
+            if self._memory_pressure():
+                # Let running jobs finish before taking on more work
+                self._wakeup.wait(timeout=settings.WORKER_POLL_INTERVAL)
+                self._wakeup.clear()
+                continue
+            
+            job_id = self._claim_next()
+            if not job_id:
+                self._wakeup.wait(timeout=settings.WORKER_POLL_INTERVAL)
+                self._wakeup.clear()
+                continue
+            
+            logger.info(f"{thread_name} picked up job {job_id}")
+            with self._active_lock:
+                self._active_jobs.add(job_id)
+            try:
+                run_extraction_job(job_id)
+            except Exception as e:
+                logger.error(f"{thread_name} crashed while running job {job_id}: {str(e)}", exc_info=True)
+            finally:
+                with self._active_lock:
+                    self._active_jobs.discard(job_id)
+        
+        logger.debug(f"{thread_name} stopped")
+    
+    def _heartbeat_loop(self) -> None:
+        """Refresh updated_at of the jobs running in this process until stopped."""
+        while not self._stopping.wait(timeout=settings.JOB_HEARTBEAT_INTERVAL):
+            self.send_heartbeat()
+    
+    def send_heartbeat(self) -> None:
+        """Mark the jobs running in this process as alive."""
+        with self._active_lock:
+            job_ids = list(self._active_jobs)
+        if not job_ids:
+            return
+        
+        db = SessionLocal()
+        try:
+            JobStatusService.heartbeat(db, job_ids)
+        except Exception as e:
+            logger.warning(f"Job heartbeat failed: {str(e)}")
+        finally:
+            db.close()
+    
+    def _memory_pressure(self) -> bool:
+        """
+        Whether this process is above ADMISSION_MAX_MEMORY_MB while other jobs are
+        still running here. A lone worker always proceeds so the queue never stalls.
+        """
+        if settings.ADMISSION_MAX_MEMORY_MB <= 0 or not self._active_jobs:
+            return False
+        if process_memory_bytes() <= settings.ADMISSION_MAX_MEMORY_MB * 1024 * 1024:
+            return False
+        logger.debug(f"{threading.current_thread().name} deferring claim - memory above {settings.ADMISSION_MAX_MEMORY_MB}MB")
+        return True
+    
+    def _claim_next(self):
+        """Claim the next pending job, returning its job ID or None."""
+        db = SessionLocal()
+        try:
+            db_job = JobStatusService.claim_next_pending(db)
+            return db_job.job_id if db_job else None
+        except Exception as e:
+            logger.error(f"Failed to claim next job: {str(e)}", exc_info=True)
+            return None
+        finally:
+            db.close()
+
+
+# Process-wide job queue used by the API server
+job_queue = JobQueue()
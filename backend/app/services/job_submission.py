@@ -0,0 +1,259 @@
+"""
+Job submission service.
+Persists an uploaded PDF and queues an extraction job for it, reusing existing
+results or in-flight jobs for identical content. Shared by the single-file and
+batch upload endpoints.
+"""
+
+import os
+import uuid
+from datetime import datetime
+from typing import BinaryIO, Dict, Any, Optional
+
+from sqlalchemy.orm import Session
+
+from app.settings import settings
+from app.services.ai_processor import current_model_config
+from app.services.single_flight import extraction_single_flight
+from app.services.upload_ingestion import ingest_upload
+from app.database.operations import (
+    UploadedFileService,
+    ExtractionResultService,
+    ExtractionLogService,
+    JobStatusService
+)
+from app.database.schemas import JobStatus, JobStatusEnum, JobTypeEnum, LogLevelEnum, DEFAULT_TENANT_ID
+from app.templates.extraction_prompt import PROMPT_VERSION
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def submit_upload(
+    db: Session,
+    source: BinaryIO,
+    original_filename: str,
+    template_id: str = "fund_report_v1",
+    force: bool = False,
+    job_id: Optional[str] = None,
+    batch_id: Optional[str] = None,
+    max_size: int = settings.MAX_FILE_SIZE,
+    job_type: JobTypeEnum = JobTypeEnum.INTERACTIVE,
+    tenant_id: Optional[str] = None,
+    idempotency_key: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Stream an uploaded PDF to disk and queue it for extraction.
+    
+    Identical content (same SHA-256, template, model config and prompt version)
+    is not extracted twice: the existing result is returned, or the payload
+    points at the job already processing it. Set force to always queue a new job.
+    
+    Args:
+        db: Database session
+        source: Readable binary file object with the PDF content
+        original_filename: Client-side filename
+        template_id: Template ID for extraction format
+        force: Skip deduplication and always queue a new job
+        job_id: Job UUID to use (generated if not provided)
+        batch_id: Batch the new job belongs to
+        max_size: Maximum file size in bytes
+        job_type: Scheduling class - interactive jobs are claimed before batch jobs
+        tenant_id: Tenant/user the job is fair-shared under
+        idempotency_key: Client Idempotency-Key stored on the new job
+    
+    Returns:
+        Response payload with job_id, file_id, status and deduplicated flag
+    
+    Raises:
+        UploadRejected: If the file is not a valid PDF or too large
+    """
+    job_id = job_id or str(uuid.uuid4())
+    
+    # Generate unique filenames
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    safe_filename = os.path.basename(original_filename).replace(" ", "_").replace(".pdf", "")
+    # Job ID suffix keeps same-second uploads of the same name from overwriting each other
+    pdf_filename = f"{safe_filename}_{timestamp}_{job_id[:8]}.pdf"
+    pdf_path = os.path.join(settings.UPLOAD_DIR, pdf_filename)
+    
+    # Stream upload to disk, hashing and validating in the same pass
+    logger.info(f"[{job_id}] PHASE 1: File Upload - Saving to disk")
+    logger.debug(f"[{job_id}] Destination: {pdf_path}")
+    
+    upload = ingest_upload(source, pdf_path, max_size=max_size)
+    file_size = upload.size
+    
+    logger.info(f"[{job_id}] File saved successfully | Size: {file_size / 1024:.2f} KB | SHA-256: {upload.sha256}")
+    
+    try:
+        # Single-flight: one extraction per content hash + template, duplicates attach to it
+        lock_key = extraction_single_flight.make_key(upload.sha256, template_id)
+        with extraction_single_flight.hold(lock_key):
+            duplicate = None
+            if not force:
+                holder = extraction_single_flight.acquire(db, lock_key, job_id)
+                if holder:
+                    duplicate = attached_job_payload(holder)
+                else:
+                    duplicate = find_duplicate_extraction(db, upload.sha256, template_id)
+                    if duplicate:
+                        extraction_single_flight.release(db, job_id)
+            
+            if duplicate:
+                # Identical content already handled - drop the new copy
+                os.remove(pdf_path)
+                logger.info(f"[{job_id}] Duplicate upload - reusing job {duplicate['job_id']} ({duplicate['status']})")
+                return duplicate
+            
+            # Create uploaded file record in database
+            logger.debug(f"[{job_id}] Creating database record for uploaded file")
+            db_file = UploadedFileService.create(
+                db=db,
+                filename=pdf_filename,
+                original_filename=original_filename,
+                file_path=pdf_path,
+                file_size=file_size,
+                content_hash=upload.sha256
+            )
+            
+            # Create job status record - workers pick up pending jobs
+            JobStatusService.create(
+                db=db, file_id=db_file.id, job_id=job_id,
+                template_id=template_id, batch_id=batch_id,
+                job_type=job_type, tenant_id=tenant_id,
+                idempotency_key=idempotency_key
+            )
+        
+        ExtractionLogService.create(
+            db, db_file.id, f"File uploaded successfully: {pdf_filename} - queued for extraction",
+            LogLevelEnum.INFO, "upload",
+            extra_data={"sha256": upload.sha256, "file_size": file_size, "batch_id": batch_id}
+        )
+    
+    except Exception:
+        # Clean up files and any single-flight lock on error
+        db.rollback()
+        extraction_single_flight.release(db, job_id)
+        if os.path.exists(pdf_path):
+            os.remove(pdf_path)
+        raise
+    
+    logger.info(f"[{job_id}] Job queued | File ID: {db_file.id}")
+    
+    return {
+        "success": True,
+        "message": "Extraction job queued",
+        "deduplicated": False,
+        "job_id": job_id,
+        "file_id": db_file.id,
+        "status": JobStatusEnum.PENDING.value,
+        "status_url": f"/api/jobs/{job_id}"
+    }
+
+
+def find_duplicate_extraction(db: Session, content_hash: str, template_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up an existing result or in-flight job for identical upload content.
+    
+    Args:
+        db: Database session
+        content_hash: SHA-256 of the uploaded file
+        template_id: Requested template ID
+    
+    Returns:
+        Response payload for the reused job, or None if the content must be extracted
+    """
+    db_result = ExtractionResultService.find_reusable(
+        db, content_hash, template_id, current_model_config(), PROMPT_VERSION
+    )
+    if db_result:
+        db_job = JobStatusService.get_by_file_id(db, db_result.file_id)
+        job_id = db_job.job_id if db_job else None
+        return {
+            "success": True,
+            "message": "Identical document already extracted - returning existing result",
+            "deduplicated": True,
+            "job_id": job_id,
+            "file_id": db_result.file_id,
+            "status": JobStatusEnum.COMPLETED.value,
+            "status_url": f"/api/jobs/{job_id}" if job_id else None,
+            "result_id": db_result.id,
+            "output_file": db_result.excel_filename,
+            "download_url": f"/api/download/{db_result.excel_filename}"
+        }
+    
+    db_job = JobStatusService.find_active_by_content(db, content_hash, template_id)
+    if db_job:
+        return attached_job_payload(db_job)
+    
+    return None
+
+
+def find_idempotent_job(db: Session, idempotency_key: str, tenant_id: Optional[str]) -> Optional[JobStatus]:
+    """
+    Look up the job created by an earlier request with the same Idempotency-Key.
+    
+    Args:
+        db: Database session
+        idempotency_key: Client-supplied Idempotency-Key header
+        tenant_id: Tenant the key is scoped to
+    
+    Returns:
+        Original job if submitted within IDEMPOTENCY_KEY_TTL_SECONDS, otherwise None
+    """
+    return JobStatusService.find_by_idempotency_key(
+        db, idempotency_key, tenant_id or DEFAULT_TENANT_ID, settings.IDEMPOTENCY_KEY_TTL_SECONDS
+    )
+
+
+def replayed_job_payload(db_job: JobStatus) -> Dict[str, Any]:
+    """
+    Build the response for a retried request, pointing at the original job.
+    
+    Args:
+        db_job: Job created by the original request
+    
+    Returns:
+        Response payload for the original job, with result details once completed
+    """
+    payload = {
+        "success": True,
+        "message": "Repeated request - returning the original job",
+        "deduplicated": False,
+        "idempotent_replay": True,
+        "job_id": db_job.job_id,
+        "file_id": db_job.file_id,
+        "status": db_job.status.value,
+        "status_url": f"/api/jobs/{db_job.job_id}"
+    }
+    
+    er = db_job.uploaded_file.extraction_result if db_job.uploaded_file else None
+    if db_job.status == JobStatusEnum.COMPLETED and er:
+        payload.update({
+            "result_id": er.id,
+            "output_file": er.excel_filename,
+            "download_url": f"/api/download/{er.excel_filename}"
+        })
+    return payload
+
+
+def attached_job_payload(db_job: JobStatus) -> Dict[str, Any]:
+    """
+    Build the response for an upload attached to an in-flight job.
+    
+    Args:
+        db_job: Pending or processing job for identical content
+    
+    Returns:
+        Response payload pointing at the existing job
+    """
+    return {
+        "success": True,
+        "message": "Identical document is already being extracted - attached to existing job",
+        "deduplicated": True,
+        "job_id": db_job.job_id,
+        "file_id": db_job.file_id,
+        "status": db_job.status.value,
+        "status_url": f"/api/jobs/{db_job.job_id}"
+    }
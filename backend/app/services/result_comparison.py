@@ -0,0 +1,542 @@
+"""
+Result comparison engine.
+Compares two extraction results, or a result and a reference workbook, sheet by
+sheet. Rows are aligned on their key columns (SheetSpec.key_columns, e.g. the
+company of a Schedule of Investments row) rather than their position, and columns
+on their headers. Cells follow the rules of the comparison view: empty-like values
+("", 0, "n/a", "not found", ...) are equivalent and text compares case-insensitively;
+numbers, including numeric text such as "1,234.50", are equal within a tolerance.
+Computed diffs are cached per process, keyed on the data they were computed from.
+"""
+
+import hashlib
+import io
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from openpyxl import load_workbook
+
+from app.settings import settings
+from app.services.executors import run_cpu_bound
+from app.services.single_flight import extraction_single_flight
+from app.templates.sheet_specs import SheetSpec, get_sheet_specs
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Text treated as empty (the comparison view's list)
+EMPTY_VALUES = frozenset(["", "0", "not found", "null", "n/a", "na", "none", "-"])
+
+# Rows of a reference sheet searched for its header row (title rows may come first)
+HEADER_SEARCH_ROWS = 20
+
+# Fields of one difference, in the order they are stored
+DIFFERENCE_FIELDS = ("sheet", "key", "left_row", "right_row", "column", "left", "right")
+
+
+class SheetTable:
+    """Header and data rows of one sheet, with the columns that identify a row."""
+    
+    def __init__(self, name: str, headers: List[str], rows: List[Sequence[Any]], key_columns: Sequence[int] = ()):
+        self.name = name
+        self.headers = headers
+        self.rows = rows
+        self.key_columns = key_columns
+
+
+def normalize_value(value: Any) -> Any:
+    """
+    Normalize a cell value for comparison.
+    
+    Args:
+        value: Cell value from extracted data or a workbook
+    
+    Returns:
+        None for empty-like values (blank, numeric zero, "n/a", "not found", ...),
+        a float for numbers and numeric text, otherwise the lowercased, stripped text
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        value = value.date().isoformat() if value.time() == datetime.min.time() else value.isoformat()
+    elif isinstance(value, date):
+        value = value.isoformat()
+    
+    number = _as_number(value)
+    if number is not None:
+        return None if number == 0 else number
+    text = str(value).strip().lower()
+    return None if text in EMPTY_VALUES else text
+
+
+def values_equivalent(left: Any, right: Any, abs_tol: float, rel_tol: float) -> bool:
+    """
+    Whether two cell values are equivalent.
+    
+    Args:
+        left: First value
+        right: Second value
+        abs_tol: Largest absolute difference between equal numbers
+        rel_tol: Largest difference between equal numbers, relative to the larger one
+    
+    Returns:
+        True if both are empty-like, both numbers within tolerance, or equal text
+    """
+    if type(left) is type(right) and left == right:
+        return True
+    left = normalize_value(left)
+    right = normalize_value(right)
+    if left is None or right is None:
+        return left is right
+    if isinstance(left, float) and isinstance(right, float):
+        return math.isclose(left, right, rel_tol=rel_tol, abs_tol=abs_tol)
+    return left == right
+
+
+def _as_number(value: Any) -> Optional[float]:
+    """Numeric value of a number or numeric text ("1,234.5", "(250)" is negative), else None."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        number = float(value)
+        return number if math.isfinite(number) else None
+    if not isinstance(value, str):
+        return None
+    
+    text = value.strip().replace(",", "")
+    if not text or text[0] not in "0123456789+-.(":
+        return None
+    negative = text.startswith("(") and text.endswith(")")
+    if negative:
+        text = text[1:-1]
+    try:
+        number = float(text)
+    except ValueError:
+        return None
+    if not math.isfinite(number):
+        return None
+    return -number if negative else number
+
+
+def result_tables(data: Dict[str, Any], template_id: str) -> List[SheetTable]:
+    """
+    Sheets of an extraction result, built with the template's sheet specs.
+    
+    Args:
+        data: Extracted data of a result
+        template_id: Extraction template ID
+    
+    Returns:
+        One table per sheet, in workbook order
+    """
+    tables = []
+    for spec in get_sheet_specs(template_id):
+        sheet = spec.build(data.get(spec.section))
+        tables.append(SheetTable(spec.name, sheet.headers, sheet.rows, spec.key_columns))
+    return tables
+
+
+def workbook_tables(content: bytes, template_id: str) -> List[SheetTable]:
+    """
+    Sheets of a reference workbook, e.g. a corrected copy of an output workbook.
+    Sheets named like a template sheet (case-insensitive) take their header row
+    and key columns from its spec; other sheets use their first non-empty row as
+    header and are compared by position.
+    
+    Args:
+        content: .xlsx file content
+        template_id: Extraction template ID the workbook follows
+    
+    Returns:
+        One table per worksheet
+    
+    Raises:
+        ValueError: If the content is not a readable .xlsx workbook
+    """
+    specs = {spec.name.lower(): spec for spec in get_sheet_specs(template_id)}
+    try:
+        wb = load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+    except Exception as e:
+        raise ValueError(f"Not a readable .xlsx workbook: {str(e)}")
+    
+    tables = []
+    try:
+        for ws in wb.worksheets:
+            rows = [list(row) for row in ws.iter_rows(values_only=True)]
+            while rows and all(value in (None, "") for value in rows[-1]):
+                rows.pop()
+            
+            spec = specs.get(ws.title.strip().lower())
+            header_index = _header_row_index(rows, spec)
+            headers = [] if not rows else [
+                "" if value is None else str(value).strip() for value in rows[header_index]
+            ]
+            tables.append(SheetTable(
+                spec.name if spec else ws.title,
+                headers,
+                rows[header_index + 1:],
+                _workbook_key_columns(spec, headers)
+            ))
+    finally:
+        wb.close()
+    return tables
+
+
+def _header_row_index(rows: List[List[Any]], spec: Optional[SheetSpec]) -> int:
+    """Index of the header row: the row holding the spec's first header, else the first non-empty row."""
+    first_header = spec.headers[0].lower() if spec and spec.headers else None
+    first_non_empty = None
+    for i, row in enumerate(rows[:HEADER_SEARCH_ROWS]):
+        cells = [str(value).strip().lower() for value in row if value not in (None, "")]
+        if first_header and first_header in cells:
+            return i
+        if first_non_empty is None and cells:
+            first_non_empty = i
+    return first_non_empty or 0
+
+
+def _workbook_key_columns(spec: Optional[SheetSpec], headers: List[str]) -> Tuple[int, ...]:
+    """Key column indexes of a reference sheet, located by the spec's header labels."""
+    if not spec or not spec.key_columns:
+        return ()
+    positions = {header.lower(): i for i, header in reversed(list(enumerate(headers)))}
+    key_columns = tuple(positions.get(spec.headers[i].lower()) for i in spec.key_columns)
+    return () if None in key_columns else key_columns
+
+
+def compare_tables(
+    left_tables: List[SheetTable],
+    right_tables: List[SheetTable],
+    abs_tol: float,
+    rel_tol: float
+) -> Dict[str, Any]:
+    """
+    Compare two sets of sheets.
+    
+    Args:
+        left_tables: Sheets of the first result
+        right_tables: Sheets of the second result or reference workbook
+        abs_tol: Largest absolute difference between equal numbers
+        rel_tol: Largest relative difference between equal numbers
+    
+    Returns:
+        {"summary": totals and per-sheet statistics,
+         "differences": one DIFFERENCE_FIELDS list per differing cell}
+    """
+    right_by_name = {table.name.lower(): table for table in right_tables}
+    left_names = {table.name.lower() for table in left_tables}
+    pairs = [(table, right_by_name.get(table.name.lower())) for table in left_tables]
+    pairs += [(None, table) for table in right_tables if table.name.lower() not in left_names]
+    
+    sheets = []
+    differences = []
+    for left, right in pairs:
+        name = (left or right).name
+        sheet = _compare_sheet(
+            name,
+            left or SheetTable(name, [], []),
+            right or SheetTable(name, [], []),
+            abs_tol, rel_tol, differences
+        )
+        # Side the sheet is missing from, if any
+        sheet["missing"] = "left" if left is None else "right" if right is None else None
+        sheets.append(sheet)
+    
+    total_cells = sum(sheet["total_cells"] for sheet in sheets)
+    matches = sum(sheet["matches"] for sheet in sheets)
+    return {
+        "summary": {
+            "total_cells": total_cells,
+            "matches": matches,
+            "differences": total_cells - matches,
+            "accuracy": _accuracy(matches, total_cells),
+            "abs_tolerance": abs_tol,
+            "rel_tolerance": rel_tol,
+            "sheets": sheets
+        },
+        "differences": differences
+    }
+
+
+def _compare_sheet(
+    name: str,
+    left: SheetTable,
+    right: SheetTable,
+    abs_tol: float,
+    rel_tol: float,
+    differences: List[List[Any]]
+) -> Dict[str, Any]:
+    """Compare one sheet, appending its differing cells to differences."""
+    columns = _align_columns(left.headers, right.headers)
+    rows = _align_rows(left, right)
+    
+    total_cells = 0
+    matches = 0
+    for key, left_index, right_index in rows:
+        left_row = left.rows[left_index] if left_index is not None else ()
+        right_row = right.rows[right_index] if right_index is not None else ()
+        for header, left_col, right_col in columns:
+            left_value = left_row[left_col] if left_col is not None and left_col < len(left_row) else None
+            right_value = right_row[right_col] if right_col is not None and right_col < len(right_row) else None
+            total_cells += 1
+            if values_equivalent(left_value, right_value, abs_tol, rel_tol):
+                matches += 1
+            else:
+                differences.append([
+                    name, key,
+                    None if left_index is None else left_index + 1,
+                    None if right_index is None else right_index + 1,
+                    header, _json_value(left_value), _json_value(right_value)
+                ])
+    
+    return {
+        "name": name,
+        "total_cells": total_cells,
+        "matches": matches,
+        "differences": total_cells - matches,
+        "accuracy": _accuracy(matches, total_cells),
+        "rows_matched": sum(1 for _, l, r in rows if l is not None and r is not None),
+        "rows_only_left": sum(1 for _, _, r in rows if r is None),
+        "rows_only_right": sum(1 for _, l, _ in rows if l is None),
+        "columns_only_left": [header for header, _, r in columns if r is None],
+        "columns_only_right": [header for header, l, _ in columns if l is None]
+    }
+
+
+def _align_columns(left_headers: List[str], right_headers: List[str]) -> List[Tuple[str, Optional[int], Optional[int]]]:
+    """(header, left index, right index) per column; columns match on case-insensitive header."""
+    right_keys = _occurrence_keys([(str(header).strip().lower(),) for header in right_headers])
+    right_positions = {key: i for i, key in enumerate(right_keys)}
+    
+    columns = []
+    matched = set()
+    for i, key in enumerate(_occurrence_keys([(str(header).strip().lower(),) for header in left_headers])):
+        right_index = right_positions.get(key)
+        if right_index is not None:
+            matched.add(right_index)
+        columns.append((left_headers[i] or f"Column {i + 1}", i, right_index))
+    for i, header in enumerate(right_headers):
+        if i not in matched:
+            columns.append((header or f"Column {i + 1}", None, i))
+    return columns
+
+
+def _align_rows(left: SheetTable, right: SheetTable) -> List[Tuple[List[Any], Optional[int], Optional[int]]]:
+    """
+    (key values, left row index, right row index) per row, in left order followed by
+    right-only rows. Rows match on their key columns; the n-th row with a key matches
+    the n-th row with the same key on the other side. Without key columns rows
+    match by position.
+    """
+    left_keys = _occurrence_keys([_row_key(left, row) for row in left.rows])
+    right_keys = _occurrence_keys([_row_key(right, row) for row in right.rows])
+    right_positions = {key: i for i, key in enumerate(right_keys)}
+    
+    rows = []
+    matched = set()
+    for i, key in enumerate(left_keys):
+        right_index = right_positions.get(key)
+        if right_index is not None:
+            matched.add(right_index)
+        rows.append((_key_values(left, left.rows[i]), i, right_index))
+    for i in range(len(right.rows)):
+        if i not in matched:
+            rows.append((_key_values(right, right.rows[i]), None, i))
+    return rows
+
+
+def _row_key(table: SheetTable, row: Sequence[Any]) -> Tuple[Any, ...]:
+    """Normalized key column values of a row."""
+    return tuple(
+        normalize_value(row[col] if col < len(row) else None) for col in table.key_columns
+    )
+
+
+def _key_values(table: SheetTable, row: Sequence[Any]) -> List[Any]:
+    """Key column values of a row as shown in differences."""
+    return [_json_value(row[col] if col < len(row) else None) for col in table.key_columns]
+
+
+def _occurrence_keys(keys: List[Tuple[Any, ...]]) -> List[Tuple[Any, ...]]:
+    """Append the occurrence number to each key, so repeated keys stay distinct."""
+    seen: Dict[Tuple[Any, ...], int] = {}
+    result = []
+    for key in keys:
+        count = seen.get(key, 0)
+        seen[key] = count + 1
+        result.append(key + (count,))
+    return result
+
+
+def _json_value(value: Any) -> Any:
+    """Cell value as JSON (workbook dates become ISO strings)."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _accuracy(matches: int, total_cells: int) -> float:
+    """Percentage of equivalent cells (100 for empty sheets)."""
+    return round(matches / total_cells * 100, 2) if total_cells else 100.0
+
+
+def compare_result_data(
+    left_data: Dict[str, Any],
+    left_template_id: str,
+    right_data: Dict[str, Any],
+    right_template_id: str,
+    abs_tol: float,
+    rel_tol: float
+) -> Dict[str, Any]:
+    """
+    Compare the extracted data of two results (runs in the CPU process pool).
+    
+    Returns:
+        Comparison from compare_tables()
+    """
+    return compare_tables(
+        result_tables(left_data, left_template_id),
+        result_tables(right_data, right_template_id),
+        abs_tol, rel_tol
+    )
+
+
+def compare_result_to_workbook(
+    data: Dict[str, Any],
+    template_id: str,
+    content: bytes,
+    abs_tol: float,
+    rel_tol: float
+) -> Dict[str, Any]:
+    """
+    Compare a result's extracted data with a reference workbook (runs in the CPU process pool).
+    
+    Returns:
+        Comparison from compare_tables()
+    
+    Raises:
+        ValueError: If the content is not a readable .xlsx workbook
+    """
+    return compare_tables(result_tables(data, template_id), workbook_tables(content, template_id), abs_tol, rel_tol)
+
+
+def comparison_key(*parts: Any) -> str:
+    """
+    Comparison ID derived from everything that determines the diff.
+    
+    Args:
+        *parts: Data ETags or content hashes of both sides, and the tolerances
+    
+    Returns:
+        Hex ID
+    """
+    return hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:32]
+
+
+class ComparisonCache:
+    """LRU of computed comparisons, keyed on comparison ID."""
+    
+    def __init__(self, max_entries: int):
+        """
+        Initialize cache.
+        
+        Args:
+            max_entries: Comparisons kept before the least recently used are evicted
+        """
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    
+    def get(self, comparison_id: str) -> Optional[Dict[str, Any]]:
+        """Cached comparison, or None if it was never computed or has been evicted."""
+        with self._lock:
+            comparison = self._entries.get(comparison_id)
+            if comparison is not None:
+                self._entries.move_to_end(comparison_id)
+            return comparison
+    
+    def put(self, comparison_id: str, comparison: Dict[str, Any]) -> None:
+        """Cache a comparison, evicting the least recently used over the entry limit."""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[comparison_id] = comparison
+            self._entries.move_to_end(comparison_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# Process-wide comparison cache
+comparison_cache = ComparisonCache(settings.COMPARISON_CACHE_SIZE)
+
+
+def cached_comparison(
+    comparison_id: str,
+    sources: Dict[str, Any],
+    compare: Callable[..., Dict[str, Any]],
+    *args: Any
+) -> Dict[str, Any]:
+    """
+    Get a comparison from the cache, computing it in the CPU pool on a miss.
+    Concurrent requests for the same comparison in this process compute it once.
+    
+    Args:
+        comparison_id: ID from comparison_key()
+        sources: Description of both sides, stored with the comparison
+        compare: compare_result_data or compare_result_to_workbook
+        *args: Arguments of compare
+    
+    Returns:
+        Comparison with its ID and sources
+    """
+    comparison = comparison_cache.get(comparison_id)
+    if comparison is not None:
+        return comparison
+    
+    with extraction_single_flight.hold(f"compare:{comparison_id}"):
+        comparison = comparison_cache.get(comparison_id)
+        if comparison is None:
+            start_time = time.time()
+            comparison = run_cpu_bound(compare, *args)
+            comparison["comparison_id"] = comparison_id
+            comparison["sources"] = sources
+            comparison_cache.put(comparison_id, comparison)
+            summary = comparison["summary"]
+            logger.info(
+                f"Comparison {comparison_id} computed | "
+                f"Cells: {summary['total_cells']:,} | Differences: {summary['differences']:,} | "
+                f"Duration: {int((time.time() - start_time) * 1000)}ms"
+            )
+    return comparison
+
+
+def comparison_page(comparison: Dict[str, Any], skip: int, limit: int, sheet: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Summary and one page of differences of a comparison.
+    
+    Args:
+        comparison: Comparison from cached_comparison()
+        skip: Number of differences to skip
+        limit: Maximum number of differences to return
+        sheet: Only return differences of this sheet (case-insensitive)
+    
+    Returns:
+        Response payload
+    """
+    differences = comparison["differences"]
+    if sheet:
+        sheet = sheet.lower()
+        differences = [difference for difference in differences if difference[0].lower() == sheet]
+    return {
+        "comparison_id": comparison["comparison_id"],
+        **comparison["sources"],
+        "summary": comparison["summary"],
+        "total_differences": len(differences),
+        "skip": skip,
+        "limit": limit,
+        "differences": [dict(zip(DIFFERENCE_FIELDS, difference)) for difference in differences[skip:skip + limit]]
+    }
@@ -0,0 +1,269 @@
+"""
+Consolidated multi-fund rollups.
+Combines the Schedule of Investments, PCAP and cashflow sheets of many extraction
+results into one workbook, or a zip of one CSV per sheet, with every row prefixed
+by the result and fund it came from. Results are read from the database in batches
+of ROLLUP_QUERY_BATCH and their rows are written straight to openpyxl's write-only
+worksheets, FastXlsxAppendWriter's spooled sheets (EXCEL_ENGINE=fast) or CSV files,
+so memory stays flat however many results are included.
+"""
+
+import csv
+import os
+import tempfile
+import time
+import zipfile
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+from sqlalchemy.orm import Session
+
+from app.settings import settings
+from app.services.spreadsheet_creator import ExcelGenerator
+from app.services.xlsx_writer import FastXlsxAppendWriter
+from app.database.operations import ExtractionResultService
+from app.templates.sheet_specs import (
+    HEADER_STYLE,
+    ColumnWidthTracker,
+    SheetSpec,
+    get_sheet_spec,
+    number_style_name
+)
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Sheets combined across results, in workbook order
+ROLLUP_SHEETS = ("Schedule of Investments", "PCAP Statement", "Statement of Cashflows")
+
+# Columns identifying the result each row came from, and their widths
+ROLLUP_PREFIX_HEADERS = ["Result ID", "Fund", "Source File"]
+ROLLUP_PREFIX_WIDTHS = [10, 30, 40]
+
+# Narrowest data column (sized before any rows are written)
+ROLLUP_MIN_WIDTH = 12
+
+ROLLUP_FORMATS = ("xlsx", "csv")
+
+
+class XlsxRollupWriter(ExcelGenerator):
+    """Appends result rows to the write-only worksheets of one rollup workbook."""
+    
+    def __init__(self, specs: Sequence[SheetSpec]):
+        """
+        Create the workbook with a styled header row per sheet.
+        
+        Args:
+            specs: Specs of the combined sheets
+        """
+        super().__init__(write_only=True)
+        self.wb = Workbook(write_only=True)
+        self._register_named_styles()
+        self._sheets = {}
+        
+        prefix_length = len(ROLLUP_PREFIX_HEADERS)
+        for spec in specs:
+            ws = self.wb.create_sheet(spec.name)
+            # Write-only sheets take their column widths before the first row
+            header_widths = ColumnWidthTracker(spec.headers).widths()
+            self._set_column_widths(
+                ws, ROLLUP_PREFIX_WIDTHS + [max(width, ROLLUP_MIN_WIDTH) for width in header_widths]
+            )
+            ws.freeze_panes = f"{get_column_letter(prefix_length + 1)}2"
+            ws.append([
+                self._styled_cell(ws, header, HEADER_STYLE)
+                for header in ROLLUP_PREFIX_HEADERS + spec.headers
+            ])
+            column_styles = {
+                col_idx + prefix_length: number_style_name(format_name)
+                for col_idx, format_name in spec.column_formats.items()
+            }
+            self._sheets[spec.name] = (ws, column_styles)
+    
+    def append_rows(self, spec: SheetSpec, prefix: List[Any], rows: List[List[Any]]) -> None:
+        """Append one result's rows of a sheet."""
+        ws, column_styles = self._sheets[spec.name]
+        for row in rows:
+            row = prefix + row
+            for col_idx, style_name in column_styles.items():
+                row[col_idx] = self._styled_cell(ws, row[col_idx], style_name)
+            ws.append(row)
+    
+    def save(self, output_path: str) -> None:
+        """Write the workbook."""
+        self.wb.save(output_path)
+    
+    def close(self) -> None:
+        """Nothing to release beyond the workbook's own temporary files."""
+
+
+class FastXlsxRollupWriter:
+    """Appends result rows to the spooled sheets of a FastXlsxAppendWriter."""
+    
+    def __init__(self, specs: Sequence[SheetSpec]):
+        """
+        Add a sheet with a styled header row per spec.
+        
+        Args:
+            specs: Specs of the combined sheets
+        """
+        self.writer = FastXlsxAppendWriter()
+        prefix_length = len(ROLLUP_PREFIX_HEADERS)
+        for spec in specs:
+            header_widths = ColumnWidthTracker(spec.headers).widths()
+            self.writer.add_sheet(
+                spec.name,
+                ROLLUP_PREFIX_HEADERS + spec.headers,
+                ROLLUP_PREFIX_WIDTHS + [max(width, ROLLUP_MIN_WIDTH) for width in header_widths],
+                column_formats={
+                    col_idx + prefix_length: format_name
+                    for col_idx, format_name in spec.column_formats.items()
+                },
+                freeze_panes=f"{get_column_letter(prefix_length + 1)}2"
+            )
+    
+    def append_rows(self, spec: SheetSpec, prefix: List[Any], rows: List[List[Any]]) -> None:
+        """Append one result's rows of a sheet."""
+        self.writer.append_rows(spec.name, [prefix + row for row in rows])
+    
+    def save(self, output_path: str) -> None:
+        """Write the workbook."""
+        self.writer.save(output_path)
+    
+    def close(self) -> None:
+        """Remove the spooled sheet files."""
+        self.writer.close()
+
+
+class CsvRollupWriter:
+    """Appends result rows to one CSV file per sheet, zipped on save."""
+    
+    def __init__(self, specs: Sequence[SheetSpec]):
+        """
+        Open a CSV file with a header row per sheet in a temporary directory.
+        
+        Args:
+            specs: Specs of the combined sheets
+        """
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._files = {}
+        self._writers = {}
+        for spec in specs:
+            path = os.path.join(self._tmp_dir.name, f"{spec.section}.csv")
+            stream = open(path, "w", newline="", encoding="utf-8")
+            self._files[spec.name] = (path, stream)
+            self._writers[spec.name] = csv.writer(stream)
+            self._writers[spec.name].writerow(ROLLUP_PREFIX_HEADERS + spec.headers)
+    
+    def append_rows(self, spec: SheetSpec, prefix: List[Any], rows: List[List[Any]]) -> None:
+        """Append one result's rows of a sheet."""
+        self._writers[spec.name].writerows(prefix + row for row in rows)
+    
+    def save(self, output_path: str) -> None:
+        """Zip the CSV files into output_path."""
+        for _, stream in self._files.values():
+            stream.close()
+        with zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for path, _ in self._files.values():
+                archive.write(path, arcname=os.path.basename(path))
+    
+    def close(self) -> None:
+        """Remove the temporary CSV files."""
+        for _, stream in self._files.values():
+            stream.close()
+        self._tmp_dir.cleanup()
+
+
+def create_rollup_writer(
+    specs: Sequence[SheetSpec],
+    output_format: str
+) -> Union[XlsxRollupWriter, FastXlsxRollupWriter, CsvRollupWriter]:
+    """
+    Rollup writer for an output format; xlsx rollups follow EXCEL_ENGINE.
+    All expose append_rows(spec, prefix, rows), save(output_path) and close().
+    """
+    if output_format == "csv":
+        return CsvRollupWriter(specs)
+    if settings.EXCEL_ENGINE == "fast":
+        return FastXlsxRollupWriter(specs)
+    return XlsxRollupWriter(specs)
+
+
+def fund_label(data: Dict[str, Any], original_filename: Optional[str]) -> str:
+    """Fund name of a result, falling back to its source filename."""
+    summary = data.get("portfolio_summary")
+    fund_name = summary.get("fund_name") if isinstance(summary, dict) else None
+    return str(fund_name).strip() if fund_name else (original_filename or "")
+
+
+def write_rollup(
+    db: Session,
+    output_path: str,
+    output_format: str = "xlsx",
+    template_id: Optional[str] = None,
+    result_ids: Optional[List[int]] = None,
+    batch_id: Optional[str] = None,
+    extracted_from: Optional[datetime] = None,
+    extracted_to: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """
+    Write a consolidated rollup of the matching results.
+    
+    Args:
+        db: Database session
+        output_path: Path of the .xlsx workbook or .zip CSV bundle
+        output_format: "xlsx" or "csv"
+        template_id: Only include results of this template (its sheet specs are
+            used either way; fund_report_v1 if not given)
+        result_ids: Only include these results
+        batch_id: Only include results of this upload batch
+        extracted_from: Only include results extracted at or after this time
+        extracted_to: Only include results extracted before this time
+    
+    Returns:
+        Statistics: results included and rows written per sheet
+    
+    Raises:
+        ValueError: If output_format is not one of ROLLUP_FORMATS
+    """
+    if output_format not in ROLLUP_FORMATS:
+        raise ValueError(f"Unknown rollup format: {output_format}. Must be one of: {ROLLUP_FORMATS}")
+    
+    specs = [get_sheet_spec(name, template_id or "fund_report_v1") for name in ROLLUP_SHEETS]
+    specs = [spec for spec in specs if spec]
+    
+    logger.info("=" * 80)
+    logger.info(f"Starting {output_format} rollup | Output: {output_path}")
+    start_time = time.time()
+    
+    writer = create_rollup_writer(specs, output_format)
+    results = 0
+    row_counts = {spec.name: 0 for spec in specs}
+    try:
+        for result in ExtractionResultService.iter_with_data(
+            db, settings.ROLLUP_QUERY_BATCH, result_ids=result_ids, template_id=template_id,
+            batch_id=batch_id, extracted_from=extracted_from, extracted_to=extracted_to
+        ):
+            data = result.extracted_data if isinstance(result.extracted_data, dict) else {}
+            prefix = [result.id, fund_label(data, result.original_filename), result.original_filename]
+            for spec in specs:
+                sheet = spec.build(data.get(spec.section))
+                writer.append_rows(spec, prefix, sheet.rows)
+                row_counts[spec.name] += len(sheet.rows)
+            results += 1
+            if results % 500 == 0:
+                logger.info(f"Rollup progress | Results: {results:,}")
+        
+        writer.save(output_path)
+    finally:
+        writer.close()
+    
+    logger.info(
+        f"Rollup written | Results: {results:,} | Rows: "
+        f"{', '.join(f'{name}: {count:,}' for name, count in row_counts.items())} | "
+        f"Duration: {time.time() - start_time:.2f}s"
+    )
+    logger.info("=" * 80)
+    return {"results": results, "rows": row_counts}
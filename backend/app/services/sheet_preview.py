@@ -0,0 +1,150 @@
+"""
+Paginated JSON previews of result sheets.
+Rows are built from ExtractionResult.extracted_data with the template's sheet
+specs - the same rows the workbook is rendered from - so a preview needs neither
+the .xlsx file nor a browser-side parse of it. Only the requested page of a
+"rows" sheet is built; the other orientations are small and built whole.
+"""
+
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.templates.sheet_specs import SheetSpec, get_sheet_specs
+
+
+def find_sheet_spec(sheet: str, template_id: str) -> Optional[SheetSpec]:
+    """
+    Look up a sheet of a template by sheet name or by extracted-data section key.
+    
+    Args:
+        sheet: Sheet name (e.g. "Schedule of Investments") or section key
+            (e.g. "schedule_of_investments")
+        template_id: Extraction template ID
+    
+    Returns:
+        Sheet spec, or None if the template has no such sheet
+    """
+    specs = get_sheet_specs(template_id)
+    for spec in specs:
+        if spec.name == sheet:
+            return spec
+    for spec in specs:
+        if spec.section == sheet:
+            return spec
+    return None
+
+
+def sheet_row_count(spec: SheetSpec, data: Dict[str, Any]) -> int:
+    """
+    Number of data rows a sheet has for the extracted data.
+    
+    Args:
+        spec: Sheet spec
+        data: Extracted data of a result
+    
+    Returns:
+        Row count (without the header row)
+    """
+    section_data = data.get(spec.section)
+    if spec.orientation == "rows":
+        return len(section_data) if isinstance(section_data, list) else 0
+    return len(spec.build(section_data).rows)
+
+
+def list_sheets(data: Dict[str, Any], template_id: str) -> List[Dict[str, Any]]:
+    """
+    Summarize the sheets of a result for a sheet picker.
+    
+    Args:
+        data: Extracted data of a result
+        template_id: Extraction template ID
+    
+    Returns:
+        One entry per sheet with name, section, orientation and row count
+    """
+    return [
+        {
+            "name": spec.name,
+            "section": spec.section,
+            "orientation": spec.orientation,
+            "total_rows": sheet_row_count(spec, data)
+        }
+        for spec in get_sheet_specs(template_id)
+    ]
+
+
+def sheet_page(
+    spec: SheetSpec,
+    data: Dict[str, Any],
+    skip: int,
+    limit: int,
+    columns: Optional[Sequence[str]] = None
+) -> Dict[str, Any]:
+    """
+    Build one page of a sheet as JSON rows.
+    
+    Args:
+        spec: Sheet spec
+        data: Extracted data of a result
+        skip: Number of data rows to skip
+        limit: Maximum number of data rows to return
+        columns: Columns to return, in this order, by header label or (for "rows"
+            sheets) source key, e.g. "Reported Value (C)" or "reported_value";
+            all columns if omitted
+    
+    Returns:
+        Page payload: columns (header and number format name), rows as value lists,
+        total row count and section label rows (indexes within the page)
+    
+    Raises:
+        ValueError: If a requested column is not a column of the sheet
+    """
+    section_data = data.get(spec.section)
+    if spec.orientation == "rows":
+        items = section_data if isinstance(section_data, list) else []
+        total_rows = len(items)
+        sheet = spec.build(items[skip:skip + limit])
+        rows = sheet.rows
+        section_rows = []
+    else:
+        sheet = spec.build(section_data)
+        total_rows = len(sheet.rows)
+        rows = sheet.rows[skip:skip + limit]
+        section_rows = [i - skip for i in sheet.section_rows if skip <= i < skip + limit]
+    
+    indexes = list(range(len(sheet.headers)))
+    if columns:
+        lookup = _column_indexes(spec, sheet.headers)
+        unknown = [column for column in columns if column not in lookup]
+        if unknown:
+            raise ValueError(f"Unknown columns for sheet {spec.name}: {unknown}")
+        indexes = [lookup[column] for column in columns]
+        if len(indexes) == 1:
+            rows = [[row[indexes[0]]] for row in rows]
+        else:
+            pick = itemgetter(*indexes)
+            rows = [list(pick(row)) for row in rows]
+    
+    return {
+        "sheet": spec.name,
+        "section": spec.section,
+        "orientation": spec.orientation,
+        "columns": [
+            {"name": sheet.headers[i], "format": spec.column_formats.get(i)}
+            for i in indexes
+        ],
+        "total_rows": total_rows,
+        "skip": skip,
+        "limit": limit,
+        "rows": rows,
+        "section_rows": section_rows
+    }
+
+
+def _column_indexes(spec: SheetSpec, headers: List[str]) -> Dict[str, int]:
+    """Column index by header label, and by source key for "rows" sheets."""
+    lookup = {header: i for i, header in enumerate(headers)}
+    if spec.orientation == "rows":
+        for i, key in enumerate(spec.keys):
+            lookup.setdefault(key, i)
+    return lookup
@@ -0,0 +1,117 @@
+"""
+Single-flight coalescing of identical extraction requests.
+At most one extraction runs per (content hash, template): concurrent duplicates are
+attached to the in-flight job instead of starting their own pipeline. A per-key
+thread lock serializes requests within this process and a unique database row
+(ExtractionLock) covers other server and worker processes.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.database.operations import ExtractionLockService, JobStatusService
+from app.database.schemas import JobStatus, JobStatusEnum
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# How long to wait for a lock holder's job row to become visible before treating the lock as orphaned
+HOLDER_WAIT_SECONDS = 5
+
+
+class ExtractionSingleFlight:
+    """Coordinate in-flight extractions keyed on content hash and template."""
+    
+    def __init__(self):
+        self._guard = threading.Lock()
+        self._local_locks: Dict[str, threading.Lock] = {}
+        self._local_waiters: Dict[str, int] = {}
+    
+    @staticmethod
+    def make_key(content_hash: str, template_id: str) -> str:
+        """Build the lock key for a document and template."""
+        return f"{content_hash}:{template_id}"
+    
+    @contextmanager
+    def hold(self, key: str):
+        """
+        Serialize callers in this process that work on the same key.
+        
+        Args:
+            key: Lock key from make_key()
+        """
+        with self._guard:
+            lock = self._local_locks.setdefault(key, threading.Lock())
+            self._local_waiters[key] = self._local_waiters.get(key, 0) + 1
+        
+        try:
+            with lock:
+                yield
+        finally:
+            with self._guard:
+                self._local_waiters[key] -= 1
+                if self._local_waiters[key] == 0:
+                    del self._local_waiters[key]
+                    del self._local_locks[key]
+    
+    def acquire(self, db: Session, key: str, job_id: str) -> Optional[JobStatus]:
+        """
+        Claim the key for a new job. Call inside hold(key).
+        
+        Args:
+            db: Database session
+            key: Lock key from make_key()
+            job_id: Job that will perform the extraction
+        
+        Returns:
+            None if job_id now owns the key, otherwise the in-flight job to attach to
+        
+        Raises:
+            RuntimeError: If the key could not be claimed or attached to
+        """
+        for _ in range(3):
+            existing = ExtractionLockService.acquire(db, key, job_id)
+            if existing is None:
+                return None
+            
+            holder = self._get_holder_job(db, existing.job_id)
+            if holder and holder.status in (JobStatusEnum.PENDING, JobStatusEnum.PROCESSING):
+                return holder
+            
+            # Holder finished or crashed without releasing - take over the key
+            logger.warning(f"Releasing stale extraction lock {key} held by job {existing.job_id}")
+            ExtractionLockService.release(db, key, existing.job_id)
+        
+        raise RuntimeError(f"Could not acquire extraction lock {key}")
+    
+    def release(self, db: Session, job_id: str) -> None:
+        """
+        Release the key held by a job once it has finished (completed, failed or cancelled).
+        
+        Args:
+            db: Database session
+            job_id: Job UUID
+        """
+        if ExtractionLockService.release_by_job_id(db, job_id):
+            logger.debug(f"Released extraction lock for job {job_id}")
+    
+    def _get_holder_job(self, db: Session, job_id: str) -> Optional[JobStatus]:
+        """
+        Load the job holding a lock. Another process may hold the lock but not yet
+        have committed its job row, so wait briefly before giving up.
+        """
+        deadline = time.time() + HOLDER_WAIT_SECONDS
+        while True:
+            db_job = JobStatusService.get_by_job_id(db, job_id)
+            if db_job or time.time() >= deadline:
+                return db_job
+            time.sleep(0.1)
+            db.expire_all()
+
+
+# Process-wide single-flight coordinator
+extraction_single_flight = ExtractionSingleFlight()
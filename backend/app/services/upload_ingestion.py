@@ -0,0 +1,194 @@
+"""
+Upload ingestion stage.
+Streams uploads to disk in chunks while hashing, counting bytes and validating the
+PDF header in the same pass, and rejects oversize request bodies early.
+"""
+
+import hashlib
+import os
+from typing import BinaryIO, Dict
+
+from app.settings import settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PDF_MAGIC = b"%PDF-"
+
+
+class UploadRejected(Exception):
+    """Raised when an upload fails validation; carries the HTTP status to return."""
+    
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class IngestedUpload:
+    """Result of ingesting an upload to disk."""
+    
+    def __init__(self, path: str, size: int, sha256: str):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+
+
+def ingest_upload(
+    source: BinaryIO,
+    dest_path: str,
+    max_size: int = settings.MAX_FILE_SIZE,
+    chunk_size: int = settings.UPLOAD_CHUNK_SIZE
+) -> IngestedUpload:
+    """
+    Stream an upload to disk in a single pass.
+    
+    Args:
+        source: Readable binary file object positioned at the start of the upload
+        dest_path: Destination path
+        max_size: Maximum allowed size in bytes
+        chunk_size: Read size in bytes
+    
+    Returns:
+        Ingested upload with size and SHA-256 hex digest
+    
+    Raises:
+        UploadRejected: 400 if the data is not a PDF, 413 if it exceeds max_size
+    """
+    digest = hashlib.sha256()
+    size = 0
+    
+    try:
+        with open(dest_path, "wb") as buffer:
+            first_chunk = True
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                
+                if first_chunk:
+                    if not chunk.startswith(PDF_MAGIC):
+                        raise UploadRejected(400, "File is not a valid PDF")
+                    first_chunk = False
+                
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadRejected(
+                        413, f"File exceeds maximum size of {max_size // (1024 * 1024)}MB"
+                    )
+                
+                digest.update(chunk)
+                buffer.write(chunk)
+        
+        if size == 0:
+            raise UploadRejected(400, "Uploaded file is empty")
+    
+    except Exception:
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        raise
+    
+    return IngestedUpload(dest_path, size, digest.hexdigest())
+
+
+def hash_file(path: str, chunk_size: int = settings.UPLOAD_CHUNK_SIZE) -> str:
+    """
+    Compute the SHA-256 of a file already on disk.
+    
+    Args:
+        path: File path
+        chunk_size: Read size in bytes
+    
+    Returns:
+        SHA-256 hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RequestTooLarge(Exception):
+    """Raised inside the ASGI receive channel when a body exceeds its limit."""
+
+
+class UploadSizeLimitMiddleware:
+    """
+    ASGI middleware that rejects oversize upload bodies with 413 before they are read in full.
+    Checks Content-Length up front and counts streamed bytes for chunked requests.
+    """
+    
+    def __init__(self, app, limits: Dict[str, int]):
+        """
+        Initialize middleware.
+        
+        Args:
+            app: ASGI application
+            limits: Maximum body size in bytes per upload path, e.g. {"/api/extract": 10485760}
+        """
+        self.app = app
+        self.limits = limits
+    
+    async def __call__(self, scope, receive, send):
+        max_body_size = self.limits.get(scope.get("path")) if scope["type"] == "http" else None
+        if max_body_size is None or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+        
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > max_body_size:
+            logger.warning(f"Rejected upload: Content-Length {int(content_length):,} exceeds {max_body_size:,}")
+            await self._send_413(send)
+            return
+        
+        received = 0
+        exceeded = False
+        response_started = False
+        
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_body_size:
+                    exceeded = True
+                    raise RequestTooLarge()
+            return message
+        
+        async def limited_send(message):
+            nonlocal response_started
+            if exceeded:
+                # Body parsing errors surface as a generic 400 - replace it with 413
+                if message["type"] == "http.response.start" and not response_started:
+                    response_started = True
+                    await self._send_413(send)
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+        
+        try:
+            await self.app(scope, limited_receive, limited_send)
+        except RequestTooLarge:
+            pass
+        
+        if exceeded:
+            logger.warning(f"Rejected upload: streamed body exceeded {max_body_size:,} bytes")
+            if not response_started:
+                await self._send_413(send)
+    
+    async def _send_413(self, send):
+        """Send a JSON 413 response."""
+        body = b'{"detail":"Request body too large"}'
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"connection", b"close")
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
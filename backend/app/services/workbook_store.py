@@ -0,0 +1,239 @@
+"""
+Workbook storage for extraction results.
+ExtractionResult.extracted_data is the source of truth; the .xlsx is a rendering of it.
+EXCEL_OUTPUT_MODE selects when workbooks are rendered:
+    disk   - eagerly by the pipeline, kept in OUTPUT_DIR
+    lazy   - on first download, kept in OUTPUT_DIR up to EXCEL_CACHE_MAX_MB (LRU)
+    memory - on download, kept in a per-process LRU of EXCEL_MEMORY_CACHE_MB
+Regenerating a result renders it under a new filename, so URLs served as immutable
+never change content.
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.settings import settings
+from app.services.executors import run_cpu_bound
+from app.services.file_serving import data_etag
+from app.services.single_flight import extraction_single_flight
+from app.services.spreadsheet_creator import generate_excel_file, render_excel_bytes
+from app.database.operations import ExtractionResultService
+from app.database.schemas import ExtractionResult
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Filenames looked up per query when deciding which OUTPUT_DIR files may be evicted
+EVICTION_QUERY_BATCH = 500
+
+
+class RenderedWorkbookCache:
+    """Size-bounded LRU of workbooks rendered in memory, keyed on filename and data ETag."""
+    
+    def __init__(self, max_bytes: int):
+        """
+        Initialize cache.
+        
+        Args:
+            max_bytes: Total size of cached workbooks before the least recently used are evicted
+        """
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._size = 0
+    
+    def get(self, filename: str, etag: str) -> Optional[bytes]:
+        """Cached workbook for a filename rendered from data with this ETag."""
+        with self._lock:
+            content = self._entries.get((filename, etag))
+            if content is not None:
+                self._entries.move_to_end((filename, etag))
+            return content
+    
+    def put(self, filename: str, etag: str, content: bytes) -> None:
+        """Cache a rendered workbook, evicting least recently used entries over the size limit."""
+        if len(content) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop((filename, etag), None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[(filename, etag)] = content
+            self._size += len(content)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+    
+    def invalidate(self, filename: str) -> None:
+        """Drop every cached rendering of a filename."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == filename]:
+                self._size -= len(self._entries.pop(key))
+    
+    def stats(self) -> dict:
+        """Entry count and size for monitoring."""
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._size, "max_bytes": self.max_bytes}
+
+
+# Process-wide cache for EXCEL_OUTPUT_MODE=memory
+rendered_workbook_cache = RenderedWorkbookCache(settings.EXCEL_MEMORY_CACHE_MB * 1024 * 1024)
+
+
+def render_workbook_bytes(db_result: ExtractionResult) -> Tuple[bytes, str]:
+    """
+    Render a result's workbook in memory, reusing the cached rendering of the same data.
+    
+    Args:
+        db_result: Extraction result with extracted_data
+    
+    Returns:
+        (XLSX content, weak ETag of the data it was rendered from)
+    """
+    etag = data_etag(db_result.extracted_data, db_result.template_id)
+    content = rendered_workbook_cache.get(db_result.excel_filename, etag)
+    if content is None:
+        start_time = time.time()
+        content = run_cpu_bound(render_excel_bytes, db_result.extracted_data, db_result.template_id)
+        rendered_workbook_cache.put(db_result.excel_filename, etag, content)
+        logger.info(
+            f"Rendered {db_result.excel_filename} in memory | Size: {len(content) / 1024:.1f} KB | "
+            f"Duration: {int((time.time() - start_time) * 1000)}ms"
+        )
+    return content, etag
+
+
+def materialize_workbook(db: Session, db_result: ExtractionResult) -> str:
+    """
+    Render a result's workbook into OUTPUT_DIR if it is not there yet.
+    Concurrent downloads of the same file in this process render it once; the file
+    is written under a temporary name and renamed, so readers never see a partial file.
+    
+    Args:
+        db: Database session
+        db_result: Extraction result with extracted_data
+    
+    Returns:
+        Path of the workbook
+    """
+    path = os.path.join(settings.OUTPUT_DIR, db_result.excel_filename)
+    with extraction_single_flight.hold(f"render:{db_result.excel_filename}"):
+        if os.path.exists(path):
+            return path
+        
+        start_time = time.time()
+        tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            run_cpu_bound(generate_excel_file, db_result.extracted_data, tmp_path, db_result.template_id)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        logger.info(
+            f"Rendered {db_result.excel_filename} on demand | "
+            f"Duration: {int((time.time() - start_time) * 1000)}ms"
+        )
+    
+    if settings.EXCEL_OUTPUT_MODE == "lazy":
+        evict_output_dir(db, keep=path)
+    return path
+
+
+def touch_workbook(path: str) -> None:
+    """Record a cache hit for LRU eviction (access time only, so the file's ETag is unchanged)."""
+    try:
+        stat = os.stat(path)
+        os.utime(path, ns=(time.time_ns(), stat.st_mtime_ns))
+    except OSError:
+        pass
+
+
+def evict_output_dir(db: Session, keep: Optional[str] = None) -> int:
+    """
+    Delete least recently used result workbooks until OUTPUT_DIR fits EXCEL_CACHE_MAX_MB.
+    Only files that belong to an extraction result are evicted - they can be
+    re-rendered from extracted_data on the next download.
+    
+    Args:
+        db: Database session
+        keep: Path that must not be evicted (the workbook just rendered)
+    
+    Returns:
+        Number of files deleted
+    """
+    max_bytes = settings.EXCEL_CACHE_MAX_MB * 1024 * 1024
+    entries = []
+    total = 0
+    with os.scandir(settings.OUTPUT_DIR) as it:
+        for entry in it:
+            if entry.is_file() and entry.name.endswith(".xlsx"):
+                stat = entry.stat()
+                entries.append((stat.st_atime_ns, entry.name, entry.path, stat.st_size))
+                total += stat.st_size
+    if total <= max_bytes:
+        return 0
+    
+    names = [name for _, name, _, _ in entries]
+    evictable = set()
+    for i in range(0, len(names), EVICTION_QUERY_BATCH):
+        evictable.update(ExtractionResultService.get_excel_filenames(db, names[i:i + EVICTION_QUERY_BATCH]))
+    
+    deleted = 0
+    for _, name, path, size in sorted(entries):
+        if total <= max_bytes:
+            break
+        if name not in evictable or path == keep:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        deleted += 1
+    
+    if deleted:
+        logger.info(f"Evicted {deleted} workbooks from {settings.OUTPUT_DIR} | Remaining: {total / (1024 * 1024):.1f} MB")
+    return deleted
+
+
+def regenerate_workbook(db: Session, db_result: ExtractionResult) -> ExtractionResult:
+    """
+    Re-render a result's workbook from extracted_data, e.g. after the data was edited
+    or a template layout changed.
+    
+    The workbook gets a new filename: the old URL was served as immutable and must
+    keep its content. In disk mode the new file is rendered now; in lazy and memory
+    modes on its first download.
+    
+    Args:
+        db: Database session
+        db_result: Extraction result with extracted_data
+    
+    Returns:
+        Updated extraction result
+    """
+    old_filename = db_result.excel_filename
+    old_path = db_result.excel_path
+    
+    stem = Path(old_filename).stem
+    base = stem[:stem.rfind("_extracted") + len("_extracted")] if "_extracted" in stem else stem
+    new_filename = f"{base}_{uuid.uuid4().hex[:8]}.xlsx"
+    new_path = os.path.join(settings.OUTPUT_DIR, new_filename)
+    
+    db_result = ExtractionResultService.update_excel_file(db, db_result.id, new_filename, new_path)
+    if settings.EXCEL_OUTPUT_MODE == "disk":
+        materialize_workbook(db, db_result)
+    
+    rendered_workbook_cache.invalidate(old_filename)
+    if old_path and os.path.exists(old_path):
+        os.remove(old_path)
+    
+    logger.info(f"Regenerated workbook for result {db_result.id} | {old_filename} -> {new_filename}")
+    return db_result
@@ -0,0 +1,516 @@
+"""
+Fast XLSX writer for the fixed report layouts.
+Assembles the XLSX package directly instead of building openpyxl's object model:
+the static parts (content types, relationships, workbook, styles) are precomputed
+strings and each sheet's XML is streamed into the zip archive row by row with
+inline strings. Output matches ExcelGenerator - same values, named styles, number
+formats, column widths, freeze panes and header heights - and is selected with
+EXCEL_ENGINE=fast. FastXlsxAppendWriter builds workbooks incrementally (rollups).
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, Dict, List, Optional, Union
+from xml.sax.saxutils import escape, quoteattr
+
+from openpyxl.cell.cell import ERROR_CODES, ILLEGAL_CHARACTERS_RE
+from openpyxl.compat import safe_string
+from openpyxl.styles.numbers import BUILTIN_FORMATS_REVERSE
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.cell import coordinate_to_tuple
+from openpyxl.utils.exceptions import IllegalCharacterError
+
+from app.settings import settings
+from app.templates.sheet_specs import (
+    HEADER_STYLE,
+    NUMBER_FORMATS,
+    SECTION_STYLE,
+    ColumnWidthTracker,
+    SheetRows,
+    SheetSpec,
+    get_sheet_specs,
+    number_style_name
+)
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PACKAGE_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+# Maximum characters in a cell (longer strings are truncated, as openpyxl does)
+MAX_CELL_LENGTH = 32767
+
+# Rows serialized per write to the compressed sheet stream
+ROWS_PER_WRITE = 500
+
+SHEET_CLOSE_XML = (
+    '</sheetData><pageMargins left="0.75" right="0.75" top="1" bottom="1" header="0.5" footer="0.5"/></worksheet>'
+)
+
+# Number format IDs: builtin IDs where Excel has one, custom IDs from 164
+_NUMBER_FORMAT_IDS: Dict[str, int] = {}
+_custom_formats: List[str] = []
+for _format_name, _number_format in NUMBER_FORMATS.items():
+    if _number_format in BUILTIN_FORMATS_REVERSE:
+        _NUMBER_FORMAT_IDS[_format_name] = BUILTIN_FORMATS_REVERSE[_number_format]
+    else:
+        _NUMBER_FORMAT_IDS[_format_name] = 164 + len(_custom_formats)
+        _custom_formats.append(
+            f'<numFmt numFmtId="{_NUMBER_FORMAT_IDS[_format_name]}" formatCode={quoteattr(_number_format)}/>'
+        )
+
+# Named styles in registration order (index = cellStyleXfs and cellXfs position)
+# and their xf attributes; fonts, fills and borders mirror ExcelGenerator's styles
+_NAMED_STYLES = [
+    ("Normal", '<xf numFmtId="0" fontId="0" fillId="0" borderId="0"', ""),
+    (
+        HEADER_STYLE,
+        '<xf numFmtId="0" fontId="1" fillId="2" borderId="1" applyFont="1" applyFill="1" '
+        'applyBorder="1" applyAlignment="1"',
+        '<alignment horizontal="center" vertical="center"/>'
+    ),
+    (SECTION_STYLE, '<xf numFmtId="0" fontId="2" fillId="0" borderId="0" applyFont="1"', "")
+] + [
+    (
+        number_style_name(format_name),
+        f'<xf numFmtId="{_NUMBER_FORMAT_IDS[format_name]}" fontId="0" fillId="0" borderId="0" '
+        'applyNumberFormat="1"',
+        ""
+    )
+    for format_name in NUMBER_FORMATS
+]
+STYLE_IDS = {name: idx for idx, (name, _, _) in enumerate(_NAMED_STYLES)}
+
+
+def _xf(attributes: str, children: str, xf_id: Optional[int] = None) -> str:
+    """Serialize one xf record."""
+    if xf_id is not None:
+        attributes += f' xfId="{xf_id}"'
+    return f"{attributes}>{children}</xf>" if children else f"{attributes}/>"
+
+
+STYLES_XML = (
+    XML_HEADER
+    + f'<styleSheet xmlns="{MAIN_NS}">'
+    + (f'<numFmts count="{len(_custom_formats)}">{"".join(_custom_formats)}</numFmts>' if _custom_formats else "")
+    + '<fonts count="3">'
+    '<font><name val="Calibri"/><family val="2"/><color theme="1"/><sz val="11"/><scheme val="minor"/></font>'
+    '<font><b val="1"/><color rgb="00FFFFFF"/></font>'
+    '<font><b val="1"/><color rgb="00000000"/></font>'
+    '</fonts>'
+    '<fills count="3">'
+    '<fill><patternFill/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill>'
+    '<fill><patternFill patternType="solid"><fgColor rgb="00366092"/><bgColor rgb="00366092"/></patternFill></fill>'
+    '</fills>'
+    '<borders count="2">'
+    '<border><left/><right/><top/><bottom/><diagonal/></border>'
+    '<border><left style="thin"/><right style="thin"/><top style="thin"/><bottom style="thin"/><diagonal/></border>'
+    '</borders>'
+    + f'<cellStyleXfs count="{len(_NAMED_STYLES)}">'
+    + "".join(_xf(attributes, children) for _, attributes, children in _NAMED_STYLES)
+    + f'</cellStyleXfs><cellXfs count="{len(_NAMED_STYLES)}">'
+    + "".join(_xf(attributes, children, idx) for idx, (_, attributes, children) in enumerate(_NAMED_STYLES))
+    + f'</cellXfs><cellStyles count="{len(_NAMED_STYLES)}">'
+    + '<cellStyle name="Normal" xfId="0" builtinId="0"/>'
+    + "".join(
+        f'<cellStyle name={quoteattr(name)} xfId="{idx}"/>'
+        for idx, (name, _, _) in enumerate(_NAMED_STYLES) if idx
+    )
+    + '</cellStyles></styleSheet>'
+)
+
+ROOT_RELS_XML = (
+    XML_HEADER
+    + f'<Relationships xmlns="{PACKAGE_REL_NS}">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/package/2006/relationships/metadata/core-properties" '
+    'Target="docProps/core.xml"/>'
+    '<Relationship Id="rId3" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/extended-properties" '
+    'Target="docProps/app.xml"/>'
+    '</Relationships>'
+)
+
+APP_XML = (
+    XML_HEADER
+    + '<Properties xmlns="http://schemas.openxmlformats.org/officeDocument/2006/extended-properties">'
+    '<Application>Microsoft Excel</Application></Properties>'
+)
+
+
+class FastXlsxWriter:
+    """Write report workbooks as raw SpreadsheetML, one streamed sheet at a time."""
+    
+    def __init__(self):
+        # Seconds spent on the last workbook (same keys as ExcelGenerator.timings)
+        self.timings: Dict[str, float] = {}
+    
+    def generate_excel(
+        self,
+        data: Dict[str, Any],
+        output_path: Union[str, BinaryIO],
+        template_id: str = "fund_report_v1"
+    ) -> Union[str, BinaryIO]:
+        """
+        Generate the workbook for extracted data.
+        
+        Args:
+            data: Extracted and structured data
+            output_path: Path to save the Excel file, or a writable binary buffer
+            template_id: Template whose sheet specs define the workbook
+        
+        Returns:
+            Path (or buffer) the Excel file was written to
+        
+        Raises:
+            ValueError: If a value cannot be stored in a cell
+        """
+        start_time = time.perf_counter()
+        specs = get_sheet_specs(template_id)
+        
+        with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for sheet_idx, spec in enumerate(specs, start=1):
+                sheet = spec.build(data.get(spec.section))
+                with archive.open(f"xl/worksheets/sheet{sheet_idx}.xml", "w") as stream:
+                    self._write_sheet(stream, spec, sheet)
+            
+            archive.writestr("[Content_Types].xml", self._content_types_xml(len(specs)))
+            archive.writestr("_rels/.rels", ROOT_RELS_XML)
+            archive.writestr("docProps/app.xml", APP_XML)
+            archive.writestr("docProps/core.xml", self._core_xml())
+            archive.writestr("xl/workbook.xml", self._workbook_xml(specs))
+            archive.writestr("xl/_rels/workbook.xml.rels", self._workbook_rels_xml(len(specs)))
+            archive.writestr("xl/styles.xml", STYLES_XML)
+        
+        self.timings = {"build_seconds": time.perf_counter() - start_time, "save_seconds": 0.0}
+        target = output_path if isinstance(output_path, str) else "<in-memory buffer>"
+        logger.info(
+            f"Excel file generated (fast writer) | Sheets: {len(specs)} | Path: {target} | "
+            f"Duration: {self.timings['build_seconds']:.2f}s"
+        )
+        return output_path
+    
+    def _write_sheet(self, stream: BinaryIO, spec: SheetSpec, sheet: SheetRows) -> None:
+        """
+        Stream one worksheet's XML.
+        
+        Args:
+            stream: Writable zip member
+            spec: Sheet spec (number formats, panes, header height)
+            sheet: Rows built from the extracted data by spec.build()
+        """
+        column_count = len(sheet.headers)
+        letters = [get_column_letter(col_idx) for col_idx in range(1, column_count + 1)]
+        row_count = len(sheet.rows) + 1
+        dimension = f"A1:{letters[-1]}{row_count}" if column_count else "A1:A1"
+        
+        # Sheet properties precede the data, so size columns from a sample like write-only mode
+        widths = ColumnWidthTracker(sheet.headers)
+        for row in sheet.rows[:settings.EXCEL_WIDTH_SAMPLE_ROWS]:
+            widths.update(row)
+            if widths.saturated:
+                break
+        
+        parts = [
+            self._sheet_open_xml(dimension, spec.freeze_panes, widths.widths()),
+            _row_xml(1, letters, [f' s="{STYLE_IDS[HEADER_STYLE]}"'] * column_count, sheet.headers, spec.header_height)
+        ]
+        
+        column_styles = [""] * column_count
+        for col_idx, format_name in spec.column_formats.items():
+            if col_idx < column_count:
+                column_styles[col_idx] = f' s="{STYLE_IDS[number_style_name(format_name)]}"'
+        section_style = f' s="{STYLE_IDS[SECTION_STYLE]}"'
+        section_rows = set(sheet.section_rows)
+        
+        for row_idx, row in enumerate(sheet.rows):
+            styles = column_styles
+            if row_idx in section_rows:
+                styles = [section_style] + column_styles[1:]
+            parts.append(_row_xml(row_idx + 2, letters, styles, row))
+            if row_idx % ROWS_PER_WRITE == 0:
+                stream.write("".join(parts).encode("utf-8"))
+                parts = []
+        
+        parts.append(SHEET_CLOSE_XML)
+        stream.write("".join(parts).encode("utf-8"))
+    
+    def _sheet_open_xml(self, dimension: str, freeze_panes: Optional[str], widths: List[int]) -> str:
+        """Worksheet XML up to the opening sheetData tag."""
+        cols = "".join(
+            f'<col min="{col_idx}" max="{col_idx}" width="{width}" customWidth="1"/>'
+            for col_idx, width in enumerate(widths, start=1)
+        )
+        return "".join([
+            XML_HEADER,
+            f'<worksheet xmlns="{MAIN_NS}" xmlns:r="{REL_NS}">',
+            f'<dimension ref="{dimension}"/>',
+            f'<sheetViews><sheetView workbookViewId="0">{self._pane_xml(freeze_panes)}</sheetView></sheetViews>',
+            '<sheetFormatPr defaultRowHeight="15"/>',
+            f"<cols>{cols}</cols>" if cols else "",
+            "<sheetData>"
+        ])
+    
+    @staticmethod
+    def _pane_xml(freeze_panes: Optional[str]) -> str:
+        """Frozen pane and selection for a top-left unfrozen cell such as "B2"."""
+        if not freeze_panes or freeze_panes == "A1":
+            return '<selection activeCell="A1" sqref="A1"/>'
+        
+        row, column = coordinate_to_tuple(freeze_panes)
+        split = ""
+        if column > 1:
+            split += f' xSplit="{column - 1}"'
+        if row > 1:
+            split += f' ySplit="{row - 1}"'
+        if column > 1 and row > 1:
+            active_pane = "bottomRight"
+        elif column > 1:
+            active_pane = "topRight"
+        else:
+            active_pane = "bottomLeft"
+        return (
+            f'<pane{split} topLeftCell="{freeze_panes}" activePane="{active_pane}" state="frozen"/>'
+            f'<selection pane="{active_pane}" activeCell="{freeze_panes}" sqref="{freeze_panes}"/>'
+        )
+    
+    @staticmethod
+    def _content_types_xml(sheet_count: int) -> str:
+        """[Content_Types].xml for the package."""
+        sheets = "".join(
+            f'<Override PartName="/xl/worksheets/sheet{idx}.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for idx in range(1, sheet_count + 1)
+        )
+        return (
+            XML_HEADER
+            + '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            + sheets
+            + '<Override PartName="/xl/styles.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            '<Override PartName="/docProps/core.xml" '
+            'ContentType="application/vnd.openxmlformats-package.core-properties+xml"/>'
+            '<Override PartName="/docProps/app.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.extended-properties+xml"/>'
+            '</Types>'
+        )
+    
+    @staticmethod
+    def _workbook_xml(specs: List[Any]) -> str:
+        """xl/workbook.xml listing the sheets (anything with a name) in order."""
+        sheets = "".join(
+            f'<sheet name={quoteattr(spec.name)} sheetId="{idx}" r:id="rId{idx}"/>'
+            for idx, spec in enumerate(specs, start=1)
+        )
+        return (
+            XML_HEADER
+            + f'<workbook xmlns="{MAIN_NS}" xmlns:r="{REL_NS}">'
+            '<workbookPr/><bookViews><workbookView activeTab="0"/></bookViews>'
+            f"<sheets>{sheets}</sheets>"
+            '<calcPr calcId="124519" fullCalcOnLoad="1"/></workbook>'
+        )
+    
+    @staticmethod
+    def _workbook_rels_xml(sheet_count: int) -> str:
+        """xl/_rels/workbook.xml.rels: one relationship per sheet plus styles."""
+        sheets = "".join(
+            f'<Relationship Id="rId{idx}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+            f'Target="worksheets/sheet{idx}.xml"/>'
+            for idx in range(1, sheet_count + 1)
+        )
+        return (
+            XML_HEADER
+            + f'<Relationships xmlns="{PACKAGE_REL_NS}">{sheets}'
+            f'<Relationship Id="rId{sheet_count + 1}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+            'Target="styles.xml"/></Relationships>'
+        )
+    
+    @staticmethod
+    def _core_xml() -> str:
+        """docProps/core.xml with creation and modification times."""
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        return (
+            XML_HEADER
+            + '<cp:coreProperties xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties" '
+            'xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:dcterms="http://purl.org/dc/terms/" '
+            'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">'
+            '<dc:creator>openpyxl</dc:creator>'
+            f'<dcterms:created xsi:type="dcterms:W3CDTF">{now}</dcterms:created>'
+            f'<dcterms:modified xsi:type="dcterms:W3CDTF">{now}</dcterms:modified>'
+            '</cp:coreProperties>'
+        )
+
+
+class AppendedSheet:
+    """A worksheet of a FastXlsxAppendWriter whose rows are spooled to a temporary file."""
+    
+    def __init__(self, name: str, path: str, letters: List[str], styles: List[str], freeze_panes: Optional[str],
+                 widths: List[int]):
+        self.name = name
+        self.path = path
+        self.stream = open(path, "wb")
+        self.letters = letters
+        self.styles = styles
+        self.freeze_panes = freeze_panes
+        self.widths = widths
+        self.row_count = 0
+
+
+class FastXlsxAppendWriter(FastXlsxWriter):
+    """
+    Build a workbook whose sheets are filled incrementally, rows appended to any
+    sheet in any order. Each sheet's row XML is spooled to a temporary file and
+    copied into the package on save, so memory does not grow with the row count.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self._sheets: Dict[str, AppendedSheet] = {}
+    
+    def add_sheet(
+        self,
+        name: str,
+        headers: List[str],
+        widths: List[int],
+        column_formats: Optional[Dict[int, str]] = None,
+        freeze_panes: Optional[str] = None
+    ) -> None:
+        """
+        Add a sheet with a styled header row.
+        
+        Args:
+            name: Sheet name
+            headers: Header labels
+            widths: Column widths (fixed up front, since rows are not kept)
+            column_formats: Number format name (a NUMBER_FORMATS key) by column index
+            freeze_panes: Top-left unfrozen cell, e.g. "D2"
+        """
+        letters = [get_column_letter(col_idx) for col_idx in range(1, len(headers) + 1)]
+        styles = [""] * len(headers)
+        for col_idx, format_name in (column_formats or {}).items():
+            if col_idx < len(headers):
+                styles[col_idx] = f' s="{STYLE_IDS[number_style_name(format_name)]}"'
+        
+        path = os.path.join(self._tmp_dir.name, f"sheet{len(self._sheets) + 1}.xml")
+        sheet = AppendedSheet(name, path, letters, styles, freeze_panes, widths)
+        self._sheets[name] = sheet
+        self.append_rows(name, [headers], styles=[f' s="{STYLE_IDS[HEADER_STYLE]}"'] * len(headers))
+    
+    def append_rows(self, name: str, rows: List[List[Any]], styles: Optional[List[str]] = None) -> None:
+        """
+        Append rows to a sheet.
+        
+        Args:
+            name: Sheet name given to add_sheet()
+            rows: Row values
+            styles: Per-column style attributes overriding the sheet's number formats
+        
+        Raises:
+            ValueError: If a value cannot be stored in a cell
+        """
+        sheet = self._sheets[name]
+        styles = styles or sheet.styles
+        parts = []
+        for row in rows:
+            sheet.row_count += 1
+            parts.append(_row_xml(sheet.row_count, sheet.letters, styles, row))
+        sheet.stream.write("".join(parts).encode("utf-8"))
+    
+    def save(self, output_path: Union[str, BinaryIO]) -> None:
+        """
+        Assemble the package from the spooled sheets.
+        
+        Args:
+            output_path: Path to save the Excel file, or a writable binary buffer
+        """
+        start_time = time.perf_counter()
+        sheets = list(self._sheets.values())
+        
+        with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for sheet_idx, sheet in enumerate(sheets, start=1):
+                sheet.stream.close()
+                dimension = f"A1:{sheet.letters[-1]}{sheet.row_count}" if sheet.letters else "A1:A1"
+                with archive.open(f"xl/worksheets/sheet{sheet_idx}.xml", "w") as stream:
+                    stream.write(self._sheet_open_xml(dimension, sheet.freeze_panes, sheet.widths).encode("utf-8"))
+                    with open(sheet.path, "rb") as rows:
+                        shutil.copyfileobj(rows, stream)
+                    stream.write(SHEET_CLOSE_XML.encode("utf-8"))
+            
+            archive.writestr("[Content_Types].xml", self._content_types_xml(len(sheets)))
+            archive.writestr("_rels/.rels", ROOT_RELS_XML)
+            archive.writestr("docProps/app.xml", APP_XML)
+            archive.writestr("docProps/core.xml", self._core_xml())
+            archive.writestr("xl/workbook.xml", self._workbook_xml(sheets))
+            archive.writestr("xl/_rels/workbook.xml.rels", self._workbook_rels_xml(len(sheets)))
+            archive.writestr("xl/styles.xml", STYLES_XML)
+        
+        self.timings = {"build_seconds": 0.0, "save_seconds": time.perf_counter() - start_time}
+    
+    def close(self) -> None:
+        """Remove the spooled sheet files."""
+        for sheet in self._sheets.values():
+            sheet.stream.close()
+        self._tmp_dir.cleanup()
+
+
+def _row_xml(
+    row_number: int,
+    letters: List[str],
+    styles: List[str],
+    values: List[Any],
+    height: Optional[float] = None
+) -> str:
+    """Serialize one row; styles are ' s="<xf index>"' attributes (or "") per column."""
+    custom_height = f' ht="{height}" customHeight="1"' if height else ""
+    cells = "".join(
+        _cell_xml(f"{letter}{row_number}", style, value)
+        for letter, style, value in zip(letters, styles, values)
+    )
+    return f'<row r="{row_number}"{custom_height}>{cells}</row>'
+
+
+def _cell_xml(ref: str, style: str, value: Any) -> str:
+    """
+    Serialize one cell with openpyxl's type rules: numbers, booleans, inline
+    strings, "=..." strings as formulas and Excel error codes as errors.
+    
+    Raises:
+        ValueError: If the value cannot be stored in a cell
+    """
+    if value is None:
+        return f'<c r="{ref}"{style}/>' if style else ""
+    
+    value_type = type(value)
+    if value_type is str:
+        value = value[:MAX_CELL_LENGTH]
+        if ILLEGAL_CHARACTERS_RE.search(value):
+            raise IllegalCharacterError(f"{value} cannot be used in worksheets.")
+        if not value:
+            return f'<c r="{ref}"{style} t="inlineStr"/>'
+        if len(value) > 1 and value[0] == "=":
+            return f'<c r="{ref}"{style}><f>{escape(value[1:])}</f><v/></c>'
+        if value in ERROR_CODES:
+            return f'<c r="{ref}"{style} t="e"><v>{escape(value)}</v></c>'
+        return f'<c r="{ref}"{style} t="inlineStr"><is><t xml:space="preserve">{escape(value)}</t></is></c>'
+    
+    if value_type is int or value_type is float:
+        return f'<c r="{ref}"{style} t="n"><v>{safe_string(value)}</v></c>'
+    if value_type is bool:
+        return f'<c r="{ref}"{style} t="b"><v>{int(value)}</v></c>'
+    
+    raise ValueError(f"Cannot convert {value!r} to Excel")
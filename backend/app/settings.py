@@ -10,7 +10,12 @@ class Settings:
     # File storage
     UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "uploads")
     OUTPUT_DIR: str = os.getenv("OUTPUT_DIR", "outputs")
-    MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
+    MAX_FILE_SIZE: int = int(os.getenv("MAX_FILE_SIZE", str(10 * 1024 * 1024)))  # 10MB
+    MAX_UPLOAD_OVERHEAD: int = 64 * 1024  # Multipart headers/form fields allowed on top of the file
+    UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))  # 1MB
+    MAX_BATCH_FILES: int = int(os.getenv("MAX_BATCH_FILES", "500"))  # PDFs per batch upload (incl. zip members)
+    MAX_BATCH_SIZE: int = int(os.getenv("MAX_BATCH_SIZE", str(1024 * 1024 * 1024)))  # 1GB per batch request
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = int(os.getenv("IDEMPOTENCY_KEY_TTL_SECONDS", "86400"))  # Window in which retries with the same Idempotency-Key return the original job
     ALLOWED_EXTENSIONS: set = {".pdf"}
     
     # Gemini model configuration
@@ -18,11 +23,75 @@ class Settings:
     GEMINI_TEMPERATURE: float = float(os.getenv("GEMINI_TEMPERATURE", "0.1"))
     GEMINI_MAX_TOKENS: int = int(os.getenv("GEMINI_MAX_TOKENS", "40000"))
     
+    # Model cascade configuration ("single" uses GEMINI_MODEL only, "cascade" escalates weak sections)
+    EXTRACTION_MODE: str = os.getenv("EXTRACTION_MODE", "single").lower()
+    GEMINI_FAST_MODEL: str = os.getenv("GEMINI_FAST_MODEL", "gemini-2.0-flash-lite")
+    GEMINI_STRONG_MODEL: str = os.getenv("GEMINI_STRONG_MODEL", "gemini-1.5-pro")
+    CASCADE_MIN_FILL_RATE: float = float(os.getenv("CASCADE_MIN_FILL_RATE", "0.25"))
+    
+    # Automatically re-extract empty/invalid sections, scoped to the pages where they appear
+    AUTO_REEXTRACT_SECTIONS: bool = os.getenv("AUTO_REEXTRACT_SECTIONS", "true").lower() == "true"
+    
+    # Offline batch extraction (packs several small documents into one LLM request)
+    BATCH_SMALL_DOC_MAX_CHARS: int = int(os.getenv("BATCH_SMALL_DOC_MAX_CHARS", "15000"))
+    BATCH_PACK_MAX_CHARS: int = int(os.getenv("BATCH_PACK_MAX_CHARS", "60000"))
+    BATCH_PACK_MAX_DOCS: int = int(os.getenv("BATCH_PACK_MAX_DOCS", "6"))
+    # A pack's response shares one GEMINI_MAX_TOKENS budget: each document is expected to need the
+    # JSON skeleton of all sections plus output proportional to its text
+    BATCH_OUTPUT_TOKENS_PER_DOC: int = int(os.getenv("BATCH_OUTPUT_TOKENS_PER_DOC", "3500"))
+    BATCH_OUTPUT_CHARS_RATIO: float = float(os.getenv("BATCH_OUTPUT_CHARS_RATIO", "0.5"))  # Output characters per input character
+    BATCH_PACK_OUTPUT_SHARE: float = float(os.getenv("BATCH_PACK_OUTPUT_SHARE", "0.8"))  # Share of GEMINI_MAX_TOKENS a pack may fill
+    
     # Database configuration (Neon PostgreSQL)
     DATABASE_URL: str = os.getenv("DATABASE_URL", "")
     DATABASE_ECHO: bool = os.getenv("DATABASE_ECHO", "false").lower() == "true"
     
+    # Background extraction workers (set EXTRACTION_WORKERS=0 to run workers only via run_worker.py)
+    EXTRACTION_WORKERS: int = int(os.getenv("EXTRACTION_WORKERS", "2"))
+    WORKER_POLL_INTERVAL: float = float(os.getenv("WORKER_POLL_INTERVAL", "2.0"))
+    JOB_STALE_AFTER_SECONDS: int = int(os.getenv("JOB_STALE_AFTER_SECONDS", "1800"))  # Processing jobs without a heartbeat for this long are requeued
+    JOB_HEARTBEAT_INTERVAL: float = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "60"))  # Seconds between heartbeats of running jobs
+    TEXT_EXTRACTION_PAGE_BATCH: int = int(os.getenv("TEXT_EXTRACTION_PAGE_BATCH", "20"))  # Pages per text extraction task (cancellation checkpoint)
+    SSE_KEEPALIVE_SECONDS: float = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))  # Keepalive / DB re-check interval for event streams
+    
+    # Admission control - new submissions get 429 + Retry-After while any limit is exceeded
+    ADMISSION_MAX_QUEUE_DEPTH: int = int(os.getenv("ADMISSION_MAX_QUEUE_DEPTH", "100"))  # Pending interactive jobs
+    ADMISSION_MAX_BATCH_QUEUE_DEPTH: int = int(os.getenv("ADMISSION_MAX_BATCH_QUEUE_DEPTH", "2000"))  # All pending jobs, checked for batch uploads
+    ADMISSION_MAX_INFLIGHT_TOKENS: int = int(os.getenv("ADMISSION_MAX_INFLIGHT_TOKENS", "1000000"))  # Estimated prompt tokens in running Gemini calls
+    ADMISSION_MAX_MEMORY_MB: int = int(os.getenv("ADMISSION_MAX_MEMORY_MB", "2048"))  # Server + CPU pool RSS (0 disables); workers also stop claiming above it
+    ADMISSION_RETRY_AFTER_SECONDS: int = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "30"))  # Retry-After for token/memory pressure
+    
+    # Executor pools: CPU-bound stages (PDF parsing, Excel generation) run in a process pool
+    # (0 runs them inline in the worker thread); sync endpoints run in the I/O thread pool
+    CPU_POOL_WORKERS: int = int(os.getenv("CPU_POOL_WORKERS", "2"))
+    IO_THREAD_POOL_SIZE: int = int(os.getenv("IO_THREAD_POOL_SIZE", "40"))
+    
+    # Excel output - write-only mode streams rows instead of building the full cell model
+    EXCEL_WRITE_ONLY: bool = os.getenv("EXCEL_WRITE_ONLY", "true").lower() == "true"
+    # "openpyxl" builds workbooks with openpyxl; "fast" writes the XLSX package directly (app/services/xlsx_writer.py)
+    EXCEL_ENGINE: str = os.getenv("EXCEL_ENGINE", "openpyxl")
+    EXCEL_WIDTH_SAMPLE_ROWS: int = int(os.getenv("EXCEL_WIDTH_SAMPLE_ROWS", "1000"))  # Rows measured for column widths per sheet
+    # "disk" renders workbooks eagerly into OUTPUT_DIR; "lazy" renders them there on first download;
+    # "memory" renders them into a buffer on download (see app/services/workbook_store.py)
+    EXCEL_OUTPUT_MODE: str = os.getenv("EXCEL_OUTPUT_MODE", "disk")
+    EXCEL_CACHE_MAX_MB: int = int(os.getenv("EXCEL_CACHE_MAX_MB", "1024"))  # OUTPUT_DIR size before LRU eviction (lazy mode)
+    EXCEL_MEMORY_CACHE_MB: int = int(os.getenv("EXCEL_MEMORY_CACHE_MB", "128"))  # Rendered workbooks kept per process (memory mode)
+    
+    # JSON sheet previews (GET /api/results/{id}/sheets/{sheet})
+    SHEET_PAGE_SIZE: int = int(os.getenv("SHEET_PAGE_SIZE", "200"))  # Rows per page when no limit is given
+    SHEET_PAGE_MAX: int = int(os.getenv("SHEET_PAGE_MAX", "5000"))  # Largest accepted page
+    GZIP_MIN_SIZE: int = int(os.getenv("GZIP_MIN_SIZE", "1024"))  # Smallest JSON response body that is gzip-compressed
+    
+    # Result comparison - numbers within either tolerance are equal
+    COMPARE_ABS_TOLERANCE: float = float(os.getenv("COMPARE_ABS_TOLERANCE", "0.01"))
+    COMPARE_REL_TOLERANCE: float = float(os.getenv("COMPARE_REL_TOLERANCE", "0"))
+    COMPARISON_CACHE_SIZE: int = int(os.getenv("COMPARISON_CACHE_SIZE", "32"))  # Computed diffs kept per process
+    
+    # Multi-fund rollups (GET /api/rollups, run_rollup.py)
+    ROLLUP_QUERY_BATCH: int = int(os.getenv("ROLLUP_QUERY_BATCH", "100"))  # Results read per query
+    
     # Application settings
+    ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
     DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"
     CORS_ORIGINS: list = eval(os.getenv("CORS_ORIGINS", '["*"]'))
 
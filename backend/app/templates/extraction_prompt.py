@@ -3,6 +3,9 @@ Simplified and optimized prompt template for Gemini 2.0 Flash.
 Focuses on practical extraction with clear structure.
 """
 
+# Bump whenever the prompts change so cached results are not reused across versions
+PROMPT_VERSION = "1.1"
+
 EXTRACTION_PROMPT_TEMPLATE = """You are a financial data extraction expert. Extract ALL data from this fund report PDF and return it as detailed JSON.
 
 CRITICAL RULES:
@@ -362,3 +365,20 @@ VALIDATION_PROMPT = """Fix and validate this JSON. Ensure all numeric fields are
 {extracted_data}
 
 Return the corrected JSON only."""
+
+BATCH_DOCUMENT_DELIMITER = """<<<DOCUMENT {doc_id}>>>
+{extracted_text}
+<<<END DOCUMENT {doc_id}>>>"""
+
+BATCH_OUTPUT_INSTRUCTION = """
+
+BATCH EXTRACTION:
+The DOCUMENT TEXT above contains {doc_count} SEPARATE documents, each wrapped in <<<DOCUMENT id>>> ... <<<END DOCUMENT id>>>.
+Never mix data between documents. Return ONE JSON object whose keys are the document ids ({doc_ids})
+and whose values are each document's complete JSON with ALL 9 sections, e.g. {{"doc_1": {{...}}, "doc_2": {{...}}}}"""
+
+SECTION_FOCUS_INSTRUCTION = """
+
+FOCUSED EXTRACTION:
+This is a follow-up request for specific sections only. Extract ONLY these sections: {sections}
+Return every other section as an empty array [] or empty object {{}} so the JSON structure stays complete."""
@@ -0,0 +1,581 @@
+"""
+Declarative specifications of the output sheets of the fund report template.
+Each SheetSpec names its sheet, the extracted-data section it reads, its layout
+orientation and its columns; header and key tuples are compiled once at import so
+the generic row engine (SheetSpec.build) turns extracted data into rows without
+per-cell code. The same rows drive the Excel workbook and CSV/JSON exports.
+Both workbook engines (ExcelGenerator and FastXlsxWriter) take their style names
+and column width rules from here, so they render the same layout.
+
+Orientations:
+    rows        list of dicts, one row per item (Schedule of Investments, ...)
+    fields      dict rendered as Field/Value rows, None keys are section labels
+    transposed  dict of line items rendered with periods as rows and items as columns
+    columns     dict of lists, one column per key (Reference Values)
+"""
+
+import csv
+from itertools import repeat
+from typing import Any, Dict, IO, List, Optional, Sequence, Tuple
+
+ORIENTATIONS = ("rows", "fields", "transposed", "columns")
+
+# Named number formats referenced by SheetSpec.number_formats; the Excel generator
+# registers one NamedStyle per name. Percentages are extracted as 15.5 for 15.5%,
+# so the percent sign is a literal rather than Excel's x100 percent format.
+NUMBER_FORMATS = {
+    "currency": "#,##0.00;(#,##0.00)",
+    "integer": "#,##0",
+    "percent": '0.00"%"',
+    "multiple": '0.00"x"'
+}
+
+# Row labels and keys of the transposed statements
+PERIOD_ROWS = (
+    ("Current Period", "current_period"),
+    ("Prior Period", "prior_period"),
+    ("Year to Date", "year_to_date")
+)
+
+
+# Column widths: longest value + padding, capped
+MAX_COLUMN_WIDTH = 50
+WIDTH_PADDING = 2
+
+# Named styles of generated workbooks; cells reference them by name
+HEADER_STYLE = "Report Header"
+SECTION_STYLE = "Report Section"
+
+
+def number_style_name(format_name: str) -> str:
+    """Named style of a NUMBER_FORMATS entry, e.g. "currency" -> "Report Currency"."""
+    return f"Report {format_name.title()}"
+
+
+class ColumnWidthTracker:
+    """
+    Track column widths in the same pass that emits rows.
+    Columns stop being measured once they reach the width cap, so long narrative
+    text (e.g. the 27-column Portfolio Company Profile) is only measured once.
+    """
+    
+    def __init__(self, headers: Sequence[Any]):
+        """
+        Initialize tracker with the header row.
+        
+        Args:
+            headers: Header labels (counted like values)
+        """
+        self._cap = MAX_COLUMN_WIDTH - WIDTH_PADDING
+        self.max_lengths = [0] * len(headers)
+        self._open = list(range(len(headers)))
+        self.update(headers)
+    
+    def update(self, row: Sequence[Any]) -> None:
+        """
+        Account for one row of values.
+        
+        Args:
+            row: Row values
+        """
+        max_lengths = self.max_lengths
+        capped = False
+        for col_idx in self._open:
+            value = row[col_idx]
+            if not value:
+                continue
+            length = len(value) if type(value) is str else len(str(value))
+            if length > max_lengths[col_idx]:
+                max_lengths[col_idx] = length
+                capped = capped or length >= self._cap
+        if capped:
+            self._open = [i for i in self._open if max_lengths[i] < self._cap]
+    
+    @property
+    def saturated(self) -> bool:
+        """Whether every column has reached the width cap."""
+        return not self._open
+    
+    def widths(self) -> List[int]:
+        """Column widths for the rows seen so far."""
+        return [min(length + WIDTH_PADDING, MAX_COLUMN_WIDTH) for length in self.max_lengths]
+
+
+class SheetRows:
+    """Rows produced for one sheet."""
+    
+    def __init__(self, headers: List[str], rows: List[List[Any]], section_rows: Sequence[int] = ()):
+        self.headers = headers
+        self.rows = rows
+        self.section_rows = section_rows
+
+
+class SheetSpec:
+    """Layout of one output sheet."""
+    
+    def __init__(
+        self,
+        name: str,
+        section: str,
+        orientation: str,
+        columns: Sequence[Tuple[str, Any]] = (),
+        number_formats: Optional[Dict[str, str]] = None,
+        value_format: Optional[str] = None,
+        row_header: Optional[str] = None,
+        row_key: Sequence[str] = (),
+        freeze_panes: Optional[str] = None,
+        header_height: Optional[float] = None
+    ):
+        """
+        Initialize and compile a sheet spec.
+        
+        Args:
+            name: Sheet name
+            section: Top-level key of the extracted data
+            orientation: One of ORIENTATIONS
+            columns: (label, key) pairs - column headers and source keys for "rows",
+                field labels and keys for "fields", line item labels and
+                (section, field) keys for "transposed"; unused for "columns"
+            number_formats: NUMBER_FORMATS name per source key (field key for "transposed")
+            value_format: NUMBER_FORMATS name for every column after the first (label)
+                column that has no entry in number_formats
+            row_header: Header of the label column ("fields" and "transposed")
+            row_key: Source keys identifying an item of a "rows" sheet, used to align
+                rows when results are compared ("fields" and "transposed" rows are
+                identified by their label column)
+            freeze_panes: Top-left unfrozen cell, e.g. "B2"
+            header_height: Header row height in points
+        """
+        if orientation not in ORIENTATIONS:
+            raise ValueError(f"Unknown sheet orientation: {orientation}")
+        format_names = set((number_formats or {}).values()) | ({value_format} if value_format else set())
+        unknown_formats = format_names - set(NUMBER_FORMATS)
+        if unknown_formats:
+            raise ValueError(f"Unknown number formats for sheet {name}: {sorted(unknown_formats)}")
+        
+        self.name = name
+        self.section = section
+        self.orientation = orientation
+        self.row_header = row_header
+        self.freeze_panes = freeze_panes
+        self.header_height = header_height
+        
+        # Compiled once: header labels, source keys and formats by column index
+        self.labels = tuple(label for label, _ in columns)
+        self.keys = tuple(key for _, key in columns)
+        formats = number_formats or {}
+        if orientation == "rows":
+            self.headers = list(self.labels)
+            self.column_formats = {
+                i: formats.get(key, value_format if i else None) for i, key in enumerate(self.keys)
+            }
+        elif orientation == "fields":
+            self.headers = [row_header or "Field", "Value"]
+            self.column_formats = {}
+        elif orientation == "transposed":
+            self.headers = [row_header or "Description"] + list(self.labels)
+            self.column_formats = {
+                i + 1: formats.get(field, value_format) for i, (_, field) in enumerate(self.keys)
+            }
+        else:
+            self.headers = []
+            self.column_formats = {}
+        # Column index -> NUMBER_FORMATS name, only for formatted columns
+        self.column_formats = {i: name for i, name in self.column_formats.items() if name}
+        self._defaults = tuple(repeat("", len(self.keys)))
+        # Column indexes identifying a row (empty: rows are matched by position)
+        if orientation == "rows":
+            self.key_columns = tuple(self.keys.index(key) for key in row_key)
+        elif orientation in ("fields", "transposed"):
+            self.key_columns = (0,)
+        else:
+            self.key_columns = ()
+    
+    @property
+    def empty_value(self) -> Any:
+        """Value used when the section is missing from the extracted data."""
+        return [] if self.orientation == "rows" else {}
+    
+    def build(self, section_data: Any) -> SheetRows:
+        """
+        Turn a section of extracted data into sheet rows.
+        
+        Args:
+            section_data: Value of data[spec.section]
+        
+        Returns:
+            Header labels, data rows and section label row indexes
+        """
+        if section_data is None:
+            section_data = self.empty_value
+        
+        if self.orientation == "rows":
+            keys, defaults = self.keys, self._defaults
+            rows = [list(map(item.get, keys, defaults)) for item in section_data]
+            return SheetRows(self.headers, rows)
+        
+        if self.orientation == "fields":
+            rows = []
+            section_rows = []
+            for label, key in zip(self.labels, self.keys):
+                if key is None:
+                    section_rows.append(len(rows))
+                    rows.append([label, ""])
+                else:
+                    rows.append([label, section_data.get(key, "")])
+            return SheetRows(self.headers, rows, section_rows)
+        
+        if self.orientation == "transposed":
+            line_items = [
+                (section_data.get(section) or {}).get(field) for section, field in self.keys
+            ]
+            rows = [
+                [period_label] + [_period_value(item, period_key) for item in line_items]
+                for period_label, period_key in PERIOD_ROWS
+            ]
+            return SheetRows(self.headers, rows)
+        
+        # columns: one column per key, padded to the longest list
+        headers = [key.replace("_", " ").title() for key in section_data]
+        values = [v if isinstance(v, list) else [] for v in section_data.values()]
+        row_count = max((len(v) for v in values), default=0)
+        rows = [
+            [v[row_idx] if row_idx < len(v) else None for v in values]
+            for row_idx in range(row_count)
+        ]
+        return SheetRows(headers, rows)
+    
+    def records(self, section_data: Any) -> List[Dict[str, Any]]:
+        """
+        Sheet rows as header-keyed dicts, for JSON export.
+        
+        Args:
+            section_data: Value of data[spec.section]
+        
+        Returns:
+            One dict per data row
+        """
+        sheet = self.build(section_data)
+        return [dict(zip(sheet.headers, row)) for row in sheet.rows]
+    
+    def write_csv(self, section_data: Any, stream: IO[str]) -> int:
+        """
+        Write the sheet as CSV (header row first).
+        
+        Args:
+            section_data: Value of data[spec.section]
+            stream: Text stream opened with newline=""
+        
+        Returns:
+            Number of data rows written
+        """
+        sheet = self.build(section_data)
+        writer = csv.writer(stream)
+        writer.writerow(sheet.headers)
+        writer.writerows(sheet.rows)
+        return len(sheet.rows)
+
+
+def _period_value(field_data: Any, period_key: str) -> Any:
+    """Value of one period of a statement line item (zero and missing render blank)."""
+    if not field_data or not isinstance(field_data, dict):
+        return ""
+    value = field_data.get(period_key, "")
+    return value if value != 0 else ""
+
+
+FUND_REPORT_SHEETS = [
+    SheetSpec("Portfolio Summary", "portfolio_summary", "fields", columns=[
+        ("General Partner", "general_partner"),
+        ("ILPA GP", "ilpa_gp"),
+        ("Assets Under Management", "assets_under_management"),
+        ("Active Funds", "active_funds"),
+        ("Active Portfolio Companies", "active_portfolio_companies"),
+        ("Fund Name", "fund_name"),
+        ("Fund Currency", "fund_currency"),
+        ("Total Commitments", "total_commitments"),
+        ("Total Drawdowns", "total_drawdowns"),
+        ("Remaining Commitments", "remaining_commitments"),
+        ("Net Contributions", "net_contributions"),
+        ("NAV", "nav"),
+        ("Fair Value", "fair_value"),
+        ("Total Number of Investments", "total_investments"),
+        ("Realized Investments", "realized_investments"),
+        ("Unrealized Investments", "unrealized_investments"),
+        ("Total Distributions", "total_distributions"),
+        ("- as % of Drawdowns", "distributions_percent_of_drawdowns"),
+        ("- as % of Commitments", "distributions_percent_of_commitments"),
+        ("DPI", "dpi"),
+        ("RVPI", "rvpi"),
+        ("TVPI", "tvpi"),
+        ("IRR", "irr"),
+        ("MOIC", "moic"),
+        ("Portfolio Breakdown By Region", None),
+        ("North America", "north_america_percent"),
+        ("Europe", "europe_percent"),
+        ("Asia", "asia_percent"),
+        ("Other Regions", "other_region_percent"),
+        ("Portfolio Breakdown By Industry", None),
+        ("Consumer Goods", "consumer_goods_percent"),
+        ("IT", "it_percent"),
+        ("Financials", "financials_percent"),
+        ("HealthCare", "healthcare_percent"),
+        ("Services", "services_percent"),
+        ("Industrials", "industrials_percent"),
+        ("Other", "other_industry_percent")
+    ]),
+    SheetSpec("Schedule of Investments", "schedule_of_investments", "rows", columns=[
+        ("Company", "company"),
+        ("Fund", "fund"),
+        ("Reported Date", "reported_date"),
+        ("Investment Status", "investment_status"),
+        ("Security Type", "security_type"),
+        ("Number of Shares", "number_of_shares"),
+        ("Fund Ownership %", "fund_ownership_percent"),
+        ("Initial Investment Date", "initial_investment_date"),
+        ("Fund Commitment", "fund_commitment"),
+        ("Total Invested (A)", "total_invested"),
+        ("Current Cost (B)", "current_cost"),
+        ("Reported Value (C)", "reported_value"),
+        ("Realized Proceeds (D)", "realized_proceeds"),
+        ("LP Ownership % (Fully Diluted)", "lp_ownership_percent_fully_diluted"),
+        ("Final Exit Date", "final_exit_date"),
+        ("Valuation Policy", "valuation_policy"),
+        ("Period Change in Valuation", "period_change_in_valuation"),
+        ("Period Change in Cost", "period_change_in_cost"),
+        ("Unrealized Gains/(Losses)", "unrealized_gains_losses"),
+        ("Movement Summary", "movement_summary"),
+        ("Current Quarter Investment Multiple", "current_quarter_investment_multiple"),
+        ("Prior Quarter Investment Multiple", "prior_quarter_investment_multiple"),
+        ("Since Inception IRR", "since_inception_irr")
+    ], number_formats={
+        "number_of_shares": "integer",
+        "fund_ownership_percent": "percent",
+        "fund_commitment": "currency",
+        "total_invested": "currency",
+        "current_cost": "currency",
+        "reported_value": "currency",
+        "realized_proceeds": "currency",
+        "lp_ownership_percent_fully_diluted": "percent",
+        "period_change_in_valuation": "currency",
+        "period_change_in_cost": "currency",
+        "unrealized_gains_losses": "currency",
+        "current_quarter_investment_multiple": "multiple",
+        "prior_quarter_investment_multiple": "multiple",
+        "since_inception_irr": "percent"
+    }, row_key=["company"]),
+    SheetSpec("Statement of Operations", "statement_of_operations", "rows", columns=[
+        ("Period", "period"),
+        ("Portfolio Interest Income", "portfolio_interest_income"),
+        ("Portfolio Dividend Income", "portfolio_dividend_income"),
+        ("Other Interest Earned", "other_interest_earned"),
+        ("Total Income", "total_income"),
+        ("Management Fees, Net", "management_fees_net"),
+        ("Broken Deal Fees", "broken_deal_fees"),
+        ("Interest", "interest"),
+        ("Professional Fees", "professional_fees"),
+        ("Bank Fees", "bank_fees"),
+        ("Advisory Directors' Fees", "advisory_directors_fees"),
+        ("Insurance", "insurance"),
+        ("Total Expenses", "total_expenses"),
+        ("Net Operating Income / (Deficit)", "net_operating_income_deficit"),
+        ("Net Realized Gain / (Loss) on Investments", "net_realized_gain_loss_on_investments"),
+        ("Net Change in Unrealized Gain / (Loss) on Investments", "net_change_in_unrealized_gain_loss_on_investments"),
+        ("Net Realized Gain / (Loss) due to F/X", "net_realized_gain_loss_due_to_fx"),
+        ("Net Realized and Unrealized Gain / (Loss) on Investments", "net_realized_and_unrealized_gain_loss_on_investments"),
+        ("Net Increase / (Decrease) in Partners' Capital Resulting from Operations", "net_increase_decrease_in_partners_capital")
+    ], value_format="currency", row_key=["period"]),
+    SheetSpec(
+        "Statement of Cashflows", "statement_of_cashflows", "transposed",
+        columns=[
+            ("Cash flows from operating activities", ("operating_activities", "section_header")),
+            ("Net increase/(decrease) in partners' capital", ("operating_activities", "net_increase_decrease_partners_capital")),
+            ("Adjustments to reconcile net increase/(decrease)", ("operating_activities", "adjustments_to_reconcile")),
+            ("Net realized (gain)/loss on investments", ("operating_activities", "net_realized_gain_loss_investments")),
+            ("Net change in unrealized (gain)/loss on investments", ("operating_activities", "net_change_unrealized_gain_loss")),
+            ("Changes in operating assets and liabilities", ("operating_activities", "changes_in_operating_assets_liabilities")),
+            ("(Increase)/decrease in due from affiliates", ("operating_activities", "increase_decrease_due_from_affiliates")),
+            ("(Increase)/decrease in due from third party", ("operating_activities", "increase_decrease_due_from_third_party")),
+            ("(Increase)/decrease in due from investment", ("operating_activities", "increase_decrease_due_from_investment")),
+            ("Purchase of investments", ("operating_activities", "purchase_of_investments")),
+            ("Proceeds from sale of investments", ("operating_activities", "proceeds_from_sale_of_investments")),
+            ("Net cash provided by/(used in) operating activities", ("operating_activities", "net_cash_provided_by_operating_activities")),
+            ("Cash flows from financing activities", ("financing_activities", "section_header")),
+            ("Capital contributions", ("financing_activities", "capital_contributions")),
+            ("Distributions", ("financing_activities", "distributions")),
+            ("Increase/(decrease) in due to limited partners", ("financing_activities", "increase_decrease_due_to_limited_partners")),
+            ("Increase/(decrease) in due to affiliates", ("financing_activities", "increase_decrease_due_to_affiliates")),
+            ("(Increase)/decrease in due from limited partners", ("financing_activities", "increase_decrease_due_from_limited_partners")),
+            ("Proceeds from loans", ("financing_activities", "proceeds_from_loans")),
+            ("Repayment of loans", ("financing_activities", "repayment_of_loans")),
+            ("Net cash provided by/(used in) financing activities", ("financing_activities", "net_cash_provided_by_financing_activities")),
+            ("Net increase/(decrease) in cash and cash equivalents", ("cash_summary", "net_increase_decrease_cash")),
+            ("Cash and cash equivalents, beginning of period", ("cash_summary", "cash_beginning_of_period")),
+            ("Cash and cash equivalents, end of period", ("cash_summary", "cash_end_of_period")),
+            ("Supplemental disclosure of cash flow information", ("supplemental_information", "supplemental_disclosure_header")),
+            ("Cash paid for interest", ("supplemental_information", "cash_paid_for_interest"))
+        ],
+        value_format="currency", freeze_panes="B2", header_height=20
+    ),
+    SheetSpec(
+        "PCAP Statement", "pcap_statement", "transposed",
+        columns=[
+            ("Beginning NAV - Net of Incentive Allocation", ("nav_movements", "beginning_nav_net_of_incentive")),
+            ("Contributions - Cash & Non-Cash", ("nav_movements", "contributions_cash_non_cash")),
+            ("Distributions - Cash & Non-Cash", ("nav_movements", "distributions_cash_non_cash")),
+            ("Total Cash / Non-Cash Flows", ("nav_movements", "total_cash_non_cash_flows")),
+            ("(Management Fees - Gross of Offsets, Waivers & Rebates)", ("fees_and_expenses", "management_fees_gross")),
+            ("(Management Fee Rebate)", ("fees_and_expenses", "management_fee_rebate")),
+            ("(Partnership Expenses - Total)", ("fees_and_expenses", "partnership_expenses_total")),
+            ("Total Offsets to Fees & Expenses", ("fees_and_expenses", "total_offsets_to_fees_expenses")),
+            ("Fee Waiver", ("fees_and_expenses", "fee_waiver")),
+            ("Interest Income", ("income_and_performance", "interest_income")),
+            ("Dividend Income", ("income_and_performance", "dividend_income")),
+            ("(Interest Expense)", ("income_and_performance", "interest_expense")),
+            ("Other Income/(Expense)", ("income_and_performance", "other_income_expense")),
+            ("Total Net Operating Income / (Expense)", ("income_and_performance", "total_net_operating_income")),
+            ("(Placement Fees)", ("income_and_performance", "placement_fees")),
+            ("Realized Gain / (Loss)", ("income_and_performance", "realized_gain_loss")),
+            ("Change in Unrealized Gain / (Loss)", ("income_and_performance", "change_in_unrealized_gain_loss")),
+            ("Ending NAV - Net of Incentive Allocation", ("ending_nav_and_commitments", "ending_nav_net_of_incentive")),
+            ("Incentive Allocation - Paid During the Period", ("ending_nav_and_commitments", "incentive_allocation_paid")),
+            ("Accrued Incentive Allocation - Periodic Change", ("ending_nav_and_commitments", "accrued_incentive_allocation_change")),
+            ("Accrued Incentive Allocation - Ending Period Balance", ("ending_nav_and_commitments", "accrued_incentive_allocation_balance")),
+            ("Ending NAV - Gross of Accrued Incentive Allocation", ("ending_nav_and_commitments", "ending_nav_gross_of_incentive")),
+            ("Total Commitment", ("ending_nav_and_commitments", "total_commitment")),
+            ("Beginning Unfunded Commitment", ("ending_nav_and_commitments", "beginning_unfunded_commitment")),
+            ("Plus Recallable Distributions", ("ending_nav_and_commitments", "plus_recallable_distributions")),
+            ("Less Expired/Released Commitments", ("ending_nav_and_commitments", "less_expired_released_commitments")),
+            ("+/- Other Unfunded Adjustment", ("ending_nav_and_commitments", "other_unfunded_adjustment")),
+            ("Ending Unfunded Commitment", ("ending_nav_and_commitments", "ending_unfunded_commitment"))
+        ],
+        value_format="currency", freeze_panes="B2", header_height=20
+    ),
+    SheetSpec("Portfolio Company Profile", "portfolio_company_profile", "rows", columns=[
+        ("Company Name", "company_name"),
+        ("Initial Investment Date", "initial_investment_date"),
+        ("Industry", "industry"),
+        ("Headquarters", "headquarters"),
+        ("Company Description", "company_description"),
+        ("Fund Ownership %", "fund_ownership_percent"),
+        ("Investor Group Ownership %", "investor_group_ownership_percent"),
+        ("Enterprise Valuation at Closing", "enterprise_valuation_at_closing"),
+        ("Securities Held", "securities_held"),
+        ("Ticker Symbol", "ticker_symbol"),
+        ("Investor Group Members", "investor_group_members"),
+        ("Management Ownership %", "management_ownership_percent"),
+        ("Board Representation", "board_representation"),
+        ("Board Members", "board_members"),
+        ("Investment Commitment", "investment_commitment"),
+        ("Invested Capital", "invested_capital"),
+        ("Reported Value", "reported_value"),
+        ("Realized Proceeds", "realized_proceeds"),
+        ("Investment Multiple", "investment_multiple"),
+        ("Gross IRR (All Security Types)", "gross_irr"),
+        ("Investment Background", "investment_background"),
+        ("Initial Investment Thesis", "initial_investment_thesis"),
+        ("Exit Expectations", "exit_expectations"),
+        ("Recent Events & Key Initiatives", "recent_events_key_initiatives"),
+        ("Company Assessment", "company_assessment"),
+        ("Valuation Methodology", "valuation_methodology"),
+        ("Risk Assessment / Update", "risk_assessment_update")
+    ], number_formats={
+        "fund_ownership_percent": "percent",
+        "investor_group_ownership_percent": "percent",
+        "enterprise_valuation_at_closing": "currency",
+        "management_ownership_percent": "percent",
+        "investment_commitment": "currency",
+        "invested_capital": "currency",
+        "reported_value": "currency",
+        "realized_proceeds": "currency",
+        "investment_multiple": "multiple",
+        "gross_irr": "percent"
+    }, row_key=["company_name"]),
+    SheetSpec("Portfolio Company Financials", "portfolio_company_financials", "rows", columns=[
+        ("Company", "company"),
+        ("Company Currency", "company_currency"),
+        ("Operating Data Date", "operating_data_date"),
+        ("Data Type", "data_type"),
+        ("LTM Revenue", "ltm_revenue"),
+        ("LTM EBITDA", "ltm_ebitda"),
+        ("Cash", "cash"),
+        ("Book Value", "book_value"),
+        ("Gross Debt", "gross_debt"),
+        ("1 Year", "debt_1_year"),
+        ("2 Years", "debt_2_years"),
+        ("3 Years", "debt_3_years"),
+        ("4 Years", "debt_4_years"),
+        ("5 Years", "debt_5_years"),
+        ("After 5 Years", "debt_after_5_years"),
+        ("YOY % Growth (Revenue)", "yoy_percent_growth_revenue"),
+        ("LTM EBITDA (Pro-forma)", "ltm_ebitda_pro_forma"),
+        ("YOY % Growth (EBITDA)", "yoy_percent_growth_ebitda"),
+        ("EBITDA Margin", "ebitda_margin"),
+        ("Total Enterprise Value (TEV)", "total_enterprise_value"),
+        ("TEV Multiple", "tev_multiple"),
+        ("Total Leverage", "total_leverage"),
+        ("Total Leverage Multiple", "total_leverage_multiple")
+    ], number_formats={
+        "ltm_revenue": "currency",
+        "ltm_ebitda": "currency",
+        "cash": "currency",
+        "book_value": "currency",
+        "gross_debt": "currency",
+        "debt_1_year": "currency",
+        "debt_2_years": "currency",
+        "debt_3_years": "currency",
+        "debt_4_years": "currency",
+        "debt_5_years": "currency",
+        "debt_after_5_years": "currency",
+        "yoy_percent_growth_revenue": "percent",
+        "ltm_ebitda_pro_forma": "currency",
+        "yoy_percent_growth_ebitda": "percent",
+        "ebitda_margin": "percent",
+        "total_enterprise_value": "currency",
+        "tev_multiple": "multiple",
+        "total_leverage": "currency",
+        "total_leverage_multiple": "multiple"
+    }, row_key=["company"]),
+    SheetSpec("Footnotes", "footnotes", "rows", columns=[
+        ("Note #", "note_number"),
+        ("Note Header", "note_header"),
+        ("Operating Data Date", "operating_data_date"),
+        ("Description", "description")
+    ], row_key=["note_number"]),
+    SheetSpec("Reference Values", "reference_values", "columns")
+]
+
+# Output sheets per extraction template
+TEMPLATE_SHEETS = {
+    "fund_report_v1": FUND_REPORT_SHEETS
+}
+
+
+def get_sheet_specs(template_id: str = "fund_report_v1") -> List[SheetSpec]:
+    """
+    Get the output sheets of a template.
+    
+    Args:
+        template_id: Extraction template ID
+    
+    Returns:
+        Sheet specs in workbook order (fund report sheets for unknown templates)
+    """
+    return TEMPLATE_SHEETS.get(template_id, FUND_REPORT_SHEETS)
+
+
+def get_sheet_spec(name: str, template_id: str = "fund_report_v1") -> Optional[SheetSpec]:
+    """
+    Look up a sheet spec by sheet name.
+    
+    Args:
+        name: Sheet name, e.g. "Schedule of Investments"
+        template_id: Extraction template ID
+    
+    Returns:
+        Sheet spec, or None if the template has no such sheet
+    """
+    for spec in get_sheet_specs(template_id):
+        if spec.name == name:
+            return spec
+    return None
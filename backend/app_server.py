@@ -3,30 +3,70 @@ Main FastAPI application for PDF data extraction.
 Provides RESTful API endpoints for financial document processing.
 """
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Depends, Query
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Depends, Query, Body, Request, Header, BackgroundTasks
+from fastapi.responses import JSONResponse, StreamingResponse, FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
-from typing import Optional
+from sqlalchemy import text
+from anyio import to_thread
+from typing import Optional, List
 import os
+import copy
+import hashlib
+import json
+import asyncio
+import tempfile
+import zipfile
+from contextlib import nullcontext
 from datetime import datetime
-import shutil
 from pathlib import Path
 import time
 import uuid
 
 from app.settings import settings
-from app.services.document_parser import PDFExtractor
-from app.services.ai_processor import GeminiExtractor
-from app.services.spreadsheet_creator import ExcelGenerator
-from app.database import init_db, get_db
+from app.services.document_parser import extract_text_from_pdf
+from app.services.ai_processor import GeminiExtractor, SECTION_KEYS
+from app.services.executors import run_cpu_bound, shutdown_executors
+from app.services.job_queue import job_queue
+from app.services.admission import admission_controller
+from app.services.job_submission import submit_upload, find_idempotent_job, replayed_job_payload
+from app.services.job_events import job_event_broker, TERMINAL_EVENTS
+from app.services.cancellation import cancellation_registry
+from app.services.single_flight import extraction_single_flight
+from app.services.file_serving import (
+    build_file_response,
+    build_bytes_response,
+    build_json_response,
+    data_etag,
+    not_modified_response,
+    GzipPathsMiddleware
+)
+from app.services.rollup import write_rollup, ROLLUP_FORMATS
+from app.services.sheet_preview import find_sheet_spec, list_sheets, sheet_page
+from app.services.result_comparison import (
+    cached_comparison,
+    compare_result_data,
+    compare_result_to_workbook,
+    comparison_cache,
+    comparison_key,
+    comparison_page
+)
+from app.services.workbook_store import (
+    materialize_workbook,
+    regenerate_workbook,
+    render_workbook_bytes,
+    touch_workbook
+)
+from app.services.upload_ingestion import UploadRejected, UploadSizeLimitMiddleware
+from app.database import init_db, get_db, SessionLocal
 from app.database.operations import (
     UploadedFileService,
     ExtractionResultService,
     ExtractionLogService,
-    JobStatusService
+    JobStatusService,
+    ExtractionBatchService
 )
-from app.database.schemas import JobStatusEnum, LogLevelEnum
+from app.database.schemas import JobStatusEnum, JobTypeEnum, LogLevelEnum
 from app.utils.logger import get_logger
 
 # Initialize logger
@@ -48,6 +88,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Reject oversize upload bodies before they are read in full
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    limits={
+        "/api/extract": settings.MAX_FILE_SIZE + settings.MAX_UPLOAD_OVERHEAD,
+        "/api/extract/batch": settings.MAX_BATCH_SIZE + settings.MAX_UPLOAD_OVERHEAD
+    }
+)
+
+# Compress JSON result views (sheet previews and diffs can be large); workbook downloads are left as stored
+app.add_middleware(
+    GzipPathsMiddleware,
+    path_prefixes=["/api/results", "/api/comparisons"],
+    minimum_size=settings.GZIP_MIN_SIZE
+)
+
 # Ensure directories exist
 Path(settings.UPLOAD_DIR).mkdir(exist_ok=True)
 Path(settings.OUTPUT_DIR).mkdir(exist_ok=True)
@@ -63,12 +119,25 @@ async def startup_event():
     logger.info(f"Debug Mode: {settings.DEBUG}")
     logger.info(f"CORS Origins: {settings.CORS_ORIGINS}")
     
+    # Size the thread pool that runs sync endpoints (blocking DB and file I/O)
+    to_thread.current_default_thread_limiter().total_tokens = settings.IO_THREAD_POOL_SIZE
+    
     # Initialize database
     init_db()
+    
+    # Start background extraction workers
+    job_queue.start()
     logger.info("Application initialized successfully")
     logger.info("="*80)
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers and executor pools on shutdown."""
+    job_queue.stop()
+    shutdown_executors()
+
+
 @app.get("/")
 async def root():
     """Root endpoint - Health check."""
@@ -82,7 +151,7 @@ async def root():
 
 
 @app.get("/health")
-async def health_check(db: Session = Depends(get_db)):
+def health_check(db: Session = Depends(get_db)):
     """
     Health check endpoint with database connectivity verification.
     
@@ -93,39 +162,59 @@ async def health_check(db: Session = Depends(get_db)):
     
     try:
         # Test database connection
-        db.execute("SELECT 1")
+        db.execute(text("SELECT 1"))
         db_status = "connected"
         logger.debug("Database connection verified successfully")
     except Exception as e:
         db_status = "disconnected"
         logger.error(f"Database health check failed: {str(e)}", exc_info=True)
-        
+    
+    admission = admission_controller.state(db) if db_status == "connected" else None
+    
     return {
         "status": "healthy" if db_status == "connected" else "degraded",
         "database": db_status,
+        "admission": admission,
         "timestamp": datetime.now().isoformat(),
         "version": "2.0.0"
     }
 
 
-@app.post("/api/extract")
-async def extract_data(
+@app.post("/api/extract", status_code=202)
+def extract_data(
     file: UploadFile = File(...),
     template_id: str = Form(default="fund_report_v1"),
+    force: bool = Form(default=False),
+    tenant_id: Optional[str] = Header(None, alias="X-Tenant-ID"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     db: Session = Depends(get_db)
 ):
     """
-    Extract structured data from uploaded PDF financial document.
+    Queue structured data extraction for an uploaded PDF financial document.
+    
+    The upload is persisted and a pending job is created; background workers
+    run the pipeline. Poll GET /api/jobs/{job_id} for progress and results.
+    
+    Identical content (same SHA-256, template, model config and prompt version)
+    is not extracted twice: the existing result is returned, or the response
+    points at the job already processing it (single-flight, also across
+    processes via the extraction_locks table). Set force=true to re-extract.
+    
+    Retries carrying the same Idempotency-Key (per tenant, within
+    IDEMPOTENCY_KEY_TTL_SECONDS) return the original job instead of queueing
+    another extraction.
     
     Args:
         file: Uploaded PDF file
         template_id: Template ID for extraction format
+        force: Skip deduplication and always queue a new job
+        tenant_id: Tenant/user for fair-share scheduling (X-Tenant-ID header)
+        idempotency_key: Client key identifying retries of this request (Idempotency-Key header)
         db: Database session
-        
+    
     Returns:
-        Job ID and extraction results with metadata
+        Job ID and status URL
     """
-    start_time = time.time()
     job_id = str(uuid.uuid4())
     
     logger.info("="*100)
@@ -140,261 +229,365 @@ async def extract_data(
     
     # Check API key
     if not settings.GEMINI_API_KEY:
-        logger.critical("[{job_id}] Gemini API key not configured")
+        logger.critical(f"[{job_id}] Gemini API key not configured")
         raise HTTPException(
             status_code=500,
             detail="Gemini API key not configured. Please set GEMINI_API_KEY in .env file"
         )
     
-    # Generate unique filenames
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    safe_filename = file.filename.replace(" ", "_").replace(".pdf", "")
-    pdf_filename = f"{safe_filename}_{timestamp}.pdf"
-    pdf_path = os.path.join(settings.UPLOAD_DIR, pdf_filename)
-    excel_filename = f"{safe_filename}_extracted_{timestamp}.xlsx"
-    excel_path = os.path.join(settings.OUTPUT_DIR, excel_filename)
-    
-    # Get file size
-    file.file.seek(0, 2)  # Seek to end
-    file_size = file.file.tell()
-    file.file.seek(0)  # Seek back to start
-    
-    db_file = None
-    db_job = None
+    if idempotency_key is not None and not 0 < len(idempotency_key) <= 255:
+        raise HTTPException(status_code=400, detail="Idempotency-Key must be 1-255 characters")
     
-    try:
-        # Save uploaded file first
-        logger.info(f"[{job_id}] PHASE 1: File Upload - Saving to disk")
-        logger.debug(f"[{job_id}] Destination: {pdf_path} | Size: {file_size / 1024:.2f} KB")
-        
-        with open(pdf_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        logger.info(f"[{job_id}] File saved successfully")
-        
-        # Create uploaded file record in database
-        logger.debug(f"[{job_id}] Creating database record for uploaded file")
-        db_file = UploadedFileService.create(
-            db=db,
-            filename=pdf_filename,
-            original_filename=file.filename,
-            file_path=pdf_path,
-            file_size=file_size
-        )
-        
-        # Now we can create logs with the proper file_id
-        ExtractionLogService.create(
-            db, db_file.id, f"Starting extraction for {file.filename}", 
-            LogLevelEnum.INFO, "initialization"
-        )
-        
-        # Create job status record
-        db_job = JobStatusService.create(db=db, file_id=db_file.id, job_id=job_id)
-        
-        ExtractionLogService.create(
-            db, db_file.id, f"File uploaded successfully: {pdf_filename}", 
-            LogLevelEnum.INFO, "upload"
-        )
-        
-        # Update job status: Processing
-        JobStatusService.update_status(
-            db, job_id, JobStatusEnum.PROCESSING, 
-            "extracting_text", 20
-        )
-        
-        # Step 1: Extract text from PDF
-        logger.info(f"[{job_id}] PHASE 2: Text Extraction - Processing PDF")
-        step_start = time.time()
-        
-        pdf_extractor = PDFExtractor()
-        extracted_text = pdf_extractor.extract_text_from_pdf(pdf_path)
-        
-        step_duration = int((time.time() - step_start) * 1000)
-        logger.info(f"[{job_id}] Text extraction completed | Characters: {len(extracted_text):,} | Duration: {step_duration}ms")
-        ExtractionLogService.create(
-            db, db_file.id, 
-            f"Extracted {len(extracted_text)} characters from PDF",
-            LogLevelEnum.INFO, "text_extraction", step_duration
-        )
-        
-        # Update job status
-        JobStatusService.update_status(
-            db, job_id, JobStatusEnum.PROCESSING, 
-            "processing_with_ai", 40
-        )
-        
-        # Step 2: Send to Gemini for data extraction
-        logger.info(f"[{job_id}] PHASE 3: AI Processing - Extracting structured data with Gemini")
-        logger.debug(f"[{job_id}] Model: {settings.GEMINI_MODEL}")
-        step_start = time.time()
-        
-        gemini_extractor = GeminiExtractor()
-        structured_data = gemini_extractor.extract_with_retry(extracted_text, max_retries=2)
-        
-        step_duration = int((time.time() - step_start) * 1000)
-        logger.info(f"[{job_id}] AI processing completed | Duration: {step_duration}ms")
-        ExtractionLogService.create(
-            db, db_file.id, 
-            f"AI extraction completed using {settings.GEMINI_MODEL}",
-            LogLevelEnum.INFO, "ai_processing", step_duration
-        )
-        
-        # Update job status
-        JobStatusService.update_status(
-            db, job_id, JobStatusEnum.PROCESSING, 
-            "generating_excel", 70
-        )
-        
-        # Step 3: Generate Excel file
-        logger.info(f"[{job_id}] PHASE 4: Excel Generation - Creating spreadsheet")
-        step_start = time.time()
-        
-        excel_generator = ExcelGenerator()
-        output_path = excel_generator.generate_excel(structured_data, excel_path)
-        
-        step_duration = int((time.time() - step_start) * 1000)
-        logger.info(f"[{job_id}] Excel generation completed | File: {excel_filename} | Duration: {step_duration}ms")
-        ExtractionLogService.create(
-            db, db_file.id, 
-            f"Excel file generated: {excel_filename}",
-            LogLevelEnum.INFO, "excel_generation", step_duration
-        )
-        
-        # Calculate processing time
-        total_processing_time = time.time() - start_time
+    # Serialize retries of the same request so only one of them is ingested
+    idempotency_lock = (
+        extraction_single_flight.hold(f"idempotency:{tenant_id}:{idempotency_key}")
+        if idempotency_key else nullcontext()
+    )
+    with idempotency_lock:
+        if idempotency_key:
+            original = find_idempotent_job(db, idempotency_key, tenant_id)
+            if original:
+                if original.template_id != template_id:
+                    raise HTTPException(
+                        status_code=422,
+                        detail="Idempotency-Key was already used with a different template_id"
+                    )
+                logger.info(f"[{job_id}] Idempotent retry - returning original job {original.job_id}")
+                payload = replayed_job_payload(original)
+                return JSONResponse(
+                    status_code=200 if payload["status"] == JobStatusEnum.COMPLETED.value else 202,
+                    content=payload,
+                    headers={"Idempotent-Replayed": "true"}
+                )
         
-        # Count sheets if structured_data is available
-        total_sheets = 0
-        if isinstance(structured_data, dict):
-            total_sheets = len(structured_data.get("sheets", []))
+        _admit_or_429(db, JobTypeEnum.INTERACTIVE)
         
-        # Create extraction result record
-        db_result = ExtractionResultService.create(
-            db=db,
-            file_id=db_file.id,
-            excel_filename=excel_filename,
-            excel_path=excel_path,
-            extracted_data=structured_data if isinstance(structured_data, dict) else None,
-            processing_time=total_processing_time,
-            total_characters_extracted=len(extracted_text),
-            total_sheets_generated=total_sheets,
-            gemini_model_used=settings.GEMINI_MODEL
+        try:
+            payload = submit_upload(
+                db, file.file, file.filename,
+                template_id=template_id, force=force, job_id=job_id,
+                job_type=JobTypeEnum.INTERACTIVE, tenant_id=tenant_id,
+                idempotency_key=idempotency_key
+            )
+        except UploadRejected as e:
+            logger.warning(f"[{job_id}] Upload rejected: {e.detail}")
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        except Exception as e:
+            logger.error(f"[{job_id}] Upload failed: {str(e)}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+    
+    if payload["deduplicated"]:
+        return JSONResponse(
+            status_code=200 if payload["status"] == JobStatusEnum.COMPLETED.value else 202,
+            content=payload
         )
-        
-        # Update job status: Completed
-        JobStatusService.update_status(
-            db, job_id, JobStatusEnum.COMPLETED, 
-            "completed", 100
+    
+    job_queue.notify()
+    return payload
+
+
+@app.post("/api/extract/batch", status_code=202)
+def extract_batch(
+    files: List[UploadFile] = File(...),
+    template_id: str = Form(default="fund_report_v1"),
+    force: bool = Form(default=False),
+    tenant_id: Optional[str] = Header(None, alias="X-Tenant-ID"),
+    db: Session = Depends(get_db)
+):
+    """
+    Queue extraction for many PDFs in one request.
+    
+    Accepts any mix of PDF files and zip archives of PDFs. Each PDF gets its own
+    job under a shared batch ID (identical content is deduplicated as in
+    /api/extract). Poll GET /api/batches/{batch_id} for aggregate progress.
+    Batch jobs run at batch priority, so single uploads are claimed first.
+    
+    Args:
+        files: Uploaded PDF files and/or zip archives
+        template_id: Template ID for extraction format
+        force: Skip deduplication and always queue new jobs
+        tenant_id: Tenant/user for fair-share scheduling (X-Tenant-ID header)
+        db: Database session
+    
+    Returns:
+        Batch ID, per-file outcomes and status URL
+    """
+    if not settings.GEMINI_API_KEY:
+        logger.critical("Gemini API key not configured")
+        raise HTTPException(
+            status_code=500,
+            detail="Gemini API key not configured. Please set GEMINI_API_KEY in .env file"
         )
-        
-        ExtractionLogService.create(
-            db, db_file.id, 
-            f"Extraction completed successfully in {total_processing_time:.2f}s",
-            LogLevelEnum.INFO, "completion"
+    
+    # Expand zip archives into their PDF members
+    try:
+        sources = list(_iter_batch_sources(files))
+    except zipfile.BadZipFile as e:
+        raise HTTPException(status_code=400, detail=f"Invalid zip archive: {str(e)}")
+    
+    if not sources:
+        raise HTTPException(status_code=400, detail="No PDF files found in upload")
+    if len(sources) > settings.MAX_BATCH_FILES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch contains {len(sources)} PDFs - maximum is {settings.MAX_BATCH_FILES}"
         )
-        
-        logger.info("="*100)
-        logger.info(f"EXTRACTION COMPLETED SUCCESSFULLY | Job ID: {job_id}")
-        logger.info(f"Total Time: {total_processing_time:.2f}s | Sheets: {total_sheets} | Characters: {len(extracted_text):,}")
-        logger.info("="*100)
-        
-        return {
-            "success": True,
-            "message": "Data extracted successfully",
-            "job_id": job_id,
-            "file_id": db_file.id,
-            "output_file": excel_filename,
-            "download_url": f"/api/download/{excel_filename}",
-            "processing_time": f"{total_processing_time:.2f}s",
-            "characters_extracted": len(extracted_text),
-            "sheets_generated": total_sheets
-        }
-        
-    except Exception as e:
-        logger.error("="*100)
-        logger.error(f"EXTRACTION FAILED | Job ID: {job_id}")
-        logger.error(f"Error: {str(e)}")
-        logger.error("="*100, exc_info=True)
-        
-        # Log error to database if file record exists
-        if db_file:
-            ExtractionLogService.create(
-                db, db_file.id, 
-                f"Extraction failed: {str(e)}",
-                LogLevelEnum.ERROR, "error"
-            )
-            
-            # Update job status to failed
-            if db_job:
-                JobStatusService.update_status(
-                    db, job_id, JobStatusEnum.FAILED,
-                    error_message=str(e)
+    
+    _admit_or_429(db, JobTypeEnum.BATCH, job_count=len(sources))
+    
+    db_batch = ExtractionBatchService.create(db, template_id=template_id)
+    batch_id = db_batch.batch_id
+    
+    logger.info("="*100)
+    logger.info(f"NEW BATCH EXTRACTION REQUEST | Batch ID: {batch_id}")
+    logger.info(f"Files: {len(sources)} | Template: {template_id}")
+    logger.info("="*100)
+    
+    items = []
+    queued = 0
+    for filename, open_source in sources:
+        item = {"filename": filename, "job_id": None, "deduplicated": False, "error": None}
+        try:
+            with open_source() as source:
+                payload = submit_upload(
+                    db, source, filename,
+                    template_id=template_id, force=force, batch_id=batch_id,
+                    job_type=JobTypeEnum.BATCH, tenant_id=tenant_id
                 )
-        
-        # Clean up files on error
-        if os.path.exists(pdf_path):
-            os.remove(pdf_path)
-        if os.path.exists(excel_path):
-            os.remove(excel_path)
-        
-        raise HTTPException(status_code=500, detail=f"Extraction failed: {str(e)}")
+            item["job_id"] = payload["job_id"]
+            item["deduplicated"] = payload["deduplicated"]
+            if not payload["deduplicated"]:
+                queued += 1
+        except UploadRejected as e:
+            logger.warning(f"[{batch_id}] Rejected {filename}: {e.detail}")
+            item["error"] = e.detail
+        except Exception as e:
+            logger.error(f"[{batch_id}] Upload failed for {filename}: {str(e)}", exc_info=True)
+            item["error"] = f"Upload failed: {str(e)}"
+        items.append(item)
+    
+    ExtractionBatchService.set_items(db, batch_id, items)
+    
+    if queued:
+        job_queue.notify()
+    logger.info(f"[{batch_id}] Batch queued | Files: {len(items)} | New jobs: {queued} | Rejected: {sum(1 for i in items if i['error'])}")
+    
+    return {
+        "success": True,
+        "message": f"Batch queued: {queued} new jobs, {len(items) - queued} reused or rejected",
+        "batch_id": batch_id,
+        "total_files": len(items),
+        "items": items,
+        "status_url": f"/api/batches/{batch_id}"
+    }
 
 
-@app.get("/api/download/{filename}")
-async def download_file(filename: str):
+def _admit_or_429(db: Session, job_type: JobTypeEnum, job_count: int = 1) -> None:
     """
-    Download generated Excel file.
+    Reject a submission with 429 + Retry-After while the service is overloaded.
     
     Args:
-        filename: Name of the file to download
-        
+        db: Database session
+        job_type: Scheduling class of the new jobs
+        job_count: Number of jobs the request would add
+    
+    Raises:
+        HTTPException: 429 if admission control rejects the jobs
+    """
+    decision = admission_controller.check(db, job_type, job_count)
+    if decision.admitted:
+        return
+    
+    logger.warning(f"Admission rejected | {job_type.value} x{job_count} | {'; '.join(decision.reasons)}")
+    raise HTTPException(
+        status_code=429,
+        detail=f"Service is at capacity ({'; '.join(decision.reasons)}) - retry later",
+        headers={"Retry-After": str(decision.retry_after)}
+    )
+
+
+def _iter_batch_sources(files: List[UploadFile]):
+    """
+    Yield (filename, opener) for every PDF in a batch upload, expanding zip archives.
+    Openers return a readable binary file object for use in a with-block.
+    
+    Args:
+        files: Uploaded files
+    """
+    for upload_file in files:
+        name = upload_file.filename or ""
+        if name.lower().endswith(".zip"):
+            archive = zipfile.ZipFile(upload_file.file)
+            for member in archive.infolist():
+                member_name = os.path.basename(member.filename)
+                if member.is_dir() or member.filename.startswith("__MACOSX/") or not member_name.lower().endswith(".pdf"):
+                    continue
+                yield member_name, (lambda archive=archive, member=member: archive.open(member))
+        else:
+            yield name, (lambda upload_file=upload_file: nullcontext(upload_file.file))
+
+
+@app.get("/api/batches/{batch_id}")
+def get_batch_status(
+    batch_id: str,
+    db: Session = Depends(get_db)
+):
+    """
+    Get aggregate progress for a batch upload.
+    
+    Args:
+        batch_id: Batch UUID
+        db: Database session
+    
     Returns:
-        Excel file for download
+        Batch status with per-status counts and per-file details
     """
-    file_path = os.path.join(settings.OUTPUT_DIR, filename)
+    db_batch = ExtractionBatchService.get_by_batch_id(db, batch_id)
+    if not db_batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
     
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="File not found")
+    items = db_batch.items or []
+    jobs = {j.job_id: j for j in JobStatusService.get_by_job_ids(db, [i["job_id"] for i in items if i.get("job_id")])}
+    
+    counts = {status.value: 0 for status in JobStatusEnum}
+    counts["rejected"] = 0
+    progress_total = 0
+    files = []
+    
+    for item in items:
+        db_job = jobs.get(item.get("job_id"))
+        entry = {"filename": item["filename"], "job_id": item.get("job_id"), "deduplicated": item.get("deduplicated", False)}
+        
+        if db_job is None:
+            counts["rejected"] += 1
+            progress_total += 100
+            entry.update({"status": "rejected", "progress_percentage": 100, "error_message": item.get("error")})
+        else:
+            counts[db_job.status.value] += 1
+            done = db_job.status in (JobStatusEnum.COMPLETED, JobStatusEnum.FAILED, JobStatusEnum.CANCELLED)
+            progress = 100 if done else db_job.progress_percentage
+            progress_total += progress
+            entry.update({
+                "status": db_job.status.value,
+                "current_step": db_job.current_step,
+                "progress_percentage": progress,
+                "error_message": db_job.error_message
+            })
+            er = db_job.uploaded_file.extraction_result if db_job.uploaded_file else None
+            if db_job.status == JobStatusEnum.COMPLETED and er:
+                entry.update({
+                    "result_id": er.id,
+                    "output_file": er.excel_filename,
+                    "download_url": f"/api/download/{er.excel_filename}"
+                })
+        files.append(entry)
     
+    in_flight = counts[JobStatusEnum.PENDING.value] + counts[JobStatusEnum.PROCESSING.value]
+    if in_flight:
+        status = "processing"
+    elif counts[JobStatusEnum.COMPLETED.value] == len(items):
+        status = "completed"
+    elif counts[JobStatusEnum.COMPLETED.value]:
+        status = "partially_completed"
+    else:
+        status = "failed"
+    
+    return {
+        "batch_id": db_batch.batch_id,
+        "template_id": db_batch.template_id,
+        "created_at": db_batch.created_at.isoformat(),
+        "status": status,
+        "total_files": db_batch.total_files,
+        "progress_percentage": int(progress_total / len(items)) if items else 100,
+        "counts": counts,
+        "files": files
+    }
+
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _workbook_response(request: Request, db: Session, filename: str, download: bool):
+    """
+    Serve a result workbook according to EXCEL_OUTPUT_MODE.
+    
+    Files in OUTPUT_DIR get the immutable file response. Missing files (lazy mode,
+    evicted or never rendered) are rendered from the result's extracted_data first;
+    in memory mode the workbook is streamed from an in-memory buffer instead.
+    
+    Args:
+        request: Incoming request (conditional and range headers)
+        db: Database session
+        filename: Excel filename of the result
+        download: Send as an attachment rather than inline
+    
+    Returns:
+        File, streamed buffer, or 304/206/416 response
+    """
     # Security check - ensure filename doesn't contain path traversal
     if ".." in filename or "/" in filename or "\\" in filename:
         raise HTTPException(status_code=400, detail="Invalid filename")
     
-    return FileResponse(
-        path=file_path,
-        filename=filename,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
+    attachment_name = filename if download else None
+    file_path = os.path.join(settings.OUTPUT_DIR, filename)
+    if os.path.exists(file_path):
+        if settings.EXCEL_OUTPUT_MODE == "lazy":
+            touch_workbook(file_path)
+        return build_file_response(request, file_path, media_type=XLSX_MEDIA_TYPE, filename=attachment_name)
+    
+    db_result = ExtractionResultService.get_by_excel_filename(db, filename)
+    if not db_result or not db_result.extracted_data:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    if settings.EXCEL_OUTPUT_MODE == "memory":
+        # Revalidation only needs the data hash, not a render
+        not_modified = not_modified_response(request, data_etag(db_result.extracted_data, db_result.template_id))
+        if not_modified:
+            return not_modified
+        content, etag = render_workbook_bytes(db_result)
+        return build_bytes_response(request, content, XLSX_MEDIA_TYPE, etag, filename=attachment_name)
+    
+    file_path = materialize_workbook(db, db_result)
+    return build_file_response(request, file_path, media_type=XLSX_MEDIA_TYPE, filename=attachment_name)
+
+
+@app.get("/api/download/{filename}")
+def download_file(filename: str, request: Request, db: Session = Depends(get_db)):
+    """
+    Download generated Excel file.
+    
+    Outputs on disk never change after generation: responses carry a strong ETag and
+    immutable Cache-Control, and support If-None-Match (304) and Range (206).
+    With EXCEL_OUTPUT_MODE=memory the workbook is rendered into a buffer and streamed.
+    
+    Args:
+        filename: Name of the file to download
+        request: Incoming request (conditional and range headers)
+        db: Database session
+    
+    Returns:
+        Excel file for download
+    """
+    return _workbook_response(request, db, filename, download=True)
 
 
 @app.get("/api/preview/{filename}")
-async def preview_file(filename: str):
+def preview_file(filename: str, request: Request, db: Session = Depends(get_db)):
     """
     Get Excel file for preview (returns file content for browser parsing).
+    Cached like /api/download (strong ETag, immutable, 304 and Range support).
     
     Args:
         filename: Name of the file to preview
-        
+        request: Incoming request (conditional and range headers)
+        db: Database session
+    
     Returns:
         Excel file content
     """
-    file_path = os.path.join(settings.OUTPUT_DIR, filename)
-    
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="File not found")
-    
-    # Security check - ensure filename doesn't contain path traversal
-    if ".." in filename or "/" in filename or "\\" in filename:
-        raise HTTPException(status_code=400, detail="Invalid filename")
-    
-    return FileResponse(
-        path=file_path,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={
-            "Access-Control-Allow-Origin": "*",
-            "Cache-Control": "no-cache"
-        }
-    )
+    response = _workbook_response(request, db, filename, download=False)
+    response.headers["Access-Control-Allow-Origin"] = "*"
+    return response
 
 
 @app.get("/api/templates")
@@ -425,7 +618,7 @@ async def list_templates():
 # ==================== Database Query Endpoints ====================
 
 @app.get("/api/files")
-async def list_files(
+def list_files(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
     db: Session = Depends(get_db)
@@ -437,7 +630,7 @@ async def list_files(
         skip: Number of records to skip
         limit: Maximum number of records to return
         db: Database session
-        
+    
     Returns:
         List of uploaded files
     """
@@ -461,7 +654,7 @@ async def list_files(
 
 
 @app.get("/api/files/{file_id}")
-async def get_file_details(
+def get_file_details(
     file_id: int,
     db: Session = Depends(get_db)
 ):
@@ -471,7 +664,7 @@ async def get_file_details(
     Args:
         file_id: File ID
         db: Database session
-        
+    
     Returns:
         File details with extraction result and job status
     """
@@ -508,6 +701,7 @@ async def get_file_details(
         js = db_file.job_status
         result["job_status"] = {
             "job_id": js.job_id,
+            "job_type": js.job_type.value,
             "status": js.status.value,
             "current_step": js.current_step,
             "progress_percentage": js.progress_percentage,
@@ -522,7 +716,7 @@ async def get_file_details(
 
 
 @app.get("/api/jobs/{job_id}")
-async def get_job_status(
+def get_job_status(
     job_id: str,
     db: Session = Depends(get_db)
 ):
@@ -532,7 +726,7 @@ async def get_job_status(
     Args:
         job_id: Job UUID
         db: Database session
-        
+    
     Returns:
         Job status details
     """
@@ -540,9 +734,139 @@ async def get_job_status(
     if not db_job:
         raise HTTPException(status_code=404, detail="Job not found")
     
+    return _job_status_payload(db_job, db)
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """
+    Stream job progress as server-sent events.
+    
+    Sends the current state first, then step transitions, per-chunk progress and
+    the final completed/failed event pushed by the pipeline. The stream closes
+    after the terminal event. If the job runs in another process (run_worker.py),
+    the state is re-read from the database every SSE_KEEPALIVE_SECONDS instead.
+    
+    Args:
+        job_id: Job UUID
+        request: Incoming request (used to detect client disconnects)
+    
+    Returns:
+        text/event-stream response
+    """
+    # Subscribe before reading the snapshot so no transition is missed in between
+    queue = job_event_broker.subscribe(job_id)
+    snapshot = await to_thread.run_sync(_load_job_snapshot, job_id)
+    if snapshot is None:
+        job_event_broker.unsubscribe(job_id, queue)
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def event_stream():
+        try:
+            event = _snapshot_event(snapshot)
+            while True:
+                if event is None:
+                    yield ": keepalive\n\n"
+                else:
+                    yield _format_sse(event)
+                    if event["event"] in TERMINAL_EVENTS:
+                        return
+                    last_state = (event.get("status"), event.get("current_step"), event.get("progress_percentage"))
+                
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    # No in-process events - the job may be running in a separate worker process
+                    current = await to_thread.run_sync(_load_job_snapshot, job_id)
+                    if current is None:
+                        return
+                    event = _snapshot_event(current)
+                    if (event["status"], event["current_step"], event["progress_percentage"]) == last_state:
+                        event = None
+        finally:
+            job_event_broker.unsubscribe(job_id, queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/api/jobs/{job_id}/cancel")
+def cancel_job(
+    job_id: str,
+    db: Session = Depends(get_db)
+):
+    """
+    Cancel a pending or processing job.
+    
+    Pending jobs are never picked up by a worker. Running jobs stop at their next
+    checkpoint (between page batches, before each Gemini request, between chunks
+    and before Excel generation) and remove partial output.
+    
+    Args:
+        job_id: Job UUID
+        db: Database session
+    
+    Returns:
+        Cancellation confirmation
+    """
+    db_job = JobStatusService.get_by_job_id(db, job_id)
+    if not db_job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    if not JobStatusService.request_cancel(db, job_id):
+        db.refresh(db_job)
+        raise HTTPException(status_code=409, detail=f"Job is already {db_job.status.value}")
+    
+    logger.info(f"[{job_id}] Cancellation requested")
+    ExtractionLogService.create(
+        db, db_job.file_id, "Cancellation requested by user",
+        LogLevelEnum.WARNING, "cancellation"
+    )
+    
+    # The job will not produce a result - let identical uploads start a new extraction
+    extraction_single_flight.release(db, job_id)
+    
+    if not cancellation_registry.cancel(job_id):
+        # Not running in this process: pending, or running in another worker process
+        # (which notices the cancelled status at its next checkpoint)
+        job_event_broker.publish(
+            job_id, "cancelled",
+            status=JobStatusEnum.CANCELLED.value,
+            current_step="cancelled",
+            error_message="Cancelled by user"
+        )
+    
     return {
+        "success": True,
+        "message": "Job cancelled",
+        "job_id": job_id,
+        "status": JobStatusEnum.CANCELLED.value
+    }
+
+
+def _job_status_payload(db_job, db: Optional[Session] = None) -> dict:
+    """
+    Build the status response for a job.
+    
+    Args:
+        db_job: Job status record
+        db: Database session, needed for the queue estimate of pending jobs
+    
+    Returns:
+        Job status details, including queue position while pending and
+        result details once completed
+    """
+    result = {
         "job_id": db_job.job_id,
         "file_id": db_job.file_id,
+        "job_type": db_job.job_type.value,
+        "priority": db_job.priority,
+        "tenant_id": db_job.tenant_id,
         "status": db_job.status.value,
         "current_step": db_job.current_step,
         "progress_percentage": db_job.progress_percentage,
@@ -552,10 +876,57 @@ async def get_job_status(
         "error_message": db_job.error_message,
         "retry_count": db_job.retry_count
     }
+    
+    # Include queue position and estimated start while the job waits
+    if db is not None and db_job.status == JobStatusEnum.PENDING:
+        result.update(job_queue.estimate_start(db, db_job) or {})
+    
+    # Include result details once the job has completed
+    er = db_job.uploaded_file.extraction_result if db_job.uploaded_file else None
+    if db_job.status == JobStatusEnum.COMPLETED and er:
+        result.update({
+            "result_id": er.id,
+            "output_file": er.excel_filename,
+            "download_url": f"/api/download/{er.excel_filename}",
+            "processing_time": f"{er.processing_time:.2f}s" if er.processing_time is not None else None,
+            "characters_extracted": er.total_characters_extracted,
+            "sheets_generated": er.total_sheets_generated
+        })
+    
+    return result
+
+
+def _load_job_snapshot(job_id: str) -> Optional[dict]:
+    """
+    Read a job's current status with a short-lived session (runs in a worker thread).
+    
+    Args:
+        job_id: Job UUID
+    
+    Returns:
+        Job status payload, or None if the job does not exist
+    """
+    db = SessionLocal()
+    try:
+        db_job = JobStatusService.get_by_job_id(db, job_id)
+        return _job_status_payload(db_job, db) if db_job else None
+    finally:
+        db.close()
+
+
+def _snapshot_event(payload: dict) -> dict:
+    """Convert a job status payload into a stream event."""
+    event = payload["status"] if payload["status"] in TERMINAL_EVENTS else "progress"
+    return {"event": event, **payload}
+
+
+def _format_sse(event: dict) -> str:
+    """Serialize an event in server-sent events wire format."""
+    return f"event: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
 
 
 @app.get("/api/jobs")
-async def list_jobs(
+def list_jobs(
     status: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
@@ -569,7 +940,7 @@ async def list_jobs(
         skip: Number of records to skip
         limit: Maximum number of records to return
         db: Database session
-        
+    
     Returns:
         List of jobs
     """
@@ -594,6 +965,7 @@ async def list_jobs(
             {
                 "job_id": j.job_id,
                 "file_id": j.file_id,
+                "job_type": j.job_type.value,
                 "status": j.status.value,
                 "current_step": j.current_step,
                 "progress_percentage": j.progress_percentage,
@@ -607,7 +979,7 @@ async def list_jobs(
 
 
 @app.get("/api/logs/{file_id}")
-async def get_file_logs(
+def get_file_logs(
     file_id: int,
     log_level: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
@@ -623,7 +995,7 @@ async def get_file_logs(
         skip: Number of records to skip
         limit: Maximum number of records to return
         db: Database session
-        
+    
     Returns:
         List of logs for the file
     """
@@ -668,7 +1040,7 @@ async def get_file_logs(
 
 
 @app.get("/api/results")
-async def list_results(
+def list_results(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
     db: Session = Depends(get_db)
@@ -680,7 +1052,7 @@ async def list_results(
         skip: Number of records to skip
         limit: Maximum number of records to return
         db: Database session
-        
+    
     Returns:
         List of extraction results
     """
@@ -708,7 +1080,7 @@ async def list_results(
 
 
 @app.get("/api/results/{result_id}")
-async def get_result_details(
+def get_result_details(
     result_id: int,
     include_data: bool = Query(False),
     db: Session = Depends(get_db)
@@ -720,7 +1092,7 @@ async def get_result_details(
         result_id: Result ID
         include_data: Whether to include the full extracted JSON data
         db: Database session
-        
+    
     Returns:
         Extraction result details
     """
@@ -746,8 +1118,409 @@ async def get_result_details(
     return result
 
 
+def _result_with_data(db: Session, result_id: int):
+    """Extraction result that has stored extracted data, or 404/409."""
+    db_result = ExtractionResultService.get_by_id(db, result_id)
+    if not db_result:
+        raise HTTPException(status_code=404, detail="Result not found")
+    if not db_result.extracted_data:
+        raise HTTPException(status_code=409, detail="Result has no stored data")
+    return db_result
+
+
+@app.get("/api/results/{result_id}/sheets")
+def list_result_sheets(result_id: int, request: Request, db: Session = Depends(get_db)):
+    """
+    List the sheets of a result with their row counts.
+    
+    Args:
+        result_id: Result ID
+        request: Incoming request (If-None-Match header)
+        db: Database session
+    
+    Returns:
+        Sheet names, sections, orientations and row counts
+    """
+    db_result = _result_with_data(db, result_id)
+    etag = data_etag(db_result.extracted_data, db_result.template_id)
+    return build_json_response(request, {
+        "result_id": result_id,
+        "template_id": db_result.template_id,
+        "sheets": list_sheets(db_result.extracted_data, db_result.template_id)
+    }, etag)
+
+
+@app.get("/api/results/{result_id}/sheets/{sheet}")
+def get_result_sheet(
+    result_id: int,
+    sheet: str,
+    request: Request,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(settings.SHEET_PAGE_SIZE, ge=1, le=settings.SHEET_PAGE_MAX),
+    columns: Optional[List[str]] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Get a page of a result sheet as JSON, built from the stored extracted data
+    (no workbook is rendered or parsed). Responses carry a weak ETag of the data
+    and are gzip-compressed when the client accepts it.
+    
+    Args:
+        result_id: Result ID
+        sheet: Sheet name (e.g. "Schedule of Investments") or section key
+        request: Incoming request (If-None-Match header)
+        skip: Number of data rows to skip
+        limit: Maximum number of data rows to return
+        columns: Header labels or source keys to return (repeat the parameter; all columns if omitted)
+        db: Database session
+    
+    Returns:
+        Column headers and formats, page rows and total row count
+    """
+    db_result = _result_with_data(db, result_id)
+    spec = find_sheet_spec(sheet, db_result.template_id)
+    if not spec:
+        raise HTTPException(status_code=404, detail=f"Sheet not found: {sheet}")
+    
+    etag = data_etag(db_result.extracted_data, db_result.template_id)
+    not_modified = not_modified_response(request, etag)
+    if not_modified:
+        return not_modified
+    
+    try:
+        page = sheet_page(spec, db_result.extracted_data, skip, limit, columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    page["result_id"] = result_id
+    return build_json_response(request, page, etag)
+
+
+def _comparison_etag(comparison_id: str) -> str:
+    """Weak ETag of a comparison (its ID is derived from the data of both sides)."""
+    return f'W/"{comparison_id}"'
+
+
+@app.get("/api/results/{result_id}/compare/{other_id}")
+def compare_results(
+    result_id: int,
+    other_id: int,
+    request: Request,
+    sheet: Optional[str] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(settings.SHEET_PAGE_SIZE, ge=1, le=settings.SHEET_PAGE_MAX),
+    abs_tol: float = Query(settings.COMPARE_ABS_TOLERANCE, ge=0),
+    rel_tol: float = Query(settings.COMPARE_REL_TOLERANCE, ge=0),
+    db: Session = Depends(get_db)
+):
+    """
+    Compare the extracted data of two results sheet by sheet.
+    Rows are aligned on their key columns, columns on their headers; empty-like
+    values are equivalent and numbers are equal within the tolerances. The diff is
+    cached, so paging through it (or repeating it) does not recompute it.
+    
+    Args:
+        result_id: Result ID (left side)
+        other_id: Result ID to compare with (right side)
+        request: Incoming request (If-None-Match header)
+        sheet: Only return differences of this sheet
+        skip: Number of differences to skip
+        limit: Maximum number of differences to return
+        abs_tol: Largest absolute difference between equal numbers
+        rel_tol: Largest relative difference between equal numbers
+        db: Database session
+    
+    Returns:
+        Comparison ID, summary with per-sheet statistics and a page of differing cells
+    """
+    left = _result_with_data(db, result_id)
+    right = _result_with_data(db, other_id)
+    
+    comparison_id = comparison_key(
+        data_etag(left.extracted_data, left.template_id),
+        data_etag(right.extracted_data, right.template_id),
+        abs_tol, rel_tol
+    )
+    etag = _comparison_etag(comparison_id)
+    not_modified = not_modified_response(request, etag)
+    if not_modified:
+        return not_modified
+    
+    sources = {
+        "left": {"result_id": left.id, "excel_filename": left.excel_filename},
+        "right": {"result_id": right.id, "excel_filename": right.excel_filename}
+    }
+    comparison = cached_comparison(
+        comparison_id, sources, compare_result_data,
+        left.extracted_data, left.template_id, right.extracted_data, right.template_id,
+        abs_tol, rel_tol
+    )
+    return build_json_response(request, comparison_page(comparison, skip, limit, sheet), etag)
+
+
+@app.post("/api/results/{result_id}/compare")
+def compare_result_with_workbook(
+    result_id: int,
+    file: UploadFile = File(...),
+    sheet: Optional[str] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(settings.SHEET_PAGE_SIZE, ge=1, le=settings.SHEET_PAGE_MAX),
+    abs_tol: float = Query(settings.COMPARE_ABS_TOLERANCE, ge=0),
+    rel_tol: float = Query(settings.COMPARE_REL_TOLERANCE, ge=0),
+    db: Session = Depends(get_db)
+):
+    """
+    Compare a result with an uploaded reference workbook (e.g. a manually corrected
+    output). Sheets are matched by name; further pages of the diff are served by
+    GET /api/comparisons/{comparison_id} while it is cached.
+    
+    Args:
+        result_id: Result ID (left side)
+        file: Reference .xlsx workbook (right side)
+        sheet: Only return differences of this sheet
+        skip: Number of differences to skip
+        limit: Maximum number of differences to return
+        abs_tol: Largest absolute difference between equal numbers
+        rel_tol: Largest relative difference between equal numbers
+        db: Database session
+    
+    Returns:
+        Comparison ID, summary with per-sheet statistics and a page of differing cells
+    """
+    db_result = _result_with_data(db, result_id)
+    
+    content = file.file.read(settings.MAX_FILE_SIZE + 1)
+    if len(content) > settings.MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File too large. Maximum size: {settings.MAX_FILE_SIZE / (1024 * 1024):.0f}MB"
+        )
+    if not content.startswith(b"PK"):
+        raise HTTPException(status_code=400, detail="Reference file must be an .xlsx workbook")
+    
+    comparison_id = comparison_key(
+        data_etag(db_result.extracted_data, db_result.template_id),
+        hashlib.sha256(content).hexdigest(),
+        abs_tol, rel_tol
+    )
+    sources = {
+        "left": {"result_id": db_result.id, "excel_filename": db_result.excel_filename},
+        "right": {"reference_filename": file.filename}
+    }
+    try:
+        comparison = cached_comparison(
+            comparison_id, sources, compare_result_to_workbook,
+            db_result.extracted_data, db_result.template_id, content, abs_tol, rel_tol
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return comparison_page(comparison, skip, limit, sheet)
+
+
+@app.get("/api/comparisons/{comparison_id}")
+def get_comparison_page(
+    comparison_id: str,
+    request: Request,
+    sheet: Optional[str] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(settings.SHEET_PAGE_SIZE, ge=1, le=settings.SHEET_PAGE_MAX)
+):
+    """
+    Page through a cached comparison.
+    
+    Args:
+        comparison_id: ID returned by a compare endpoint
+        request: Incoming request (If-None-Match header)
+        sheet: Only return differences of this sheet
+        skip: Number of differences to skip
+        limit: Maximum number of differences to return
+    
+    Returns:
+        Summary and a page of differing cells
+    """
+    comparison = comparison_cache.get(comparison_id)
+    if comparison is None:
+        raise HTTPException(status_code=404, detail="Comparison not found or expired - run the comparison again")
+    return build_json_response(
+        request, comparison_page(comparison, skip, limit, sheet), _comparison_etag(comparison_id)
+    )
+
+
+@app.post("/api/results/{result_id}/reextract")
+def reextract_result_sections(
+    result_id: int,
+    sections: List[str] = Body(..., embed=True),
+    db: Session = Depends(get_db)
+):
+    """
+    Re-run extraction for selected sections of an existing result.
+    Only the pages where those sections appear are sent to the model; the
+    stored data is updated and the workbook regenerated (under a new filename)
+    when sections improved. Subject to admission control, and concurrent
+    re-extractions of the same result run one at a time.
+    
+    Args:
+        result_id: Result ID
+        sections: Section keys to re-extract (e.g. ["statement_of_cashflows"])
+        db: Database session
+    
+    Returns:
+        Re-extraction summary
+    """
+    db_result = ExtractionResultService.get_by_id(db, result_id)
+    if not db_result:
+        raise HTTPException(status_code=404, detail="Result not found")
+    
+    invalid_sections = [s for s in sections if s not in SECTION_KEYS]
+    if not sections or invalid_sections:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid sections {invalid_sections}. Must be one of: {SECTION_KEYS}"
+        )
+    
+    db_file = db_result.uploaded_file
+    if not db_file or not os.path.exists(db_file.file_path):
+        raise HTTPException(status_code=404, detail="Original PDF no longer available")
+    
+    _admit_or_429(db, JobTypeEnum.INTERACTIVE)
+    
+    start_time = time.time()
+    logger.info(f"SECTION RE-EXTRACTION | Result ID: {result_id} | Sections: {', '.join(sections)}")
+    
+    try:
+        extracted_text = run_cpu_bound(extract_text_from_pdf, db_file.file_path)
+        
+        # Serialize re-extractions of one result so concurrent requests merge instead of
+        # overwriting each other's sections; re-read the data once the lock is held
+        with extraction_single_flight.hold(f"reextract:{result_id}"):
+            db.refresh(db_result)
+            structured_data = copy.deepcopy(db_result.extracted_data or {})
+            
+            gemini_extractor = GeminiExtractor()
+            improved_sections = gemini_extractor.reextract_sections(extracted_text, structured_data, sections)
+            
+            if improved_sections:
+                db_result = ExtractionResultService.update_extracted_data(db, result_id, structured_data)
+                db_result = regenerate_workbook(db, db_result)
+        
+        duration = time.time() - start_time
+        ExtractionLogService.create(
+            db, db_file.id,
+            f"Re-extracted sections {sections} | Improved: {improved_sections}",
+            LogLevelEnum.INFO, "section_reextraction", int(duration * 1000),
+            extra_data={"requested_sections": sections, "improved_sections": improved_sections}
+        )
+    except Exception as e:
+        logger.error(f"Section re-extraction failed | Result ID: {result_id} | Error: {str(e)}", exc_info=True)
+        ExtractionLogService.create(
+            db, db_file.id,
+            f"Section re-extraction failed: {str(e)}",
+            LogLevelEnum.ERROR, "section_reextraction"
+        )
+        raise HTTPException(status_code=500, detail=f"Re-extraction failed: {str(e)}")
+    
+    return {
+        "success": True,
+        "result_id": result_id,
+        "requested_sections": sections,
+        "improved_sections": improved_sections,
+        "processing_time": f"{duration:.2f}s",
+        "download_url": f"/api/download/{db_result.excel_filename}"
+    }
+
+
+@app.post("/api/results/{result_id}/regenerate")
+def regenerate_result_workbook(result_id: int, db: Session = Depends(get_db)):
+    """
+    Re-render a result's workbook from its stored extracted data, e.g. after a
+    template layout change. The workbook gets a new filename and download URL.
+    
+    Args:
+        result_id: Result ID
+        db: Database session
+    
+    Returns:
+        New output filename and download URL
+    """
+    db_result = ExtractionResultService.get_by_id(db, result_id)
+    if not db_result:
+        raise HTTPException(status_code=404, detail="Result not found")
+    if not db_result.extracted_data:
+        raise HTTPException(status_code=409, detail="Result has no stored data to render from")
+    
+    previous_file = db_result.excel_filename
+    try:
+        db_result = regenerate_workbook(db, db_result)
+    except Exception as e:
+        logger.error(f"Workbook regeneration failed | Result ID: {result_id} | Error: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Regeneration failed: {str(e)}")
+    
+    return {
+        "success": True,
+        "result_id": result_id,
+        "previous_file": previous_file,
+        "output_file": db_result.excel_filename,
+        "download_url": f"/api/download/{db_result.excel_filename}",
+        "output_mode": settings.EXCEL_OUTPUT_MODE
+    }
+
+
+@app.get("/api/rollups")
+def download_rollup(
+    background_tasks: BackgroundTasks,
+    output_format: str = Query("xlsx", alias="format"),
+    template_id: Optional[str] = Query(None),
+    batch_id: Optional[str] = Query(None),
+    result_ids: Optional[List[int]] = Query(None),
+    extracted_from: Optional[datetime] = Query(None),
+    extracted_to: Optional[datetime] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Download a consolidated multi-fund rollup of the Schedule of Investments, PCAP
+    and cashflow sheets of the matching results, as one workbook or a zip of CSVs.
+    Results are read in batches and rows streamed to disk, so any number of results
+    can be included; for very large rollups prefer run_rollup.py.
+    
+    Args:
+        background_tasks: Removes the rollup file once it has been sent
+        output_format: "xlsx" for a workbook, "csv" for a zip with one CSV per sheet
+        template_id: Only include results of this template
+        batch_id: Only include results of this upload batch
+        result_ids: Only include these results (repeat the parameter)
+        extracted_from: Only include results extracted at or after this time
+        extracted_to: Only include results extracted before this time
+        db: Database session
+    
+    Returns:
+        Rollup file as an attachment
+    """
+    if output_format not in ROLLUP_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid format. Must be one of: {ROLLUP_FORMATS}")
+    
+    extension = "xlsx" if output_format == "xlsx" else "zip"
+    fd, rollup_path = tempfile.mkstemp(prefix="rollup_", suffix=f".{extension}")
+    os.close(fd)
+    try:
+        stats = write_rollup(
+            db, rollup_path, output_format, template_id=template_id, result_ids=result_ids,
+            batch_id=batch_id, extracted_from=extracted_from, extracted_to=extracted_to
+        )
+    except Exception as e:
+        os.remove(rollup_path)
+        logger.error(f"Rollup failed | Error: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Rollup failed: {str(e)}")
+    
+    background_tasks.add_task(os.remove, rollup_path)
+    return FileResponse(
+        rollup_path,
+        media_type=XLSX_MEDIA_TYPE if output_format == "xlsx" else "application/zip",
+        filename=f"rollup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}",
+        headers={"X-Rollup-Results": str(stats["results"])}
+    )
+
+
 @app.delete("/api/files/{file_id}")
-async def delete_file(
+def delete_file(
     file_id: int,
     delete_physical_files: bool = Query(True),
     db: Session = Depends(get_db)
@@ -759,7 +1532,7 @@ async def delete_file(
         file_id: File ID to delete
         delete_physical_files: Whether to also delete physical files from disk
         db: Database session
-        
+    
     Returns:
         Deletion status
     """
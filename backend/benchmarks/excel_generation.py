@@ -0,0 +1,146 @@
+"""
+Compare Excel generation time and peak memory across generator modes.
+
+Generates a workbook with a large Schedule of Investments (10,000 rows by default)
+in a fresh subprocess per mode, so peak RSS is not shared between runs:
+    python benchmarks/excel_generation.py --rows 10000 --repeat 3
+
+Modes: "standard" builds openpyxl's full cell model, "write_only" streams rows,
+"fast" writes the sheet XML directly (EXCEL_ENGINE=fast).
+Reports total time split into sheet building and workbook save, peak memory and file size.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MODES = ["standard", "write_only", "fast"]
+
+
+def build_sample_data(rows: int) -> dict:
+    """Extraction result with a large Schedule of Investments and typical other sections."""
+    schedule = [
+        {
+            "company": f"Portfolio Company {i:05d}",
+            "fund": "Fund of Funds III",
+            "reported_date": "2024-12-31",
+            "investment_status": "Unrealized" if i % 3 else "Realized",
+            "security_type": "Common Equity",
+            "number_of_shares": 1000 + i,
+            "fund_ownership_percent": round((i % 97) / 100, 4),
+            "initial_investment_date": "2019-06-30",
+            "fund_commitment": 5_000_000 + i,
+            "total_invested": 4_250_000.5 + i,
+            "current_cost": 4_000_000 + i,
+            "reported_value": 6_125_000.75 + i,
+            "realized_proceeds": 0 if i % 3 else 1_500_000,
+            "valuation_policy": "Fair value per ASC 820",
+            "period_change_in_valuation": 12_500 - i,
+            "unrealized_gains_losses": 2_125_000 + i,
+            "movement_summary": "Follow-on investment in Series C; valuation increased on revenue growth",
+            "current_quarter_investment_multiple": 1.44,
+            "prior_quarter_investment_multiple": 1.38,
+            "since_inception_irr": 0.153
+        }
+        for i in range(rows)
+    ]
+    return {
+        "portfolio_summary": {"fund_name": "Fund of Funds III", "nav": 1_250_000_000, "general_partner": "Example GP"},
+        "schedule_of_investments": schedule,
+        "statement_of_operations": [{"period": "Q4 2024", "total_income": 1_000_000, "total_expenses": 250_000}],
+        "statement_of_cashflows": {
+            "operating_activities": {"purchase_of_investments": {"current_period": -1, "prior_period": -2, "year_to_date": -3}}
+        },
+        "pcap_statement": {
+            "nav_movements": {"beginning_nav_net_of_incentive": {"current_period": 10, "prior_period": 9, "year_to_date": 8}}
+        },
+        "portfolio_company_profile": [
+            {"company_name": f"Portfolio Company {i:05d}", "industry": "IT", "company_description": "Narrative text " * 20}
+            for i in range(min(rows, 500))
+        ],
+        "portfolio_company_financials": [
+            {"company": f"Portfolio Company {i:05d}", "ltm_revenue": 50_000_000 + i, "ltm_ebitda": 9_000_000 + i}
+            for i in range(min(rows, 500))
+        ],
+        "footnotes": [{"note_number": 1, "note_header": "Basis of presentation", "description": "Notes " * 40}],
+        "reference_values": {"currencies": ["USD", "EUR", "GBP"], "industries": ["IT", "Healthcare"]}
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB (ru_maxrss is KB on Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_child(mode: str, rows: int) -> dict:
+    """Generate one workbook in this process and report timing and memory."""
+    import logging
+    logging.disable(logging.INFO)
+    
+    from app.services.spreadsheet_creator import ExcelGenerator
+    from app.services.xlsx_writer import FastXlsxWriter
+    
+    data = build_sample_data(rows)
+    baseline_mb = peak_rss_mb()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = os.path.join(tmp, "benchmark.xlsx")
+        if mode == "fast":
+            generator = FastXlsxWriter()
+        else:
+            generator = ExcelGenerator(write_only=(mode == "write_only"))
+        start = time.perf_counter()
+        generator.generate_excel(data, output_path)
+        elapsed = time.perf_counter() - start
+        size_kb = os.path.getsize(output_path) / 1024
+    
+    peak_mb = peak_rss_mb()
+    return {
+        "mode": mode,
+        "seconds": elapsed,
+        "build_seconds": generator.timings["build_seconds"],
+        "save_seconds": generator.timings["save_seconds"],
+        "peak_rss_mb": peak_mb,
+        "generation_rss_mb": peak_mb - baseline_mb,
+        "file_kb": size_kb
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Excel generation modes")
+    parser.add_argument("--rows", type=int, default=10000, help="Schedule of Investments rows")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode (best time is reported)")
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        print(json.dumps(run_child(args.child, args.rows)))
+        return
+    
+    print(f"Schedule of Investments rows: {args.rows:,} | Runs per mode: {args.repeat}")
+    print(f"{'mode':<12} {'best time':>10} {'build':>8} {'save':>8} {'peak RSS':>10} {'gen. RSS':>10} {'file size':>10}")
+    for mode in args.modes:
+        runs = []
+        for _ in range(args.repeat):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", mode, "--rows", str(args.rows)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+        
+        best = min(runs, key=lambda run: run["seconds"])
+        print(f"{mode:<12} {best['seconds']:>9.2f}s {best['build_seconds']:>7.2f}s {best['save_seconds']:>7.2f}s "
+              f"{max(r['peak_rss_mb'] for r in runs):>8.1f}MB "
+              f"{max(r['generation_rss_mb'] for r in runs):>8.1f}MB {best['file_kb']:>8.0f}KB")
+
+
+if __name__ == "__main__":
+    main()
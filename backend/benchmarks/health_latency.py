@@ -0,0 +1,94 @@
+"""
+Measure /health and /api/jobs latency while extractions run concurrently.
+
+Start the API server first, then:
+    python benchmarks/health_latency.py --url http://localhost:8000 --pdf sample.pdf --uploads 8
+
+Latency percentiles are reported for an idle baseline and under extraction load;
+with blocking work off the event loop the two should stay close.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import threading
+import time
+import urllib.request
+import uuid
+
+
+def timed_get(url: str) -> float:
+    """GET a URL and return the latency in milliseconds."""
+    start = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=60) as response:
+        response.read()
+    return (time.perf_counter() - start) * 1000
+
+
+def upload_pdf(base_url: str, pdf_path: str) -> dict:
+    """POST a PDF to /api/extract as multipart/form-data."""
+    boundary = uuid.uuid4().hex
+    with open(pdf_path, "rb") as f:
+        pdf_bytes = f.read()
+    filename = os.path.basename(pdf_path)
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        "Content-Type: application/pdf\r\n\r\n"
+    ).encode() + pdf_bytes + f"\r\n--{boundary}--\r\n".encode()
+    
+    request = urllib.request.Request(
+        f"{base_url}/api/extract",
+        data=body,
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+        method="POST"
+    )
+    with urllib.request.urlopen(request, timeout=600) as response:
+        return json.loads(response.read())
+
+
+def sample_latency(base_url: str, duration: float, interval: float = 0.1) -> dict:
+    """Sample /health and /api/jobs latency for a period of time."""
+    samples = {"health": [], "jobs": []}
+    deadline = time.time() + duration
+    while time.time() < deadline:
+        samples["health"].append(timed_get(f"{base_url}/health"))
+        samples["jobs"].append(timed_get(f"{base_url}/api/jobs?limit=20"))
+        time.sleep(interval)
+    return samples
+
+
+def summarize(label: str, samples: dict):
+    """Print p50/p95/max per endpoint."""
+    for endpoint, values in samples.items():
+        if not values:
+            continue
+        ordered = sorted(values)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        print(f"{label:<12} {endpoint:<8} n={len(values):<4} "
+              f"p50={statistics.median(values):7.1f}ms p95={p95:7.1f}ms max={ordered[-1]:7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API latency under concurrent extraction load")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--pdf", required=True, help="PDF to upload repeatedly")
+    parser.add_argument("--uploads", type=int, default=8, help="Concurrent extraction uploads")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to sample under load")
+    args = parser.parse_args()
+    
+    summarize("idle", sample_latency(args.url, duration=5.0))
+    
+    threads = [
+        threading.Thread(target=upload_pdf, args=(args.url, args.pdf), daemon=True)
+        for _ in range(args.uploads)
+    ]
+    for thread in threads:
+        thread.start()
+    
+    summarize("under load", sample_latency(args.url, duration=args.duration))
+
+
+if __name__ == "__main__":
+    main()
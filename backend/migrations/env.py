@@ -0,0 +1,37 @@
+"""
+Alembic environment.
+Uses the connection passed by app.database.migrations.upgrade_database() when run
+from the application, otherwise the application's engine (alembic CLI).
+"""
+
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.database.connection import engine
+from app.database.schemas import Base
+
+config = context.config
+target_metadata = Base.metadata
+
+
+def run_migrations(connection) -> None:
+    """Run the pending revisions on a connection."""
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        # SQLite cannot alter columns in place - batch operations recreate the table
+        render_as_batch=True
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+connection = config.attributes.get("connection")
+if connection is not None:
+    run_migrations(connection)
+else:
+    if config.config_file_name is not None:
+        fileConfig(config.config_file_name)
+    with engine.begin() as connection:
+        run_migrations(connection)
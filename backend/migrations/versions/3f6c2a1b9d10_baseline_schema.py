@@ -0,0 +1,103 @@
+"""Baseline schema: uploaded files, extraction results, job statuses and logs
+
+Revision ID: 3f6c2a1b9d10
+Revises:
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.database.migrations import has_table
+
+# revision identifiers, used by Alembic.
+revision: str = "3f6c2a1b9d10"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+JOB_STATUSES = ("PENDING", "PROCESSING", "COMPLETED", "FAILED", "CANCELLED")
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+
+def upgrade() -> None:
+    if not has_table("uploaded_files"):
+        op.create_table(
+            "uploaded_files",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("filename", sa.String(255), nullable=False),
+            sa.Column("original_filename", sa.String(255), nullable=False),
+            sa.Column("file_path", sa.String(512), nullable=False),
+            sa.Column("file_size", sa.Integer(), nullable=False),
+            sa.Column("mime_type", sa.String(100)),
+            sa.Column("upload_timestamp", sa.DateTime(), nullable=False)
+        )
+        op.create_index("ix_uploaded_files_id", "uploaded_files", ["id"])
+        op.create_index("ix_uploaded_files_filename", "uploaded_files", ["filename"])
+        op.create_index("ix_uploaded_files_upload_timestamp", "uploaded_files", ["upload_timestamp"])
+    
+    if not has_table("extraction_results"):
+        op.create_table(
+            "extraction_results",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("file_id", sa.Integer(), sa.ForeignKey("uploaded_files.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("excel_filename", sa.String(255), nullable=False),
+            sa.Column("excel_path", sa.String(512), nullable=False),
+            sa.Column("extracted_data", sa.JSON()),
+            sa.Column("extraction_timestamp", sa.DateTime(), nullable=False),
+            sa.Column("processing_time", sa.Float()),
+            sa.Column("total_characters_extracted", sa.Integer()),
+            sa.Column("total_sheets_generated", sa.Integer()),
+            sa.Column("gemini_model_used", sa.String(100))
+        )
+        op.create_index("ix_extraction_results_id", "extraction_results", ["id"])
+        op.create_index("ix_extraction_results_file_id", "extraction_results", ["file_id"], unique=True)
+    
+    if not has_table("job_statuses"):
+        op.create_table(
+            "job_statuses",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("file_id", sa.Integer(), sa.ForeignKey("uploaded_files.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("job_id", sa.String(100), nullable=False),
+            sa.Column("status", sa.Enum(*JOB_STATUSES, name="jobstatusenum"), nullable=False),
+            sa.Column("current_step", sa.String(100)),
+            sa.Column("progress_percentage", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("started_at", sa.DateTime()),
+            sa.Column("completed_at", sa.DateTime()),
+            sa.Column("error_message", sa.Text()),
+            sa.Column("retry_count", sa.Integer(), nullable=False)
+        )
+        op.create_index("ix_job_statuses_id", "job_statuses", ["id"])
+        op.create_index("ix_job_statuses_file_id", "job_statuses", ["file_id"], unique=True)
+        op.create_index("ix_job_statuses_job_id", "job_statuses", ["job_id"], unique=True)
+        op.create_index("ix_job_statuses_status", "job_statuses", ["status"])
+        op.create_index("ix_job_statuses_created_at", "job_statuses", ["created_at"])
+    
+    if not has_table("extraction_logs"):
+        op.create_table(
+            "extraction_logs",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("file_id", sa.Integer(), sa.ForeignKey("uploaded_files.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("log_level", sa.Enum(*LOG_LEVELS, name="loglevelenum"), nullable=False),
+            sa.Column("message", sa.Text(), nullable=False),
+            sa.Column("step", sa.String(100)),
+            sa.Column("timestamp", sa.DateTime(), nullable=False),
+            sa.Column("duration_ms", sa.Integer()),
+            sa.Column("extra_data", sa.JSON())
+        )
+        op.create_index("ix_extraction_logs_id", "extraction_logs", ["id"])
+        op.create_index("ix_extraction_logs_file_id", "extraction_logs", ["file_id"])
+        op.create_index("ix_extraction_logs_log_level", "extraction_logs", ["log_level"])
+        op.create_index("ix_extraction_logs_timestamp", "extraction_logs", ["timestamp"])
+
+
+def downgrade() -> None:
+    op.drop_table("extraction_logs")
+    op.drop_table("job_statuses")
+    op.drop_table("extraction_results")
+    op.drop_table("uploaded_files")
+    sa.Enum(name="loglevelenum").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="jobstatusenum").drop(op.get_bind(), checkfirst=True)
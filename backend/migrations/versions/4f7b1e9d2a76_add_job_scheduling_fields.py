@@ -0,0 +1,51 @@
+"""Add job_statuses.priority, tenant_id and queued_at (priority and fair-share scheduling)
+
+Revision ID: 4f7b1e9d2a76
+Revises: 92c8d5e3a065
+Create Date: 2026-10-19 12:00:06.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.database.migrations import add_backfilled_column_if_missing, add_column_if_missing
+
+# revision identifiers, used by Alembic.
+revision: str = "4f7b1e9d2a76"
+down_revision: Union[str, None] = "92c8d5e3a065"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Priority classes as of this revision (JOB_PRIORITIES)
+INTERACTIVE_PRIORITY = 100
+BATCH_PRIORITY = 10
+
+
+def upgrade() -> None:
+    if add_column_if_missing(
+        "job_statuses",
+        sa.Column("priority", sa.Integer(), nullable=False, server_default=str(INTERACTIVE_PRIORITY)),
+        index=True
+    ):
+        op.execute(f"UPDATE job_statuses SET priority = {BATCH_PRIORITY} WHERE job_type = 'BATCH'")
+    add_column_if_missing(
+        "job_statuses",
+        sa.Column("tenant_id", sa.String(100), nullable=False, server_default="default"),
+        index=True
+    )
+    # Jobs queued before this revision keep their submission order
+    add_backfilled_column_if_missing(
+        "job_statuses",
+        sa.Column("queued_at", sa.DateTime(), nullable=False),
+        "created_at",
+        index=True
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("job_statuses") as batch_op:
+        for column_name in ("queued_at", "tenant_id", "priority"):
+            batch_op.drop_index(f"ix_job_statuses_{column_name}")
+            batch_op.drop_column(column_name)
@@ -0,0 +1,37 @@
+"""Add uploaded_files.content_hash and the extraction configuration of results (upload deduplication)
+
+Revision ID: 5d9a3c7e8f43
+Revises: c47e19b2d532
+Create Date: 2026-10-19 12:00:03.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.database.migrations import add_column_if_missing
+
+# revision identifiers, used by Alembic.
+revision: str = "5d9a3c7e8f43"
+down_revision: Union[str, None] = "c47e19b2d532"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing uploads and results stay NULL, so they are never reused as duplicates
+    add_column_if_missing("uploaded_files", sa.Column("content_hash", sa.String(64), nullable=True), index=True)
+    add_column_if_missing("extraction_results", sa.Column("template_id", sa.String(100), nullable=True))
+    add_column_if_missing("extraction_results", sa.Column("model_config", sa.String(255), nullable=True))
+    add_column_if_missing("extraction_results", sa.Column("prompt_version", sa.String(50), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("extraction_results") as batch_op:
+        batch_op.drop_column("prompt_version")
+        batch_op.drop_column("model_config")
+        batch_op.drop_column("template_id")
+    op.drop_index("ix_uploaded_files_content_hash", table_name="uploaded_files")
+    with op.batch_alter_table("uploaded_files") as batch_op:
+        batch_op.drop_column("content_hash")
@@ -0,0 +1,27 @@
+"""Index extraction_results.excel_filename (downloads look results up by filename)
+
+Revision ID: 6c2f9a8d4e98
+Revises: a8e3c6f5b187
+Create Date: 2026-10-19 12:00:08.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.database.migrations import has_index
+
+# revision identifiers, used by Alembic.
+revision: str = "6c2f9a8d4e98"
+down_revision: Union[str, None] = "a8e3c6f5b187"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if not has_index("extraction_results", "ix_extraction_results_excel_filename"):
+        op.create_index("ix_extraction_results_excel_filename", "extraction_results", ["excel_filename"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_extraction_results_excel_filename", table_name="extraction_results")
@@ -0,0 +1,37 @@
+"""Add job_statuses.job_type (interactive or offline batch extraction)
+
+Revision ID: 8a2d4e6f1c21
+Revises: 3f6c2a1b9d10
+Create Date: 2026-10-19 12:00:01.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.database.migrations import add_column_if_missing
+
+# revision identifiers, used by Alembic.
+revision: str = "8a2d4e6f1c21"
+down_revision: Union[str, None] = "3f6c2a1b9d10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+job_type_enum = sa.Enum("INTERACTIVE", "BATCH", name="jobtypeenum")
+
+
+def upgrade() -> None:
+    # Existing jobs all came from /api/extract
+    job_type_enum.create(op.get_bind(), checkfirst=True)
+    add_column_if_missing(
+        "job_statuses",
+        sa.Column("job_type", job_type_enum, nullable=False, server_default="INTERACTIVE"),
+        index=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_job_statuses_job_type", table_name="job_statuses")
+    op.drop_column("job_statuses", "job_type")
+    job_type_enum.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,51 @@
+"""Add extraction_batches and job_statuses.batch_id (batch uploads)
+
+Revision ID: 92c8d5e3a065
+Revises: e1b6f2a4c954
+Create Date: 2026-10-19 12:00:05.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.database.migrations import add_column_if_missing, has_table
+
+# revision identifiers, used by Alembic.
+revision: str = "92c8d5e3a065"
+down_revision: Union[str, None] = "e1b6f2a4c954"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if not has_table("extraction_batches"):
+        op.create_table(
+            "extraction_batches",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("batch_id", sa.String(100), nullable=False),
+            sa.Column("template_id", sa.String(100), nullable=False),
+            sa.Column("total_files", sa.Integer(), nullable=False),
+            sa.Column("items", sa.JSON()),
+            sa.Column("created_at", sa.DateTime(), nullable=False)
+        )
+        op.create_index("ix_extraction_batches_id", "extraction_batches", ["id"])
+        op.create_index("ix_extraction_batches_batch_id", "extraction_batches", ["batch_id"], unique=True)
+        op.create_index("ix_extraction_batches_created_at", "extraction_batches", ["created_at"])
+    
+    if add_column_if_missing("job_statuses", sa.Column("batch_id", sa.String(100), nullable=True), index=True):
+        # SQLite cannot add a constraint to an existing table - batch mode recreates it
+        with op.batch_alter_table("job_statuses") as batch_op:
+            batch_op.create_foreign_key(
+                "fk_job_statuses_batch_id", "extraction_batches",
+                ["batch_id"], ["batch_id"], ondelete="SET NULL"
+            )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("job_statuses") as batch_op:
+        batch_op.drop_constraint("fk_job_statuses_batch_id", type_="foreignkey")
+        batch_op.drop_index("ix_job_statuses_batch_id")
+        batch_op.drop_column("batch_id")
+    op.drop_table("extraction_batches")
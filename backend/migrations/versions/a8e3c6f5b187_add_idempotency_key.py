@@ -0,0 +1,29 @@
+"""Add job_statuses.idempotency_key (Idempotency-Key on submissions)
+
+Revision ID: a8e3c6f5b187
+Revises: 4f7b1e9d2a76
+Create Date: 2026-10-19 12:00:07.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.database.migrations import add_column_if_missing
+
+# revision identifiers, used by Alembic.
+revision: str = "a8e3c6f5b187"
+down_revision: Union[str, None] = "4f7b1e9d2a76"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    add_column_if_missing("job_statuses", sa.Column("idempotency_key", sa.String(255), nullable=True), index=True)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("job_statuses") as batch_op:
+        batch_op.drop_index("ix_job_statuses_idempotency_key")
+        batch_op.drop_column("idempotency_key")
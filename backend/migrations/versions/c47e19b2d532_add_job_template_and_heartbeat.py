@@ -0,0 +1,39 @@
+"""Add job_statuses.template_id and updated_at (background worker queue)
+
+Revision ID: c47e19b2d532
+Revises: 8a2d4e6f1c21
+Create Date: 2026-10-19 12:00:02.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.database.migrations import add_backfilled_column_if_missing, add_column_if_missing
+
+# revision identifiers, used by Alembic.
+revision: str = "c47e19b2d532"
+down_revision: Union[str, None] = "8a2d4e6f1c21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Every job before the queue used the default template
+    add_column_if_missing(
+        "job_statuses",
+        sa.Column("template_id", sa.String(100), nullable=False, server_default="fund_report_v1")
+    )
+    # Last heartbeat of running jobs - the last known activity for existing ones
+    add_backfilled_column_if_missing(
+        "job_statuses",
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        "COALESCE(completed_at, started_at, created_at)"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("job_statuses") as batch_op:
+        batch_op.drop_column("updated_at")
+        batch_op.drop_column("template_id")
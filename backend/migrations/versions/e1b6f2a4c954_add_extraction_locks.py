@@ -0,0 +1,37 @@
+"""Add extraction_locks (single-flight coalescing across processes)
+
+Revision ID: e1b6f2a4c954
+Revises: 5d9a3c7e8f43
+Create Date: 2026-10-19 12:00:04.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.database.migrations import has_table
+
+# revision identifiers, used by Alembic.
+revision: str = "e1b6f2a4c954"
+down_revision: Union[str, None] = "5d9a3c7e8f43"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if not has_table("extraction_locks"):
+        op.create_table(
+            "extraction_locks",
+            sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+            sa.Column("lock_key", sa.String(200), nullable=False),
+            sa.Column("job_id", sa.String(100), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False)
+        )
+        op.create_index("ix_extraction_locks_id", "extraction_locks", ["id"])
+        op.create_index("ix_extraction_locks_lock_key", "extraction_locks", ["lock_key"], unique=True)
+        op.create_index("ix_extraction_locks_job_id", "extraction_locks", ["job_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("extraction_locks")
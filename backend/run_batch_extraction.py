@@ -0,0 +1,65 @@
+"""
+Command-line entry point for offline batch extraction.
+Intended for nightly backfills of short capital-call notices and fund letters;
+runs separately from the interactive /api/extract path.
+
+Usage:
+    python run_batch_extraction.py <pdf file or directory> [...] [--template fund_report_v1]
+"""
+
+import argparse
+import os
+from pathlib import Path
+
+from app.settings import settings
+from app.database import init_db, SessionLocal
+from app.services.batch_extractor import BatchExtractionRunner
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def collect_pdf_paths(paths):
+    """Expand directories into the PDF files they contain."""
+    pdf_paths = []
+    for path in paths:
+        if os.path.isdir(path):
+            pdf_paths.extend(sorted(str(p) for p in Path(path).glob("*.pdf")))
+        elif path.lower().endswith(".pdf"):
+            pdf_paths.append(path)
+        else:
+            logger.warning(f"Skipping non-PDF path: {path}")
+    return pdf_paths
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Batch-extract small fund documents, packing several into each LLM request"
+    )
+    parser.add_argument("paths", nargs="+", help="PDF files or directories containing PDFs")
+    parser.add_argument("--template", default="fund_report_v1", help="Template ID for extraction format")
+    args = parser.parse_args()
+    
+    pdf_paths = collect_pdf_paths(args.paths)
+    if not pdf_paths:
+        parser.error("No PDF files found")
+    
+    Path(settings.UPLOAD_DIR).mkdir(exist_ok=True)
+    Path(settings.OUTPUT_DIR).mkdir(exist_ok=True)
+    init_db()
+    
+    db = SessionLocal()
+    try:
+        stats = BatchExtractionRunner(db, template_id=args.template).run(pdf_paths)
+    finally:
+        db.close()
+    
+    logger.info(
+        f"Batch summary | Documents: {stats['documents']} | Completed: {stats['completed']} | "
+        f"Failed: {stats['failed']} | Packed requests: {stats['packed_requests']} | "
+        f"Single requests: {stats['single_requests']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Command-line entry point for consolidated multi-fund rollups.
+Combines the Schedule of Investments, PCAP and cashflow sheets of the matching
+extraction results into one workbook (or a zip of CSVs) for quarter-end reporting.
+Results are read in batches and rows streamed to disk, so memory stays flat for
+thousands of results.
+
+Usage:
+    python run_rollup.py <output.xlsx | output.zip> [--format csv] [--batch-id ID]
+        [--result-ids 1 2 3] [--template fund_report_v1] [--from 2025-01-01] [--to 2025-04-01]
+"""
+
+import argparse
+from datetime import datetime
+
+from app.database import init_db, SessionLocal
+from app.services.rollup import write_rollup, ROLLUP_FORMATS
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a consolidated rollup workbook across extraction results")
+    parser.add_argument("output", help="Output path (.xlsx workbook, or .zip for the CSV bundle)")
+    parser.add_argument("--format", choices=ROLLUP_FORMATS, help="Output format (default: from the output extension)")
+    parser.add_argument("--template", help="Only include results of this template ID")
+    parser.add_argument("--batch-id", help="Only include results of this upload batch")
+    parser.add_argument("--result-ids", nargs="+", type=int, help="Only include these result IDs")
+    parser.add_argument("--from", dest="extracted_from", type=datetime.fromisoformat,
+                        help="Only include results extracted at or after this ISO date/time")
+    parser.add_argument("--to", dest="extracted_to", type=datetime.fromisoformat,
+                        help="Only include results extracted before this ISO date/time")
+    args = parser.parse_args()
+    
+    output_format = args.format or ("csv" if args.output.lower().endswith(".zip") else "xlsx")
+    
+    init_db()
+    db = SessionLocal()
+    try:
+        stats = write_rollup(
+            db, args.output, output_format, template_id=args.template, result_ids=args.result_ids,
+            batch_id=args.batch_id, extracted_from=args.extracted_from, extracted_to=args.extracted_to
+        )
+    finally:
+        db.close()
+    
+    logger.info(
+        f"Rollup summary | Results: {stats['results']:,} | Output: {args.output} | "
+        + " | ".join(f"{name}: {count:,} rows" for name, count in stats["rows"].items())
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Standalone extraction worker process.
+Claims pending jobs from the shared database so workers can be scaled
+independently of the API server (run the API with EXTRACTION_WORKERS=0).
+
+Usage:
+    python run_worker.py [--workers N]
+"""
+
+import argparse
+from pathlib import Path
+
+from app.settings import settings
+from app.database import init_db
+from app.services.job_queue import JobQueue
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run background extraction workers")
+    parser.add_argument(
+        "--workers", type=int, default=max(settings.EXTRACTION_WORKERS, 1),
+        help="Number of worker threads in this process"
+    )
+    args = parser.parse_args()
+    
+    Path(settings.UPLOAD_DIR).mkdir(exist_ok=True)
+    Path(settings.OUTPUT_DIR).mkdir(exist_ok=True)
+    init_db()
+    
+    logger.info(f"Extraction worker process starting | Workers: {args.workers}")
+    JobQueue(worker_count=args.workers).run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Shared pytest fixtures.
+Tests use a throwaway directory for the app's default SQLite database (used when
+DATABASE_URL is unset), uploads and outputs. CPU-bound work
+runs inline, no background workers are started, and Gemini requests are answered
+by FakeGemini with canned responses.
+
+Run from backend/:
+    python -m pytest -q
+"""
+
+import copy
+import json
+import os
+import sys
+import tempfile
+
+WORK_DIR = tempfile.mkdtemp(prefix="pdf-extraction-tests-")
+os.environ.update({
+    "GEMINI_API_KEY": "test-key",
+    "DATABASE_URL": "",
+    "EXTRACTION_WORKERS": "0",
+    "CPU_POOL_WORKERS": "0",
+    "UPLOAD_DIR": os.path.join(WORK_DIR, "uploads"),
+    "OUTPUT_DIR": os.path.join(WORK_DIR, "outputs")
+})
+os.makedirs(os.environ["UPLOAD_DIR"], exist_ok=True)
+os.makedirs(os.environ["OUTPUT_DIR"], exist_ok=True)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+
+# The SQLite path is relative to the working directory when the engine is created
+_invocation_dir = os.getcwd()
+os.chdir(WORK_DIR)
+from app.database.connection import SessionLocal, engine
+os.chdir(_invocation_dir)
+
+from app.database.operations import ExtractionResultService, JobStatusService, UploadedFileService
+from app.database.schemas import Base
+from app.services.ai_processor import GeminiExtractor
+from app.services.extraction_pipeline import ExtractionPipeline
+import app_server
+
+# Extraction result covering every section of the fund report template
+REPORT_DATA = {
+    "portfolio_summary": {
+        "fund_name": "Fund II",
+        "general_partner": "Example GP",
+        "nav": 1_250_000,
+        "total_commitments": 5_000_000
+    },
+    "schedule_of_investments": [
+        {
+            "company": f"Co {i}",
+            "fund": "Fund II",
+            "investment_status": "Unrealized",
+            "total_invested": i * 10,
+            "reported_value": i * 12,
+            "since_inception_irr": 0.15
+        }
+        for i in range(1, 6)
+    ],
+    "statement_of_operations": [
+        {"period": "Q4 2024", "total_income": 1_000, "total_expenses": 250}
+    ],
+    "statement_of_cashflows": {
+        "operating_activities": {
+            "purchase_of_investments": {"current_period": -1, "prior_period": -2, "year_to_date": -3}
+        }
+    },
+    "pcap_statement": {
+        "nav_movements": {
+            "beginning_nav_net_of_incentive": {"current_period": 10, "prior_period": 9, "year_to_date": 8}
+        }
+    },
+    "portfolio_company_profile": [
+        {"company_name": "Co 1", "industry": "IT", "company_description": "Software"}
+    ],
+    "portfolio_company_financials": [
+        {"company": "Co 1", "ltm_revenue": 50, "ltm_ebitda": 9}
+    ],
+    "footnotes": [
+        {"note_number": 1, "note_header": "Basis of presentation", "description": "Notes"}
+    ],
+    "reference_values": {"currencies": ["USD", "EUR"], "industries": ["IT"]}
+}
+
+# Text every PDF reads as once the pipeline_text fixture is active
+PIPELINE_TEXT = "--- Page 1 --- Fund II quarterly report"
+
+
+def pdf_upload(filename: str = "report.pdf", content: bytes = b"%PDF-1.4 report"):
+    """Multipart files argument for posting a PDF."""
+    return {"file": (filename, content, "application/pdf")}
+
+
+class FakeGemini:
+    """Canned Gemini responses by model name; records every prompt sent."""
+    
+    def __init__(self):
+        # Model name -> data dict, exception, or callable(prompt) returning either
+        self.responses = {}
+        self.default = copy.deepcopy(REPORT_DATA)
+        self.calls = []
+    
+    def generate(self, extractor: GeminiExtractor, prompt: str) -> str:
+        """Stand-in for GeminiExtractor._generate_content."""
+        if extractor.cancel_check:
+            extractor.cancel_check()
+        self.calls.append((extractor.model_name, prompt))
+        
+        response = self.responses.get(extractor.model_name, self.default)
+        if callable(response):
+            response = response(prompt)
+        if isinstance(response, Exception):
+            raise response
+        return response if isinstance(response, str) else json.dumps(response)
+    
+    def models_called(self):
+        """Model name of every request, in order."""
+        return [model for model, _ in self.calls]
+
+
+@pytest.fixture
+def fake_gemini(monkeypatch):
+    """Answer Gemini requests from a FakeGemini."""
+    fake = FakeGemini()
+    monkeypatch.setattr(GeminiExtractor, "_generate_content", lambda self, prompt: fake.generate(self, prompt))
+    return fake
+
+
+@pytest.fixture
+def report_data():
+    """Fresh copy of REPORT_DATA."""
+    return copy.deepcopy(REPORT_DATA)
+
+
+@pytest.fixture
+def pipeline_text(monkeypatch):
+    """Skip PDF parsing in the extraction pipeline: every document reads as PIPELINE_TEXT."""
+    monkeypatch.setattr(ExtractionPipeline, "_extract_text", lambda self, pdf_path: PIPELINE_TEXT)
+
+
+@pytest.fixture
+def db():
+    """Session on an empty database with the current schema."""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(db):
+    """API client on an empty database (startup hooks - migrations, workers - are not run)."""
+    return TestClient(app_server.app)
+
+
+@pytest.fixture
+def create_job(db):
+    """Factory for an uploaded file with a pending job: create_job(filename, content_hash, **job_fields)."""
+    def create(filename: str = "report.pdf", content_hash: str = None, **job_fields):
+        path = os.path.join(os.environ["UPLOAD_DIR"], filename)
+        with open(path, "wb") as stream:
+            stream.write(b"%PDF-1.4 test")
+        db_file = UploadedFileService.create(
+            db, filename=filename, original_filename=filename, file_path=path,
+            file_size=13, content_hash=content_hash
+        )
+        return JobStatusService.create(db, file_id=db_file.id, **job_fields)
+    return create
+
+
+@pytest.fixture
+def store_result(db, create_job):
+    """Factory for a stored extraction result: store_result(extracted_data, filename, **job_fields) -> result ID."""
+    def store(extracted_data, filename: str = "report.pdf", **job_fields):
+        file_id = create_job(filename=filename, **job_fields).file_id
+        db_result = ExtractionResultService.create(
+            db, file_id=file_id, excel_filename=f"{filename}.xlsx", excel_path=f"{filename}.xlsx",
+            extracted_data=extracted_data, template_id="fund_report_v1"
+        )
+        return db_result.id
+    return store
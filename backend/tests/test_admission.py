@@ -0,0 +1,100 @@
+"""Tests for admission control and 429 backpressure."""
+
+import pytest
+
+from conftest import pdf_upload
+
+from app.settings import settings
+from app.database.schemas import JobTypeEnum
+from app.services.admission import AdmissionController, MIN_RETRY_AFTER_SECONDS
+from app.services.ai_processor import llm_inflight_tokens
+from app.services.job_queue import JobQueue
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_MAX_QUEUE_DEPTH", 2)
+    monkeypatch.setattr(settings, "ADMISSION_MAX_BATCH_QUEUE_DEPTH", 3)
+    monkeypatch.setattr(settings, "ADMISSION_MAX_INFLIGHT_TOKENS", 1_000)
+    monkeypatch.setattr(settings, "ADMISSION_MAX_MEMORY_MB", 0)
+    monkeypatch.setattr(settings, "ADMISSION_RETRY_AFTER_SECONDS", 30)
+
+
+def test_interactive_queue_depth_ignores_batch_jobs(db, create_job, limits):
+    controller = AdmissionController()
+    for index in range(3):
+        create_job(f"batch_{index}.pdf", job_type=JobTypeEnum.BATCH)
+    create_job("interactive.pdf")
+    
+    assert controller.check(db, JobTypeEnum.INTERACTIVE).admitted
+    
+    create_job("interactive_2.pdf")
+    decision = controller.check(db, JobTypeEnum.INTERACTIVE)
+    assert not decision.admitted
+    assert decision.reasons == ["queue_depth 2 + 1 exceeds 2"]
+    assert decision.retry_after >= MIN_RETRY_AFTER_SECONDS
+
+
+def test_batch_admission_counts_the_jobs_being_added(db, create_job, limits):
+    controller = AdmissionController()
+    create_job()
+    
+    assert controller.check(db, JobTypeEnum.BATCH, job_count=2).admitted
+    assert not controller.check(db, JobTypeEnum.BATCH, job_count=3).admitted
+
+
+def test_inflight_tokens_reject_new_jobs(db, limits):
+    controller = AdmissionController()
+    
+    with llm_inflight_tokens.track("x" * 4_004):
+        decision = controller.check(db)
+        assert not decision.admitted
+        assert decision.reasons == ["inflight_tokens 1001 exceeds 1000"]
+        assert decision.retry_after == 30
+    
+    assert llm_inflight_tokens.tokens == 0
+    assert controller.check(db).admitted
+
+
+def test_memory_limit_rejects_new_jobs(db, limits, monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_MAX_MEMORY_MB", 1)
+    
+    decision = AdmissionController().check(db)
+    
+    assert not decision.admitted
+    assert decision.reasons == ["memory exceeds 1MB"]
+
+
+def test_overloaded_api_answers_429_with_retry_after(db, client, create_job, limits):
+    create_job("a.pdf")
+    create_job("b.pdf")
+    
+    response = client.post("/api/extract", files=pdf_upload())
+    
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= MIN_RETRY_AFTER_SECONDS
+    assert "queue_depth" in response.json()["detail"]
+    
+    health = client.get("/health").json()["admission"]
+    assert health["accepting_interactive"] is False
+    assert health["accepting_batch"] is True
+    assert health["queue_depth"] == 2
+
+
+def test_batch_upload_over_limit_is_rejected_whole(db, client, limits):
+    files = [("files", (f"{name}.pdf", b"%PDF-1.4 " + name.encode(), "application/pdf")) for name in "abcd"]
+    
+    response = client.post("/api/extract/batch", files=files)
+    
+    assert response.status_code == 429
+    assert client.get("/health").json()["admission"]["queue_depth"] == 0
+
+
+def test_workers_stop_claiming_under_memory_pressure_unless_idle(limits, monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_MAX_MEMORY_MB", 1)
+    queue = JobQueue(worker_count=0)
+    
+    assert not queue._memory_pressure()
+    
+    queue._active_jobs.add("running-job")
+    assert queue._memory_pressure()
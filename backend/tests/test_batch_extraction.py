@@ -0,0 +1,106 @@
+"""Tests for pack sizing and failure isolation in offline batch extraction."""
+
+import os
+
+import pytest
+
+from app.settings import settings
+from app.database.operations import JobStatusService
+from app.database.schemas import ExtractionResult, JobStatus, JobStatusEnum, UploadedFile
+from app.services.batch_extractor import BatchDocument, BatchExtractionRunner
+from app.services.document_parser import PDFExtractor
+
+
+def document(doc_id: str, chars: int) -> BatchDocument:
+    doc = BatchDocument(doc_id, f"{doc_id}.pdf", f"/tmp/{doc_id}.pdf", 0, doc_id)
+    doc.text = "x" * chars
+    return doc
+
+
+def pack_ids(packs):
+    return [[doc.doc_id for doc in pack] for pack in packs]
+
+
+@pytest.fixture
+def pack_limits(monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_SMALL_DOC_MAX_CHARS", 1_000)
+    monkeypatch.setattr(settings, "BATCH_PACK_MAX_CHARS", 2_500)
+    monkeypatch.setattr(settings, "BATCH_PACK_MAX_DOCS", 3)
+    monkeypatch.setattr(settings, "BATCH_OUTPUT_TOKENS_PER_DOC", 100)
+    monkeypatch.setattr(settings, "BATCH_OUTPUT_CHARS_RATIO", 0.5)
+    monkeypatch.setattr(settings, "BATCH_PACK_OUTPUT_SHARE", 1.0)
+    monkeypatch.setattr(settings, "GEMINI_MAX_TOKENS", 100_000)
+
+
+@pytest.fixture
+def pdf_files(tmp_path, monkeypatch):
+    """Source PDFs for a batch; the parser returns a short text per file."""
+    monkeypatch.setattr(PDFExtractor, "extract_text_from_pdf", lambda self, path: f"Text of {os.path.basename(path)}")
+    paths = []
+    for name in ("a.pdf", "b.pdf", "c.pdf"):
+        path = tmp_path / name
+        path.write_bytes(b"%PDF-1.4 " + name.encode())
+        paths.append(str(path))
+    return paths
+
+
+def test_pack_documents_respects_char_and_doc_limits(pack_limits):
+    docs = [document("big", 1_500)] + [document(f"d{i}", 800) for i in range(4)] + [document("tiny", 10)]
+    
+    packs = pack_ids(BatchExtractionRunner.pack_documents(docs))
+    
+    assert packs == [["tiny", "d0", "d1"], ["big"], ["d2", "d3"]]
+
+
+def test_pack_documents_respects_output_budget(pack_limits, monkeypatch):
+    # 100 + 800 * 0.5 / 4 = 200 expected output tokens per document
+    monkeypatch.setattr(settings, "GEMINI_MAX_TOKENS", 500)
+    docs = [document(f"d{i}", 800) for i in range(3)]
+    
+    assert BatchExtractionRunner.expected_output_tokens(docs[0]) == 200
+    assert pack_ids(BatchExtractionRunner.pack_documents(docs)) == [["d0", "d1"], ["d2"]]
+    
+    monkeypatch.setattr(settings, "BATCH_PACK_OUTPUT_SHARE", 0.5)
+    assert pack_ids(BatchExtractionRunner.pack_documents(docs)) == [["d0"], ["d1"], ["d2"]]
+
+
+def test_missing_packed_documents_fall_back_to_single_extraction(db, fake_gemini, pdf_files, report_data):
+    def respond(prompt):
+        if "doc_1" in prompt and "doc_2" in prompt:
+            return {"doc_1": report_data, "doc_3": report_data}
+        return report_data
+    fake_gemini.default = respond
+    
+    stats = BatchExtractionRunner(db).run(pdf_files)
+    
+    assert stats == {"documents": 3, "completed": 3, "failed": 0, "packed_requests": 1, "single_requests": 1}
+    assert len(fake_gemini.calls) == 2
+    assert "doc_2" in fake_gemini.calls[1][1]
+    statuses = {job.status for job in db.query(JobStatus).all()}
+    assert statuses == {JobStatusEnum.COMPLETED}
+    assert db.query(ExtractionResult).count() == 3
+
+
+def test_unreadable_document_does_not_abort_batch(db, fake_gemini, pdf_files, tmp_path):
+    paths = [pdf_files[0], str(tmp_path / "missing.pdf"), pdf_files[1]]
+    
+    stats = BatchExtractionRunner(db).run(paths)
+    
+    assert stats["documents"] == 3
+    assert stats["completed"] == 2
+    assert stats["failed"] == 1
+    assert [f.original_filename for f in db.query(UploadedFile).order_by(UploadedFile.id)] == ["a.pdf", "b.pdf"]
+    assert not [name for name in os.listdir(settings.UPLOAD_DIR) if name.startswith("missing")]
+
+
+def test_extraction_failure_marks_only_that_job_failed(db, fake_gemini, pdf_files, monkeypatch, report_data):
+    monkeypatch.setattr(settings, "BATCH_PACK_MAX_DOCS", 1)
+    fake_gemini.default = lambda prompt: RuntimeError("bad response") if "Text of b_" in prompt else report_data
+    
+    stats = BatchExtractionRunner(db).run(pdf_files)
+    
+    assert stats["completed"] == 2 and stats["failed"] == 1
+    failed = [job for job in db.query(JobStatus).all() if job.status == JobStatusEnum.FAILED]
+    assert len(failed) == 1
+    assert "bad response" in failed[0].error_message
+    assert JobStatusService.get_by_job_id(db, failed[0].job_id).uploaded_file.original_filename == "b.pdf"
@@ -0,0 +1,89 @@
+"""Tests for multi-file batch uploads and their aggregated status."""
+
+import io
+import zipfile
+
+from app.database.operations import JobStatusService
+from app.database.schemas import JobTypeEnum
+from app.services.extraction_pipeline import run_extraction_job
+
+
+def zip_archive(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+def submit_batch(client, files):
+    response = client.post("/api/extract/batch", files=[
+        ("files", (name, content, "application/octet-stream")) for name, content in files
+    ])
+    assert response.status_code == 202, response.text
+    return response.json()
+
+
+def test_batch_expands_zip_archives_and_records_rejections(db, client):
+    archive = zip_archive({
+        "reports/c.pdf": b"%PDF-1.4 c",
+        "__MACOSX/reports/._c.pdf": b"resource fork",
+        "readme.txt": b"not a report"
+    })
+    
+    batch = submit_batch(client, [
+        ("a.pdf", b"%PDF-1.4 a"),
+        ("b.pdf", b"not a pdf"),
+        ("reports.zip", archive)
+    ])
+    
+    assert [item["filename"] for item in batch["items"]] == ["a.pdf", "b.pdf", "c.pdf"]
+    assert batch["items"][1]["error"] == "File is not a valid PDF"
+    jobs = JobStatusService.get_by_job_ids(db, [item["job_id"] for item in batch["items"] if item["job_id"]])
+    assert len(jobs) == 2
+    assert {job.batch_id for job in jobs} == {batch["batch_id"]}
+    assert {job.job_type for job in jobs} == {JobTypeEnum.BATCH}
+
+
+def test_batch_rejects_invalid_zip_and_empty_batches(db, client):
+    response = client.post("/api/extract/batch", files=[("files", ("broken.zip", b"not a zip", "application/zip"))])
+    assert response.status_code == 400
+    
+    response = client.post("/api/extract/batch", files=[("files", ("empty.zip", zip_archive({}), "application/zip"))])
+    assert response.status_code == 400
+    assert response.json()["detail"] == "No PDF files found in upload"
+
+
+def test_batch_status_aggregates_job_progress(db, client, fake_gemini, pipeline_text):
+    batch = submit_batch(client, [("a.pdf", b"%PDF-1.4 a"), ("b.pdf", b"%PDF-1.4 b"), ("c.pdf", b"bad")])
+    status_url = batch["status_url"]
+    
+    status = client.get(status_url).json()
+    assert status["status"] == "processing"
+    assert status["counts"]["pending"] == 2
+    assert status["counts"]["rejected"] == 1
+    assert status["progress_percentage"] == 33
+    
+    for item in batch["items"][:2]:
+        run_extraction_job(item["job_id"])
+    
+    status = client.get(status_url).json()
+    assert status["status"] == "partially_completed"
+    assert status["counts"]["completed"] == 2
+    assert status["progress_percentage"] == 100
+    assert all(entry["download_url"] for entry in status["files"][:2])
+
+
+def test_batch_reuses_existing_results(db, client, fake_gemini, pipeline_text):
+    single = client.post("/api/extract", files={"file": ("a.pdf", b"%PDF-1.4 a", "application/pdf")}).json()
+    run_extraction_job(single["job_id"])
+    
+    batch = submit_batch(client, [("a.pdf", b"%PDF-1.4 a")])
+    
+    assert batch["items"][0]["deduplicated"] is True
+    assert batch["items"][0]["job_id"] == single["job_id"]
+    assert client.get(batch["status_url"]).json()["status"] == "completed"
+
+
+def test_unknown_batch_is_404(db, client):
+    assert client.get("/api/batches/missing").status_code == 404
@@ -0,0 +1,124 @@
+"""Tests for cooperative cancellation of extraction jobs."""
+
+import os
+
+import pytest
+
+from conftest import pdf_upload
+
+from app.settings import settings
+from app.database.connection import SessionLocal
+from app.database.operations import ExtractionResultService, JobStatusService
+from app.database.schemas import ExtractionLock, JobStatusEnum
+from app.services import cancellation, extraction_pipeline
+from app.services.cancellation import CancelToken, JobCancelled
+from app.services.extraction_pipeline import run_extraction_job
+
+
+def cancel_in_database(job_id):
+    """Cancel a job the way another API process would: only in the database."""
+    db = SessionLocal()
+    try:
+        assert JobStatusService.request_cancel(db, job_id)
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def published(monkeypatch):
+    """Events published by the pipeline as (job_id, event) pairs."""
+    events = []
+    monkeypatch.setattr(
+        extraction_pipeline.job_event_broker, "publish",
+        lambda job_id, event, **data: events.append((job_id, event))
+    )
+    return events
+
+
+@pytest.fixture
+def claimed_job(db, client, pipeline_text):
+    """A submitted job claimed by a worker, as the job queue leaves it."""
+    job_id = client.post("/api/extract", files=pdf_upload()).json()["job_id"]
+    assert JobStatusService.claim_next_pending(db).job_id == job_id
+    return job_id
+
+
+def test_cancel_token_checks_local_signal_and_database(db, create_job, monkeypatch):
+    monkeypatch.setattr(cancellation, "DB_CHECK_INTERVAL_SECONDS", 0)
+    local = CancelToken("local-job")
+    local.check()
+    local.cancel()
+    with pytest.raises(JobCancelled):
+        local.check()
+    
+    db_job = create_job()
+    remote = CancelToken(db_job.job_id)
+    assert not remote.cancelled
+    cancel_in_database(db_job.job_id)
+    assert remote.cancelled
+
+
+def test_cancel_endpoint_cancels_pending_job_once(db, client):
+    job_id = client.post("/api/extract", files=pdf_upload()).json()["job_id"]
+    
+    response = client.post(f"/api/jobs/{job_id}/cancel")
+    
+    assert response.status_code == 200
+    assert JobStatusService.get_by_job_id(db, job_id).status == JobStatusEnum.CANCELLED
+    assert db.query(ExtractionLock).count() == 0
+    assert client.post(f"/api/jobs/{job_id}/cancel").status_code == 409
+    assert client.post("/api/jobs/missing/cancel").status_code == 404
+
+
+def test_running_job_stops_at_next_checkpoint(db, client, fake_gemini, claimed_job, published, report_data):
+    def cancel_during_request(prompt):
+        assert client.post(f"/api/jobs/{claimed_job}/cancel").status_code == 200
+        return report_data
+    fake_gemini.default = cancel_during_request
+    
+    run_extraction_job(claimed_job)
+    
+    db_job = JobStatusService.get_by_job_id(db, claimed_job)
+    db.refresh(db_job)
+    assert db_job.status == JobStatusEnum.CANCELLED
+    assert ExtractionResultService.get_by_file_id(db, db_job.file_id) is None
+    assert (claimed_job, "cancelled") in published
+    assert (claimed_job, "completed") not in published
+
+
+def test_cancellation_after_last_checkpoint_wins_over_completion(
+    db, fake_gemini, claimed_job, published, monkeypatch
+):
+    monkeypatch.setattr(settings, "EXCEL_OUTPUT_MODE", "disk")
+    create_result = ExtractionResultService.create
+    
+    def create_then_cancel(*args, **kwargs):
+        db_result = create_result(*args, **kwargs)
+        cancel_in_database(claimed_job)
+        return db_result
+    monkeypatch.setattr(extraction_pipeline.ExtractionResultService, "create", create_then_cancel)
+    
+    run_extraction_job(claimed_job)
+    
+    db_job = JobStatusService.get_by_job_id(db, claimed_job)
+    db.refresh(db_job)
+    assert db_job.status == JobStatusEnum.CANCELLED
+    assert ExtractionResultService.get_by_file_id(db, db_job.file_id) is None
+    excel_filename = f"{os.path.splitext(db_job.uploaded_file.filename)[0]}_extracted.xlsx"
+    assert not os.path.exists(os.path.join(settings.OUTPUT_DIR, excel_filename))
+    assert (claimed_job, "completed") not in published
+
+
+def test_failure_after_cancellation_keeps_job_cancelled(db, fake_gemini, claimed_job, published):
+    def cancel_then_fail(prompt):
+        cancel_in_database(claimed_job)
+        return RuntimeError("Gemini unavailable")
+    fake_gemini.default = cancel_then_fail
+    
+    run_extraction_job(claimed_job)
+    
+    db_job = JobStatusService.get_by_job_id(db, claimed_job)
+    db.refresh(db_job)
+    assert db_job.status == JobStatusEnum.CANCELLED
+    assert db_job.error_message is None
+    assert (claimed_job, "failed") not in published
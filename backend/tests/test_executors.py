@@ -0,0 +1,45 @@
+"""Tests for keeping blocking work off the event loop."""
+
+import inspect
+import os
+
+from app.settings import settings
+from app.services.executors import run_cpu_bound, shutdown_executors
+import app_server
+
+# Handlers that never block: static payloads and the SSE stream (which polls via to_thread)
+ASYNC_ENDPOINTS = {"root", "list_templates", "stream_job_events"}
+
+
+def test_run_cpu_bound_runs_inline_without_pool(monkeypatch):
+    monkeypatch.setattr(settings, "CPU_POOL_WORKERS", 0)
+    
+    assert run_cpu_bound(os.getpid) == os.getpid()
+
+
+def test_run_cpu_bound_uses_process_pool(monkeypatch):
+    monkeypatch.setattr(settings, "CPU_POOL_WORKERS", 1)
+    try:
+        assert run_cpu_bound(os.getpid) != os.getpid()
+        assert run_cpu_bound(divmod, 7, 2) == (3, 1)
+    finally:
+        shutdown_executors()
+
+
+def test_blocking_endpoints_run_in_thread_pool():
+    async_endpoints = {
+        route.endpoint.__name__
+        for route in app_server.app.routes
+        if getattr(route, "endpoint", None) and route.endpoint.__module__ == app_server.__name__
+        and inspect.iscoroutinefunction(route.endpoint)
+    }
+    
+    assert async_endpoints == ASYNC_ENDPOINTS
+
+
+def test_health_checks_database(client):
+    response = client.get("/health")
+    
+    assert response.status_code == 200
+    assert response.json()["status"] == "healthy"
+    assert response.json()["database"] == "connected"
@@ -0,0 +1,111 @@
+"""Tests for ETag, conditional and range handling of workbook downloads."""
+
+import pytest
+
+from conftest import pdf_upload
+
+from app.settings import settings
+from app.services.extraction_pipeline import run_extraction_job
+from app.services.file_serving import _etag_matches, _parse_range
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-9", (0, 9)),
+    ("bytes=5-", (5, 9)),
+    ("bytes=0-100", (0, 9)),
+    ("bytes=-3", (7, 9)),
+    ("bytes=-20", (0, 9)),
+    (" bytes = 2-3 ", (2, 3)),
+    ("bytes=-0", "unsatisfiable"),
+    ("bytes=10-", "unsatisfiable"),
+    ("bytes=12-20", "unsatisfiable"),
+    ("bytes=5-2", None),
+    ("bytes=0-1,3-4", None),
+    ("items=0-1", None),
+    ("bytes=a-b", None),
+    ("bytes=-", None),
+    ("bytes=--5", None)
+])
+def test_parse_range(header, expected):
+    assert _parse_range(header, 10) == expected
+
+
+@pytest.mark.parametrize("if_none_match, matches", [
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"other", "abc"', True),
+    ("*", True),
+    ('"other"', False),
+    (None, False)
+])
+def test_etag_matching_is_weak(if_none_match, matches):
+    assert _etag_matches(if_none_match, '"abc"') is matches
+
+
+@pytest.fixture
+def workbook_url(db, client, fake_gemini, pipeline_text, monkeypatch):
+    """Download URL of a workbook generated on disk."""
+    monkeypatch.setattr(settings, "EXCEL_OUTPUT_MODE", "disk")
+    job_id = client.post("/api/extract", files=pdf_upload()).json()["job_id"]
+    run_extraction_job(job_id)
+    return client.get(f"/api/jobs/{job_id}").json()["download_url"]
+
+
+def test_download_is_immutable_and_revalidates(client, workbook_url):
+    response = client.get(workbook_url)
+    
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["content-disposition"].startswith("attachment")
+    etag = response.headers["etag"]
+    
+    revalidated = client.get(workbook_url, headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert client.get(workbook_url, headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_download_serves_byte_ranges(client, workbook_url):
+    full = client.get(workbook_url)
+    size = len(full.content)
+    
+    partial = client.get(workbook_url, headers={"Range": "bytes=10-99"})
+    assert partial.status_code == 206
+    assert partial.headers["content-range"] == f"bytes 10-99/{size}"
+    assert partial.content == full.content[10:100]
+    
+    suffix = client.get(workbook_url, headers={"Range": "bytes=-50"})
+    assert suffix.content == full.content[-50:]
+    
+    unsatisfiable = client.get(workbook_url, headers={"Range": f"bytes={size}-"})
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["content-range"] == f"bytes */{size}"
+    
+    multi_range = client.get(workbook_url, headers={"Range": "bytes=0-1,5-6"})
+    assert multi_range.status_code == 200
+    assert multi_range.content == full.content
+
+
+def test_if_range_with_old_etag_returns_full_file(client, workbook_url):
+    full = client.get(workbook_url)
+    etag = full.headers["etag"]
+    
+    current = client.get(workbook_url, headers={"Range": "bytes=0-9", "If-Range": etag})
+    changed = client.get(workbook_url, headers={"Range": "bytes=0-9", "If-Range": '"old"'})
+    
+    assert current.status_code == 206
+    assert changed.status_code == 200
+    assert changed.content == full.content
+
+
+def test_preview_is_inline(client, workbook_url):
+    response = client.get(workbook_url.replace("/api/download/", "/api/preview/"))
+    
+    assert response.status_code == 200
+    assert "content-disposition" not in response.headers
+
+
+def test_unknown_or_unsafe_filenames_are_rejected(db, client):
+    assert client.get("/api/download/missing.xlsx").status_code == 404
+    assert client.get("/api/download/..%5Csecret.xlsx").status_code == 400
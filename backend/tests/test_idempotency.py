@@ -0,0 +1,66 @@
+"""Tests for Idempotency-Key handling on extraction submissions."""
+
+from datetime import datetime, timedelta
+
+from conftest import pdf_upload
+
+from app.settings import settings
+from app.database.operations import JobStatusService, UploadedFileService
+from app.services.extraction_pipeline import run_extraction_job
+
+
+def submit(client, key, content=b"%PDF-1.4 report", tenant=None, **form):
+    headers = {"Idempotency-Key": key}
+    if tenant:
+        headers["X-Tenant-ID"] = tenant
+    return client.post("/api/extract", files=pdf_upload(content=content), data=form, headers=headers)
+
+
+def test_retry_returns_original_job_without_new_upload(db, client):
+    first = submit(client, "key-1")
+    retry = submit(client, "key-1", content=b"%PDF-1.4 changed on retry")
+    
+    assert first.status_code == 202
+    assert retry.status_code == 202
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json()["job_id"] == first.json()["job_id"]
+    assert retry.json()["idempotent_replay"] is True
+    assert len(UploadedFileService.get_all(db)) == 1
+
+
+def test_replay_of_completed_job_includes_result(db, client, fake_gemini, pipeline_text):
+    job_id = submit(client, "key-1").json()["job_id"]
+    run_extraction_job(job_id)
+    
+    retry = submit(client, "key-1")
+    
+    assert retry.status_code == 200
+    assert retry.json()["status"] == "completed"
+    assert retry.json()["download_url"]
+
+
+def test_keys_are_scoped_per_tenant(db, client):
+    first = submit(client, "shared-key", tenant="a").json()
+    other = submit(client, "shared-key", content=b"%PDF-1.4 other", tenant="b")
+    
+    assert "Idempotent-Replayed" not in other.headers
+    assert other.json()["job_id"] != first["job_id"]
+
+
+def test_expired_key_starts_a_new_job(db, client):
+    first = submit(client, "key-1").json()
+    db_job = JobStatusService.get_by_job_id(db, first["job_id"])
+    db_job.created_at = datetime.utcnow() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS + 1)
+    db.commit()
+    
+    retry = submit(client, "key-1", content=b"%PDF-1.4 other")
+    
+    assert "Idempotent-Replayed" not in retry.headers
+    assert retry.json()["job_id"] != first["job_id"]
+
+
+def test_key_reused_with_other_template_or_invalid_key_is_rejected(db, client):
+    submit(client, "key-1")
+    
+    assert submit(client, "key-1", template_id="other_template").status_code == 422
+    assert submit(client, "k" * 256).status_code == 400
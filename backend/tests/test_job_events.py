@@ -0,0 +1,87 @@
+"""Tests for job progress events and the server-sent events stream."""
+
+import asyncio
+import json
+import threading
+import time
+
+from conftest import pdf_upload
+
+from app.settings import settings
+from app.services.extraction_pipeline import run_extraction_job
+from app.services.job_events import JobEventBroker, job_event_broker
+
+
+def read_events(response):
+    """Parse (event, data) pairs from an SSE response until it closes."""
+    events = []
+    name = None
+    for line in response.iter_lines():
+        if line.startswith("event: "):
+            name = line[len("event: "):]
+        elif line.startswith("data: "):
+            events.append((name, json.loads(line[len("data: "):])))
+    return events
+
+
+def test_broker_delivers_events_from_other_threads():
+    broker = JobEventBroker(max_queue_size=2)
+    
+    async def subscribe_and_receive():
+        queue = broker.subscribe("job-1")
+        publisher = threading.Thread(target=lambda: [
+            broker.publish("job-1", "progress", progress_percentage=step) for step in (10, 20, 30)
+        ])
+        publisher.start()
+        publisher.join()
+        await asyncio.sleep(0)
+        received = [queue.get_nowait() for _ in range(queue.qsize())]
+        broker.unsubscribe("job-1", queue)
+        return received
+    
+    received = asyncio.run(subscribe_and_receive())
+    
+    # The oldest event is dropped once a subscriber falls behind
+    assert [event["progress_percentage"] for event in received] == [20, 30]
+    assert received[0]["job_id"] == "job-1"
+    assert broker.subscriber_count() == 0
+
+
+def test_stream_of_finished_job_sends_terminal_snapshot(db, client, fake_gemini, pipeline_text):
+    job_id = client.post("/api/extract", files=pdf_upload()).json()["job_id"]
+    run_extraction_job(job_id)
+    
+    with client.stream("GET", f"/api/jobs/{job_id}/events") as response:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = read_events(response)
+    
+    assert [name for name, _ in events] == ["completed"]
+    assert events[0][1]["progress_percentage"] == 100
+    assert events[0][1]["download_url"]
+
+
+def test_stream_follows_running_job_until_completion(db, client, fake_gemini, pipeline_text, monkeypatch):
+    monkeypatch.setattr(settings, "SSE_KEEPALIVE_SECONDS", 0.2)
+    job_id = client.post("/api/extract", files=pdf_upload()).json()["job_id"]
+    
+    def run_once_subscribed():
+        deadline = time.time() + 10
+        while not job_event_broker.subscriber_count(job_id) and time.time() < deadline:
+            time.sleep(0.01)
+        run_extraction_job(job_id)
+    
+    # The test client returns the response only once the stream has closed
+    worker = threading.Thread(target=run_once_subscribed)
+    worker.start()
+    with client.stream("GET", f"/api/jobs/{job_id}/events") as response:
+        events = read_events(response)
+    worker.join()
+    
+    assert events[0][0] == "progress"
+    assert events[-1][0] == "completed"
+    steps = [data.get("current_step") for name, data in events if name == "progress"]
+    assert "processing_with_ai" in steps or "generating_excel" in steps
+
+
+def test_stream_of_unknown_job_is_404(db, client):
+    assert client.get("/api/jobs/missing/events").status_code == 404
@@ -0,0 +1,73 @@
+"""Tests for the database-backed job queue: heartbeats and stale job recovery."""
+
+from datetime import datetime, timedelta
+
+from app.database.operations import ExtractionResultService, JobStatusService
+from app.database.schemas import JobStatusEnum
+from app.services.job_queue import JobQueue
+
+
+def start_processing(db, db_job, seconds_ago: int = 0):
+    """Mark a job as processing with its last heartbeat some seconds ago."""
+    db_job.status = JobStatusEnum.PROCESSING
+    db_job.started_at = datetime.utcnow() - timedelta(seconds=seconds_ago)
+    db.commit()
+    db_job.updated_at = datetime.utcnow() - timedelta(seconds=seconds_ago)
+    db.commit()
+    return db_job
+
+
+def test_heartbeat_refreshes_only_processing_jobs(db, create_job):
+    running = start_processing(db, create_job("running.pdf"), seconds_ago=600)
+    pending = create_job("pending.pdf")
+    pending_updated_at = pending.updated_at
+    
+    assert JobStatusService.heartbeat(db, [running.job_id, pending.job_id]) == 1
+    
+    db.refresh(running)
+    db.refresh(pending)
+    assert running.updated_at > datetime.utcnow() - timedelta(seconds=60)
+    assert pending.updated_at == pending_updated_at
+    assert JobStatusService.heartbeat(db, []) == 0
+
+
+def test_requeue_stale_leaves_jobs_with_recent_heartbeat(db, create_job):
+    stale = start_processing(db, create_job("stale.pdf"), seconds_ago=600)
+    alive = start_processing(db, create_job("alive.pdf"), seconds_ago=600)
+    JobStatusService.heartbeat(db, [alive.job_id])
+    
+    assert JobStatusService.requeue_stale(db, stale_after_seconds=300) == 1
+    
+    db.refresh(stale)
+    db.refresh(alive)
+    assert stale.status == JobStatusEnum.PENDING
+    assert stale.current_step == "queued"
+    assert stale.retry_count == 1
+    assert alive.status == JobStatusEnum.PROCESSING
+
+
+def test_requeue_stale_completes_jobs_that_already_stored_a_result(db, create_job):
+    db_job = start_processing(db, create_job("done.pdf"), seconds_ago=600)
+    ExtractionResultService.create(db, file_id=db_job.file_id, excel_filename="done.xlsx", excel_path="done.xlsx")
+    
+    assert JobStatusService.requeue_stale(db, stale_after_seconds=300) == 0
+    
+    db.refresh(db_job)
+    assert db_job.status == JobStatusEnum.COMPLETED
+    assert db_job.progress_percentage == 100
+    assert db_job.retry_count == 0
+
+
+def test_queue_heartbeat_covers_jobs_running_in_this_process(db, create_job):
+    running = start_processing(db, create_job("running.pdf"), seconds_ago=600)
+    other = start_processing(db, create_job("other.pdf"), seconds_ago=600)
+    queue = JobQueue(worker_count=0)
+    queue._active_jobs.add(running.job_id)
+    
+    queue.send_heartbeat()
+    
+    assert JobStatusService.requeue_stale(db, stale_after_seconds=300) == 1
+    db.refresh(running)
+    db.refresh(other)
+    assert running.status == JobStatusEnum.PROCESSING
+    assert other.status == JobStatusEnum.PENDING
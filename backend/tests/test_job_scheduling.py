@@ -0,0 +1,86 @@
+"""Tests for priority classes and per-tenant fair-share claiming."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import pdf_upload
+
+from app.database.operations import JobStatusService
+from app.database.schemas import JobTypeEnum
+
+START = datetime(2024, 1, 1)
+
+
+@pytest.fixture
+def queue_job(db, create_job):
+    """Create a pending job queued a number of seconds after START."""
+    counter = iter(range(1000))
+    
+    def queue(seconds: int, tenant_id: str = "default", job_type: JobTypeEnum = JobTypeEnum.INTERACTIVE):
+        db_job = create_job(f"report_{next(counter)}.pdf", tenant_id=tenant_id, job_type=job_type)
+        db_job.queued_at = START + timedelta(seconds=seconds)
+        db.commit()
+        return db_job.job_id
+    return queue
+
+
+def claim_order(db, count):
+    return [JobStatusService.claim_next_pending(db).job_id for _ in range(count)]
+
+
+def test_interactive_jobs_are_claimed_before_earlier_batch_jobs(db, queue_job):
+    batch = queue_job(0, job_type=JobTypeEnum.BATCH)
+    interactive = queue_job(10)
+    
+    assert claim_order(db, 2) == [interactive, batch]
+    assert JobStatusService.claim_next_pending(db) is None
+
+
+def test_jobs_of_one_tenant_are_claimed_fifo(db, queue_job):
+    jobs = [queue_job(30), queue_job(10), queue_job(20)]
+    
+    assert claim_order(db, 3) == [jobs[1], jobs[2], jobs[0]]
+
+
+def test_tenants_take_turns(db, queue_job):
+    a1, a2, a3 = queue_job(0, "a"), queue_job(1, "a"), queue_job(2, "a")
+    b1, b2 = queue_job(10, "b"), queue_job(11, "b")
+    
+    # Equal running counts - the least recently served tenant goes next
+    assert claim_order(db, 5) == [a1, b1, a2, b2, a3]
+
+
+def test_tenant_with_fewest_running_jobs_goes_first(db, queue_job):
+    queue_job(0, "busy")
+    busy_next = queue_job(1, "busy")
+    quiet = queue_job(50, "quiet")
+    claim_order(db, 1)
+    
+    assert claim_order(db, 2) == [quiet, busy_next]
+
+
+def test_queue_position_accounts_for_priority_and_fair_share(db, queue_job):
+    queue_job(0, job_type=JobTypeEnum.BATCH)
+    queue_job(0, "a")
+    queue_job(1, "a")
+    b1 = queue_job(2, "b")
+    batch_last = queue_job(3, job_type=JobTypeEnum.BATCH)
+    
+    position = JobStatusService.get_queue_position
+    # One earlier "a" job is served before b1's turn; all interactive jobs precede batch ones
+    assert position(db, JobStatusService.get_by_job_id(db, b1)) == 1
+    assert position(db, JobStatusService.get_by_job_id(db, batch_last)) == 4
+
+
+def test_submissions_record_tenant_and_priority(db, client):
+    single = client.post("/api/extract", files=pdf_upload(), headers={"X-Tenant-ID": "acme"}).json()
+    batch = client.post("/api/extract/batch", files=[
+        ("files", ("b.pdf", b"%PDF-1.4 b", "application/pdf"))
+    ], headers={"X-Tenant-ID": "acme"}).json()
+    
+    status = client.get(f"/api/jobs/{single['job_id']}").json()
+    assert (status["tenant_id"], status["priority"], status["job_type"]) == ("acme", 100, "interactive")
+    assert status["queue_position"] == 0
+    batch_job = JobStatusService.get_by_job_id(db, batch["items"][0]["job_id"])
+    assert (batch_job.tenant_id, batch_job.priority) == ("acme", 10)
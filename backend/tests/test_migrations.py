@@ -0,0 +1,180 @@
+"""Tests for Alembic schema migrations of existing databases."""
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database.migrations import BASELINE_REVISION, alembic_config, upgrade_database
+from app.database.operations import JobStatusService
+from app.database.schemas import Base, JobStatusEnum
+from app.services import job_queue as job_queue_module
+from app.services.job_queue import JobQueue
+
+
+def head_revision() -> str:
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def columns(engine, table_name):
+    return {column["name"] for column in inspect(engine).get_columns(table_name)}
+
+
+@pytest.fixture
+def baseline_engine(tmp_path):
+    """Database with the pre-migration schema (as create_all left it) and one job per status."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    with engine.begin() as connection:
+        command.upgrade(alembic_config(connection), BASELINE_REVISION)
+        connection.execute(text("DROP TABLE alembic_version"))
+        connection.execute(text(
+            "INSERT INTO uploaded_files (id, filename, original_filename, file_path, file_size, upload_timestamp) "
+            "VALUES (1, 'a.pdf', 'a.pdf', 'uploads/a.pdf', 10, '2024-01-01 00:00:00'), "
+            "(2, 'b.pdf', 'b.pdf', 'uploads/b.pdf', 10, '2024-01-01 00:00:00')"
+        ))
+        connection.execute(text(
+            "INSERT INTO job_statuses (file_id, job_id, status, progress_percentage, created_at, started_at, retry_count) "
+            "VALUES (1, 'job-1', 'PROCESSING', 40, '2024-01-01 00:00:00', '2024-01-01 00:00:05', 0), "
+            "(2, 'job-2', 'PENDING', 0, '2024-01-02 00:00:00', NULL, 0)"
+        ))
+    yield engine
+    engine.dispose()
+
+
+def test_new_database_is_created_from_models_and_stamped(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'new.db'}")
+    
+    assert upgrade_database(engine) == "created"
+    
+    assert set(Base.metadata.tables) <= set(inspect(engine).get_table_names())
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT version_num FROM alembic_version")).scalar() == head_revision()
+    assert upgrade_database(engine) == "upgraded"
+
+
+def test_unversioned_database_is_stamped_and_upgraded(baseline_engine):
+    assert upgrade_database(baseline_engine) == "upgraded_unversioned"
+    
+    with baseline_engine.connect() as connection:
+        assert connection.execute(text("SELECT version_num FROM alembic_version")).scalar() == head_revision()
+    assert upgrade_database(baseline_engine) == "upgraded"
+
+
+def test_job_type_backfills_existing_jobs_as_interactive(baseline_engine):
+    upgrade_database(baseline_engine)
+    
+    assert "job_type" in columns(baseline_engine, "job_statuses")
+    with baseline_engine.connect() as connection:
+        job_types = connection.execute(text("SELECT job_type FROM job_statuses")).scalars().all()
+    assert job_types == ["INTERACTIVE", "INTERACTIVE"]
+
+
+def test_job_heartbeat_columns_are_backfilled(baseline_engine):
+    upgrade_database(baseline_engine)
+    
+    with baseline_engine.connect() as connection:
+        rows = connection.execute(text(
+            "SELECT job_id, template_id, updated_at FROM job_statuses ORDER BY job_id"
+        )).all()
+    assert [(job_id, template_id) for job_id, template_id, _ in rows] == [
+        ("job-1", "fund_report_v1"), ("job-2", "fund_report_v1")
+    ]
+    assert [str(updated_at) for _, _, updated_at in rows] == ["2024-01-01 00:00:05", "2024-01-02 00:00:00"]
+    nullable = {column["name"]: column["nullable"] for column in inspect(baseline_engine).get_columns("job_statuses")}
+    assert nullable["updated_at"] is False
+
+
+def test_deduplication_columns_are_added_empty(baseline_engine):
+    upgrade_database(baseline_engine)
+    
+    assert "content_hash" in columns(baseline_engine, "uploaded_files")
+    assert {"template_id", "model_config", "prompt_version"} <= columns(baseline_engine, "extraction_results")
+    indexes = {index["name"] for index in inspect(baseline_engine).get_indexes("uploaded_files")}
+    assert "ix_uploaded_files_content_hash" in indexes
+    with baseline_engine.connect() as connection:
+        assert connection.execute(text("SELECT content_hash FROM uploaded_files")).scalars().all() == [None, None]
+
+
+def test_extraction_locks_table_is_created(baseline_engine):
+    upgrade_database(baseline_engine)
+    
+    assert {"lock_key", "job_id", "created_at"} <= columns(baseline_engine, "extraction_locks")
+    unique = {index["name"] for index in inspect(baseline_engine).get_indexes("extraction_locks") if index["unique"]}
+    assert unique == {"ix_extraction_locks_lock_key"}
+
+
+def test_batch_table_and_job_reference_are_added(baseline_engine):
+    upgrade_database(baseline_engine)
+    
+    assert "extraction_batches" in inspect(baseline_engine).get_table_names()
+    foreign_keys = inspect(baseline_engine).get_foreign_keys("job_statuses")
+    assert {(fk["referred_table"], tuple(fk["constrained_columns"])) for fk in foreign_keys} == {
+        ("uploaded_files", ("file_id",)), ("extraction_batches", ("batch_id",))
+    }
+    indexes = {index["name"] for index in inspect(baseline_engine).get_indexes("job_statuses")}
+    assert {"ix_job_statuses_batch_id", "ix_job_statuses_job_id", "ix_job_statuses_job_type"} <= indexes
+    with baseline_engine.connect() as connection:
+        assert connection.execute(text("SELECT COUNT(*) FROM job_statuses")).scalar() == 2
+
+
+def test_scheduling_fields_are_backfilled(baseline_engine):
+    # Batch jobs only exist from the revision before the scheduling fields
+    with baseline_engine.begin() as connection:
+        command.stamp(alembic_config(connection), BASELINE_REVISION)
+        command.upgrade(alembic_config(connection), "92c8d5e3a065")
+        connection.execute(text("UPDATE job_statuses SET job_type = 'BATCH' WHERE job_id = 'job-2'"))
+    
+    upgrade_database(baseline_engine)
+    
+    with baseline_engine.connect() as connection:
+        rows = connection.execute(text(
+            "SELECT job_id, priority, tenant_id, queued_at FROM job_statuses ORDER BY job_id"
+        )).all()
+    assert [tuple(row[:3]) for row in rows] == [("job-1", 100, "default"), ("job-2", 10, "default")]
+    assert [str(row[3]) for row in rows] == ["2024-01-01 00:00:00", "2024-01-02 00:00:00"]
+
+
+def test_idempotency_key_is_added_with_index(baseline_engine):
+    upgrade_database(baseline_engine)
+    
+    assert "idempotency_key" in columns(baseline_engine, "job_statuses")
+    indexes = {index["name"] for index in inspect(baseline_engine).get_indexes("job_statuses")}
+    assert "ix_job_statuses_idempotency_key" in indexes
+
+
+def test_result_excel_filename_is_indexed(baseline_engine):
+    upgrade_database(baseline_engine)
+    
+    indexes = {index["name"] for index in inspect(baseline_engine).get_indexes("extraction_results")}
+    assert "ix_extraction_results_excel_filename" in indexes
+
+
+def test_upgraded_baseline_matches_models(baseline_engine):
+    upgrade_database(baseline_engine)
+    
+    with baseline_engine.connect() as connection:
+        context = MigrationContext.configure(connection, opts={"compare_type": True})
+        assert compare_metadata(context, Base.metadata) == []
+
+
+def test_startup_recovers_jobs_on_upgraded_baseline(baseline_engine, monkeypatch):
+    upgrade_database(baseline_engine)
+    monkeypatch.setattr(job_queue_module, "SessionLocal", sessionmaker(bind=baseline_engine))
+    
+    queue = JobQueue(worker_count=0)
+    queue.start()
+    queue.stop()
+    
+    db = Session(bind=baseline_engine)
+    try:
+        recovered = JobStatusService.get_by_job_id(db, "job-1")
+        assert recovered.status == JobStatusEnum.PENDING
+        assert recovered.retry_count == 1
+        claimed = JobStatusService.claim_next_pending(db)
+        assert claimed.job_id == "job-1"
+        assert claimed.status == JobStatusEnum.PROCESSING
+    finally:
+        db.close()
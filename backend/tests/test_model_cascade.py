@@ -0,0 +1,84 @@
+"""Tests for fill-rate scoring and the fast/strong model cascade."""
+
+import pytest
+
+from app.settings import settings
+from app.services.ai_processor import GeminiExtractor, SECTION_KEYS, current_model_config
+
+
+@pytest.fixture
+def cascade_models(monkeypatch):
+    monkeypatch.setattr(settings, "GEMINI_FAST_MODEL", "fast-model")
+    monkeypatch.setattr(settings, "GEMINI_STRONG_MODEL", "strong-model")
+    monkeypatch.setattr(settings, "CASCADE_MIN_FILL_RATE", 0.5)
+
+
+def test_score_sections_counts_populated_leaves():
+    extractor = GeminiExtractor()
+    scores = extractor.score_sections({
+        "portfolio_summary": {"fund_name": "Fund II", "nav": None, "vintage": 0, "gp": ""},
+        "schedule_of_investments": [{"company": "Co 1", "reported_value": 12}],
+        "pcap_statement": {"nav_movements_header": "ignored", "row": {"current_period": 1, "prior_period": None}},
+        "footnotes": []
+    })
+    
+    assert set(scores) == set(SECTION_KEYS)
+    assert scores["portfolio_summary"] == 0.25
+    assert scores["schedule_of_investments"] == 1.0
+    assert scores["pcap_statement"] == 0.5
+    assert scores["footnotes"] == 0.0
+    assert scores["reference_values"] == 0.0
+
+
+def test_find_failed_sections_flags_empty_and_mistyped_sections(report_data):
+    extractor = GeminiExtractor()
+    report_data["footnotes"] = []
+    report_data["pcap_statement"] = ["not", "an", "object"]
+    
+    assert extractor.find_failed_sections(report_data) == ["pcap_statement", "footnotes"]
+
+
+def test_cascade_escalates_only_weak_sections(fake_gemini, cascade_models, report_data):
+    weak = dict(report_data, footnotes=[], statement_of_cashflows={})
+    strong = dict(report_data, footnotes=[{"note_number": 2, "note_header": "Strong", "description": "Better"}])
+    strong["statement_of_cashflows"] = {}
+    fake_gemini.responses = {"fast-model": weak, "strong-model": strong}
+    
+    extractor = GeminiExtractor(model_name=settings.GEMINI_FAST_MODEL)
+    data = extractor.extract_with_cascade("short document text")
+    
+    assert fake_gemini.models_called() == ["fast-model", "strong-model"]
+    strong_prompt = fake_gemini.calls[1][1]
+    assert "footnotes" in strong_prompt and "statement_of_cashflows" in strong_prompt
+    assert data["footnotes"] == strong["footnotes"]
+    assert data["statement_of_cashflows"] == {}
+    assert extractor.escalated_sections == ["footnotes"]
+    assert extractor.models_used_label == "fast-model+strong-model"
+
+
+def test_cascade_skips_escalation_when_all_sections_pass(fake_gemini, cascade_models):
+    extractor = GeminiExtractor(model_name=settings.GEMINI_FAST_MODEL)
+    extractor.extract_with_cascade("short document text")
+    
+    assert fake_gemini.models_called() == ["fast-model"]
+    assert extractor.models_used_label == "fast-model"
+
+
+def test_cascade_keeps_fast_results_when_escalation_fails(fake_gemini, cascade_models, report_data):
+    weak = dict(report_data, footnotes=[])
+    fake_gemini.responses = {"fast-model": weak, "strong-model": RuntimeError("quota exceeded")}
+    
+    extractor = GeminiExtractor(model_name=settings.GEMINI_FAST_MODEL)
+    data = extractor.extract_with_cascade("short document text", max_retries=1)
+    
+    assert data["footnotes"] == []
+    assert extractor.escalated_sections == []
+    assert extractor.models_used_label == "fast-model"
+
+
+def test_model_config_describes_cascade(monkeypatch, cascade_models):
+    monkeypatch.setattr(settings, "EXTRACTION_MODE", "cascade")
+    assert current_model_config() == "cascade:fast-model>strong-model"
+    
+    monkeypatch.setattr(settings, "EXTRACTION_MODE", "single")
+    assert current_model_config() == settings.GEMINI_MODEL
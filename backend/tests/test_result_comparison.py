@@ -0,0 +1,152 @@
+"""Tests for the result comparison engine and its endpoints."""
+
+import copy
+import io
+from datetime import datetime
+
+import pytest
+from openpyxl import load_workbook
+
+from app.services.result_comparison import (
+    SheetTable,
+    compare_tables,
+    result_tables,
+    values_equivalent
+)
+from app.services.spreadsheet_creator import render_excel_bytes
+
+
+@pytest.mark.parametrize("left, right, equivalent", [
+    (1234.5, "1,234.50", True),
+    ("(250)", -250, True),
+    (0, "n/a", True),
+    ("", None, True),
+    ("Not Found", "-", True),
+    ("Fund II", " fund ii ", True),
+    (datetime(2024, 12, 31), "2024-12-31", True),
+    (100, 100.005, True),
+    (100, 100.02, False),
+    ("abc", None, False),
+    (True, 1, False),
+    ("1.2.3", "1.2.3", True),
+    ("Fund II", "Fund III", False)
+])
+def test_values_equivalent_with_default_tolerances(left, right, equivalent):
+    assert values_equivalent(left, right, abs_tol=0.01, rel_tol=0) is equivalent
+
+
+def test_relative_tolerance_scales_with_magnitude():
+    assert values_equivalent(1_000_000, 1_000_500, abs_tol=0, rel_tol=0.001)
+    assert not values_equivalent(100, 100.5, abs_tol=0, rel_tol=0.001)
+
+
+def schedule(*rows):
+    return SheetTable("Schedule", ["Company", "NAV"], [list(row) for row in rows], key_columns=(0,))
+
+
+def test_rows_align_on_key_columns_not_position():
+    left = schedule(("Co 1", 10), ("Co 2", 20), ("Co 3", 30))
+    right = schedule(("co 3", 30), ("Co 1", 10), ("Co 2", 25), ("Co 4", 40))
+    
+    result = compare_tables([left], [right], abs_tol=0.01, rel_tol=0)
+    
+    sheet = result["summary"]["sheets"][0]
+    assert (sheet["rows_matched"], sheet["rows_only_left"], sheet["rows_only_right"]) == (3, 0, 1)
+    assert [difference[:5] for difference in result["differences"]] == [
+        ["Schedule", ["Co 2"], 2, 3, "NAV"],
+        ["Schedule", ["Co 4"], None, 4, "Company"],
+        ["Schedule", ["Co 4"], None, 4, "NAV"]
+    ]
+    assert result["summary"]["total_cells"] == 8
+    assert result["summary"]["accuracy"] == 62.5
+
+
+def test_repeated_keys_match_in_order():
+    left = schedule(("Co 1", 10), ("Co 1", 20))
+    right = schedule(("Co 1", 10), ("Co 1", 21))
+    
+    differences = compare_tables([left], [right], abs_tol=0.01, rel_tol=0)["differences"]
+    
+    assert [(difference[2], difference[3], difference[6]) for difference in differences] == [(2, 2, 21)]
+
+
+def test_columns_align_on_headers_and_sheets_on_names():
+    left = SheetTable("Sheet A", ["Company", "NAV", "IRR"], [["Co 1", 10, 0.1]])
+    right = SheetTable("sheet a", ["nav", "Company", "TVPI"], [[10, "Co 1", 1.5]])
+    extra = SheetTable("Sheet B", ["X"], [[1]])
+    
+    sheets = compare_tables([left], [right, extra], abs_tol=0.01, rel_tol=0)["summary"]["sheets"]
+    
+    assert sheets[0]["columns_only_left"] == ["IRR"]
+    assert sheets[0]["columns_only_right"] == ["TVPI"]
+    assert sheets[0]["matches"] == 2
+    assert (sheets[1]["name"], sheets[1]["missing"]) == ("Sheet B", "left")
+
+
+def test_identical_results_have_no_differences(report_data):
+    tables = result_tables(report_data, "fund_report_v1")
+    
+    summary = compare_tables(tables, result_tables(copy.deepcopy(report_data), "fund_report_v1"), 0.01, 0)["summary"]
+    
+    assert summary["differences"] == 0
+    assert summary["accuracy"] == 100.0
+
+
+@pytest.fixture
+def result_pair(store_result, report_data):
+    """IDs of a result and a copy with one changed value and one extra investment."""
+    changed = copy.deepcopy(report_data)
+    changed["schedule_of_investments"][2]["reported_value"] = 99
+    changed["schedule_of_investments"].append({"company": "Co 6", "fund": "Fund II"})
+    return store_result(report_data), store_result(changed, filename="changed.pdf")
+
+
+def test_compare_results_pages_through_cached_differences(client, result_pair):
+    left_id, right_id = result_pair
+    url = f"/api/results/{left_id}/compare/{right_id}"
+    
+    response = client.get(url, params={"limit": 1})
+    
+    assert response.status_code == 200
+    body = response.json()
+    assert body["left"]["result_id"] == left_id
+    assert body["total_differences"] == 3
+    assert body["differences"] == [{
+        "sheet": "Schedule of Investments", "key": ["Co 3"], "left_row": 3, "right_row": 3,
+        "column": "Reported Value (C)", "left": 36, "right": 99
+    }]
+    
+    etag = response.headers["etag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    
+    page = client.get(f"/api/comparisons/{body['comparison_id']}", params={"skip": 1, "limit": 5}).json()
+    assert [difference["key"] for difference in page["differences"]] == [["Co 6"], ["Co 6"]]
+    filtered = client.get(f"/api/comparisons/{body['comparison_id']}", params={"sheet": "footnotes"}).json()
+    assert filtered["total_differences"] == 0
+    
+    assert client.get(url, params={"abs_tol": 100}).json()["total_differences"] == 2
+    assert client.get("/api/comparisons/unknown").status_code == 404
+
+
+def test_compare_result_with_reference_workbook(client, store_result, report_data):
+    result_id = store_result(report_data)
+    workbook = load_workbook(io.BytesIO(render_excel_bytes(report_data)))
+    workbook["Portfolio Summary"]["B7"] = "Fund Two"
+    workbook["Footnotes"]["B2"] = "basis of presentation"
+    reference = io.BytesIO()
+    workbook.save(reference)
+    
+    response = client.post(
+        f"/api/results/{result_id}/compare",
+        files={"file": ("corrected.xlsx", reference.getvalue(), "application/octet-stream")}
+    )
+    
+    assert response.status_code == 200
+    body = response.json()
+    assert body["right"] == {"reference_filename": "corrected.xlsx"}
+    assert [(d["sheet"], d["key"], d["left"], d["right"]) for d in body["differences"]] == [
+        ("Portfolio Summary", ["Fund Name"], "Fund II", "Fund Two")
+    ]
+    
+    not_xlsx = client.post(f"/api/results/{result_id}/compare", files={"file": ("a.xlsx", b"plain text")})
+    assert not_xlsx.status_code == 400
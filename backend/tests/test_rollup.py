@@ -0,0 +1,147 @@
+"""Tests for keyset iteration over results and consolidated multi-fund rollups."""
+
+import csv
+import io
+import zipfile
+from datetime import datetime
+
+import pytest
+from openpyxl import load_workbook
+from sqlalchemy import event
+
+from app.settings import settings
+from app.database.connection import engine
+from app.database.operations import ExtractionBatchService, ExtractionResultService
+from app.database.schemas import ExtractionResult
+from app.services.extraction_pipeline import run_extraction_job
+from app.services.rollup import ROLLUP_PREFIX_HEADERS, ROLLUP_SHEETS, write_rollup
+
+
+@pytest.fixture
+def result_ids(db, store_result, report_data):
+    """Seven stored results of funds "Fund 0" to "Fund 6" (Fund 3 without a fund name)."""
+    ids = []
+    for i in range(7):
+        data = dict(report_data, portfolio_summary={"fund_name": f"Fund {i}"})
+        if i == 3:
+            data["portfolio_summary"] = {}
+        ids.append(store_result(data, filename=f"fund_{i}.pdf"))
+    return ids
+
+
+@pytest.fixture
+def result_queries():
+    """List that collects the queries on extraction_results run while the test is active."""
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith("SELECT") and "FROM extraction_results" in statement:
+            statements.append(statement)
+    event.listen(engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def test_iter_with_data_pages_across_batch_boundaries(db, store_result, result_ids, result_queries):
+    store_result(None, filename="no_data.pdf")
+    result_queries.clear()
+    
+    rows = list(ExtractionResultService.iter_with_data(db, batch_size=3))
+    
+    assert [row.id for row in rows] == result_ids
+    assert rows[0].original_filename == "fund_0.pdf"
+    assert rows[1].extracted_data["portfolio_summary"] == {"fund_name": "Fund 1"}
+    # Batches of 3, 3 and 1 rows; the short batch is followed by one empty query
+    assert len(result_queries) == 4
+
+
+def test_iter_with_data_filters(db, store_result, result_ids):
+    batch_id = ExtractionBatchService.create(db).batch_id
+    batched = store_result({"portfolio_summary": {}}, filename="batched.pdf", batch_id=batch_id)
+    db.query(ExtractionResult).filter(ExtractionResult.id == result_ids[0]).update({
+        ExtractionResult.template_id: "other_template",
+        ExtractionResult.extraction_timestamp: datetime(2024, 1, 1)
+    })
+    db.commit()
+    
+    def ids(**filters):
+        return [row.id for row in ExtractionResultService.iter_with_data(db, batch_size=2, **filters)]
+    
+    assert ids(result_ids=result_ids[2:5]) == result_ids[2:5]
+    assert ids(template_id="other_template") == [result_ids[0]]
+    assert ids(batch_id=batch_id) == [batched]
+    assert ids(extracted_to=datetime(2025, 1, 1)) == [result_ids[0]]
+    assert result_ids[0] not in ids(extracted_from=datetime(2025, 1, 1))
+
+
+def test_batch_filter_includes_deduplicated_uploads(db, client, fake_gemini, pipeline_text):
+    single = client.post("/api/extract", files={"file": ("a.pdf", b"%PDF-1.4 a", "application/pdf")}).json()
+    run_extraction_job(single["job_id"])
+    response = client.post("/api/extract/batch", files=[
+        ("files", (name, content, "application/octet-stream"))
+        for name, content in [("a.pdf", b"%PDF-1.4 a"), ("b.pdf", b"%PDF-1.4 b")]
+    ])
+    batch = response.json()
+    assert batch["items"][0]["deduplicated"] is True
+    run_extraction_job(batch["items"][1]["job_id"])
+    
+    rows = list(ExtractionResultService.iter_with_data(db, batch_size=10, batch_id=batch["batch_id"]))
+    
+    assert [row.original_filename for row in rows] == ["a.pdf", "b.pdf"]
+    rollup = client.get("/api/rollups", params={"batch_id": batch["batch_id"]})
+    assert rollup.headers["x-rollup-results"] == "2"
+
+
+@pytest.mark.parametrize("engine_name", ["openpyxl", "fast"])
+def test_xlsx_rollup_prefixes_rows_with_their_result(db, result_ids, monkeypatch, tmp_path, engine_name):
+    monkeypatch.setattr(settings, "EXCEL_ENGINE", engine_name)
+    monkeypatch.setattr(settings, "ROLLUP_QUERY_BATCH", 2)
+    output_path = str(tmp_path / "rollup.xlsx")
+    
+    stats = write_rollup(db, output_path)
+    
+    assert stats == {"results": 7, "rows": {
+        "Schedule of Investments": 35, "PCAP Statement": 21, "Statement of Cashflows": 21
+    }}
+    workbook = load_workbook(output_path)
+    assert workbook.sheetnames == list(ROLLUP_SHEETS)
+    ws = workbook["Schedule of Investments"]
+    rows = list(ws.values)
+    assert list(rows[0][:3]) == ROLLUP_PREFIX_HEADERS
+    assert rows[0][3] == "Company"
+    assert rows[1][:4] == (result_ids[0], "Fund 0", "fund_0.pdf", "Co 1")
+    assert rows[16][:3] == (result_ids[3], "fund_3.pdf", "fund_3.pdf")
+    assert ws.freeze_panes == "D2"
+    assert ws.cell(row=2, column=4 + 11).number_format == "#,##0.00;(#,##0.00)"
+
+
+def test_csv_rollup_zips_one_file_per_sheet(db, result_ids, tmp_path):
+    output_path = str(tmp_path / "rollup.zip")
+    
+    write_rollup(db, output_path, "csv", result_ids=result_ids[:2])
+    
+    with zipfile.ZipFile(output_path) as archive:
+        assert sorted(archive.namelist()) == [
+            "pcap_statement.csv", "schedule_of_investments.csv", "statement_of_cashflows.csv"
+        ]
+        rows = list(csv.reader(io.TextIOWrapper(archive.open("pcap_statement.csv"), encoding="utf-8")))
+    assert rows[0][:4] == ROLLUP_PREFIX_HEADERS + ["Description"]
+    assert len(rows) == 1 + 2 * 3
+    assert rows[4][:3] == [str(result_ids[1]), "Fund 1", "fund_1.pdf"]
+
+
+def test_rollup_rejects_unknown_format(db, tmp_path):
+    with pytest.raises(ValueError, match="Unknown rollup format"):
+        write_rollup(db, str(tmp_path / "rollup.pdf"), "pdf")
+
+
+def test_rollup_endpoint(client, result_ids):
+    response = client.get("/api/rollups", params={"result_ids": result_ids[:3]})
+    
+    assert response.status_code == 200
+    assert response.headers["x-rollup-results"] == "3"
+    assert response.headers["content-disposition"].startswith('attachment; filename="rollup_')
+    workbook = load_workbook(io.BytesIO(response.content))
+    assert workbook["PCAP Statement"].max_row == 1 + 3 * 3
+    
+    assert client.get("/api/rollups", params={"format": "pdf"}).status_code == 400
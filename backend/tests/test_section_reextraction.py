@@ -0,0 +1,129 @@
+"""Tests for page-scoped re-extraction of failed sections."""
+
+import threading
+import time
+
+import pytest
+
+import app_server
+from app.settings import settings
+from app.services.ai_processor import GeminiExtractor
+from app.services.extraction_pipeline import ExtractionPipeline
+from app.services.single_flight import extraction_single_flight
+from app.database.operations import ExtractionResultService, JobStatusService
+from app.database.schemas import JobStatusEnum
+
+DOCUMENT_TEXT = "\n".join([
+    "--- Page 1 --- Portfolio summary and net asset value",
+    "--- Page 2 --- Schedule of investments",
+    "--- Page 3 --- Notes to the financial statements",
+    "--- Page 4 --- Continued notes",
+    "--- Page 5 --- Appendix"
+])
+
+NOTES = [{"note_number": 1, "note_header": "Basis of presentation", "description": "Notes"}]
+
+
+def test_reextract_sends_only_the_section_pages(fake_gemini, report_data):
+    data = dict(report_data, footnotes=[])
+    fake_gemini.default = dict(report_data, footnotes=NOTES)
+    
+    improved = GeminiExtractor().reextract_sections(DOCUMENT_TEXT, data, ["footnotes"])
+    
+    prompt = fake_gemini.calls[0][1]
+    assert "--- Page 3 ---" in prompt and "--- Page 4 ---" in prompt
+    assert "--- Page 1 ---" not in prompt and "--- Page 5 ---" not in prompt
+    assert improved == ["footnotes"]
+    assert data["footnotes"] == NOTES
+
+
+def test_reextract_keeps_sections_that_did_not_improve(fake_gemini, report_data):
+    data = dict(report_data, footnotes=[{"note_number": 1, "note_header": "Kept", "description": None}])
+    fake_gemini.default = dict(report_data, footnotes=[])
+    
+    improved = GeminiExtractor().reextract_sections(DOCUMENT_TEXT, data, ["footnotes"])
+    
+    assert improved == []
+    assert data["footnotes"][0]["note_header"] == "Kept"
+
+
+def test_reextract_skips_unlocated_sections_when_pages_are_required(fake_gemini, report_data):
+    data = dict(report_data, statement_of_cashflows={})
+    
+    improved = GeminiExtractor().reextract_sections(
+        DOCUMENT_TEXT, data, ["statement_of_cashflows"], require_pages=True
+    )
+    
+    assert improved == []
+    assert fake_gemini.calls == []
+
+
+@pytest.fixture
+def cascade_pipeline(monkeypatch, create_job):
+    monkeypatch.setattr(settings, "EXTRACTION_MODE", "cascade")
+    monkeypatch.setattr(settings, "GEMINI_FAST_MODEL", "fast-model")
+    monkeypatch.setattr(settings, "GEMINI_STRONG_MODEL", "strong-model")
+    monkeypatch.setattr(settings, "AUTO_REEXTRACT_SECTIONS", True)
+    monkeypatch.setattr(settings, "EXCEL_OUTPUT_MODE", "lazy")
+    monkeypatch.setattr(ExtractionPipeline, "_extract_text", lambda self, pdf_path: DOCUMENT_TEXT)
+    return create_job()
+
+
+def test_cascade_pipeline_reextracts_on_the_strong_model(db, fake_gemini, report_data, cascade_pipeline):
+    # Page 1 is only sent with the whole document (extraction and escalation), not the scoped retry
+    fake_gemini.responses = {
+        "fast-model": dict(report_data, footnotes=[]),
+        "strong-model": lambda prompt: dict(report_data, footnotes=[] if "--- Page 1 ---" in prompt else NOTES)
+    }
+    
+    ExtractionPipeline(db, cascade_pipeline.job_id).run()
+    
+    assert fake_gemini.models_called() == ["fast-model", "strong-model", "strong-model"]
+    db_job = JobStatusService.get_by_job_id(db, cascade_pipeline.job_id)
+    assert db_job.status == JobStatusEnum.COMPLETED
+    db_result = ExtractionResultService.get_by_file_id(db, db_job.file_id)
+    assert db_result.extracted_data["footnotes"] == NOTES
+    assert db_result.gemini_model_used == "fast-model+strong-model"
+
+
+@pytest.fixture
+def reextract_url(monkeypatch, store_result, report_data):
+    """Re-extraction URL of a stored result whose footnotes are missing."""
+    monkeypatch.setattr(app_server, "extract_text_from_pdf", lambda pdf_path: DOCUMENT_TEXT)
+    return f"/api/results/{store_result(dict(report_data, footnotes=[]))}/reextract"
+
+
+def test_reextract_endpoint_is_admission_controlled(client, fake_gemini, reextract_url, monkeypatch):
+    # The stored result's own pending job fills the queue
+    monkeypatch.setattr(settings, "ADMISSION_MAX_QUEUE_DEPTH", 1)
+    
+    response = client.post(reextract_url, json={"sections": ["footnotes"]})
+    
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+    assert fake_gemini.calls == []
+
+
+def test_concurrent_reextractions_of_a_result_are_serialized(db, client, fake_gemini, reextract_url):
+    result_id = int(reextract_url.split("/")[3])
+    responses = []
+    request = threading.Thread(
+        target=lambda: responses.append(client.post(reextract_url, json={"sections": ["footnotes"]}))
+    )
+    
+    with extraction_single_flight.hold(f"reextract:{result_id}"):
+        request.start()
+        time.sleep(0.2)
+        assert fake_gemini.calls == []
+        # A re-extraction holding the lock writes its section
+        data = dict(ExtractionResultService.get_by_id(db, result_id).extracted_data)
+        data["portfolio_summary"] = dict(data["portfolio_summary"], fund_name="Fund III")
+        ExtractionResultService.update_extracted_data(db, result_id, data)
+    request.join(timeout=10)
+    
+    assert responses[0].status_code == 200, responses[0].text
+    assert responses[0].json()["improved_sections"] == ["footnotes"]
+    db.expire_all()
+    stored = ExtractionResultService.get_by_id(db, result_id).extracted_data
+    assert stored["portfolio_summary"]["fund_name"] == "Fund III"
+    assert stored["footnotes"] == NOTES
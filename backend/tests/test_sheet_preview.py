@@ -0,0 +1,91 @@
+"""Tests for paginated JSON sheet previews built from stored extracted data."""
+
+import pytest
+
+from app.services.sheet_preview import find_sheet_spec, sheet_page
+
+
+@pytest.fixture
+def result_id(store_result, report_data):
+    report_data["schedule_of_investments"] = [
+        {"company": f"Co {i}", "reported_value": i * 12} for i in range(1, 251)
+    ]
+    return store_result(report_data)
+
+
+def test_find_sheet_spec_by_name_or_section():
+    assert find_sheet_spec("PCAP Statement", "fund_report_v1").section == "pcap_statement"
+    assert find_sheet_spec("pcap_statement", "fund_report_v1").name == "PCAP Statement"
+    assert find_sheet_spec("Balance Sheet", "fund_report_v1") is None
+
+
+def test_list_sheets_reports_row_counts(client, result_id):
+    response = client.get(f"/api/results/{result_id}/sheets")
+    
+    assert response.status_code == 200
+    counts = {sheet["name"]: sheet["total_rows"] for sheet in response.json()["sheets"]}
+    assert counts["Schedule of Investments"] == 250
+    assert counts["Statement of Cashflows"] == 3
+    assert counts["Reference Values"] == 2
+    assert counts["Portfolio Summary"] == 37
+    
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+    assert client.get(f"/api/results/{result_id}/sheets", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_rows_sheet_is_paginated(client, result_id):
+    response = client.get(f"/api/results/{result_id}/sheets/schedule_of_investments?skip=200&limit=100")
+    
+    assert response.status_code == 200
+    page = response.json()
+    assert page["sheet"] == "Schedule of Investments"
+    assert page["total_rows"] == 250
+    assert len(page["rows"]) == 50
+    assert page["rows"][0][0] == "Co 201"
+    assert page["columns"][0] == {"name": "Company", "format": None}
+
+
+def test_page_selects_columns_by_key_or_label(client, result_id):
+    url = f"/api/results/{result_id}/sheets/Schedule of Investments"
+    page = client.get(url, params={"limit": 2, "columns": ["reported_value", "Company"]}).json()
+    
+    assert page["columns"] == [
+        {"name": "Reported Value (C)", "format": "currency"},
+        {"name": "Company", "format": None}
+    ]
+    assert page["rows"] == [[12, "Co 1"], [24, "Co 2"]]
+    assert client.get(url, params={"columns": "company"}).json()["rows"][0] == ["Co 1"]
+    
+    unknown = client.get(url, params={"columns": "ebitda"})
+    assert unknown.status_code == 400
+    assert "ebitda" in unknown.json()["detail"]
+
+
+def test_section_rows_are_relative_to_the_page(report_data):
+    spec = find_sheet_spec("Portfolio Summary", "fund_report_v1")
+    
+    full = sheet_page(spec, report_data, 0, 100)
+    page = sheet_page(spec, report_data, 25, 10)
+    
+    assert full["section_rows"] == [24, 29]
+    assert page["section_rows"] == [4]
+    assert page["rows"][4][0] == "Portfolio Breakdown By Industry"
+
+
+def test_sheet_pages_are_compressed_and_revalidated(client, result_id):
+    url = f"/api/results/{result_id}/sheets/Schedule of Investments?limit=250"
+    response = client.get(url, headers={"Accept-Encoding": "gzip"})
+    
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()["rows"]) == 250
+    assert client.get(url, headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+
+
+def test_sheet_errors(client, store_result, result_id):
+    no_data = store_result(None, filename="empty.pdf")
+    
+    assert client.get(f"/api/results/{result_id}/sheets/Balance Sheet").status_code == 404
+    assert client.get("/api/results/999/sheets").status_code == 404
+    assert client.get(f"/api/results/{no_data}/sheets").status_code == 409
+    assert client.get(f"/api/results/{result_id}/sheets/footnotes?limit=0").status_code == 422
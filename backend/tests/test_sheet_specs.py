@@ -0,0 +1,135 @@
+"""Tests for the declarative sheet spec registry and its row engine."""
+
+import csv
+import io
+
+import pytest
+
+from app.templates.sheet_specs import (
+    FUND_REPORT_SHEETS,
+    MAX_COLUMN_WIDTH,
+    WIDTH_PADDING,
+    ColumnWidthTracker,
+    SheetSpec,
+    get_sheet_spec,
+    get_sheet_specs
+)
+
+
+def test_registry_lists_fund_report_sheets_in_workbook_order():
+    names = [spec.name for spec in get_sheet_specs("fund_report_v1")]
+    
+    assert names == [
+        "Portfolio Summary", "Schedule of Investments", "Statement of Operations",
+        "Statement of Cashflows", "PCAP Statement", "Portfolio Company Profile",
+        "Portfolio Company Financials", "Footnotes", "Reference Values"
+    ]
+    assert get_sheet_specs("unknown_template") is FUND_REPORT_SHEETS
+
+
+def test_get_sheet_spec_looks_up_by_name():
+    spec = get_sheet_spec("Schedule of Investments")
+    
+    assert spec.section == "schedule_of_investments"
+    assert spec.key_columns == (0,)
+    assert get_sheet_spec("Missing Sheet") is None
+
+
+def test_spec_rejects_unknown_orientation_and_formats():
+    with pytest.raises(ValueError, match="orientation"):
+        SheetSpec("Bad", "section", "diagonal")
+    with pytest.raises(ValueError, match="number formats"):
+        SheetSpec("Bad", "section", "rows", columns=[("A", "a")], number_formats={"a": "roman"})
+
+
+def test_rows_sheet_maps_items_through_keys():
+    spec = get_sheet_spec("Schedule of Investments")
+    sheet = spec.build([{"company": "Co 1", "reported_value": 12, "unknown": "ignored"}])
+    
+    assert sheet.headers == list(spec.labels)
+    row = sheet.rows[0]
+    assert row[0] == "Co 1"
+    assert row[spec.keys.index("reported_value")] == 12
+    assert row[spec.keys.index("fund")] == ""
+    assert spec.column_formats[spec.keys.index("reported_value")] == "currency"
+    assert 0 not in spec.column_formats
+
+
+def test_fields_sheet_marks_section_label_rows():
+    spec = get_sheet_spec("Portfolio Summary")
+    sheet = spec.build({"fund_name": "Fund II", "nav": 100})
+    
+    assert sheet.headers == ["Field", "Value"]
+    assert ["Fund Name", "Fund II"] in sheet.rows
+    assert ["NAV", 100] in sheet.rows
+    assert [sheet.rows[i][0] for i in sheet.section_rows] == [
+        "Portfolio Breakdown By Region", "Portfolio Breakdown By Industry"
+    ]
+
+
+def test_transposed_sheet_has_one_row_per_period(report_data):
+    spec = get_sheet_spec("Statement of Cashflows")
+    sheet = spec.build(report_data["statement_of_cashflows"])
+    column = spec.labels.index("Purchase of investments") + 1
+    
+    assert sheet.headers[0] == "Description"
+    assert [row[0] for row in sheet.rows] == ["Current Period", "Prior Period", "Year to Date"]
+    assert [row[column] for row in sheet.rows] == [-1, -2, -3]
+    assert sheet.rows[0][1] == ""
+
+
+def test_columns_sheet_pads_to_longest_list(report_data):
+    sheet = get_sheet_spec("Reference Values").build(report_data["reference_values"])
+    
+    assert sheet.headers == ["Currencies", "Industries"]
+    assert sheet.rows == [["USD", "IT"], ["EUR", None]]
+
+
+def test_missing_section_builds_empty_sheet():
+    for spec in get_sheet_specs():
+        sheet = spec.build(None)
+        if spec.orientation in ("rows", "columns"):
+            assert sheet.rows == []
+        else:
+            assert all(value == "" for row in sheet.rows for value in row[1:])
+
+
+def test_records_and_csv_share_the_row_engine(report_data):
+    spec = get_sheet_spec("Footnotes")
+    records = spec.records(report_data["footnotes"])
+    
+    assert records == [{
+        "Note #": 1, "Note Header": "Basis of presentation",
+        "Operating Data Date": "", "Description": "Notes"
+    }]
+    
+    stream = io.StringIO(newline="")
+    assert spec.write_csv(report_data["footnotes"], stream) == 1
+    stream.seek(0)
+    assert list(csv.reader(stream)) == [
+        list(spec.headers), ["1", "Basis of presentation", "", "Notes"]
+    ]
+
+
+def test_width_tracker_measures_longest_value_plus_padding():
+    widths = ColumnWidthTracker(["Company", "NAV", ""])
+    widths.update(["Co 1", 1_250_000.5, None])
+    widths.update(["A much longer name", 0, ""])
+    
+    assert widths.max_lengths == [18, 9, 0]
+    assert widths.widths() == [18 + WIDTH_PADDING, 9 + WIDTH_PADDING, WIDTH_PADDING]
+    assert not widths.saturated
+
+
+def test_width_tracker_stops_measuring_capped_columns():
+    widths = ColumnWidthTracker(["Description", "#"])
+    widths.update(["x" * 200, 1])
+    
+    assert widths.widths() == [MAX_COLUMN_WIDTH, 1 + WIDTH_PADDING]
+    assert widths.max_lengths[0] == 200
+    widths.update(["y" * 500, 123])
+    assert widths.max_lengths == [200, 3]
+    
+    widths.update([1, "z" * MAX_COLUMN_WIDTH])
+    assert widths.saturated
+    assert widths.widths() == [MAX_COLUMN_WIDTH, MAX_COLUMN_WIDTH]
@@ -0,0 +1,70 @@
+"""Tests for single-flight coalescing of identical extraction requests."""
+
+import threading
+
+from conftest import pdf_upload
+
+from app.database.operations import ExtractionLockService
+from app.database.schemas import ExtractionLock, JobStatusEnum
+from app.services.extraction_pipeline import run_extraction_job
+from app.services.single_flight import extraction_single_flight
+
+KEY = extraction_single_flight.make_key("a" * 64, "fund_report_v1")
+
+
+def test_lock_is_exclusive_per_key(db):
+    assert ExtractionLockService.acquire(db, KEY, "job-1") is None
+    
+    existing = ExtractionLockService.acquire(db, KEY, "job-2")
+    
+    assert existing.job_id == "job-1"
+    assert ExtractionLockService.release(db, KEY, "job-2") is False
+    assert ExtractionLockService.release_by_job_id(db, "job-1") == 1
+    assert ExtractionLockService.acquire(db, KEY, "job-2") is None
+
+
+def test_acquire_attaches_to_in_flight_holder(db, create_job):
+    holder = create_job("holder.pdf")
+    assert extraction_single_flight.acquire(db, KEY, holder.job_id) is None
+    
+    attached = extraction_single_flight.acquire(db, KEY, "job-2")
+    
+    assert attached.job_id == holder.job_id
+
+
+def test_acquire_takes_over_lock_of_finished_job(db, create_job):
+    holder = create_job("holder.pdf")
+    extraction_single_flight.acquire(db, KEY, holder.job_id)
+    holder.status = JobStatusEnum.FAILED
+    db.commit()
+    
+    assert extraction_single_flight.acquire(db, KEY, "job-2") is None
+    
+    assert db.query(ExtractionLock).one().job_id == "job-2"
+
+
+def test_concurrent_identical_uploads_share_one_job(db, client):
+    barrier = threading.Barrier(4)
+    responses = []
+    
+    def submit():
+        barrier.wait()
+        responses.append(client.post("/api/extract", files=pdf_upload()).json())
+    
+    threads = [threading.Thread(target=submit) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len({response["job_id"] for response in responses}) == 1
+    assert sorted(response["deduplicated"] for response in responses) == [False, True, True, True]
+    assert db.query(ExtractionLock).count() == 1
+
+
+def test_lock_is_released_when_the_job_finishes(db, client, fake_gemini, pipeline_text):
+    job_id = client.post("/api/extract", files=pdf_upload()).json()["job_id"]
+    
+    run_extraction_job(job_id)
+    
+    assert db.query(ExtractionLock).count() == 0
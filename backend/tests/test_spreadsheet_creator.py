@@ -0,0 +1,102 @@
+"""Tests for the openpyxl workbook generator in standard and write-only modes."""
+
+import io
+
+import pytest
+from openpyxl import load_workbook
+
+from app.settings import settings
+from app.services.spreadsheet_creator import ExcelGenerator
+from app.templates.sheet_specs import (
+    HEADER_STYLE,
+    NUMBER_FORMATS,
+    SECTION_STYLE,
+    get_sheet_spec,
+    get_sheet_specs,
+    number_style_name
+)
+
+
+def render(data, write_only):
+    """Generate a workbook in memory and load it back."""
+    buffer = io.BytesIO()
+    ExcelGenerator(write_only=write_only).generate_excel(data, buffer)
+    buffer.seek(0)
+    return load_workbook(buffer)
+
+
+@pytest.mark.parametrize("write_only", [True, False])
+def test_sheet_properties_follow_specs(report_data, write_only):
+    workbook = render(report_data, write_only)
+    specs = get_sheet_specs("fund_report_v1")
+    
+    assert workbook.sheetnames == [spec.name for spec in specs]
+    for spec in specs:
+        ws = workbook[spec.name]
+        assert ws.row_dimensions[1].height == spec.header_height
+        assert ws.freeze_panes == spec.freeze_panes
+        assert ws.cell(row=1, column=1).style == HEADER_STYLE
+
+
+@pytest.mark.parametrize("sheet_name", ["Statement of Cashflows", "PCAP Statement"])
+def test_write_only_keeps_header_height(report_data, sheet_name):
+    ws = render(report_data, write_only=True)[sheet_name]
+    
+    assert ws.row_dimensions[1].height == 20
+    assert ws.row_dimensions[2].height is None
+    assert ws.freeze_panes == "B2"
+
+
+def test_write_only_matches_standard_mode(report_data):
+    streamed = render(report_data, write_only=True)
+    standard = render(report_data, write_only=False)
+    
+    for name in standard.sheetnames:
+        expected, actual = standard[name], streamed[name]
+        assert list(actual.values) == list(expected.values)
+        for letter, dimension in expected.column_dimensions.items():
+            assert actual.column_dimensions[letter].width == dimension.width
+
+
+@pytest.mark.parametrize("write_only", [True, False])
+def test_column_widths_are_sized_from_sampled_rows(monkeypatch, report_data, write_only):
+    monkeypatch.setattr(settings, "EXCEL_WIDTH_SAMPLE_ROWS", 2)
+    report_data["schedule_of_investments"][3]["company"] = "Company past the sample"
+    report_data["footnotes"][0]["description"] = "x" * 80
+    workbook = render(report_data, write_only)
+    
+    # "Company" header (7) wins: the long name is in the fourth row
+    assert workbook["Schedule of Investments"].column_dimensions["A"].width == 9
+    assert workbook["Footnotes"].column_dimensions["D"].width == 50
+
+
+@pytest.mark.parametrize("write_only", [True, False])
+def test_named_styles_are_registered_once(report_data, write_only):
+    workbook = render(report_data, write_only)
+    
+    expected = {HEADER_STYLE, SECTION_STYLE} | {number_style_name(name) for name in NUMBER_FORMATS}
+    assert expected <= set(workbook.style_names)
+    assert len(workbook.style_names) == len(set(workbook.style_names))
+
+
+@pytest.mark.parametrize("write_only", [True, False])
+def test_cells_carry_named_styles(report_data, write_only):
+    workbook = render(report_data, write_only)
+    spec = get_sheet_spec("Schedule of Investments")
+    ws = workbook[spec.name]
+    
+    header = ws.cell(row=1, column=1)
+    assert header.font.bold and header.font.color.rgb.endswith("FFFFFF")
+    assert header.fill.start_color.rgb.endswith("366092")
+    for key, format_name in [("reported_value", "currency"), ("since_inception_irr", "percent")]:
+        cell = ws.cell(row=2, column=spec.keys.index(key) + 1)
+        assert cell.style == number_style_name(format_name)
+        assert cell.number_format == NUMBER_FORMATS[format_name]
+    assert ws.cell(row=2, column=1).style == "Normal"
+    
+    summary = workbook["Portfolio Summary"]
+    section_labels = [row[0] for row in summary.iter_rows(min_row=2) if row[0].style == SECTION_STYLE]
+    assert [cell.value for cell in section_labels] == [
+        "Portfolio Breakdown By Region", "Portfolio Breakdown By Industry"
+    ]
+    assert all(cell.font.bold for cell in section_labels)
@@ -0,0 +1,56 @@
+"""Tests for reusing results of identical uploads."""
+
+from conftest import pdf_upload
+
+from app.settings import settings
+from app.database.operations import ExtractionResultService, UploadedFileService
+from app.services.extraction_pipeline import run_extraction_job
+
+
+def submit(client, content=b"%PDF-1.4 report", **form):
+    response = client.post("/api/extract", files=pdf_upload(content=content), data=form)
+    assert response.status_code in (200, 202), response.text
+    return response
+
+
+def test_identical_upload_returns_existing_result(db, client, fake_gemini, pipeline_text):
+    first = submit(client).json()
+    run_extraction_job(first["job_id"])
+    
+    second = submit(client)
+    
+    assert second.status_code == 200
+    payload = second.json()
+    assert payload["deduplicated"] is True
+    assert payload["job_id"] == first["job_id"]
+    assert payload["status"] == "completed"
+    assert payload["result_id"] == ExtractionResultService.get_by_file_id(db, first["file_id"]).id
+    assert len(fake_gemini.calls) == 1
+    assert len(UploadedFileService.get_all(db)) == 1
+
+
+def test_different_content_or_template_is_extracted_again(db, client, fake_gemini, pipeline_text):
+    first = submit(client).json()
+    run_extraction_job(first["job_id"])
+    
+    assert submit(client, content=b"%PDF-1.4 other report").json()["deduplicated"] is False
+    assert submit(client, template_id="other_template").json()["deduplicated"] is False
+
+
+def test_result_is_not_reused_after_model_or_prompt_change(db, client, fake_gemini, pipeline_text, monkeypatch):
+    first = submit(client).json()
+    run_extraction_job(first["job_id"])
+    
+    monkeypatch.setattr(settings, "GEMINI_MODEL", "another-model")
+    
+    assert submit(client).json()["deduplicated"] is False
+
+
+def test_force_skips_deduplication(db, client, fake_gemini, pipeline_text):
+    first = submit(client).json()
+    run_extraction_job(first["job_id"])
+    
+    forced = submit(client, force="true").json()
+    
+    assert forced["deduplicated"] is False
+    assert forced["job_id"] != first["job_id"]
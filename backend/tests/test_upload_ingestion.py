@@ -0,0 +1,82 @@
+"""Tests for streaming upload ingestion and the upload size limit middleware."""
+
+import hashlib
+import io
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.services.upload_ingestion import UploadRejected, UploadSizeLimitMiddleware, hash_file, ingest_upload
+
+PDF_BYTES = b"%PDF-1.4\n" + b"0123456789" * 100
+
+
+def test_ingest_upload_hashes_and_counts_in_chunks(tmp_path):
+    dest = tmp_path / "upload.pdf"
+    
+    upload = ingest_upload(io.BytesIO(PDF_BYTES), str(dest), max_size=10_000, chunk_size=64)
+    
+    assert upload.size == len(PDF_BYTES)
+    assert upload.sha256 == hashlib.sha256(PDF_BYTES).hexdigest()
+    assert dest.read_bytes() == PDF_BYTES
+    assert hash_file(str(dest), chunk_size=7) == upload.sha256
+
+
+@pytest.mark.parametrize("data, max_size, status_code", [
+    (b"not a pdf", 10_000, 400),
+    (b"", 10_000, 400),
+    (PDF_BYTES, 500, 413)
+])
+def test_ingest_upload_rejects_and_removes_partial_file(tmp_path, data, max_size, status_code):
+    dest = tmp_path / "upload.pdf"
+    
+    with pytest.raises(UploadRejected) as error:
+        ingest_upload(io.BytesIO(data), str(dest), max_size=max_size, chunk_size=64)
+    
+    assert error.value.status_code == status_code
+    assert not dest.exists()
+
+
+@pytest.fixture
+def limited_client():
+    """App echoing the size of POST /upload bodies, limited to 100 bytes."""
+    app = FastAPI()
+    
+    @app.post("/upload")
+    async def upload(request: Request):
+        return {"size": len(await request.body())}
+    
+    app.add_middleware(UploadSizeLimitMiddleware, limits={"/upload": 100})
+    return TestClient(app)
+
+
+def test_size_limit_allows_small_bodies(limited_client):
+    response = limited_client.post("/upload", content=b"x" * 100)
+    
+    assert response.status_code == 200
+    assert response.json() == {"size": 100}
+
+
+def test_size_limit_rejects_declared_content_length(limited_client):
+    response = limited_client.post("/upload", content=b"x" * 101)
+    
+    assert response.status_code == 413
+    assert response.json() == {"detail": "Request body too large"}
+
+
+def test_size_limit_rejects_streamed_chunked_body(limited_client):
+    def chunks():
+        for _ in range(5):
+            yield b"x" * 40
+    
+    response = limited_client.post("/upload", content=chunks())
+    
+    assert response.status_code == 413
+
+
+def test_extract_endpoint_rejects_non_pdf_content(client):
+    response = client.post("/api/extract", files={"file": ("report.pdf", b"plain text", "application/pdf")})
+    
+    assert response.status_code == 400
+    assert response.json()["detail"] == "File is not a valid PDF"
@@ -0,0 +1,163 @@
+"""Tests for EXCEL_OUTPUT_MODE: workbooks rendered in memory or on first download."""
+
+import io
+import os
+import time
+
+import pytest
+from openpyxl import load_workbook
+
+from conftest import pdf_upload
+
+import app_server
+from app.settings import settings
+from app.database.operations import ExtractionResultService
+from app.services.extraction_pipeline import run_extraction_job
+from app.services.workbook_store import RenderedWorkbookCache, evict_output_dir, rendered_workbook_cache
+
+
+def extract(client, output_mode, monkeypatch):
+    """Run an extraction in an output mode; returns the job's download URL."""
+    monkeypatch.setattr(settings, "EXCEL_OUTPUT_MODE", output_mode)
+    job_id = client.post("/api/extract", files=pdf_upload()).json()["job_id"]
+    run_extraction_job(job_id)
+    return client.get(f"/api/jobs/{job_id}").json()["download_url"]
+
+
+def output_path(download_url):
+    return os.path.join(settings.OUTPUT_DIR, download_url.rsplit("/", 1)[1])
+
+
+@pytest.fixture
+def memory_url(db, client, fake_gemini, pipeline_text, monkeypatch):
+    """Download URL of a result rendered in memory."""
+    url = extract(client, "memory", monkeypatch)
+    rendered_workbook_cache.invalidate(url.rsplit("/", 1)[1])
+    return url
+
+
+def test_memory_mode_renders_on_download(client, memory_url):
+    assert not os.path.exists(output_path(memory_url))
+    
+    response = client.get(memory_url)
+    
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('W/"')
+    assert response.headers["accept-ranges"] == "none"
+    assert response.headers["cache-control"] == "no-cache"
+    assert response.headers["content-disposition"].startswith("attachment")
+    workbook = load_workbook(io.BytesIO(response.content))
+    assert workbook["Portfolio Summary"]["B7"].value == "Fund II"
+    assert not os.path.exists(output_path(memory_url))
+
+
+def test_memory_mode_revalidates_without_rendering(client, memory_url, monkeypatch):
+    etag = client.get(memory_url).headers["etag"]
+    
+    def no_render(db_result):
+        raise AssertionError("workbook rendered for a matching If-None-Match")
+    monkeypatch.setattr(app_server, "render_workbook_bytes", no_render)
+    
+    revalidated = client.get(memory_url, headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+
+
+def test_memory_mode_ignores_range(client, memory_url):
+    full = client.get(memory_url)
+    partial = client.get(memory_url, headers={"Range": "bytes=0-9"})
+    
+    assert partial.status_code == 200
+    assert len(partial.content) == len(full.content)
+
+
+@pytest.fixture
+def lazy_url(db, client, fake_gemini, pipeline_text, monkeypatch):
+    """Download URL of a result whose workbook is rendered on first download."""
+    return extract(client, "lazy", monkeypatch)
+
+
+def test_lazy_mode_renders_once_on_first_download(client, lazy_url):
+    path = output_path(lazy_url)
+    assert not os.path.exists(path)
+    
+    first = client.get(lazy_url)
+    assert first.status_code == 200
+    assert os.path.exists(path)
+    assert not [name for name in os.listdir(settings.OUTPUT_DIR) if name.endswith(".tmp")]
+    mtime = os.stat(path).st_mtime_ns
+    
+    second = client.get(lazy_url)
+    assert second.content == first.content
+    assert second.headers["etag"] == first.headers["etag"]
+    assert not second.headers["etag"].startswith("W/")
+    assert os.stat(path).st_mtime_ns == mtime
+    assert client.get(lazy_url, headers={"Range": "bytes=0-9"}).status_code == 206
+
+
+def test_missing_disk_workbook_is_rendered_again(db, client, fake_gemini, pipeline_text, monkeypatch):
+    url = extract(client, "disk", monkeypatch)
+    os.remove(output_path(url))
+    
+    response = client.get(url)
+    
+    assert response.status_code == 200
+    assert os.path.exists(output_path(url))
+
+
+def test_eviction_keeps_unknown_files_and_the_new_render(db, create_job, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "OUTPUT_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "EXCEL_CACHE_MAX_MB", 0)
+    now = time.time()
+    for age, name in enumerate(["kept.xlsx", "old.xlsx", "older.xlsx", "foreign.xlsx"]):
+        path = tmp_path / name
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (now - age * 60, now))
+        if name != "foreign.xlsx":
+            file_id = create_job(filename=f"{name}.pdf").file_id
+            ExtractionResultService.create(db, file_id=file_id, excel_filename=name, excel_path=str(path))
+    
+    assert evict_output_dir(db, keep=str(tmp_path / "kept.xlsx")) == 2
+    assert sorted(os.listdir(tmp_path)) == ["foreign.xlsx", "kept.xlsx"]
+
+
+def test_eviction_stops_under_the_size_limit(db, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "OUTPUT_DIR", str(tmp_path))
+    (tmp_path / "a.xlsx").write_bytes(b"x" * 100)
+    
+    assert evict_output_dir(db) == 0
+    assert os.listdir(tmp_path) == ["a.xlsx"]
+
+
+def test_rendered_workbook_cache_evicts_least_recently_used():
+    cache = RenderedWorkbookCache(max_bytes=10)
+    cache.put("a.xlsx", "W/\"1\"", b"aaaa")
+    cache.put("b.xlsx", "W/\"1\"", b"bbbb")
+    assert cache.get("a.xlsx", "W/\"1\"") == b"aaaa"
+    
+    cache.put("c.xlsx", "W/\"1\"", b"cccc")
+    assert cache.get("b.xlsx", "W/\"1\"") is None
+    assert cache.get("a.xlsx", "W/\"2\"") is None
+    assert cache.stats() == {"entries": 2, "bytes": 8, "max_bytes": 10}
+    
+    cache.put("huge.xlsx", "W/\"1\"", b"x" * 11)
+    cache.invalidate("a.xlsx")
+    assert cache.stats()["entries"] == 1
+
+
+def test_regenerate_moves_workbook_to_a_new_filename(db, client, lazy_url):
+    old_filename = lazy_url.rsplit("/", 1)[1]
+    client.get(lazy_url)
+    db_result = ExtractionResultService.get_by_excel_filename(db, old_filename)
+    
+    response = client.post(f"/api/results/{db_result.id}/regenerate")
+    
+    assert response.status_code == 200
+    body = response.json()
+    assert body["previous_file"] == old_filename
+    assert body["output_file"] != old_filename
+    assert body["output_file"].startswith(old_filename[:-len(".xlsx")])
+    assert not os.path.exists(output_path(lazy_url))
+    assert client.get(body["download_url"]).status_code == 200
+    assert client.get(lazy_url).status_code == 404
+    assert client.post("/api/results/999/regenerate").status_code == 404
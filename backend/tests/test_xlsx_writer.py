@@ -0,0 +1,78 @@
+"""Tests for FastXlsxWriter: workbooks must match ExcelGenerator's cell for cell."""
+
+import io
+
+import pytest
+from openpyxl import load_workbook
+
+from app.settings import settings
+from app.services.spreadsheet_creator import ExcelGenerator, create_workbook_writer
+from app.services.xlsx_writer import FastXlsxWriter
+
+
+def snapshot(buffer):
+    """Everything the two engines must agree on, per sheet and cell."""
+    buffer.seek(0)
+    workbook = load_workbook(buffer)
+    sheets = {}
+    for ws in workbook.worksheets:
+        cells = [
+            (
+                cell.coordinate, cell.value, cell.data_type, cell.number_format, cell.style,
+                cell.font.b, cell.font.color.rgb if cell.font.color else None,
+                cell.fill.fill_type, cell.fill.fgColor.rgb, cell.border.left.style,
+                cell.alignment.horizontal, cell.alignment.vertical
+            )
+            for row in ws.iter_rows() for cell in row
+        ]
+        sheets[ws.title] = {
+            "cells": cells,
+            "freeze_panes": ws.freeze_panes,
+            "widths": {letter: dim.width for letter, dim in ws.column_dimensions.items() if dim.customWidth},
+            "heights": {row: dim.height for row, dim in ws.row_dimensions.items() if dim.height}
+        }
+    return workbook.sheetnames, sorted(workbook.style_names), sheets
+
+
+def assert_same_workbook(data):
+    expected, actual = io.BytesIO(), io.BytesIO()
+    ExcelGenerator(write_only=False).generate_excel(data, expected)
+    FastXlsxWriter().generate_excel(data, actual)
+    
+    expected_names, expected_styles, expected_sheets = snapshot(expected)
+    actual_names, actual_styles, actual_sheets = snapshot(actual)
+    assert actual_names == expected_names
+    assert actual_styles == expected_styles
+    for name in expected_names:
+        assert actual_sheets[name] == expected_sheets[name], name
+
+
+def test_fast_writer_matches_excel_generator(report_data):
+    assert_same_workbook(report_data)
+
+
+def test_fast_writer_matches_on_awkward_values(report_data):
+    report_data["schedule_of_investments"][0].update({
+        "company": 'A & B <Holdings> "Ltd"',
+        "fund": "=SUM(1,2)",
+        "reported_date": "#N/A",
+        "investment_status": "",
+        "security_type": True,
+        "number_of_shares": 12345678901,
+        "fund_ownership_percent": 0.1 + 0.2,
+        "valuation_policy": "  padded  ",
+        "movement_summary": "Ünïcødé — ✓\nline2",
+        "reported_value": None
+    })
+    report_data["schedule_of_investments"][1]["company"] = "x" * 120
+    assert_same_workbook(report_data)
+
+
+def test_fast_writer_matches_on_empty_data():
+    assert_same_workbook({})
+
+
+@pytest.mark.parametrize("engine, writer_class", [("fast", FastXlsxWriter), ("openpyxl", ExcelGenerator)])
+def test_engine_setting_selects_writer(monkeypatch, engine, writer_class):
+    monkeypatch.setattr(settings, "EXCEL_ENGINE", engine)
+    assert type(create_workbook_writer()) is writer_class
@@ -10,7 +10,7 @@ import ExtractionProcessor from './components/ExtractionProcessor';
 import OutputDisplay from './components/OutputDisplay';
 import RecordsArchive from './components/RecordsArchive';
 import DataComparison from './components/DataComparison';
-import { uploadFiles } from './services/api';
+import { uploadFiles, watchJob, waitForBatch, cancelJob } from './services/api';
 import './App.css';
 
 function App() {
@@ -22,6 +22,8 @@ function App() {
   const [processingComplete, setProcessingComplete] = useState(false);
   const [sidebarWidth, setSidebarWidth] = useState(280);
   const [isProcessing, setIsProcessing] = useState(false);
+  const [jobProgress, setJobProgress] = useState({ progress: 0, step: 'queued' });
+  const [activeJobId, setActiveJobId] = useState(null);
 
   // Determine current page from URL
   const getCurrentPage = () => {
@@ -45,17 +47,6 @@ function App() {
     }
   };
 
-  const handleProgressComplete = (progress) => {
-    if (progress === 100) {
-      setProcessingComplete(true);
-      toast.success('Extraction completed successfully! 🎉');
-      // Wait a moment at 100% before showing results
-      setTimeout(() => {
-        navigate('/results');
-      }, 800);
-    }
-  };
-
   const handleStartExtraction = async () => {
     if (selectedFiles.length === 0) {
       toast.error('Please select at least one PDF file');
@@ -69,12 +60,40 @@ function App() {
     setProcessingComplete(false);
 
     try {
-      // The new backend returns results immediately (synchronous)
-      const response = await uploadFiles(selectedFiles, 'fund_report_v1');
+      // The backend queues the extraction and returns a job ID
+      const queued = await uploadFiles(selectedFiles, 'fund_report_v1');
+      toast.loading('Extracting data...', { id: 'extraction' });
       
-      if (response.success) {
+      if (queued.batch_id) {
+        const batch = await waitForBatch(queued.batch_id, (b) => {
+          toast.loading(`Extracting data... ${b.progress_percentage}% of ${b.total_files} files`, { id: 'extraction' });
+        });
+        const completed = batch.files.filter((f) => f.status === 'completed');
+        if (completed.length === 0) {
+          throw new Error('All files in the batch failed to extract');
+        }
+        // Show the first completed file; the rest are available in history
+        setOutputFilename(completed[0].output_file);
+        toast.success(`Extracted ${completed.length} of ${batch.total_files} files 🎉`, { id: 'extraction' });
+        setIsProcessing(false);
+        setTimeout(() => {
+          navigate('/results');
+        }, 500);
+        return;
+      }
+      
+      // Follow live progress on the processing page
+      setJobProgress({ progress: 0, step: queued.status === 'completed' ? 'completed' : 'queued' });
+      setActiveJobId(queued.job_id);
+      navigate('/processing');
+      const response = await watchJob(queued.job_id, (job) => {
+        setJobProgress({ progress: job.progress_percentage ?? 0, step: job.current_step });
+      });
+      
+      if (response.status === 'completed') {
         // Store the output filename
         setOutputFilename(response.output_file);
+        setProcessingComplete(true);
         toast.success('Extraction completed successfully! 🎉', { id: 'extraction' });
         setIsProcessing(false);
         // Navigate to results page after successful extraction
@@ -89,6 +108,19 @@ function App() {
       toast.error(errorMessage, { id: 'extraction' });
       setError(errorMessage);
       setIsProcessing(false);
+      if (location.pathname === '/processing') {
+        navigate('/');
+      }
+    }
+  };
+
+  const handleCancelExtraction = async () => {
+    if (!activeJobId) return;
+    try {
+      // The pending watchJob rejects with "Extraction cancelled" once the job stops
+      await cancelJob(activeJobId);
+    } catch (err) {
+      toast.error(err.response?.data?.detail || 'Could not cancel extraction');
     }
   };
 
@@ -270,7 +302,9 @@ function App() {
             <Route path="/processing" element={
               <ExtractionProcessor 
                 fileName={selectedFiles[0]?.name} 
-                onProgressUpdate={handleProgressComplete}
+                progress={jobProgress.progress}
+                currentStep={jobProgress.step}
+                onCancel={handleCancelExtraction}
               />
             } />
 
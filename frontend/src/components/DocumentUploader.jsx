@@ -46,11 +46,13 @@ const FileUpload = ({ onFilesSelected, disabled, isProcessing }) => {
     validator: (file) => {
       // Custom validator - files will be visible but validated on selection
       const isPDF = file.type === 'application/pdf' || file.name.toLowerCase().endsWith('.pdf');
+      // Zip archives of PDFs are uploaded through the batch endpoint
+      const isZip = file.name.toLowerCase().endsWith('.zip');
       
-      if (!isPDF) {
+      if (!isPDF && !isZip) {
         return {
           code: 'file-invalid-type',
-          message: 'Only PDF files are allowed'
+          message: 'Only PDF files (or zip archives of PDFs) are allowed'
         };
       }
       
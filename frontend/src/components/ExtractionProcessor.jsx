@@ -1,9 +1,25 @@
 import React, { useEffect, useState } from 'react';
 
-const ProcessingPage = ({ fileName, onProgressUpdate }) => {
-  const [currentStep, setCurrentStep] = useState(0);
-  const [progress, setProgress] = useState(0);
+// Map the pipeline step reported by the server onto the displayed steps
+const stepIndexFor = (step, progress) => {
+  switch (step) {
+    case 'processing_with_ai':
+      // Progress moves past 40% once the first chunk has been extracted
+      return progress > 40 ? 2 : 1;
+    case 'reextracting_sections':
+      return 3;
+    case 'generating_excel':
+      return 4;
+    case 'completed':
+      return 5;
+    default:
+      return 0;
+  }
+};
+
+const ProcessingPage = ({ fileName, progress = 0, currentStep: serverStep, onCancel }) => {
   const [dots, setDots] = useState('');
+  const currentStep = stepIndexFor(serverStep, progress);
 
   const steps = [
     { 
@@ -47,43 +63,6 @@ const ProcessingPage = ({ fileName, onProgressUpdate }) => {
     return () => clearInterval(interval);
   }, []);
 
-  // Smooth progress animation
-  useEffect(() => {
-    if (currentStep < steps.length) {
-      const step = steps[currentStep];
-      const duration = currentStep === 2 ? 3500 : 2000; // AI step takes longer
-      const startProgress = step.startProgress;
-      const endProgress = step.endProgress;
-      const startTime = Date.now();
-
-      const animateProgress = () => {
-        const elapsed = Date.now() - startTime;
-        const progressPercent = Math.min(elapsed / duration, 1);
-        
-        // Easing function for smooth animation
-        const easeOutQuad = (t) => t * (2 - t);
-        const easedProgress = easeOutQuad(progressPercent);
-        
-        const currentProgress = startProgress + (endProgress - startProgress) * easedProgress;
-        setProgress(Math.round(currentProgress));
-
-        if (progressPercent < 1) {
-          requestAnimationFrame(animateProgress);
-        } else if (currentStep < steps.length - 1) {
-          // Move to next step
-          setTimeout(() => setCurrentStep(prev => prev + 1), 300);
-        } else {
-          // Notify parent that processing is complete
-          if (onProgressUpdate) {
-            onProgressUpdate(100);
-          }
-        }
-      };
-
-      requestAnimationFrame(animateProgress);
-    }
-  }, [currentStep]);
-
   return (
     <div className="min-h-[80vh] flex items-center justify-center p-6">
       <div className="w-full max-w-3xl relative">
@@ -209,6 +188,17 @@ const ProcessingPage = ({ fileName, onProgressUpdate }) => {
               </p>
             </div>
 
+            {onCancel && currentStep < steps.length && (
+              <div className="flex justify-center">
+                <button
+                  onClick={onCancel}
+                  className="px-6 py-2 rounded-full bg-white/20 hover:bg-white/30 border-2 border-white/40 text-white font-semibold transition-colors duration-200"
+                >
+                  Cancel extraction
+                </button>
+              </div>
+            )}
+
             {/* Info Message */}
             <div className="flex items-start gap-4 p-5 bg-white/10 border-2 border-white/30 rounded-2xl backdrop-blur-sm">
               <div className="flex-shrink-0">
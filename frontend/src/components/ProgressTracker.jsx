@@ -1,40 +1,31 @@
 import React, { useEffect, useState } from 'react';
-import { getJobStatus } from '../services/api';
+import { subscribeToJob } from '../services/api';
 
 const ExtractionProgress = ({ jobId, onComplete, onError }) => {
   const [status, setStatus] = useState(null);
-  const [polling, setPolling] = useState(true);
 
   useEffect(() => {
-    if (!jobId || !polling) return;
+    if (!jobId) return;
 
-    const pollStatus = async () => {
-      try {
-        const data = await getJobStatus(jobId);
+    // Live progress pushed by the server (falls back to polling if the stream drops)
+    const unsubscribe = subscribeToJob(jobId, {
+      onEvent: (data) => {
         setStatus(data);
 
         if (data.status === 'completed') {
-          setPolling(false);
           onComplete(data);
-        } else if (data.status === 'failed') {
-          setPolling(false);
-          onError(data.errors);
+        } else if (data.status === 'failed' || data.status === 'cancelled') {
+          onError([data.error_message || `Extraction ${data.status}`]);
         }
-      } catch (error) {
-        console.error('Error polling status:', error);
-        setPolling(false);
+      },
+      onError: (error) => {
+        console.error('Error following job progress:', error);
         onError([error.message]);
-      }
-    };
+      },
+    });
 
-    // Poll immediately
-    pollStatus();
-
-    // Then poll every 2 seconds
-    const interval = setInterval(pollStatus, 2000);
-
-    return () => clearInterval(interval);
-  }, [jobId, polling, onComplete, onError]);
+    return unsubscribe;
+  }, [jobId, onComplete, onError]);
 
   if (!status) {
     return (
@@ -90,28 +81,27 @@ const ExtractionProgress = ({ jobId, onComplete, onError }) => {
 
           <div className="w-full space-y-3">
             <p className="text-sm text-slate-600 dark:text-slate-400 text-center">
-              Files processed: <strong className="text-slate-900 dark:text-white">{status.files_processed}</strong> / <strong className="text-slate-900 dark:text-white">{status.total_files}</strong>
+              Current step: <strong className="text-slate-900 dark:text-white">{status.current_step || 'queued'}</strong>
+              {status.chunk && (
+                <> (chunk <strong className="text-slate-900 dark:text-white">{status.chunk}</strong> / <strong className="text-slate-900 dark:text-white">{status.total_chunks}</strong>)</>
+              )}
             </p>
             
             <div className="w-full h-4 bg-slate-200 dark:bg-slate-700 rounded-full overflow-hidden">
               <div 
                 className="h-full bg-gradient-to-r from-blue-500 to-cyan-500 transition-all duration-500 ease-out rounded-full shadow-lg shadow-blue-500/50"
-                style={{ width: `${status.progress}%` }}
+                style={{ width: `${status.progress_percentage ?? 0}%` }}
               ></div>
             </div>
             
-            <p className="text-3xl font-black text-center text-blue-600 dark:text-blue-400">{status.progress.toFixed(0)}%</p>
+            <p className="text-3xl font-black text-center text-blue-600 dark:text-blue-400">{(status.progress_percentage ?? 0).toFixed(0)}%</p>
           </div>
         </div>
 
-        {status.errors && status.errors.length > 0 && (
+        {status.error_message && (
           <div className="mt-6 p-4 bg-red-50 dark:bg-red-900/20 border-l-4 border-red-500 rounded-lg">
             <h4 className="text-sm font-bold text-red-700 dark:text-red-400 mb-2">Errors:</h4>
-            <ul className="space-y-1">
-              {status.errors.map((error, index) => (
-                <li key={index} className="text-sm text-red-600 dark:text-red-400">{error}</li>
-              ))}
-            </ul>
+            <p className="text-sm text-red-600 dark:text-red-400">{status.error_message}</p>
           </div>
         )}
       </div>
@@ -6,27 +6,139 @@ const api = axios.create({
   baseURL: API_BASE_URL,
 });
 
-export const uploadFiles = async (files, templateId) => {
+export const uploadFiles = async (files, templateId, force = false) => {
   const formData = new FormData();
   
-  // The new backend only supports single file upload
-  const file = files[0];
-  formData.append('file', file);
+  // Multiple files (or zip archives) go through the batch endpoint in one request
+  const isBatch = files.length > 1 || files[0].name.toLowerCase().endsWith('.zip');
+  if (isBatch) {
+    files.forEach((file) => formData.append('files', file));
+  } else {
+    formData.append('file', files[0]);
+  }
   formData.append('template_id', templateId || 'fund_report_v1');
+  // Identical uploads reuse the existing result unless forced
+  if (force) {
+    formData.append('force', 'true');
+  }
   
-  const response = await api.post('/extract', formData, {
-    headers: {
-      'Content-Type': 'multipart/form-data',
-    },
-  });
+  const headers = { 'Content-Type': 'multipart/form-data' };
+  // Single uploads carry an Idempotency-Key so a retried request returns the original job
+  if (!isBatch && window.crypto?.randomUUID) {
+    headers['Idempotency-Key'] = window.crypto.randomUUID();
+  }
+  
+  const response = await api.post(isBatch ? '/extract/batch' : '/extract', formData, { headers });
   
   return response.data;
 };
 
 export const getJobStatus = async (jobId) => {
-  // For the new backend, this is not needed as extraction is synchronous
-  // Return completed status
-  return { status: 'completed', job_id: jobId };
+  const response = await api.get(`/jobs/${jobId}`);
+  return response.data;
+};
+
+const TERMINAL_STATUSES = ['completed', 'failed', 'cancelled'];
+
+// Subscribe to live job progress over server-sent events. Falls back to polling
+// when EventSource is unavailable or the stream drops. Returns an unsubscribe function.
+export const subscribeToJob = (jobId, { onEvent, onError }) => {
+  let closed = false;
+  let source = null;
+  let pollTimer = null;
+
+  const close = () => {
+    closed = true;
+    if (source) {
+      source.close();
+    }
+    if (pollTimer) {
+      clearTimeout(pollTimer);
+    }
+  };
+
+  const poll = async () => {
+    if (closed) return;
+    try {
+      const job = await getJobStatus(jobId);
+      const done = TERMINAL_STATUSES.includes(job.status);
+      onEvent({ event: done ? job.status : 'progress', ...job });
+      if (done) {
+        close();
+        return;
+      }
+      pollTimer = setTimeout(poll, 2000);
+    } catch (err) {
+      close();
+      if (onError) {
+        onError(err);
+      }
+    }
+  };
+
+  if (typeof EventSource === 'undefined') {
+    poll();
+    return close;
+  }
+
+  source = new EventSource(`${API_BASE_URL}/jobs/${jobId}/events`);
+  const handleEvent = (e) => {
+    const data = JSON.parse(e.data);
+    onEvent(data);
+    if (TERMINAL_STATUSES.includes(data.event)) {
+      close();
+    }
+  };
+  ['progress', ...TERMINAL_STATUSES].forEach((name) => source.addEventListener(name, handleEvent));
+  source.onerror = () => {
+    if (closed) return;
+    source.close();
+    source = null;
+    poll();
+  };
+
+  return close;
+};
+
+// Resolve once the job completes, reporting progress events along the way
+export const watchJob = (jobId, onProgress) => new Promise((resolve, reject) => {
+  subscribeToJob(jobId, {
+    onEvent: (job) => {
+      if (onProgress) {
+        onProgress(job);
+      }
+      if (job.status === 'completed') {
+        resolve(job);
+      } else if (job.status === 'failed' || job.status === 'cancelled') {
+        reject(new Error(job.error_message || `Extraction ${job.status}`));
+      }
+    },
+    onError: reject,
+  });
+});
+
+export const cancelJob = async (jobId) => {
+  const response = await api.post(`/jobs/${jobId}/cancel`);
+  return response.data;
+};
+
+export const getBatchStatus = async (batchId) => {
+  const response = await api.get(`/batches/${batchId}`);
+  return response.data;
+};
+
+// Poll a batch until none of its jobs are pending or processing
+export const waitForBatch = async (batchId, onProgress, intervalMs = 3000) => {
+  for (;;) {
+    const batch = await getBatchStatus(batchId);
+    if (onProgress) {
+      onProgress(batch);
+    }
+    if (batch.status !== 'processing') {
+      return batch;
+    }
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
 };
 
 export const getExtractionResults = async (jobId) => {
@@ -44,6 +156,41 @@ export const getExtractionHistory = async () => {
   return response.data;
 };
 
+export const getResultSheets = async (resultId) => {
+  const response = await api.get(`/results/${resultId}/sheets`);
+  return response.data;
+};
+
+// One page of a sheet as JSON rows, built server-side from the stored result data
+export const getResultSheetPage = async (resultId, sheet, { skip = 0, limit, columns } = {}) => {
+  const response = await api.get(`/results/${resultId}/sheets/${encodeURIComponent(sheet)}`, {
+    params: { skip, limit, columns },
+    paramsSerializer: { indexes: null },
+  });
+  return response.data;
+};
+
+// Server-side diff of two results; page through it with getComparisonPage
+export const compareResults = async (resultId, otherId, params = {}) => {
+  const response = await api.get(`/results/${resultId}/compare/${otherId}`, { params });
+  return response.data;
+};
+
+export const compareResultWithWorkbook = async (resultId, file, params = {}) => {
+  const formData = new FormData();
+  formData.append('file', file);
+  const response = await api.post(`/results/${resultId}/compare`, formData, {
+    headers: { 'Content-Type': 'multipart/form-data' },
+    params,
+  });
+  return response.data;
+};
+
+export const getComparisonPage = async (comparisonId, { sheet, skip = 0, limit } = {}) => {
+  const response = await api.get(`/comparisons/${comparisonId}`, { params: { sheet, skip, limit } });
+  return response.data;
+};
+
 export const downloadFile = async (filename) => {
   const url = `${API_BASE_URL}/download/${filename}`;
   window.open(url, '_blank');